@@ -1,12 +1,7 @@
 import sys
 
-from PyQt5.QtGui import QIcon
-
-# Project modules
+# Project modules that do not import Qt
 from config.constants import COMPANY_NAME, PROGRAM_NAME
-from ui.ctharvester_app import CTHarvesterApp
-from ui.exception_handler import install_global_exception_hook
-from ui.main_window import CTHarvesterMainWindow
 from utils.common import ensure_directories, resource_path
 from utils.paths import user_directories
 from version import __version__
@@ -24,6 +19,21 @@
 logger, session_id = setup_logger(PROGRAM_NAME)
 logger.info(f"CTHarvester version {__version__} starting")
 
+# --batch builds thumbnail pyramids for the directories that follow it and
+# exits. It is dispatched here, before anything below imports PyQt5 and
+# OpenGL, so it runs on a server with no display and no libGL. See
+# core.batch_builder for its arguments.
+if __name__ == "__main__" and "--batch" in sys.argv[1:]:
+    from core.batch_builder import main as batch_main
+
+    sys.exit(batch_main(sys.argv[sys.argv.index("--batch") + 1 :]))
+
+from PyQt5.QtGui import QIcon
+
+from ui.ctharvester_app import CTHarvesterApp
+from ui.exception_handler import install_global_exception_hook
+from ui.main_window import CTHarvesterMainWindow
+
 
 def main():
     """Main application entry point"""
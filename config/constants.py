@@ -76,7 +76,6 @@
 MIN_THREADS = 1
 MAX_THREADS = 8
 DEFAULT_THREADS = 1  # Single thread optimal for Python fallback
-GARBAGE_COLLECTION_INTERVAL = 10  # Collect garbage every N items
 
 # Performance Monitoring
 STALL_DETECTION_THRESHOLD = 12  # Number of 5-second checks before stall warning (60 seconds)
@@ -88,6 +87,43 @@
 MEMORY_THRESHOLD_MB = 4096
 IMAGE_MEMORY_ESTIMATE_MB = 50  # Estimated memory per image
 
+# Memory budget of a pyramid build (see core.memory_budget); processing.memory_limit_gb
+# sets the total, the shares split it between the parts of the build that hold images
+DEFAULT_MEMORY_LIMIT_GB = 4
+MEMORY_SHARE_VOLUME = 0.5  # The level kept in memory for the 3D view
+MEMORY_SHARE_TASKS = 0.3  # Slices held by tasks in flight
+MEMORY_SHARE_PREFETCH = 0.1  # Source slices decoded ahead
+MEMORY_SHARE_WRITES = 0.1  # Thumbnails waiting to be written
+
+# Read-ahead of source slices (see core.slice_prefetcher)
+PREFETCH_MEMORY_BUDGET_MB = 256  # Decoded slices held ahead of the consumer
+PREFETCH_MAX_SLICES = 8  # Window cap, however small the slices are
+PREFETCH_THREADS = 2  # Decoder threads; file reads and PIL decoding release the GIL
+
+# Decoded slices kept by the 2D viewer (see core.slice_cache)
+SLICE_CACHE_MEMORY_SHARE = 0.125  # Of processing.memory_limit_gb, shared by all levels
+VIEWER_PREFETCH_SLICES = 8  # Slices decoded ahead in the direction the slider moves
+VIEWER_RENDER_CACHE_ENTRIES = 8  # Thresholded renders kept per slice (threshold, ROI, size)
+
+# Meshes kept by the 3D preview (see core.mesh_service)
+MESH_CACHE_MB = 256  # By (ROI, level, isovalue, inverse), least recently used evicted first
+# Default of rendering.preview_triangle_budget. The preview is meshed at 50 voxels
+# on its longest side: a clean surface gives ~15k triangles, speckle up to ~400k.
+PREVIEW_TRIANGLE_BUDGET = 50_000
+
+# Marching cubes over slabs in worker processes (see core.slab_mcubes)
+SLAB_MESH_MIN_VOXELS = 16 * 1024**2  # Smaller volumes take less than process start-up
+SLAB_MESH_MIN_DEPTH = 8  # Planes per slab, at least
+
+# Exported mesh files (see core.mesh_writers)
+MESH_WRITE_CHUNK = 1 << 18  # Vertices or triangles serialised at a time
+
+# Write-behind of generated thumbnails (see core.output_writer)
+WRITE_QUEUE_MAX_PENDING = 8  # Outputs waiting to be written before the builder blocks
+
+# Pyramid index written after each build (see core.pyramid_index)
+PYRAMID_INDEX_SAMPLE_SLICES = 16  # Slices per level the value statistics are taken from
+
 # UI Settings
 DEFAULT_WINDOW_WIDTH = 1200
 DEFAULT_WINDOW_HEIGHT = 800
@@ -0,0 +1,383 @@
+"""Headless batch pyramid builder.
+
+Builds the .thumbnail pyramid for many scan directories without opening the
+GUI, so overnight scans are pre-pyramided before anyone opens them. Each
+dataset goes through the same two steps DirectoryOpenHandler takes --
+FileHandler.sort_file_list_from_dir to detect the stack, then a pyramid
+build -- with PyramidEngine doing the build, so nothing here imports Qt.
+
+Several datasets can build at once (jobs), each with its own worker count
+(threads) and an equal part of the memory limit. The outcome is a JSON
+summary with, per dataset, the per-level timings and throughput.
+
+Run from the command line through CTHarvester.py:
+
+    python CTHarvester.py --batch "/data/scans/*" --jobs 2 --threads 4 \\
+        --summary pyramid_summary.json
+"""
+
+import argparse
+import glob
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from core.file_handler import FileHandler, FileHandlerError
+from core.memory_budget import MemoryBudget
+from core.pyramid_engine import PyramidEngine, PyramidResult, resolve_worker_count
+
+logger = logging.getLogger(__name__)
+
+ENGINES = ("processes", "threads", "single-pass")
+
+
+def expand_directories(patterns: list[str]) -> list[str]:
+    """Turn command-line arguments into a list of scan directories.
+
+    Each argument is either a directory or a glob pattern matching
+    directories. Files matched by a pattern are ignored; duplicates are
+    dropped, first occurrence wins.
+
+    Args:
+        patterns: Directories and/or glob patterns
+
+    Returns:
+        list[str]: Directories, in argument order (patterns sorted)
+    """
+    directories: list[str] = []
+    seen: set[str] = set()
+    for pattern in patterns:
+        # glob.glob, not Path.glob: the pattern may be absolute, which Path.glob refuses
+        matches = [pattern]
+        if glob.has_magic(pattern):
+            matches = sorted(glob.glob(pattern))  # noqa: PTH207
+        if not matches:
+            logger.warning(f"Batch: pattern matched nothing: {pattern}")
+        for match in matches:
+            if not Path(match).is_dir():
+                if not glob.has_magic(pattern):
+                    logger.warning(f"Batch: not a directory, skipped: {match}")
+                continue
+            key = str(Path(match).resolve())
+            if key not in seen:
+                seen.add(key)
+                directories.append(match)
+    return directories
+
+
+def level_throughput(
+    settings: dict[str, Any], levels: list[dict[str, Any]], level_seconds: list[float]
+) -> list[dict[str, Any]]:
+    """Per-level timing entries for the summary.
+
+    Throughput is given in outputs per second and in source megapixels per
+    second -- every output reads two slices of the level below, so the
+    second figure is what makes levels of different size comparable.
+
+    Args:
+        settings: The dataset's settings (image_width, image_height, seq_begin, seq_end)
+        levels: PyramidEngine.plan(settings)
+        level_seconds: PyramidResult.level_seconds; shorter than levels (or
+            empty, in single-pass mode) when levels were not timed
+
+    Returns:
+        list[dict]: level, width, height, outputs, seconds,
+        outputs_per_second, megapixels_per_second (None where not timed)
+    """
+    src_width = int(settings["image_width"])
+    src_height = int(settings["image_height"])
+    src_count = int(settings["seq_end"]) - int(settings["seq_begin"]) + 1
+
+    entries = []
+    for i, entry in enumerate(levels):
+        seconds = level_seconds[i] if i < len(level_seconds) else None
+        source_megapixels = src_width * src_height * src_count / 1e6
+        timed = seconds is not None and seconds > 0
+        entries.append(
+            {
+                "level": entry["level"],
+                "width": entry["width"],
+                "height": entry["height"],
+                "outputs": entry["count"],
+                "seconds": round(seconds, 3) if seconds is not None else None,
+                "outputs_per_second": round(entry["count"] / seconds, 2) if timed else None,
+                "megapixels_per_second": round(source_megapixels / seconds, 2) if timed else None,
+            }
+        )
+        src_width, src_height, src_count = entry["width"], entry["height"], entry["count"]
+    return entries
+
+
+class BatchPyramidBuilder:
+    """Builds pyramids for a list of scan directories, several at a time.
+
+    Attributes:
+        jobs: Datasets built concurrently
+        workers: Worker count given to each dataset's PyramidEngine
+        engine: "processes", "threads" or "single-pass"
+        max_thumbnail_size: Passed to PyramidEngine (None for the default)
+        memory_budget: Budget of the whole batch, split evenly among the jobs
+    """
+
+    def __init__(
+        self,
+        jobs: int = 1,
+        workers: int = 1,
+        engine: str = "processes",
+        max_thumbnail_size: int | None = None,
+        memory_limit_gb: float | None = None,
+    ):
+        """Initialize the batch builder.
+
+        Args:
+            jobs: Datasets built concurrently
+            workers: Worker count per dataset (see pyramid_engine.resolve_worker_count)
+            engine: "processes", "threads" or "single-pass"
+            max_thumbnail_size: Passed to PyramidEngine (None for the default)
+            memory_limit_gb: Memory limit of the whole batch in GB (None for
+                DEFAULT_MEMORY_LIMIT_GB)
+
+        Raises:
+            ValueError: engine is not one of ENGINES
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine {engine!r}, expected one of {', '.join(ENGINES)}")
+        self.jobs = max(1, jobs)
+        self.workers = max(1, workers)
+        self.engine = engine
+        self.max_thumbnail_size = max_thumbnail_size
+        self.memory_budget = MemoryBudget(memory_limit_gb)
+
+        self._lock = threading.Lock()
+        self._engines: set[PyramidEngine] = set()
+        self._cancelled = threading.Event()
+
+    def cancel(self) -> None:
+        """Stop the running builds and skip the datasets not started yet."""
+        self._cancelled.set()
+        with self._lock:
+            for engine in self._engines:
+                engine.cancel()
+
+    def run(self, directories: list[str]) -> dict[str, Any]:
+        """Build every directory's pyramid and summarise the batch.
+
+        A dataset that fails is recorded in the summary and the batch goes on.
+
+        Args:
+            directories: Scan directories
+
+        Returns:
+            dict: The summary -- started, elapsed, jobs, workers, engine,
+            succeeded, failed, and one entry per dataset (see build_dataset),
+            in the order given
+        """
+        started = datetime.now(UTC)
+        start_time = time.time()
+        logger.info(
+            f"Batch: {len(directories)} datasets, jobs={self.jobs}, workers={self.workers}, "
+            f"engine={self.engine}, {self.memory_budget}"
+        )
+
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            try:
+                datasets = list(executor.map(self.build_dataset, directories))
+            except KeyboardInterrupt:
+                # Let the running builds stop at their next progress event
+                # instead of waiting for them to finish on the way out.
+                self.cancel()
+                raise
+
+        succeeded = sum(1 for dataset in datasets if dataset["status"] == "ok")
+        summary = {
+            "started": started.isoformat(timespec="seconds"),
+            "elapsed": round(time.time() - start_time, 3),
+            "jobs": self.jobs,
+            "workers": self.workers,
+            "engine": self.engine,
+            "succeeded": succeeded,
+            "failed": len(datasets) - succeeded,
+            "datasets": datasets,
+        }
+        logger.info(
+            f"Batch complete in {summary['elapsed']:.1f}s: {succeeded} built, "
+            f"{summary['failed']} not"
+        )
+        return summary
+
+    def build_dataset(self, directory: str) -> dict[str, Any]:
+        """Detect one directory's stack and build its pyramid.
+
+        Args:
+            directory: Scan directory
+
+        Returns:
+            dict: directory, status ("ok", "failed" or "cancelled"), error,
+            and when the stack was detected: image_width, image_height,
+            slices, levels_built, generated, loaded, elapsed,
+            slices_per_second and levels (see level_throughput)
+        """
+        dataset: dict[str, Any] = {"directory": directory, "status": "failed", "error": None}
+        if self._cancelled.is_set():
+            dataset["status"] = "cancelled"
+            return dataset
+
+        try:
+            settings = FileHandler().sort_file_list_from_dir(directory)
+        except (FileHandlerError, OSError) as e:
+            logger.error(
+                f"Batch: could not read stack in {directory}",
+                exc_info=True,
+                extra={"extra_fields": {"error_type": "batch_open_error", "directory": directory}},
+            )
+            dataset["error"] = f"{type(e).__name__}: {e}"
+            return dataset
+
+        engine = PyramidEngine(
+            workers=self.workers,
+            use_processes=self.engine == "processes",
+            single_pass=self.engine == "single-pass",
+            max_thumbnail_size=self.max_thumbnail_size,
+            memory_budget=self.memory_budget.split(self.jobs),
+        )
+        with self._lock:
+            self._engines.add(engine)
+        try:
+            result = engine.build(directory, settings)
+        except (OSError, ValueError, MemoryError) as e:
+            logger.error(
+                f"Batch: pyramid build failed for {directory}",
+                exc_info=True,
+                extra={"extra_fields": {"error_type": "batch_build_error", "directory": directory}},
+            )
+            dataset["error"] = f"{type(e).__name__}: {e}"
+            return dataset
+        finally:
+            with self._lock:
+                self._engines.discard(engine)
+
+        dataset.update(self._describe(settings, engine.plan(settings), result))
+        return dataset
+
+    @staticmethod
+    def _describe(
+        settings: dict[str, Any], levels: list[dict[str, Any]], result: PyramidResult
+    ) -> dict[str, Any]:
+        """Summary fields of one finished (or cancelled) build."""
+        slices = int(settings["seq_end"]) - int(settings["seq_begin"]) + 1
+        return {
+            "status": "cancelled" if result.cancelled else "ok",
+            "image_width": int(settings["image_width"]),
+            "image_height": int(settings["image_height"]),
+            "slices": slices,
+            "levels_built": result.levels_built,
+            "generated": result.generated,
+            "loaded": result.loaded,
+            "elapsed": round(result.elapsed, 3),
+            "slices_per_second": (
+                round(slices / result.elapsed, 2) if result.elapsed > 0 else None
+            ),
+            "levels": level_throughput(settings, levels, result.level_seconds),
+        }
+
+
+def write_summary(summary: dict[str, Any], path: str) -> None:
+    """Write the batch summary as JSON, creating parent directories."""
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with Path(path).open("w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+        f.write("\n")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Argument parser for batch mode (the arguments after --batch)."""
+    parser = argparse.ArgumentParser(
+        prog="CTHarvester --batch",
+        description="Build thumbnail pyramids for many scan directories without the GUI.",
+    )
+    parser.add_argument(
+        "directories", nargs="+", help="Scan directories, or glob patterns matching them"
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1, help="Datasets built at the same time (default 1)"
+    )
+    parser.add_argument(
+        "-t",
+        "--threads",
+        default="auto",
+        help="Workers per dataset, or 'auto' to share the CPUs among the jobs (default auto)",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="processes",
+        help="How each dataset is built (default processes)",
+    )
+    parser.add_argument(
+        "--max-thumbnail-size",
+        type=int,
+        default=None,
+        help="Stop halving once a level is smaller than this, px (default 512)",
+    )
+    parser.add_argument(
+        "--memory-limit-gb",
+        type=float,
+        default=None,
+        help="Memory the whole batch may use for images, GB (default 4)",
+    )
+    parser.add_argument(
+        "-o",
+        "--summary",
+        default="pyramid_summary.json",
+        help="Where to write the JSON summary (default pyramid_summary.json)",
+    )
+    return parser
+
+
+def main(argv: list[str]) -> int:
+    """Batch mode entry point.
+
+    Args:
+        argv: Arguments after --batch
+
+    Returns:
+        int: Exit status -- 0 if every dataset was built, 1 if any was not,
+        2 if no directory matched
+    """
+    args = build_parser().parse_args(argv)
+
+    directories = expand_directories(args.directories)
+    if not directories:
+        print("No scan directories matched.")
+        return 2
+
+    jobs = max(1, args.jobs)
+    if args.threads == "auto":
+        # Auto shares the machine among the datasets rather than giving each
+        # one all of it; jobs x cores worker processes only thrash.
+        workers = max(1, resolve_worker_count("auto") // jobs)
+    else:
+        workers = resolve_worker_count(args.threads)
+
+    builder = BatchPyramidBuilder(
+        jobs=jobs,
+        workers=workers,
+        engine=args.engine,
+        max_thumbnail_size=args.max_thumbnail_size,
+        memory_limit_gb=args.memory_limit_gb,
+    )
+    summary = builder.run(directories)
+    write_summary(summary, args.summary)
+    for dataset in summary["datasets"]:
+        detail = dataset["error"] or f"{dataset.get('elapsed', 0):.1f}s"
+        print(f"{dataset['status']:>9}  {dataset['directory']}  ({detail})")
+    print(
+        f"{summary['succeeded']}/{len(directories)} built in {summary['elapsed']:.1f}s; "
+        f"summary written to {Path(args.summary).resolve()}"
+    )
+    return 0 if summary["failed"] == 0 else 1
@@ -0,0 +1,367 @@
+"""Build manifest for resumable pyramid generation.
+
+Deciding whether to regenerate an output from Path.exists() alone has two
+failure modes: a TIFF left half-written by a crash or a cancel is trusted
+forever, and a source stack that changed after the pyramid was built is never
+noticed. The manifest, .thumbnail/manifest.json, records instead:
+
+- the parameters the pyramid was built with (file pattern, range, image size,
+  size limit) -- if any differ, every level is discarded and rebuilt;
+- the size and mtime of each source slice, plus the source directory's mtime;
+- which outputs of each level were completely written.
+
+An output counts as done only once it has been saved and the manifest says so,
+so an interrupted build resumes at exactly the outputs it had not finished.
+A changed source slice invalidates only the outputs built from it, one per
+level. And when the source directory's mtime is unchanged, a reopen neither
+stats the sources nor checks the outputs: the manifest is read and that is all.
+That check sees slices added, removed or replaced, which is how scanners and
+reconstruction software write; a file rewritten in place without changing the
+directory is not noticed until something else in the directory changes.
+
+The manifest is written atomically (temporary file, then os.replace), so a
+crash while saving leaves the previous one intact.
+"""
+
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from core.directory_index import StackIndex, load_index, save_index, scan_directory
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+_OUTPUT_NAME = re.compile(r"^(\d{6})\.tif$")
+
+# Completion flags are kept in memory as 0/1 bytes and on disk as "0"/"1".
+_FLAGS_TO_TEXT = bytes.maketrans(b"\x00\x01", b"01")
+_FLAGS_FROM_TEXT = bytes.maketrans(b"01", b"\x00\x01")
+
+
+def build_params(settings: dict[str, Any], max_thumbnail_size: int) -> dict[str, Any]:
+    """The settings a pyramid depends on, normalised for comparison.
+
+    Args:
+        settings: prefix, index_length, file_type, seq_begin, seq_end,
+            image_width, image_height
+        max_thumbnail_size: Size limit the pyramid is built down to
+
+    Returns:
+        dict: The values, as str and int
+    """
+    return {
+        "prefix": str(settings["prefix"]),
+        "index_length": int(settings["index_length"]),
+        "file_type": str(settings["file_type"]),
+        "seq_begin": int(settings["seq_begin"]),
+        "seq_end": int(settings["seq_end"]),
+        "image_width": int(settings["image_width"]),
+        "image_height": int(settings["image_height"]),
+        "max_thumbnail_size": int(max_thumbnail_size),
+    }
+
+
+def scan_sources(directory: str, settings: dict[str, Any]) -> list[list[int]]:
+    """Size and mtime of every source slice in the range, from one directory scan.
+
+    The directory index (core.directory_index) is used instead of scanning
+    when it is current, and saved after a scan for whoever opens next.
+
+    Args:
+        directory: Directory holding the original slices
+        settings: prefix, index_length, file_type, seq_begin, seq_end
+
+    Returns:
+        list: [size, mtime_ns] per slice, seq_begin first; [-1, -1] for a
+        slice that is missing
+    """
+    index = load_index(directory)
+    if index is None or not index.describes(settings):
+        mtime_ns, _, files = scan_directory(directory)
+        index = StackIndex.from_scan(
+            directory,
+            mtime_ns,
+            files,
+            str(settings["prefix"]),
+            str(settings["file_type"]),
+            int(settings["image_width"]),
+            int(settings["image_height"]),
+            index_length=int(settings["index_length"]),
+        )
+        save_index(index)
+    return index.stats(int(settings["seq_begin"]), int(settings["seq_end"]))
+
+
+class BuildManifest:
+    """Completion record of one dataset's pyramid.
+
+    Outputs are marked done from whichever thread wrote them, and saved from
+    another, so every access to the completion flags takes a lock.
+
+    Attributes:
+        directory: Directory holding the original slices
+        params: build_params() of the pyramid
+        sources: [size, mtime_ns] per source slice (see scan_sources)
+        source_dir_mtime_ns: mtime of the source directory when sources was taken
+    """
+
+    def __init__(self, directory: str, params: dict[str, Any], level_counts: list[int]):
+        """Create an empty manifest: nothing done yet.
+
+        Args:
+            directory: Directory holding the original slices
+            params: build_params() of the pyramid
+            level_counts: Number of outputs of each level, level 1 first
+        """
+        self.directory = directory
+        self.params = params
+        self.sources: list[list[int]] = []
+        self.source_dir_mtime_ns: int | None = None
+
+        self._lock = threading.Lock()
+        self._done = [bytearray(count) for count in level_counts]
+        self._dirty = True
+        self._last_save = 0.0
+
+    @property
+    def path(self) -> Path:
+        """Where the manifest is stored."""
+        return Path(self.directory) / ".thumbnail" / MANIFEST_FILENAME
+
+    @classmethod
+    def load(cls, directory: str) -> "BuildManifest | None":
+        """Read a dataset's manifest.
+
+        Returns:
+            BuildManifest, or None if there is none or it cannot be used
+            (unreadable, malformed, or from another manifest version)
+        """
+        path = Path(directory) / ".thumbnail" / MANIFEST_FILENAME
+        try:
+            with path.open(encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != MANIFEST_VERSION:
+                logger.info(f"Ignoring build manifest of version {data.get('version')}: {path}")
+                return None
+            levels = data["levels"]
+            manifest = cls(
+                directory, data["params"], [len(levels[key]) for key in sorted(levels, key=int)]
+            )
+            manifest.sources = data["sources"]
+            manifest.source_dir_mtime_ns = data["source_dir_mtime_ns"]
+            for i, key in enumerate(sorted(levels, key=int)):
+                manifest._done[i][:] = levels[key].encode("ascii").translate(_FLAGS_FROM_TEXT)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            logger.warning(f"Ignoring unreadable build manifest: {path}", exc_info=True)
+            return None
+        manifest._dirty = False
+        return manifest
+
+    def save(self) -> None:
+        """Write the manifest atomically. Does nothing if nothing changed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {
+                "version": MANIFEST_VERSION,
+                "params": self.params,
+                "source_dir_mtime_ns": self.source_dir_mtime_ns,
+                "sources": self.sources,
+                # One character per output, "1" once it is completely written.
+                "levels": {
+                    str(level): bytes(done).translate(_FLAGS_TO_TEXT).decode("ascii")
+                    for level, done in enumerate(self._done, start=1)
+                },
+            }
+            self._dirty = False
+            self._last_save = time.monotonic()
+
+        path = self.path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        try:
+            with tmp_path.open("w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            tmp_path.replace(path)
+        except OSError:
+            # Losing the manifest costs a rebuild of the unrecorded outputs,
+            # never a wrong pyramid, so a failed save must not stop the build.
+            logger.warning(f"Could not save build manifest: {path}", exc_info=True)
+            with self._lock:
+                self._dirty = True
+
+    def save_if_due(self, interval: float = 1.0) -> None:
+        """Save, but not more often than every `interval` seconds.
+
+        Outputs completed since the last save are rebuilt if the process dies
+        now; the interval bounds that loss without writing on every output.
+        """
+        if time.monotonic() - self._last_save >= interval:
+            self.save()
+
+    def is_done(self, level: int, idx: int) -> bool:
+        """Whether output `idx` of `level` was completely written."""
+        with self._lock:
+            done = self._done[level - 1]
+            return idx < len(done) and bool(done[idx])
+
+    def done_indices(self, level: int) -> set[int]:
+        """Indices of the completed outputs of `level`."""
+        with self._lock:
+            return {idx for idx, flag in enumerate(self._done[level - 1]) if flag}
+
+    def mark_done(self, level: int, idx: int) -> None:
+        """Record that output `idx` of `level` has been completely written."""
+        with self._lock:
+            self._done[level - 1][idx] = 1
+            self._dirty = True
+
+    def is_complete(self) -> bool:
+        """Whether every output of every level is done."""
+        with self._lock:
+            return all(all(done) for done in self._done)
+
+    def invalidate_sources(self, offsets: list[int]) -> int:
+        """Forget the outputs built from the given source slices.
+
+        Source offset i feeds output i >> L of level L, so one changed slice
+        costs one output per level, not the pyramid.
+
+        Args:
+            offsets: Changed slices, as offsets from seq_begin
+
+        Returns:
+            int: Number of outputs that had been done and no longer are
+        """
+        cleared = 0
+        with self._lock:
+            for level, done in enumerate(self._done, start=1):
+                for idx in {offset >> level for offset in offsets}:
+                    if idx < len(done) and done[idx]:
+                        done[idx] = 0
+                        cleared += 1
+            self._dirty = True
+        return cleared
+
+    def record_sources(self, sources: list[list[int]], dir_mtime_ns: int) -> None:
+        """Remember the source stack the pyramid is being built from."""
+        with self._lock:
+            self.sources = sources
+            self.source_dir_mtime_ns = dir_mtime_ns
+            self._dirty = True
+
+    def adopt_outputs(self, levels: list[dict[str, Any]], bytes_per_pixel: int = 1) -> int:
+        """Mark outputs found on disk as done, for a pyramid built without a manifest.
+
+        Pyramids from before the manifest existed (or from the Rust module)
+        have only their files to go on. An output is adopted if it is at least
+        as large as its pixels at the stack's depth; anything shorter is
+        truncated and is rebuilt. Outputs are written uncompressed, so a file
+        cut off after its first half is caught too.
+
+        Args:
+            levels: PyramidEngine.plan() entries (level, width, height, count)
+            bytes_per_pixel: Of the stack, and so of its outputs
+
+        Returns:
+            int: Number of outputs adopted
+        """
+        adopted = 0
+        for entry in levels:
+            level_dir = Path(self.directory) / ".thumbnail" / str(entry["level"])
+            if not level_dir.is_dir():
+                continue
+            min_size = entry["width"] * entry["height"] * bytes_per_pixel
+            with os.scandir(level_dir) as entries:
+                for dir_entry in entries:
+                    match = _OUTPUT_NAME.match(dir_entry.name)
+                    if match is None or int(match.group(1)) >= entry["count"]:
+                        continue
+                    if dir_entry.stat().st_size >= min_size:
+                        self.mark_done(entry["level"], int(match.group(1)))
+                        adopted += 1
+        return adopted
+
+
+def open_manifest(
+    directory: str,
+    settings: dict[str, Any],
+    levels: list[dict[str, Any]],
+    max_thumbnail_size: int,
+    bytes_per_pixel: int = 1,
+) -> BuildManifest:
+    """Load a dataset's manifest and bring it up to date with the sources.
+
+    - No manifest: outputs already on disk are adopted (see adopt_outputs).
+    - Parameters changed: the old levels are deleted and the pyramid starts over.
+    - Source directory mtime unchanged: trusted as is; nothing else is touched.
+    - Otherwise: the sources are scanned, and the outputs built from any
+      slice whose size or mtime changed are invalidated.
+
+    The result is saved before returning, so a build that starts from it and
+    is killed still leaves a manifest that matches the files.
+
+    Args:
+        directory: Directory holding the original slices
+        settings: As for PyramidEngine.build
+        levels: PyramidEngine.plan(settings)
+        max_thumbnail_size: Size limit the pyramid is built down to
+        bytes_per_pixel: Of the stack; outputs shorter than their pixels at
+            this depth are not adopted
+
+    Returns:
+        BuildManifest
+    """
+    params = build_params(settings, max_thumbnail_size)
+    counts = [entry["count"] for entry in levels]
+    thumbnail_dir = Path(directory) / ".thumbnail"
+    # Created before the directory's mtime is read, or creating it would
+    # change that mtime and make the next reopen rescan the sources.
+    thumbnail_dir.mkdir(parents=True, exist_ok=True)
+    dir_mtime_ns = Path(directory).stat().st_mtime_ns
+
+    manifest = BuildManifest.load(directory)
+    if (
+        manifest is not None
+        and manifest.params == params
+        and manifest.source_dir_mtime_ns == dir_mtime_ns
+    ):
+        logger.info("Build manifest: sources unchanged since last build")
+        return manifest
+
+    sources = scan_sources(directory, settings)
+    if manifest is None:
+        manifest = BuildManifest(directory, params, counts)
+        adopted = manifest.adopt_outputs(levels, bytes_per_pixel)
+        logger.info(f"Build manifest: none found, adopted {adopted} existing outputs")
+    elif manifest.params != params:
+        logger.info("Build manifest: build parameters changed, discarding existing levels")
+        for level_dir in thumbnail_dir.iterdir():
+            if level_dir.is_dir() and level_dir.name.isdigit():
+                shutil.rmtree(level_dir)
+        manifest = BuildManifest(directory, params, counts)
+    else:
+        changed = [
+            offset
+            for offset, stat in enumerate(sources)
+            if offset >= len(manifest.sources) or manifest.sources[offset] != stat
+        ]
+        cleared = manifest.invalidate_sources(changed) if changed else 0
+        logger.info(
+            f"Build manifest: {len(changed)} source slices changed, {cleared} outputs invalidated"
+        )
+
+    manifest.record_sources(sources, dir_mtime_ns)
+    manifest.save()
+    return manifest
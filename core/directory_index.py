@@ -0,0 +1,367 @@
+"""One-pass index of a dataset directory, cached between opens.
+
+Opening a scan used to touch every slice several times before anything
+appeared: FileHandler listed the directory and ran its filename regex twice
+over every name, then called Path.exists() once per expected slice, and the
+thumbnail levels were each listed again to count them. On a network share
+each of those is a round trip, and a 20,000-slice stack pays tens of
+thousands of them.
+
+Here the directory is read once, with os.scandir, and what the callers need
+is kept as a StackIndex: the detected prefix and extension, the slices
+present (and so the gaps), their sizes and mtimes, and the image size. The
+index is saved in .thumbnail/directory_index.json together with the slice
+count and image size of each thumbnail level, and is reused for as long as
+the directory's mtime is unchanged -- the same test the build manifest
+(core.build_manifest) trusts, with the same blind spot for a file rewritten
+in place. Each level is keyed by its own directory's mtime.
+
+The index is only saved where .thumbnail already exists: opening a directory
+must not create anything in it, or change the mtime the index is keyed by.
+
+Typical usage example:
+
+    index = load_index(directory)          # None when missing or stale
+    if index is None:
+        mtime_ns, file_count, files = scan_directory(directory)
+        index = StackIndex.from_scan(directory, mtime_ns, files, prefix, ...)
+        save_index(index)
+"""
+
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from utils.image_utils import get_image_dimensions
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = "directory_index.json"
+INDEX_VERSION = 1
+
+# (prefix)(digits).(extension), e.g. "slice_0001.tif"
+STACK_PATTERN = re.compile(r"^(.*?)(\d+)\.(\w+)$")
+
+
+class ScannedFile(NamedTuple):
+    """A file whose name matches STACK_PATTERN."""
+
+    name: str
+    prefix: str
+    number: int
+    digits: int
+    extension: str  # lower case
+    size: int
+    mtime_ns: int
+
+
+class LevelSummary(NamedTuple):
+    """What readers need to know about a thumbnail level without opening it."""
+
+    level: int
+    path: str
+    count: int
+    width: int
+    height: int
+
+
+def scan_directory(directory: str | Path) -> tuple[int, int, list[ScannedFile]]:
+    """Read a directory once, matching each name against STACK_PATTERN once.
+
+    The mtime is taken before the scan, so a change made while scanning
+    leaves an index that is stale next time rather than one that is wrong.
+
+    Returns:
+        (mtime_ns, file_count, files) -- the directory's mtime, how many
+        regular files it holds, and those whose names match
+    """
+    mtime_ns = Path(directory).stat().st_mtime_ns
+    file_count = 0
+    files = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if not entry.is_file():
+                continue
+            file_count += 1
+            match = STACK_PATTERN.match(entry.name)
+            if match is None:
+                continue
+            st = entry.stat()
+            files.append(
+                ScannedFile(
+                    entry.name,
+                    match.group(1),
+                    int(match.group(2)),
+                    len(match.group(2)),
+                    match.group(3).lower(),
+                    st.st_size,
+                    st.st_mtime_ns,
+                )
+            )
+    return mtime_ns, file_count, files
+
+
+@dataclass
+class StackIndex:
+    """The slices of one detected stack.
+
+    Attributes:
+        directory: Directory scanned
+        mtime_ns: Its mtime when scanned
+        prefix: Filename prefix, e.g. "slice_"
+        file_type: Extension in lower case, e.g. "tif"
+        index_length: Digits in the first slice's number
+        image_width: Width of the first slice
+        image_height: Height of the first slice
+        files: Slice number -> (file name, size, mtime_ns)
+    """
+
+    directory: str
+    mtime_ns: int
+    prefix: str
+    file_type: str
+    index_length: int
+    image_width: int
+    image_height: int
+    files: dict[int, tuple[str, int, int]]
+
+    @classmethod
+    def from_scan(
+        cls,
+        directory: str | Path,
+        mtime_ns: int,
+        files: list[ScannedFile],
+        prefix: str,
+        file_type: str,
+        image_width: int,
+        image_height: int,
+        index_length: int | None = None,
+    ) -> "StackIndex":
+        """Index the files of a scan that belong to the stack `prefix`*.`file_type`.
+
+        index_length defaults to the digits of the lowest-numbered slice.
+        """
+        stack = sorted(
+            (f for f in files if f.prefix == prefix and f.extension == file_type.lower()),
+            key=lambda f: f.number,
+        )
+        if index_length is None:
+            index_length = stack[0].digits if stack else 0
+        indexed: dict[int, tuple[str, int, int]] = {}
+        # Of two names for one number ("a1.tif", "a0001.tif"), the padded one
+        for f in sorted(stack, key=lambda f: f.digits != index_length):
+            indexed.setdefault(f.number, (f.name, f.size, f.mtime_ns))
+        indexed = dict(sorted(indexed.items()))
+        return cls(
+            directory=str(directory),
+            mtime_ns=mtime_ns,
+            prefix=prefix,
+            file_type=file_type.lower(),
+            index_length=index_length,
+            image_width=int(image_width),
+            image_height=int(image_height),
+            files=indexed,
+        )
+
+    @property
+    def seq_begin(self) -> int:
+        return min(self.files)
+
+    @property
+    def seq_end(self) -> int:
+        return max(self.files)
+
+    def settings(self) -> dict[str, Any]:
+        """The settings hash FileHandler.sort_file_list_from_dir returns."""
+        return {
+            "prefix": self.prefix,
+            "image_width": self.image_width,
+            "image_height": self.image_height,
+            "file_type": self.file_type,
+            "index_length": self.index_length,
+            "seq_begin": self.seq_begin,
+            "seq_end": self.seq_end,
+        }
+
+    def describes(self, settings: dict[str, Any]) -> bool:
+        """Whether `settings` name this stack, so the index can answer for them."""
+        return (
+            settings["prefix"] == self.prefix
+            and str(settings["file_type"]).lower() == self.file_type
+            and int(settings["index_length"]) == self.index_length
+        )
+
+    def name(self, number: int) -> str | None:
+        """File name of slice `number` as the settings spell it, or None if absent.
+
+        A slice present under another zero padding ("a1.tif" for "a0001.tif")
+        counts as absent, as it did to the Path.exists() calls this replaces.
+        """
+        entry = self.files.get(number)
+        if entry is None:
+            return None
+        stem = f"{self.prefix}{number:0{self.index_length}d}."
+        name = entry[0]
+        return (
+            name if name.startswith(stem) and len(name) == len(stem) + len(self.file_type) else None
+        )
+
+    def gaps(self) -> list[int]:
+        """Slice numbers missing between seq_begin and seq_end."""
+        return [n for n in range(self.seq_begin, self.seq_end + 1) if self.name(n) is None]
+
+    def stats(self, seq_begin: int, seq_end: int) -> list[list[int]]:
+        """[size, mtime_ns] per slice in the range; [-1, -1] for a missing one."""
+        stats = []
+        for number in range(seq_begin, seq_end + 1):
+            entry = self.files[number] if self.name(number) is not None else None
+            stats.append([entry[1], entry[2]] if entry is not None else [-1, -1])
+        return stats
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "mtime_ns": self.mtime_ns,
+            "prefix": self.prefix,
+            "file_type": self.file_type,
+            "index_length": self.index_length,
+            "image_width": self.image_width,
+            "image_height": self.image_height,
+            "files": [[number, *entry] for number, entry in self.files.items()],
+        }
+
+    @classmethod
+    def from_json(cls, directory: str | Path, data: dict[str, Any]) -> "StackIndex":
+        return cls(
+            directory=str(directory),
+            mtime_ns=int(data["mtime_ns"]),
+            prefix=str(data["prefix"]),
+            file_type=str(data["file_type"]),
+            index_length=int(data["index_length"]),
+            image_width=int(data["image_width"]),
+            image_height=int(data["image_height"]),
+            files={
+                int(n): (str(name), int(size), int(mtime)) for n, name, size, mtime in data["files"]
+            },
+        )
+
+
+def _index_path(directory: str | Path) -> Path:
+    return Path(directory) / ".thumbnail" / INDEX_FILENAME
+
+
+def _read_cache(directory: str | Path) -> dict[str, Any]:
+    """The saved index file, or an empty one if it is missing or unreadable."""
+    path = _index_path(directory)
+    try:
+        with path.open(encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError):
+        logger.warning(f"Unreadable directory index {path}, rescanning", exc_info=True)
+        return {}
+    if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+        return {}
+    return data
+
+
+def _write_cache(directory: str | Path, data: dict[str, Any]) -> None:
+    """Save the index file atomically, if .thumbnail exists; failures are only logged."""
+    path = _index_path(directory)
+    if not path.parent.is_dir():
+        return
+    data["version"] = INDEX_VERSION
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        tmp_path.replace(path)
+    except OSError:
+        # Costs the next open a rescan, nothing more
+        logger.warning(f"Could not save directory index {path}", exc_info=True)
+        tmp_path.unlink(missing_ok=True)
+
+
+def load_index(directory: str | Path) -> StackIndex | None:
+    """The saved index of `directory`, if it was made at its current mtime."""
+    stack = _read_cache(directory).get("stack")
+    if not stack:
+        return None
+    try:
+        if Path(directory).stat().st_mtime_ns != stack.get("mtime_ns"):
+            return None
+        index = StackIndex.from_json(directory, stack)
+    except (OSError, KeyError, TypeError, ValueError):
+        logger.warning(f"Discarding directory index of {directory}", exc_info=True)
+        return None
+    if not index.files:
+        return None
+    logger.info(f"Using directory index of {directory}: {len(index.files)} slices")
+    return index
+
+
+def save_index(index: StackIndex) -> None:
+    """Keep `index` for load_index, next to the level summaries."""
+    data = _read_cache(index.directory)
+    data["stack"] = index.to_json()
+    _write_cache(index.directory, data)
+
+
+def level_summaries(directory: str | Path, max_levels: int) -> list[LevelSummary]:
+    """Count and size of each thumbnail level, listing only levels that changed.
+
+    Levels are contiguous from 1, so the first missing one ends the list. A
+    level is listed (and its first slice opened for its size) only when its
+    directory's mtime differs from the one saved; an empty level is reported
+    with a count of 0.
+
+    Args:
+        directory: Dataset directory, holding .thumbnail
+        max_levels: Levels to look for at most
+
+    Returns:
+        list: LevelSummary per level, level 1 first
+    """
+    thumbnail_base = Path(directory) / ".thumbnail"
+    data = _read_cache(directory)
+    cached = data.get("levels", {})
+    summaries = []
+    changed = False
+    for level in range(1, max_levels):
+        level_dir = thumbnail_base / str(level)
+        try:
+            mtime_ns = level_dir.stat().st_mtime_ns
+        except FileNotFoundError:
+            break
+        entry = cached.get(str(level))
+        if entry is None or entry.get("mtime_ns") != mtime_ns:
+            with os.scandir(level_dir) as entries:
+                names = [e.name for e in entries if e.name.endswith(".tif") and e.is_file()]
+            width, height = get_image_dimensions(str(level_dir / min(names))) if names else (0, 0)
+            entry = {"mtime_ns": mtime_ns, "count": len(names), "width": width, "height": height}
+            cached[str(level)] = entry
+            changed = True
+        summaries.append(
+            LevelSummary(level, str(level_dir), entry["count"], entry["width"], entry["height"])
+        )
+
+    if changed:
+        # Levels beyond the last one found are gone
+        data["levels"] = {str(s.level): cached[str(s.level)] for s in summaries}
+        _write_cache(directory, data)
+    return summaries
+
+
+def forget_levels(directory: str | Path) -> None:
+    """Drop the saved level summaries, before levels are rewritten in place.
+
+    A file overwritten under the same name leaves its directory's mtime
+    alone, so a rewritten level would otherwise keep its old summary.
+    """
+    data = _read_cache(directory)
+    if data.pop("levels", None) is not None:
+        _write_cache(directory, data)
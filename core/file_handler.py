@@ -7,10 +7,10 @@
 
 import logging
 import os
-import re
 from pathlib import Path
 from typing import ClassVar
 
+from core.directory_index import StackIndex, load_index, save_index, scan_directory
 from security.file_validator import FileSecurityError, SecureFileValidator
 from utils.image_utils import get_image_dimensions
 
@@ -73,6 +73,8 @@ class FileHandler:
     def __init__(self) -> None:
         """Initialize file handler"""
         self.validator = SecureFileValidator()
+        # Index of the directory last detected, for get_file_list
+        self._index: StackIndex | None = None
 
     def open_directory(self, directory_path: str) -> dict:
         """Open and analyze a directory containing CT images
@@ -185,52 +187,40 @@ def sort_file_list_from_dir(self, directory_path: str) -> dict:
             OSError: For other OS-level errors
 
         Algorithm:
-            1. List all files in directory
-            2. Extract prefix and extension using regex: (prefix)(number).(ext)
+            1. Reuse the directory's saved index if its mtime is unchanged
+            2. Otherwise list the directory once, matching each name against
+               (prefix)(number).(ext)
             3. Find most common prefix and extension
-            4. Filter files matching the pattern
+            4. Index the files matching the pattern (see core.directory_index)
             5. Extract sequence range and image metadata
         """
-        # Step 1: Get all files in directory
-        all_files = [entry.name for entry in Path(directory_path).iterdir() if entry.is_file()]
+        return self.index_directory(directory_path).settings()
 
-        if not all_files:
-            logger.warning(f"No files found in directory: {directory_path}")
-            raise NoImagesFoundError(f"No files found in directory: {directory_path}")
-
-        logger.info(f"Found {len(all_files)} files in directory")
+    def index_directory(self, directory_path: str) -> StackIndex:
+        """Index the CT stack in a directory, reusing the saved index if current.
 
-        # Step 2: Regular expression pattern to match: (prefix)(digits).(extension)
-        # Example: "slice_0001.tif" -> prefix="slice_", digits="0001", extension="tif"
-        pattern = r"^(.*?)(\d+)\.(\w+)$"
+        The index is kept for get_file_list, and saved for the next open where
+        the directory already has a .thumbnail folder.
 
-        ct_stack_files = []
-        matching_files = []
-        other_files = []
-        prefix_hash: dict[str, int] = {}
-        extension_hash: dict[str, int] = {}
+        Raises:
+            As sort_file_list_from_dir
+        """
+        index = load_index(directory_path)
+        if index is None:
+            index = self._scan_stack(directory_path)
+            save_index(index)
+        self._index = index
+        return index
+
+    def _scan_stack(self, directory_path: str) -> StackIndex:
+        """Detect the stack in one pass over the directory."""
+        mtime_ns, file_count, matching_files = scan_directory(directory_path)
+
+        if not file_count:
+            logger.warning(f"No files found in directory: {directory_path}")
+            raise NoImagesFoundError(f"No files found in directory: {directory_path}")
 
-        # Step 3: Analyze all files
-        for file in all_files:
-            match = re.match(pattern, file)
-            if match:
-                matching_files.append(file)
-
-                # Count prefix occurrences
-                prefix = match.group(1)
-                if prefix in prefix_hash:
-                    prefix_hash[prefix] += 1
-                else:
-                    prefix_hash[prefix] = 1
-
-                # Count extension occurrences
-                extension = match.group(3).lower()
-                if extension in extension_hash:
-                    extension_hash[extension] += 1
-                else:
-                    extension_hash[extension] = 1
-            else:
-                other_files.append(file)
+        logger.info(f"Found {file_count} files in directory")
 
         if not matching_files:
             logger.warning("No files matching CT stack pattern found")
@@ -238,6 +228,12 @@ def sort_file_list_from_dir(self, directory_path: str) -> dict:
                 f"No files matching CT stack pattern found in: {directory_path}"
             )
 
+        prefix_hash: dict[str, int] = {}
+        extension_hash: dict[str, int] = {}
+        for file in matching_files:
+            prefix_hash[file.prefix] = prefix_hash.get(file.prefix, 0) + 1
+            extension_hash[file.extension] = extension_hash.get(file.extension, 0) + 1
+
         max_prefix = self._most_common(prefix_hash)
         logger.info(f"Most common prefix: '{max_prefix}' ({prefix_hash[max_prefix]} files)")
 
@@ -246,85 +242,39 @@ def sort_file_list_from_dir(self, directory_path: str) -> dict:
             f"Most common extension: '{max_extension}' ({extension_hash[max_extension]} files)"
         )
 
-        # Step 6: Filter files matching the most common prefix and extension
-        for file in matching_files:
-            match = re.match(pattern, file)
-            if (
-                match
-                and match.group(1) == max_prefix
-                and match.group(3).lower() == max_extension.lower()
-            ):
-                ct_stack_files.append(file)
-
-        if not ct_stack_files:
+        # Image size is filled in below, once the first slice is known
+        index = StackIndex.from_scan(
+            directory_path, mtime_ns, matching_files, max_prefix, max_extension, 0, 0
+        )
+        if not index.files:
             logger.warning("No CT stack files matched the pattern")
             raise NoImagesFoundError(f"No CT stack files matched the pattern in: {directory_path}")
 
-        # Sort files naturally (by numeric value, not string)
-        ct_stack_files = self._natural_sort(ct_stack_files, pattern)
-
-        logger.info(f"Found {len(ct_stack_files)} files in CT stack")
-
-        # Step 7: Extract metadata from first and last files
-        first_file = ct_stack_files[0]
-        last_file = ct_stack_files[-1]
-        first_file_path = str(Path(directory_path) / first_file)
+        logger.info(f"Found {len(index.files)} files in CT stack")
 
         # Get image dimensions from first file
+        first_file = index.files[index.seq_begin][0]
+        first_file_path = str(Path(directory_path) / first_file)
         try:
-            width, height = get_image_dimensions(first_file_path)
+            index.image_width, index.image_height = get_image_dimensions(first_file_path)
         except Exception as e:
             logger.exception(f"Failed to read image dimensions from {first_file_path}")
             raise CorruptedImageError(
                 f"Failed to read image file: {first_file}. File may be corrupted."
             ) from e
 
-        # Extract sequence information
-        match1 = re.match(pattern, first_file)
-        match2 = re.match(pattern, last_file)
-
-        if not match1 or not match2:
-            logger.error("Failed to match pattern for first/last files")
-            raise NoImagesFoundError("Failed to extract sequence information from file names")
-
-        start_index = int(match1.group(2))
-        end_index = int(match2.group(2))
-        seq_length = len(match1.group(2))
-
-        # Build settings dictionary
-        settings_hash = {
-            "prefix": max_prefix,
-            "image_width": width,
-            "image_height": height,
-            "file_type": max_extension,
-            "index_length": seq_length,
-            "seq_begin": start_index,
-            "seq_end": end_index,
-        }
-
-        return settings_hash
-
-    def _natural_sort(self, file_list: list[str], pattern: str) -> list[str]:
-        """Sort files naturally by numeric sequence
-
-        Example: ['file1.tif', 'file10.tif', 'file2.tif']
-        -> ['file1.tif', 'file2.tif', 'file10.tif']
-
-        Args:
-            file_list (List[str]): List of filenames to sort
-            pattern (str): Regex pattern to extract numeric part
-
-        Returns:
-            List[str]: Naturally sorted file list
-        """
-
-        def extract_number(filename: str) -> int:
-            match = re.match(pattern, filename)
-            if match:
-                return int(match.group(2))  # Extract numeric part
-            return 0
+        return index
 
-        return sorted(file_list, key=extract_number)
+    def _current_index(self, directory_path: str) -> StackIndex | None:
+        """The index of `directory_path` if one is kept and still current."""
+        index = self._index
+        if index is None or Path(index.directory).absolute() != Path(directory_path).absolute():
+            return load_index(directory_path)
+        try:
+            current = Path(directory_path).stat().st_mtime_ns == index.mtime_ns
+        except OSError:
+            return None
+        return index if current else None
 
     def get_file_list(self, directory_path: str, settings_hash: dict) -> list[str]:
         """Get sorted list of CT image file paths based on detected pattern
@@ -342,6 +292,12 @@ def get_file_list(self, directory_path: str, settings_hash: dict) -> list[str]:
         seq_end = settings_hash["seq_end"]
         index_length = settings_hash["index_length"]
 
+        # Answered from the directory index when it describes this stack,
+        # rather than one exists() call per slice
+        index = self._current_index(directory_path)
+        if index is not None and not index.describes(settings_hash):
+            index = None
+
         file_list = []
         missing_files = []
         MAX_MISSING_WARNINGS = 10  # noqa: N806 -- local constant  # Only log first N missing files
@@ -349,9 +305,14 @@ def get_file_list(self, directory_path: str, settings_hash: dict) -> list[str]:
         for i in range(seq_begin, seq_end + 1):
             # Format with leading zeros based on index_length
             filename = f"{prefix}{i:0{index_length}d}.{extension}"
-            filepath = Path(directory_path) / filename
+            if index is not None:
+                found = index.name(i)
+                filepath = Path(directory_path) / (found or filename)
+            else:
+                found = filename if (Path(directory_path) / filename).exists() else None
+                filepath = Path(directory_path) / filename
 
-            if filepath.exists():
+            if found is not None:
                 # str, not Path: this list is the declared return type and goes
                 # on to callers that treat the entries as strings.
                 file_list.append(str(filepath))
@@ -0,0 +1,358 @@
+"""Single-pass pyramid builder for Python fallback mode.
+
+The level-by-level path (PyramidEngine's slice-pair tasks on a thread or
+process pool) builds level N+1 by reading every file of level N back off disk, so a
+four-level pyramid decodes roughly twice the data of the original stack. This
+builder reads each source slice exactly once and carries it up through every
+level in the same pass, the way process_group_all_levels in
+src/lib_optimized.rs does for the Rust module.
+
+Each level holds at most one pending slice: the first of a pair waits there
+until its partner arrives, the two are averaged and halved, and the result is
+written and handed to the level above. Memory therefore stays at one slice per
+level however deep the stack is, and the files written are the same ones the
+level-by-level path would write. The source reads are all known before the
+first one, so a SlicePrefetcher decodes them ahead of the pass on background
+threads, within its memory budget, and an OutputWriter writes the results
+behind it.
+"""
+
+import logging
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from core.memory_budget import MemoryBudget, pipeline_depths
+from core.output_writer import OutputWriter
+from core.protocols import ProgressDialog
+from core.slice_prefetcher import SlicePrefetcher
+from utils.image_utils import (
+    reduce_slices,
+    reduction_scratch,
+    safe_load_image,
+    save_image_atomic,
+)
+
+if TYPE_CHECKING:
+    from core.build_manifest import BuildManifest
+    from core.progress_manager import ProgressManager
+
+logger = logging.getLogger(__name__)
+
+
+def count_pyramid_levels(size: float, max_thumbnail_size: int) -> int:
+    """Number of levels the Python generator builds for images of `size` px.
+
+    Mirrors the loop in ThumbnailGenerator.generate_python: halve until the
+    result is under max_thumbnail_size, never going below 2 px. At least one
+    level is built even for images already smaller than the limit, which is
+    why this is not simply ThumbnailGenerator.total_levels.
+    """
+    levels = 0
+    while True:
+        size = size / 2
+        if size < 2:
+            return levels
+        levels += 1
+        if size < max_thumbnail_size:
+            return levels
+
+
+class FusedPyramidBuilder:
+    """Builds every pyramid level from one sequential read of the source stack.
+
+    Sources are consumed in aligned groups of 2**num_levels slices. A group
+    maps onto exactly one slice of the top level, so every pending buffer is
+    empty at a group boundary; that is what lets a group whose outputs are all
+    on disk already be skipped without reading any of its sources.
+
+    Attributes:
+        progress_dialog: Optional progress dialog, polled for cancellation
+        progress_manager: Optional progress tracking manager
+        manifest: Optional BuildManifest; when given, only the outputs it
+            records as done are skipped, and each output written is recorded
+        memory_budget: Optional MemoryBudget for read-ahead and queued writes
+        level_weights: Progress weight of one output at each level (index 0 = level 1)
+        completed_tasks: Outputs accounted for, across all levels
+        generated_count: Outputs computed and written in this run
+        loaded_count: Outputs that were already on disk
+        source_reads: Source slices decoded in this run
+        is_cancelled: Cancellation flag
+        global_step_counter: Weighted progress counter
+    """
+
+    def __init__(
+        self,
+        progress_dialog: ProgressDialog | None,
+        progress_manager: "ProgressManager | None",
+        level_weights: list[float],
+        manifest: "BuildManifest | None" = None,
+        memory_budget: MemoryBudget | None = None,
+    ):
+        """Initialize the builder.
+
+        Args:
+            progress_dialog: Optional dialog for cancellation
+            progress_manager: Manager for progress tracking, or None
+            level_weights: Progress weight per output for each level, level 1 first
+            manifest: BuildManifest to skip and record completed outputs by
+            memory_budget: Bounds read-ahead and queued writes; None for the
+                fixed defaults
+        """
+        self.progress_dialog = progress_dialog
+        self.progress_manager = progress_manager
+        self.manifest = manifest
+        self.memory_budget = memory_budget
+        self.level_weights = level_weights
+
+        self.completed_tasks = 0
+        self.generated_count = 0
+        self.loaded_count = 0
+        self.source_reads = 0
+        self.is_cancelled = False
+        self.global_step_counter: float = 0.0
+
+        # Per-level state, indexed by level number; index 0 is the source stack.
+        self._num_levels = 0
+        self._pending: list[np.ndarray | None] = []
+        self._scratch: list[tuple[np.ndarray, np.ndarray] | None] = []
+        self._next_index: list[int] = []
+        self._existing: list[set[str]] = []
+        self._level_dirs: list[Path] = []
+        self._source_dtype: np.dtype | None = None
+        self._prefetcher: SlicePrefetcher | None = None
+        self._writer: OutputWriter | None = None
+
+    def build(
+        self,
+        directory: str,
+        settings_hash: dict[str, Any],
+        seq_begin: int,
+        seq_end: int,
+        num_levels: int,
+    ) -> None:
+        """Write levels 1..num_levels under <directory>/.thumbnail in one pass.
+
+        Args:
+            directory: Directory holding the original slices
+            settings_hash: Image metadata ('prefix', 'index_length', 'file_type')
+            seq_begin: First source sequence number (inclusive)
+            seq_end: Last source sequence number (inclusive)
+            num_levels: How many levels to build
+
+        Raises:
+            FileNotFoundError: A source slice in the range is missing. Skipping it
+                would shift every later index, so the build stops instead.
+            OutputWriteError: An output could not be written
+
+        Side Effects:
+            - Creates .thumbnail/1 .. .thumbnail/<num_levels> and their files
+            - Updates the counters above and the progress manager
+            - Sets is_cancelled if the user cancels; files written so far stay
+        """
+        start_time = time.time()
+        self._prepare_levels(directory, num_levels)
+
+        total = seq_end - seq_begin + 1
+        group_size = 1 << num_levels
+        logger.info(
+            f"Single-pass build: {total} slices, {num_levels} levels, group size {group_size}"
+        )
+
+        groups = []
+        for group_start in range(0, total, group_size):
+            group_end = min(group_start + group_size, total)
+            groups.append((group_start, group_end, self._group_on_disk(group_start, group_end)))
+        reads = [
+            self._source_path(directory, settings_hash, seq_begin + offset)
+            for start, end, on_disk in groups
+            if not on_disk
+            for offset in range(start, end)
+        ]
+        window, max_pending = pipeline_depths(reads, self.memory_budget)
+        logger.info(f"Reading up to {window} source slices ahead, writing {max_pending} behind")
+
+        self._prefetcher = SlicePrefetcher(reads, window)
+        self._writer = OutputWriter(max_pending)
+        try:
+            for group_start, group_end, on_disk in groups:
+                if on_disk:
+                    self._skip_group(group_start, group_end)
+                    continue
+
+                for offset in range(group_start, group_end):
+                    if self.progress_dialog and self.progress_dialog.is_cancelled:
+                        self.is_cancelled = True
+                        logger.info(f"Single-pass build cancelled at source slice {offset}")
+                        return
+                    self._push(0, self._read_source(directory, settings_hash, seq_begin + offset))
+
+            self._prefetcher.close()
+            self._flush()
+            self._writer.flush()
+        finally:
+            self._prefetcher.close()
+            self._prefetcher = None
+            self._writer.close()
+            self._writer = None
+
+        elapsed = time.time() - start_time
+        logger.info(
+            f"Single-pass build complete in {elapsed:.1f}s: {self.source_reads} source reads, "
+            f"generated {self.generated_count}, already on disk {self.loaded_count}"
+        )
+
+    def _prepare_levels(self, directory: str, num_levels: int) -> None:
+        """Create the level directories and note which outputs already exist.
+
+        With a manifest, "exist" means recorded as done; files it does not
+        vouch for may be truncated and are written again. Without one, one
+        directory listing per level up front, rather than a stat per output,
+        because on network storage the round-trips are what cost.
+        """
+        self._num_levels = num_levels
+        self._pending = [None] * (num_levels + 1)
+        self._scratch = [None] * (num_levels + 1)
+        self._next_index = [0] * (num_levels + 1)
+        self._existing = [set()]
+        self._level_dirs = [Path(directory)]
+
+        for level in range(1, num_levels + 1):
+            level_dir = Path(directory) / ".thumbnail" / str(level)
+            level_dir.mkdir(parents=True, exist_ok=True)
+            self._level_dirs.append(level_dir)
+            if self.manifest is not None:
+                self._existing.append(
+                    {f"{idx:06}.tif" for idx in self.manifest.done_indices(level)}
+                )
+            else:
+                self._existing.append({p.name for p in level_dir.iterdir() if p.suffix == ".tif"})
+
+    @staticmethod
+    def _level_range(group_start: int, group_end: int, level: int) -> range:
+        """Output indices at `level` that depend on sources [group_start, group_end)."""
+        return range(group_start >> level, (group_end + (1 << level) - 1) >> level)
+
+    def _group_on_disk(self, group_start: int, group_end: int) -> bool:
+        """Whether every output this group feeds into has already been written."""
+        return all(
+            f"{idx:06}.tif" in self._existing[level]
+            for level in range(1, self._num_levels + 1)
+            for idx in self._level_range(group_start, group_end, level)
+        )
+
+    def _skip_group(self, group_start: int, group_end: int) -> None:
+        """Account for a group whose outputs are all on disk, without reading it."""
+        for level in range(1, self._num_levels + 1):
+            outputs = self._level_range(group_start, group_end, level)
+            for _ in outputs:
+                self._advance(level, generated=False)
+            self._next_index[level] = outputs.stop
+
+    @staticmethod
+    def _source_path(directory: str, settings_hash: dict[str, Any], seq: int) -> str:
+        """Path of original slice `seq`."""
+        filename = (
+            settings_hash["prefix"]
+            + str(seq).zfill(settings_hash["index_length"])
+            + "."
+            + settings_hash["file_type"]
+        )
+        return str(Path(directory) / filename)
+
+    def _read_source(self, directory: str, settings_hash: dict[str, Any], seq: int) -> np.ndarray:
+        """Decode one original slice, matched to the bit depth of the first one.
+
+        A stack that mixes depths is brought to the first slice's depth the way
+        the Rust module does it: shifted up or down by eight bits.
+        """
+        path = self._source_path(directory, settings_hash, seq)
+        arr = self._prefetcher.take(path) if self._prefetcher else safe_load_image(path)
+        if not isinstance(arr, np.ndarray):
+            raise FileNotFoundError(f"Source slice missing: {path}")
+        self.source_reads += 1
+
+        if self._source_dtype is None:
+            self._source_dtype = arr.dtype
+        elif arr.dtype != self._source_dtype:
+            if self._source_dtype == np.uint16 and arr.dtype == np.uint8:
+                arr = arr.astype(np.uint16) << 8
+            elif self._source_dtype == np.uint8 and arr.dtype == np.uint16:
+                arr = (arr >> 8).astype(np.uint8)
+        return arr
+
+    def _push(self, level: int, arr: np.ndarray) -> None:
+        """Hand a slice of `level` upward: park it, or pair it with the one parked."""
+        if level >= self._num_levels:
+            return
+
+        pending = self._pending[level]
+        if pending is None:
+            self._pending[level] = arr
+            return
+
+        self._pending[level] = None
+        self._emit(level + 1, self._reduce(level, pending, arr))
+
+    def _flush(self) -> None:
+        """Finish odd-length levels, bottom up, once the sources run out.
+
+        A leftover slice has no partner, so it is halved on its own -- the
+        same single-image case the level-by-level path handles. Emitting it
+        can leave a new leftover one level up, which the loop reaches next.
+        """
+        for level in range(self._num_levels):
+            pending = self._pending[level]
+            if pending is None:
+                continue
+            self._pending[level] = None
+            self._emit(level + 1, self._reduce(level, pending, None))
+
+    def _reduce(self, level: int, arr1: np.ndarray, arr2: np.ndarray | None) -> np.ndarray:
+        """Reduce a pair of `level` slices, reusing that level's scratch arrays."""
+        if self._scratch[level] is None:
+            self._scratch[level] = reduction_scratch(arr1.shape, arr1.dtype)
+        return reduce_slices(arr1, arr2, scratch=self._scratch[level])
+
+    def _emit(self, level: int, arr: np.ndarray) -> None:
+        """Write the next output of `level` unless it is on disk, then push it up."""
+        idx = self._next_index[level]
+        self._next_index[level] += 1
+
+        name = f"{idx:06}.tif"
+        generated = name not in self._existing[level]
+        if generated:
+            self._write(level, idx, arr)
+
+        self._advance(level, generated=generated)
+        self._push(level, arr)
+
+    def _write(self, level: int, idx: int, arr: np.ndarray) -> None:
+        """Save output `idx` of `level`, behind the pass when a writer is running.
+
+        The manifest records it only once the file is complete on disk.
+        """
+        path = str(self._level_dirs[level] / f"{idx:06}.tif")
+        manifest = self.manifest
+        on_written = None if manifest is None else (lambda: manifest.mark_done(level, idx))
+        if self._writer is not None:
+            self._writer.submit(path, arr, on_written)
+            return
+        save_image_atomic(arr, path)
+        if on_written is not None:
+            on_written()
+
+    def _advance(self, level: int, generated: bool) -> None:
+        """Count one output of `level` and move the progress bar by its weight."""
+        self.completed_tasks += 1
+        if generated:
+            self.generated_count += 1
+        else:
+            self.loaded_count += 1
+
+        weight = self.level_weights[level - 1] if level <= len(self.level_weights) else 1.0
+        self.global_step_counter += weight
+        if self.progress_manager is not None:
+            self.progress_manager.update(value=int(self.global_step_counter))
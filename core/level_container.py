@@ -0,0 +1,186 @@
+"""Single-file containers for pyramid levels.
+
+A pyramid level is stored as one NNNNNN.tif file per slice, so anything that
+reads a level -- the level list, the slider, the 3D view, the exporter -- pays
+an open, a stat and a header parse per slice. On an SMB share each of those
+is a network round trip. A level container holds a whole level in one file,
+.thumbnail/level_<n>.npy: an NPY header giving the shape and dtype, then the
+slices back to back, each a contiguous chunk at header + i * slice bytes. It
+is read through a memory map, so reading one slice touches only its pages.
+
+The TIFF files remain the layout of record. Builds resume from them, the
+Rust module writes only them, and a level without a container is read from
+them as before. A container is packed only from a complete level, under a
+temporary name that is renamed into place. It is removed before anything
+rewrites the level, so a container that exists always matches the files.
+
+Typical usage example:
+
+    volume = open_level(thumbnail_base, level)   # memmap, or None
+    if volume is not None:
+        arr = volume[idx]
+"""
+
+import logging
+import uuid
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+
+from core.directory_index import forget_levels
+from core.preview_cache import remove_preview
+from core.pyramid_index import remove_pyramid_index
+from core.slice_prefetcher import SlicePrefetcher, prefetch_window
+from core.volume_buffer import VolumeBuffer
+from utils.image_utils import ImageLoadError
+
+logger = logging.getLogger(__name__)
+
+
+def container_path(thumbnail_base: str | Path, level: int) -> Path:
+    """Where the container of `level` lives under the .thumbnail directory."""
+    return Path(thumbnail_base) / f"level_{level}.npy"
+
+
+def open_level(thumbnail_base: str | Path, level: int) -> np.ndarray | None:
+    """Map a level's container read-only.
+
+    Args:
+        thumbnail_base: The .thumbnail directory
+        level: Pyramid level, 1 and up
+
+    Returns:
+        (slices, height, width) memory map, or None when the level has no
+        container or it cannot be read -- callers then use the TIFF files
+    """
+    path = container_path(thumbnail_base, level)
+    if not path.exists():
+        return None
+    try:
+        volume = np.load(path, mmap_mode="r", allow_pickle=False)
+    except (OSError, ValueError):
+        logger.warning(f"Unreadable level container {path}, using the TIFF files", exc_info=True)
+        return None
+    if volume.ndim != 3:
+        logger.warning(f"Level container {path} holds a {volume.shape} array, not a volume")
+        return None
+    return volume  # type: ignore[no-any-return]
+
+
+def load_level(
+    volume: np.ndarray,
+    transform: Callable[[np.ndarray], np.ndarray] | None = None,
+    spill_dir: str | None = None,
+) -> np.ndarray:
+    """Copy a mapped container into a volume of its own, like load_volume.
+
+    The copy frees the container file for the next build to replace, which
+    a map kept open would not on Windows.
+
+    Args:
+        volume: From open_level
+        transform: Applied to each slice, e.g. to 8 bits
+        spill_dir: See VolumeBuffer
+
+    Returns:
+        np.ndarray: (slices, height, width)
+    """
+    buffer = VolumeBuffer(len(volume), spill_dir=spill_dir)
+    for idx in range(len(volume)):
+        arr = np.asarray(volume[idx])
+        buffer.put(idx, transform(arr) if transform is not None else arr)
+    return buffer.volume()
+
+
+def _forget_derived(thumbnail_base: str | Path) -> None:
+    """Drop what is derived from the levels: 3D view cache, level summaries, index."""
+    remove_preview(thumbnail_base)
+    forget_levels(Path(thumbnail_base).parent)
+    remove_pyramid_index(thumbnail_base)
+
+
+def remove_level(thumbnail_base: str | Path, level: int) -> None:
+    """Remove a level's container before the level is written again.
+
+    Raises:
+        OSError: The container exists and could not be removed, e.g. because
+            another program has it open on Windows. Building on would leave
+            it out of step with the files.
+    """
+    _forget_derived(thumbnail_base)
+    path = container_path(thumbnail_base, level)
+    if path.exists():
+        path.unlink()
+        logger.info(f"Removed level container {path}")
+
+
+def remove_all(thumbnail_base: str | Path) -> None:
+    """Remove every level container, for builders that do not write them."""
+    _forget_derived(thumbnail_base)
+    for path in Path(thumbnail_base).glob("level_*.npy"):
+        path.unlink()
+        logger.info(f"Removed level container {path}")
+
+
+def pack_level(
+    level_dir: str | Path,
+    count: int,
+    cancel_check: Callable[[], bool] | None = None,
+) -> Path | None:
+    """Pack a complete level's TIFF files into its container.
+
+    Reads 000000.tif .. count-1 in order, decoding ahead with a
+    SlicePrefetcher, into a memory-mapped NPY file that is renamed into place
+    once every slice is in. Nothing is left behind when it stops early.
+
+    Args:
+        level_dir: .thumbnail/<level>
+        count: Slices in the level
+        cancel_check: Stop early when this returns True
+
+    Returns:
+        Path: The container, or None if the level could not be packed -- a
+        slice missing or of another shape, a failed write, or cancelled
+    """
+    level_dir = Path(level_dir)
+    target = container_path(level_dir.parent, int(level_dir.name))
+    paths = [str(level_dir / f"{idx:06}.tif") for idx in range(count)]
+    temp = target.with_name(f".{target.name}.{uuid.uuid4().hex[:8]}.tmp")
+
+    volume: np.ndarray | None = None
+    try:
+        with SlicePrefetcher(paths, prefetch_window(paths)) as prefetcher:
+            for idx, path in enumerate(paths):
+                if cancel_check is not None and cancel_check():
+                    return None
+                arr = prefetcher.take(path)
+                if not isinstance(arr, np.ndarray):
+                    logger.warning(f"Not packing {level_dir}: {path} could not be read")
+                    return None
+                if volume is None:
+                    volume = np.lib.format.open_memmap(
+                        temp, mode="w+", dtype=arr.dtype, shape=(count, *arr.shape)
+                    )
+                if arr.shape != volume.shape[1:] or arr.dtype != volume.dtype:
+                    logger.warning(f"Not packing {level_dir}: {path} is {arr.shape} {arr.dtype}")
+                    return None
+                volume[idx] = arr
+        if volume is None:
+            return None
+        volume.flush()
+        volume = None  # unmapped before the rename, which Windows insists on
+        temp.replace(target)
+    except (OSError, ImageLoadError):
+        logger.error(
+            f"Could not pack {level_dir} into a container",
+            exc_info=True,
+            extra={"extra_fields": {"error_type": "container_error", "directory": str(level_dir)}},
+        )
+        return None
+    finally:
+        volume = None
+        temp.unlink(missing_ok=True)
+
+    logger.info(f"Packed {count} slices of {level_dir} into {target}")
+    return target
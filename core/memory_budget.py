@@ -0,0 +1,164 @@
+"""Memory budget for pyramid builds, from processing.memory_limit_gb.
+
+Every part of a build that holds decoded images draws on one limit: tasks in
+flight, source slices read ahead, thumbnails waiting to be written, and the
+level kept in memory for the 3D view. MemoryBudget splits the limit into a
+fixed share for each (MEMORY_SHARE_* in config.constants) and turns a share
+into a count -- how many tasks, how many slices ahead, how many queued writes
+-- from the size of one image. The counts never go below one, so a budget
+too small for even that slows a build down to one image at a time rather
+than stopping it.
+
+The estimates are of the arrays the build itself allocates. Python, Qt and
+the libraries come on top, which is why the shares add up to the limit and
+not to the machine.
+
+Typical usage example:
+
+    budget = MemoryBudget(settings.get("processing.memory_limit_gb"))
+    workers = budget.max_in_flight(reduce_task_bytes(width, height, 2), workers)
+"""
+
+import logging
+from typing import Any
+
+from core.slice_prefetcher import first_slice_bytes, window_for_budget
+
+logger = logging.getLogger(__name__)
+
+_MIB = 1024 * 1024
+_GIB = 1024 * _MIB
+
+
+def resolve_memory_limit(value: Any) -> float:
+    """Turn the processing.memory_limit_gb setting into a limit in GB.
+
+    Args:
+        value: Value of processing.memory_limit_gb; None for the default
+
+    Returns:
+        float: Limit in GB, DEFAULT_MEMORY_LIMIT_GB if unset or invalid
+    """
+    from config.constants import DEFAULT_MEMORY_LIMIT_GB
+
+    if value is None:
+        return float(DEFAULT_MEMORY_LIMIT_GB)
+    try:
+        limit = float(value)
+    except (TypeError, ValueError):
+        limit = 0.0
+    if limit <= 0:
+        logger.warning(
+            f"Invalid processing.memory_limit_gb value {value!r}, "
+            f"using {DEFAULT_MEMORY_LIMIT_GB} GB"
+        )
+        return float(DEFAULT_MEMORY_LIMIT_GB)
+    return limit
+
+
+def reduce_task_bytes(width: int, height: int, bytes_per_pixel: int) -> int:
+    """Peak memory of one reduce task: two slices in, one half-size slice out.
+
+    reduce_slices sums into double-width scratch arrays -- row pairs (half
+    the rows) and 2x2 blocks (a quarter of the pixels) -- so at its peak a task
+    holds the two sources, a slice and a half of scratch and the quarter-size
+    output.
+
+    Args:
+        width: Width of a source slice
+        height: Height of a source slice
+        bytes_per_pixel: Bytes per pixel of a source slice
+
+    Returns:
+        int: Estimated bytes
+    """
+    slice_bytes = width * height * bytes_per_pixel
+    return 3 * slice_bytes + 3 * slice_bytes // 4
+
+
+class MemoryBudget:
+    """Splits a memory limit between the parts of a build that hold images.
+
+    Attributes:
+        limit_bytes: The whole budget
+    """
+
+    SHARES = ("volume", "tasks", "prefetch", "writes")
+
+    def __init__(self, limit_gb: Any = None):
+        """Set the limit.
+
+        Args:
+            limit_gb: Limit in GB, as processing.memory_limit_gb holds it;
+                None for DEFAULT_MEMORY_LIMIT_GB
+        """
+        self.limit_bytes = int(resolve_memory_limit(limit_gb) * _GIB)
+
+    def __repr__(self) -> str:
+        return f"MemoryBudget({self.limit_bytes / _GIB:g} GB)"
+
+    def share(self, part: str) -> int:
+        """Bytes allowed for one part of the build.
+
+        Args:
+            part: One of SHARES
+
+        Returns:
+            int: Bytes
+        """
+        from config import constants
+
+        fraction = getattr(constants, f"MEMORY_SHARE_{part.upper()}")
+        return int(self.limit_bytes * fraction)
+
+    def split(self, ways: int) -> "MemoryBudget":
+        """An equal part of this budget, for one of `ways` builds run at once."""
+        return MemoryBudget(self.limit_bytes / max(1, ways) / _GIB)
+
+    def max_in_flight(self, task_bytes: int, wanted: int) -> int:
+        """How many tasks of `task_bytes` may run at once.
+
+        Args:
+            task_bytes: Peak memory of one task (see reduce_task_bytes)
+            wanted: Workers available
+
+        Returns:
+            int: Between 1 and `wanted`
+        """
+        allowed = self.share("tasks") // max(1, task_bytes)
+        return max(1, min(wanted, allowed))
+
+    def prefetch_window(self, slice_bytes: int) -> int:
+        """How many source slices of `slice_bytes` to decode ahead."""
+        return window_for_budget(slice_bytes, budget_mb=self.share("prefetch") / _MIB)
+
+    def write_queue_length(self, output_bytes: int) -> int:
+        """How many thumbnails of `output_bytes` may wait to be written."""
+        from config.constants import WRITE_QUEUE_MAX_PENDING
+
+        allowed = self.share("writes") // max(1, output_bytes)
+        return max(1, min(WRITE_QUEUE_MAX_PENDING, allowed))
+
+    def fits_volume(self, volume_bytes: int) -> bool:
+        """Whether a volume of `volume_bytes` may be kept in memory."""
+        return volume_bytes <= self.share("volume")
+
+
+def pipeline_depths(reads: list[str], budget: MemoryBudget | None) -> tuple[int, int]:
+    """Read-ahead window and write queue length for a builder about to read `reads`.
+
+    Args:
+        reads: Source slices in read order; the first that exists is probed
+        budget: Budget to fit in; None for the fixed PREFETCH_* and
+            WRITE_QUEUE_MAX_PENDING defaults
+
+    Returns:
+        (window, max_pending) for SlicePrefetcher and OutputWriter. Outputs
+        are taken to be a quarter of a source slice, the largest they get.
+    """
+    from config.constants import WRITE_QUEUE_MAX_PENDING
+
+    slice_bytes = first_slice_bytes(reads)
+    if budget is None:
+        return window_for_budget(slice_bytes), WRITE_QUEUE_MAX_PENDING
+    return budget.prefetch_window(slice_bytes), budget.write_queue_length(slice_bytes // 4)
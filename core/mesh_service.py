@@ -0,0 +1,317 @@
+"""Marching-cubes meshes for the 3D preview, built in the background and cached.
+
+Dragging the threshold slider asks for a new mesh at every step. The widget
+used to refuse a request while a build ran and then work through the ones
+queued behind it, each on a full copy of the volume, so the preview lagged
+further behind the slider the longer it was dragged. MeshService keeps only
+the newest request: a build checks between its stages whether it has been
+superseded and stops if so, and requests made while it ran are dropped
+except the last. Finished meshes stay in a MeshCache keyed by ROI, level,
+isovalue and inversion, so going back to a threshold already shown costs a
+lookup.
+
+Nothing here touches Qt: results are handed to callbacks on the service's
+thread, which the widget forwards to the GUI thread through a signal.
+
+Typical usage example:
+
+    service = MeshService(MeshCache(limit_bytes), on_mesh, on_error)
+    mesh = service.request(key, volume, isovalue, scale_factor, is_inverse)
+    if mesh is None:
+        ...  # on_mesh(generation, key, mesh) follows
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import mcubes
+import numpy as np
+from scipy import ndimage
+
+from core.mesh_decimation import decimate_mesh
+
+logger = logging.getLogger(__name__)
+
+
+def mesh_nbytes(mesh: dict) -> int:
+    """Bytes held by the arrays of a mesh dict."""
+    return sum(arr.nbytes for arr in mesh.values() if isinstance(arr, np.ndarray))
+
+
+def build_mesh(
+    volume: np.ndarray,
+    isovalue: float,
+    scale_factor: float,
+    is_inverse: bool,
+    progress: Callable[[int], None] | None = None,
+    cancelled: Callable[[], bool] | None = None,
+    triangle_budget: int = 0,
+) -> dict | None:
+    """Resample `volume`, run marching cubes on it and compute vertex normals.
+
+    Args:
+        volume: 3D 8-bit volume; only read
+        isovalue: Surface level, in the volume's 0-255 range
+        scale_factor: Zoom applied to the volume before marching cubes
+        is_inverse: Take the surface of the inverted volume
+        progress: Called with a percentage as stages finish
+        cancelled: Polled between stages; the build stops once it returns True
+        triangle_budget: Decimate the mesh to about this many triangles (see
+            decimate_mesh); 0 keeps every triangle
+
+    Returns:
+        dict: "vertices", "triangles" and "vertex_normals" arrays; None if
+        cancelled
+    """
+    from config.constants import IMAGE_8BIT_MAX
+
+    def report(percentage: int) -> None:
+        if progress is not None:
+            progress(percentage)
+
+    def stop() -> bool:
+        return cancelled is not None and cancelled()
+
+    # Scale volume
+    report(10)
+    volume = ndimage.zoom(volume, scale_factor, order=1)
+    if stop():
+        return None
+
+    # Invert if needed
+    report(20)
+    if is_inverse:
+        volume = IMAGE_8BIT_MAX - volume
+        isovalue = IMAGE_8BIT_MAX - isovalue
+
+    # Marching cubes algorithm
+    report(30)
+    logger.debug("Running marching cubes...")
+    vertices, triangles = mcubes.marching_cubes(volume, isovalue)
+    if stop():
+        return None
+
+    # Face normals, from the cross product of two edges of each triangle
+    report(60)
+    v0 = vertices[triangles[:, 0]]
+    edge1 = vertices[triangles[:, 1]] - v0
+    edge2 = vertices[triangles[:, 2]] - v0
+    face_normals = np.cross(edge1, edge2)
+    norms = np.linalg.norm(face_normals, axis=1, keepdims=True)
+    face_normals = face_normals / np.where(norms == 0, 1, norms)
+
+    # Vertex normals: the normalised sum of the faces around each vertex
+    report(80)
+    vertex_normals = np.zeros(vertices.shape, dtype=np.float32)
+    for corner in range(3):
+        np.add.at(vertex_normals, triangles[:, corner], face_normals)
+    norms = np.linalg.norm(vertex_normals, axis=1, keepdims=True)
+    vertex_normals = vertex_normals / np.where(norms == 0, 1, norms)
+
+    mesh = {"vertices": vertices, "triangles": triangles, "vertex_normals": vertex_normals}
+    if triangle_budget and len(triangles) > triangle_budget:
+        if stop():
+            return None
+        report(90)
+        mesh = decimate_mesh(mesh, triangle_budget)
+
+    report(95)
+    return mesh
+
+
+class MeshCache:
+    """Least-recently-used meshes, bounded in bytes.
+
+    Thread-safe, like SliceCache: the service fills it from its thread and
+    the widget reads it from the GUI thread. Cached meshes are shared and
+    must not be modified.
+
+    Attributes:
+        limit_bytes: Most bytes of meshes held at once
+    """
+
+    def __init__(self, limit_bytes: int):
+        self.limit_bytes = limit_bytes
+        self._meshes: OrderedDict[Hashable, dict] = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._meshes)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._meshes
+
+    def get(self, key: Hashable) -> dict | None:
+        """The mesh cached under `key`, now the most recently used; None if absent."""
+        with self._lock:
+            mesh = self._meshes.get(key)
+            if mesh is not None:
+                self._meshes.move_to_end(key)
+            return mesh
+
+    def put(self, key: Hashable, mesh: dict) -> None:
+        """Cache `mesh`, evicting the least recently used to stay in the limit.
+
+        A mesh larger than the whole limit is not cached.
+        """
+        nbytes = mesh_nbytes(mesh)
+        if nbytes > self.limit_bytes:
+            return
+        with self._lock:
+            old = self._meshes.pop(key, None)
+            if old is not None:
+                self._nbytes -= mesh_nbytes(old)
+            self._meshes[key] = mesh
+            self._nbytes += nbytes
+            while self._nbytes > self.limit_bytes:
+                _, evicted = self._meshes.popitem(last=False)
+                self._nbytes -= mesh_nbytes(evicted)
+
+    def clear(self) -> None:
+        """Drop every cached mesh, e.g. when another volume is loaded."""
+        with self._lock:
+            self._meshes.clear()
+            self._nbytes = 0
+
+
+class MeshService:
+    """Builds the newest requested mesh on one background thread.
+
+    Each request() supersedes the previous one. A build that is superseded
+    stops at its next stage and reports nothing; requests that were waiting
+    behind it are skipped without being started.
+    """
+
+    def __init__(
+        self,
+        cache: MeshCache,
+        on_mesh: Callable[[int, Hashable, dict], None],
+        on_error: Callable[[int, str], None] | None = None,
+        on_progress: Callable[[int], None] | None = None,
+    ):
+        """Start the builder thread.
+
+        Args:
+            cache: Consulted before building, and filled with what is built
+            on_mesh: Called as on_mesh(generation, key, mesh) from the
+                builder thread when the current request's mesh is ready
+            on_error: Called as on_error(generation, message) if it fails
+            on_progress: Called with the current build's percentage
+        """
+        self.cache = cache
+        self._on_mesh = on_mesh
+        self._on_error = on_error
+        self._on_progress = on_progress
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mesh-build")
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._running = 0
+
+    @property
+    def generation(self) -> int:
+        """Number of the current request; results of earlier ones are stale."""
+        return self._generation
+
+    @property
+    def busy(self) -> bool:
+        """Whether a request is waiting or being built."""
+        with self._lock:
+            return self._running > 0
+
+    def request(
+        self,
+        key: Hashable,
+        volume: np.ndarray,
+        isovalue: float,
+        scale_factor: float,
+        is_inverse: bool,
+        triangle_budget: int = 0,
+    ) -> dict | None:
+        """Ask for the mesh of `volume` at `isovalue`, superseding earlier requests.
+
+        Args:
+            key: Identifies the mesh in the cache, e.g. (ROI, level, isovalue,
+                inverse); equal keys must mean equal meshes. None: not cached
+            volume: Only read, from the builder thread, so it must not be
+                written to until the mesh arrives
+            triangle_budget: As for build_mesh; part of what `key` must identify
+
+        Returns:
+            dict: The cached mesh, if there is one; None when it is being built
+            and will be passed to on_mesh
+        """
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            mesh = self.cache.get(key) if key is not None else None
+            if mesh is not None:
+                return mesh
+            self._running += 1
+        future = self._executor.submit(
+            self._run, generation, key, volume, isovalue, scale_factor, is_inverse, triangle_budget
+        )
+        future.add_done_callback(self._finished)
+        return None
+
+    def cancel(self) -> None:
+        """Supersede the current request without making another."""
+        with self._lock:
+            self._generation += 1
+
+    def _run(
+        self,
+        generation: int,
+        key: Hashable,
+        volume: np.ndarray,
+        isovalue: float,
+        scale_factor: float,
+        is_inverse: bool,
+        triangle_budget: int,
+    ) -> None:
+        def stale() -> bool:
+            return generation != self._generation
+
+        try:
+            if stale():
+                return
+            logger.info(f"Building mesh: isovalue={isovalue}, scale_factor={scale_factor}")
+            mesh = build_mesh(
+                volume,
+                isovalue,
+                scale_factor,
+                is_inverse,
+                self._on_progress,
+                cancelled=stale,
+                triangle_budget=triangle_budget,
+            )
+            if mesh is None:
+                logger.debug(f"Mesh build for isovalue={isovalue} superseded")
+                return
+            if key is not None:
+                self.cache.put(key, mesh)
+            logger.info(
+                f"Mesh built: {len(mesh['vertices'])} vertices, {len(mesh['triangles'])} triangles"
+            )
+            if not stale():
+                self._on_mesh(generation, key, mesh)
+        except Exception as e:
+            logger.error(f"Mesh generation failed: {e}", exc_info=True)
+            if self._on_error is not None and not stale():
+                self._on_error(generation, str(e))
+
+    def _finished(self, future: Future) -> None:
+        # Also called for requests close() cancels before they start, which
+        # is why the count is kept here rather than at the end of _run
+        with self._lock:
+            self._running -= 1
+
+    def close(self) -> None:
+        """Stop the builder thread; the current request is dropped."""
+        self.cancel()
+        self._executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,105 @@
+"""Placing marching-cubes meshes in the 3D view's and the exported model's axes.
+
+mcubes.marching_cubes returns vertices in (slice, row, column) order. The 3D
+view and OBJ export want them as [z, x, y] -- column, slice, row -- and the
+view also scales the mesh down and centres it on the ROI. Doing that vertex by
+vertex in Python, after deep-copying every array, froze the UI for seconds on
+large meshes each time the ROI moved. transform_mesh does it as one gather,
+multiply and subtract over the whole array, in float32. TransformedMeshCache
+keeps the result until the mesh or the transform changes.
+
+Typical usage example:
+
+    vertices, normals = transform_mesh(vertices, normals, scale=0.1, displacement=d)
+
+    cache = TransformedMeshCache()
+    vertices, normals = cache.get(generated_data, scale=0.1, displacement=d)
+"""
+
+import numpy as np
+
+# Source axes making up [z, x, y]: the mesh's axis 2 comes first
+AXIS_ORDER = [2, 0, 1]
+
+
+def transform_mesh(
+    vertices: np.ndarray,
+    vertex_normals: np.ndarray | None = None,
+    scale: float = 1.0,
+    displacement: np.ndarray | tuple[float, float, float] | None = None,
+) -> tuple[np.ndarray, np.ndarray | None]:
+    """Scale, shift and reorder the axes of a mesh, leaving the source untouched.
+
+    Each vertex v becomes (v * scale - displacement)[AXIS_ORDER]. The axes
+    are reordered first, while copying, so the scale and shift are applied in
+    place to that copy. Normals are only reordered: a uniform scale and a
+    shift do not change their direction.
+
+    Args:
+        vertices: (N, 3) vertex positions, in the mesh's own axes
+        vertex_normals: (N, 3) normals, or None
+        scale: Factor applied to every coordinate
+        displacement: Length-3 shift subtracted after scaling, in the mesh's
+            own axes; None for no shift
+
+    Returns:
+        tuple: (N, 3) float32 vertices, and (N, 3) float32 normals or None
+    """
+    out = np.asarray(vertices, dtype=np.float32)[:, AXIS_ORDER]
+    if scale != 1.0:
+        out *= np.float32(scale)
+    if displacement is not None:
+        out -= np.asarray(displacement, dtype=np.float32)[AXIS_ORDER]
+    normals = None
+    if vertex_normals is not None:
+        normals = np.asarray(vertex_normals, dtype=np.float32)[:, AXIS_ORDER]
+    return out, normals
+
+
+class TransformedMeshCache:
+    """The last mesh placed by transform_mesh, kept until its input changes.
+
+    The mesh is identified by the dict core.mesh_service.build_mesh produced,
+    so a new mesh always replaces the cached one, even if it has the same size.
+    The transform is compared by value.
+    """
+
+    def __init__(self) -> None:
+        self._key: tuple[float, tuple[float, ...] | None] | None = None
+        self._source: dict[str, np.ndarray] | None = None
+        self._result: tuple[np.ndarray, np.ndarray | None] | None = None
+
+    def get(
+        self,
+        generated_data: dict[str, np.ndarray],
+        scale: float = 1.0,
+        displacement: np.ndarray | tuple[float, float, float] | None = None,
+    ) -> tuple[np.ndarray, np.ndarray | None]:
+        """Transformed vertices and normals of `generated_data`.
+
+        Args:
+            generated_data: Dict with "vertices" and "vertex_normals" arrays
+            scale, displacement: As for transform_mesh
+
+        Returns:
+            tuple: (vertices, normals) as returned by transform_mesh. The
+            arrays are shared with later calls and must not be modified.
+        """
+        key = (
+            float(scale),
+            None if displacement is None else tuple(float(d) for d in displacement),
+        )
+        if self._result is not None and self._source is generated_data and self._key == key:
+            return self._result
+        result = transform_mesh(
+            generated_data["vertices"], generated_data.get("vertex_normals"), scale, displacement
+        )
+        for arr in result:
+            if arr is not None:
+                arr.flags.writeable = False
+        self._source, self._key, self._result = generated_data, key, result
+        return result
+
+    def clear(self) -> None:
+        """Forget the cached mesh."""
+        self._source = self._key = self._result = None
@@ -0,0 +1,234 @@
+"""Writing exported meshes as binary STL, binary PLY and OBJ files.
+
+The 3D model export used to write OBJ only, with one f-string per vertex and
+per face. A mesh of a few million triangles took minutes, and the text was
+several times larger than the mesh. These writers serialise straight from
+the vertex and triangle arrays instead. STL and PLY records are filled into
+numpy structured arrays, whose layout is the file's, and written as bytes.
+OBJ lines are formatted a whole block at a time. Either way the mesh is
+written in blocks of MESH_WRITE_CHUNK rows, so the copy made for writing
+stays small whatever the mesh's size.
+
+Every writer takes a binary file object and the same arguments, so callers
+pick one from MESH_WRITERS by file extension. Opening, and making the write
+atomic, is left to the caller.
+
+Typical usage example:
+
+    normals = vertex_normals(vertices, triangles)
+    with open("model.ply", "wb") as fh:
+        write_mesh(fh, ".ply", vertices, triangles, normals)
+"""
+
+import logging
+from typing import BinaryIO
+
+import numpy as np
+
+from config.constants import MESH_WRITE_CHUNK
+
+logger = logging.getLogger(__name__)
+
+# 80-byte header, which must not start with "solid" (that marks ASCII STL)
+STL_HEADER = b"CTHarvester binary STL".ljust(80, b"\0")
+
+# One STL facet: normal, three corners, attribute byte count -- 50 bytes
+STL_FACET = np.dtype([("normal", "<f4", 3), ("corners", "<f4", (3, 3)), ("attributes", "<u2")])
+
+# One PLY face: corner count, then the corners -- 13 bytes
+PLY_FACE = np.dtype([("count", "u1"), ("corners", "<i4", 3)])
+
+
+def _face_normals(corners: np.ndarray) -> np.ndarray:
+    """Unit normals of (M, 3, 3) triangle corners; zero for degenerate ones."""
+    normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    norms = np.linalg.norm(normals, axis=1, keepdims=True)
+    return normals / np.where(norms == 0, 1, norms)
+
+
+def vertex_normals(vertices: np.ndarray, triangles: np.ndarray) -> np.ndarray:
+    """Per-vertex normals: the normalised sum of the faces around each vertex.
+
+    Faces are weighted equally, as for the 3D preview (see core.mesh_service),
+    and point the way their corners wind.
+
+    Args:
+        vertices: (N, 3) vertex positions
+        triangles: (M, 3) vertex indices
+
+    Returns:
+        np.ndarray: (N, 3) float32 unit normals; zero for unused vertices
+    """
+    vertices = np.asarray(vertices, dtype=np.float32)
+    normals = np.zeros((len(vertices), 3), dtype=np.float64)
+    for start, stop in _blocks(len(triangles)):
+        block = np.asarray(triangles[start:stop], dtype=np.int64)
+        faces = _face_normals(vertices[block].astype(np.float64))
+        corners = block.ravel()
+        for axis in range(3):
+            normals[:, axis] += np.bincount(
+                corners, weights=np.repeat(faces[:, axis], 3), minlength=len(vertices)
+            )
+    norms = np.linalg.norm(normals, axis=1, keepdims=True)
+    return (normals / np.where(norms == 0, 1, norms)).astype(np.float32)
+
+
+def _blocks(count: int):
+    """(start, stop) of successive blocks of MESH_WRITE_CHUNK rows."""
+    for start in range(0, count, MESH_WRITE_CHUNK):
+        yield start, min(start + MESH_WRITE_CHUNK, count)
+
+
+def write_stl(
+    fh: BinaryIO, vertices: np.ndarray, triangles: np.ndarray, normals: np.ndarray | None = None
+) -> None:
+    """Write a binary STL file.
+
+    STL stores one normal per facet, not per vertex, so `normals` is not
+    written. Facet normals are computed from each triangle's corners, in the
+    direction they wind.
+
+    Args:
+        fh: Binary file to write to
+        vertices: (N, 3) vertex positions
+        triangles: (M, 3) vertex indices, 0-based
+        normals: Ignored; accepted so every writer takes the same arguments
+
+    Raises:
+        ValueError: More triangles than STL can count (2**32 - 1)
+    """
+    if len(triangles) > np.iinfo(np.uint32).max:
+        raise ValueError(f"{len(triangles)} triangles is too many for STL")
+    vertices = np.asarray(vertices, dtype=np.float32)
+
+    fh.write(STL_HEADER)
+    fh.write(np.uint32(len(triangles)).astype("<u4").tobytes())
+    for start, stop in _blocks(len(triangles)):
+        corners = vertices[triangles[start:stop]]
+        facets = np.zeros(stop - start, dtype=STL_FACET)
+        facets["normal"] = _face_normals(corners)
+        facets["corners"] = corners
+        fh.write(facets.tobytes())
+
+
+def write_ply(
+    fh: BinaryIO, vertices: np.ndarray, triangles: np.ndarray, normals: np.ndarray | None = None
+) -> None:
+    """Write a binary little-endian PLY file.
+
+    Args:
+        fh: Binary file to write to
+        vertices: (N, 3) vertex positions
+        triangles: (M, 3) vertex indices, 0-based
+        normals: (N, 3) per-vertex normals, written as nx, ny, nz; or None
+
+    Raises:
+        ValueError: More vertices than a PLY int index can reach (2**31 - 1)
+    """
+    if len(vertices) > np.iinfo(np.int32).max:
+        raise ValueError(f"{len(vertices)} vertices is too many for PLY")
+
+    fields = [("position", "<f4", 3)]
+    properties = ["x", "y", "z"]
+    if normals is not None:
+        fields.append(("normal", "<f4", 3))
+        properties += ["nx", "ny", "nz"]
+    vertex_dtype = np.dtype(fields)
+
+    header = [
+        "ply",
+        "format binary_little_endian 1.0",
+        "comment CTHarvester",
+        f"element vertex {len(vertices)}",
+        *(f"property float {name}" for name in properties),
+        f"element face {len(triangles)}",
+        "property list uchar int vertex_indices",
+        "end_header",
+    ]
+    fh.write(("\n".join(header) + "\n").encode("ascii"))
+
+    for start, stop in _blocks(len(vertices)):
+        records = np.empty(stop - start, dtype=vertex_dtype)
+        records["position"] = vertices[start:stop]
+        if normals is not None:
+            records["normal"] = normals[start:stop]
+        fh.write(records.tobytes())
+
+    for start, stop in _blocks(len(triangles)):
+        faces = np.empty(stop - start, dtype=PLY_FACE)
+        faces["count"] = 3
+        faces["corners"] = triangles[start:stop]
+        fh.write(faces.tobytes())
+
+
+def write_obj(
+    fh: BinaryIO, vertices: np.ndarray, triangles: np.ndarray, normals: np.ndarray | None = None
+) -> None:
+    """Write a Wavefront OBJ file.
+
+    Coordinates are written with 9 significant digits, enough to read back
+    every float32 exactly. Each block of lines is formatted by one %
+    operation rather than one f-string per line.
+
+    Args:
+        fh: Binary file to write to; the text is ASCII
+        vertices: (N, 3) vertex positions
+        triangles: (M, 3) vertex indices, 0-based; written 1-based
+        normals: (N, 3) per-vertex normals, written as vn lines and
+            referenced by the faces (f v//vn ...); or None
+    """
+
+    def write_lines(line, rows, convert):
+        for start, stop in _blocks(len(rows)):
+            block = convert(rows[start:stop])
+            fh.write(((line * len(block)) % tuple(block.ravel().tolist())).encode("ascii"))
+
+    def coordinates(block):
+        return np.asarray(block, dtype=np.float32)
+
+    def indices(block):
+        return np.asarray(block, dtype=np.int64) + 1
+
+    write_lines("v %.9g %.9g %.9g\n", vertices, coordinates)
+    if normals is None:
+        write_lines("f %d %d %d\n", triangles, indices)
+    else:
+        write_lines("vn %.9g %.9g %.9g\n", normals, coordinates)
+        # Each corner's normal has the vertex's own index
+        write_lines(
+            "f %d//%d %d//%d %d//%d\n",
+            triangles,
+            lambda block: np.repeat(indices(block), 2, axis=1),
+        )
+
+
+# Writer for each extension in config.constants.SUPPORTED_EXPORT_FORMATS
+MESH_WRITERS = {".stl": write_stl, ".ply": write_ply, ".obj": write_obj}
+
+
+def write_mesh(
+    fh: BinaryIO,
+    extension: str,
+    vertices: np.ndarray,
+    triangles: np.ndarray,
+    normals: np.ndarray | None = None,
+) -> None:
+    """Write a mesh in the format of `extension`.
+
+    Args:
+        fh: Binary file to write to
+        extension: ".stl", ".ply" or ".obj", in any case
+        vertices: (N, 3) vertex positions
+        triangles: (M, 3) vertex indices, 0-based
+        normals: (N, 3) per-vertex normals, or None; STL never stores them
+
+    Raises:
+        ValueError: Unknown extension, or a mesh too large for the format
+    """
+    writer = MESH_WRITERS.get(extension.lower())
+    if writer is None:
+        raise ValueError(f"Unsupported mesh format: {extension}")
+    writer(fh, vertices, triangles, normals)
+    logger.debug(
+        f"Wrote {len(vertices)} vertices, {len(triangles)} triangles as {extension.lower()}"
+    )
@@ -0,0 +1,141 @@
+"""Write-behind queue for generated thumbnails.
+
+The single-threaded FusedPyramidBuilder used to stop after every output to
+encode it as TIFF and wait for the write. On slow storage that wait is as long
+as the computation. OutputWriter takes the arrays, writes them on a background
+thread, and lets the builder carry on.
+
+- Every write is atomic (utils.image_utils.save_image_atomic): an output is
+  complete under its real name, or not there at all.
+- The queue is bounded. When storage falls behind and the queue is full,
+  submit() blocks until there is room again, so unwritten arrays cannot pile
+  up in memory without limit.
+- A failed write is not just logged. It is raised as OutputWriteError to the
+  builder, at its next submit() or at flush(), so it can stop and report it
+  the way it reports any other failure.
+
+Typical usage example:
+
+    with OutputWriter() as writer:
+        for path, arr in outputs:
+            writer.submit(path, arr)
+        writer.flush()
+"""
+
+import logging
+import queue
+import threading
+from collections.abc import Callable
+
+import numpy as np
+
+from utils.image_utils import OutputWriteError, save_image_atomic
+
+logger = logging.getLogger(__name__)
+
+
+class OutputWriter:
+    """Writes images on a background thread, behind a bounded queue.
+
+    Attributes:
+        max_pending: Outputs that may wait to be written before submit() blocks
+        written: Outputs written so far
+    """
+
+    def __init__(self, max_pending: int | None = None):
+        """Start the writer thread.
+
+        Args:
+            max_pending: Queue bound; defaults to WRITE_QUEUE_MAX_PENDING
+        """
+        from config.constants import WRITE_QUEUE_MAX_PENDING
+
+        self.max_pending = max(1, max_pending or WRITE_QUEUE_MAX_PENDING)
+        self.written = 0
+
+        self._queue: queue.Queue = queue.Queue(maxsize=self.max_pending)
+        self._error: OutputWriteError | None = None
+        self._thread = threading.Thread(target=self._run, name="thumbnail-writer", daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> "OutputWriter":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def submit(
+        self,
+        path: str,
+        arr: np.ndarray,
+        on_written: Callable[[], None] | None = None,
+    ) -> None:
+        """Queue an image to be written to `path`.
+
+        The array must not be modified afterwards; it is written as it is
+        when the writer gets to it.
+
+        Args:
+            path: Output path; the extension picks the format
+            arr: Image to write
+            on_written: Called on the writer thread once the file is complete
+
+        Raises:
+            OutputWriteError: An earlier write failed
+        """
+        self._raise_error()
+        self._queue.put((path, arr, on_written))
+
+    def flush(self) -> None:
+        """Wait until everything queued so far is written.
+
+        Raises:
+            OutputWriteError: A write failed
+        """
+        self._queue.join()
+        self._raise_error()
+
+    def close(self) -> None:
+        """Write what is queued and stop the thread.
+
+        Never raises, so it is safe in a finally block with another exception
+        on its way out; call flush() first to learn of failed writes.
+        """
+        self._queue.join()
+        self._queue.put(None)
+        self._thread.join()
+        if self._error is not None:
+            logger.debug(f"Output writer closed after a failed write: {self._error}")
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                path, arr, on_written = item
+                if self._error is not None:
+                    # The builder is about to stop; writing more would only
+                    # hit the same full disk or lost share again.
+                    continue
+                try:
+                    save_image_atomic(arr, path)
+                except OutputWriteError as e:
+                    logger.error(
+                        f"Failed to write thumbnail: {path}",
+                        exc_info=True,
+                        extra={
+                            "extra_fields": {"error_type": "thumbnail_save_error", "file": path}
+                        },
+                    )
+                    self._error = e
+                    continue
+                self.written += 1
+                if on_written is not None:
+                    on_written()
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,140 @@
+"""Memory-mapped cache of the 8-bit volume behind the 3D view.
+
+Opening a processed dataset loads one pyramid level into memory as 8 bits for
+the 3D view (ThumbnailGenerator.load_thumbnail_data): every slice of it read,
+decoded and normalised, each time. The first load saves the result as
+.thumbnail/preview.npy, with .thumbnail/preview.json recording which level it
+is and what it was chosen for; later loads map that file read-only instead,
+which costs the same however many slices the level has.
+
+The cache is only ever a copy. It is trusted only while its metadata matches
+the request, and removing preview.json is enough to invalidate it -- which
+core.level_container does whenever a level is about to be rewritten. The
+.npy itself may be mapped by the viewer, which Windows will not let anyone
+delete, so removing it is best effort.
+
+Typical usage example:
+
+    cached = open_preview(thumbnail_base, key)   # (volume, level), or None
+    if cached is None:
+        ...load the level...
+        save_preview(thumbnail_base, key, level, volume)
+"""
+
+import json
+import logging
+import uuid
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+PREVIEW_FILE = "preview.npy"
+PREVIEW_META_FILE = "preview.json"
+PREVIEW_VERSION = 1
+
+
+def open_preview(thumbnail_base: str | Path, key: dict[str, Any]) -> tuple[np.ndarray, int] | None:
+    """Map the cached volume if it was saved for the same `key`.
+
+    Args:
+        thumbnail_base: The .thumbnail directory
+        key: What the level was chosen for, as given to save_preview; the
+            cache is used only when it matches exactly
+
+    Returns:
+        (volume, level) -- a read-only (slices, height, width) uint8 memory
+        map and the pyramid level it holds -- or None to load the level
+    """
+    base = Path(thumbnail_base)
+    try:
+        with (base / PREVIEW_META_FILE).open(encoding="utf-8") as f:
+            meta = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError):
+        logger.warning(f"Unreadable preview metadata in {base}, ignoring the cache", exc_info=True)
+        return None
+
+    if meta.get("version") != PREVIEW_VERSION or meta.get("key") != key:
+        logger.info("Cached preview volume was made for other settings, not using it")
+        return None
+    if not (base / str(meta.get("level"))).is_dir():
+        logger.info(f"Level {meta.get('level')} of the cached preview volume is gone")
+        return None
+
+    try:
+        volume = np.load(base / PREVIEW_FILE, mmap_mode="r", allow_pickle=False)
+    except (OSError, ValueError):
+        logger.warning(f"Unreadable preview volume in {base}, ignoring the cache", exc_info=True)
+        return None
+    if list(volume.shape) != meta.get("shape") or volume.dtype != np.uint8:
+        logger.warning(f"Preview volume in {base} does not match its metadata, ignoring it")
+        return None
+    return volume, int(meta["level"])
+
+
+def save_preview(
+    thumbnail_base: str | Path, key: dict[str, Any], level: int, volume: np.ndarray
+) -> bool:
+    """Save a freshly loaded volume for open_preview to map next time.
+
+    The volume is written under a temporary name and renamed into place,
+    and the metadata only after it, so a reader never maps a partial file.
+    Failing to save costs only the next load its speed, so it is logged and
+    otherwise ignored.
+
+    Args:
+        thumbnail_base: The .thumbnail directory
+        key: What the level was chosen for (JSON-serialisable)
+        level: Pyramid level the volume holds
+        volume: (slices, height, width) uint8
+
+    Returns:
+        bool: Whether the cache was saved
+    """
+    base = Path(thumbnail_base)
+    suffix = f".{uuid.uuid4().hex[:8]}.tmp"
+    temp = base / f".{PREVIEW_FILE}{suffix}"
+    meta_temp = base / f".{PREVIEW_META_FILE}{suffix}"
+    meta = {
+        "version": PREVIEW_VERSION,
+        "key": key,
+        "level": level,
+        "shape": list(volume.shape),
+    }
+    try:
+        remove_preview(base)
+        with temp.open("wb") as f:
+            np.save(f, np.asarray(volume, dtype=np.uint8), allow_pickle=False)
+        temp.replace(base / PREVIEW_FILE)
+        with meta_temp.open("w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        meta_temp.replace(base / PREVIEW_META_FILE)
+    except OSError:
+        logger.warning(f"Could not cache the preview volume in {base}", exc_info=True)
+        return False
+    finally:
+        temp.unlink(missing_ok=True)
+        meta_temp.unlink(missing_ok=True)
+
+    logger.info(f"Cached level {level} preview volume {volume.shape} in {base}")
+    return True
+
+
+def remove_preview(thumbnail_base: str | Path) -> None:
+    """Invalidate the cache, before any level is rewritten.
+
+    Raises:
+        OSError: The metadata could not be removed, so the cache would still
+            be trusted
+    """
+    base = Path(thumbnail_base)
+    (base / PREVIEW_META_FILE).unlink(missing_ok=True)
+    try:
+        (base / PREVIEW_FILE).unlink(missing_ok=True)
+    except OSError:
+        # Still mapped by the viewer on Windows; harmless without its metadata
+        logger.info(f"Preview volume in {base} is in use, leaving it to be replaced")
@@ -0,0 +1,740 @@
+"""Qt-free thumbnail pyramid engine.
+
+Everything needed to build the .thumbnail pyramid for a CT stack, with no
+QApplication, QThreadPool or progress dialog involved: work runs on a
+concurrent.futures executor, progress comes back as PyramidProgress events
+(from an iterator, or through a callback), and cancellation is a method call.
+Batch jobs and benchmarks use it directly; ThumbnailGenerator.generate_python
+is the GUI's adapter around it.
+
+Two ways of building are offered, and both write the same files:
+
+- Level by level (the default): each level is a set of independent slice-pair
+  tasks read from the level below. Tasks run on a thread pool, or with
+  use_processes=True on a process pool, which is what lets more than one core
+  work -- threads contend on the GIL and PIL's locks.
+- Single pass: FusedPyramidBuilder reads each original slice once and carries
+  it up through every level. Sequential by nature, so it runs on one
+  background thread.
+
+Waiting is done by blocking on the futures with a timeout, so the caller gets
+an event at least every PROGRESS_UPDATE_INTERVAL_MS without spinning.
+
+Once built, each level is also packed into a single-file container
+(core.level_container) that readers prefer to the per-slice files; a level
+about to be rewritten loses its container first.
+
+Every build keeps a BuildManifest (core.build_manifest) of the outputs it has
+finished. Only those are skipped on the next build; anything else on disk is
+overwritten, so an interrupted build resumes where it stopped and never trusts
+a half-written file.
+
+Typical usage example:
+
+    engine = PyramidEngine(workers=8, use_processes=True)
+    for progress in engine.iter_build("/data/scan", settings):
+        print(f"{progress.percentage:.0f}%")
+    print(engine.result.level_info)
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from core.build_manifest import BuildManifest, open_manifest
+from core.fused_pyramid_builder import FusedPyramidBuilder, count_pyramid_levels
+from core.level_container import container_path, pack_level, remove_level
+from core.memory_budget import MemoryBudget, reduce_task_bytes
+from core.pyramid_index import write_pyramid_index
+from core.slice_prefetcher import estimate_slice_bytes
+from utils.image_utils import (
+    ImageLoadError,
+    OutputWriteError,
+    reduce_slices,
+    reduction_scratch,
+    safe_load_image,
+    save_image_atomic,
+)
+
+logger = logging.getLogger(__name__)
+
+# reduce_slices scratch of each worker thread (or process), kept from one task
+# to the next of a level, where every slice is the same size
+_worker_scratch = threading.local()
+
+
+def _scratch_for(arr: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """This worker's scratch for slices like `arr`, reallocated when they change."""
+    key = (arr.shape, arr.dtype)
+    if getattr(_worker_scratch, "key", None) != key:
+        _worker_scratch.arrays = reduction_scratch(arr.shape, arr.dtype)
+        _worker_scratch.key = key
+    arrays: tuple[np.ndarray, np.ndarray] = _worker_scratch.arrays
+    return arrays
+
+
+def resolve_worker_count(threads: Any) -> int:
+    """Turn the processing.threads setting into a worker process count.
+
+    "auto" (or 0/None, which the settings dialog writes for Auto) leaves one
+    core free for the UI. An explicit number is honoured as given but never
+    goes below 1 or above the number of CPUs -- more processes than cores only
+    adds memory and contention.
+
+    Args:
+        threads: Value of processing.threads ("auto" or an int)
+
+    Returns:
+        int: Number of worker processes, at least 1
+    """
+    cpu_count = os.cpu_count() or 1
+    if threads in (None, "auto", 0, "0"):
+        return max(1, cpu_count - 1)
+    try:
+        requested = int(threads)
+    except (TypeError, ValueError):
+        logger.warning(f"Invalid processing.threads value {threads!r}, using auto")
+        return max(1, cpu_count - 1)
+    return max(1, min(requested, cpu_count))
+
+
+def source_filenames(
+    level: int, seq: int, seq_begin: int, seq_end: int, settings_hash: dict[str, Any]
+) -> tuple[str, str | None]:
+    """Name the two source images a task averages together.
+
+    Level 0 reads the originals, whose names follow the scan's own prefix
+    and index width; later levels read the previous level's output, which is
+    always plain six-digit numbering. The second name is None for the final
+    task of an odd-length range -- there is no partner to average with.
+
+    FusedPyramidBuilder and the viewer's readers use the same naming; they
+    must agree or a level reads files that are not there.
+    """
+    if level == 0:
+
+        def original(number: int) -> str:
+            # settings_hash is dict[str, Any], so the concatenation is Any
+            # to mypy even though every part of it is a str.
+            name: str = (
+                settings_hash["prefix"]
+                + str(number).zfill(settings_hash["index_length"])
+                + "."
+                + settings_hash["file_type"]
+            )
+            return name
+
+        filename1 = original(seq)
+        filename2 = original(seq + 1) if seq + 1 <= seq_end else None
+    else:
+        relative_seq = seq - seq_begin
+        filename1 = f"{relative_seq:06}.tif"
+        filename2 = f"{relative_seq + 1:06}.tif" if seq + 1 <= seq_end else None
+
+    return filename1, filename2
+
+
+def reduce_pair(
+    idx: int,
+    file1_path: str,
+    file2_path: str | None,
+    output_path: str,
+    overwrite: bool = False,
+) -> tuple[int, bool]:
+    """Average a slice pair, halve it and save it.
+
+    Does what FusedPyramidBuilder does for one pair, so both build paths write
+    identical files. An output that already exists is not regenerated unless
+    `overwrite` is set. Runs in worker processes, which is why it lives in a
+    module that does not import Qt.
+
+    Args:
+        idx: Task index, handed back so the caller can mark it done
+        file1_path: First source image
+        file2_path: Second source image, or None for the last task of an odd range
+        output_path: Thumbnail to write
+        overwrite: Regenerate the output even if a file is there -- for callers
+            that know from a BuildManifest the file was never completed
+
+    Returns:
+        (idx, was_generated)
+
+    Raises:
+        FileNotFoundError: The first source image is missing
+        OutputWriteError: The thumbnail could not be written
+    """
+    if not overwrite and Path(output_path).exists():
+        return idx, False
+
+    arr1 = safe_load_image(file1_path)
+    if not isinstance(arr1, np.ndarray):
+        raise FileNotFoundError(f"Source image missing: {file1_path}")
+    arr2 = safe_load_image(file2_path) if file2_path and Path(file2_path).exists() else None
+    if not isinstance(arr2, np.ndarray):
+        arr2 = None
+    save_image_atomic(reduce_slices(arr1, arr2, scratch=_scratch_for(arr1)), output_path)
+    return idx, True
+
+
+@dataclass(frozen=True)
+class PyramidProgress:
+    """One progress event from PyramidEngine.
+
+    Attributes:
+        level: Level being built (1 = half size), or 0 in single-pass mode,
+            where every level advances together
+        completed: Outputs accounted for at that level (all levels if level is 0)
+        total: Outputs at that level (all levels if level is 0)
+        generated: Outputs written so far in this build, all levels
+        loaded: Outputs found already on disk so far, all levels
+        work_done: Size-weighted work done, all levels
+        work_total: Size-weighted work in the whole build
+    """
+
+    level: int
+    completed: int
+    total: int
+    generated: int
+    loaded: int
+    work_done: float
+    work_total: float
+
+    @property
+    def fraction(self) -> float:
+        """Share of the whole build done, 0.0 to 1.0."""
+        if self.work_total <= 0:
+            return 1.0
+        return min(1.0, self.work_done / self.work_total)
+
+    @property
+    def percentage(self) -> float:
+        """Share of the whole build done, 0 to 100."""
+        return self.fraction * 100
+
+
+@dataclass
+class PyramidResult:
+    """Outcome of PyramidEngine.build / iter_build.
+
+    Attributes:
+        level_info: One entry per level, Level 0 (the originals) first, in the
+            form ThumbnailGenerator reports: name, width, height, seq_begin, seq_end
+        levels_built: Number of the smallest complete level on disk
+        generated: Outputs written in this build
+        loaded: Outputs that were already on disk
+        cancelled: True if the build was cancelled before finishing
+        elapsed: Wall time of the build, seconds
+        level_seconds: Wall time of each level, level 1 first. Level-by-level
+            mode only; single-pass mode builds every level at once.
+    """
+
+    level_info: list[dict[str, Any]]
+    levels_built: int = 0
+    generated: int = 0
+    loaded: int = 0
+    cancelled: bool = False
+    elapsed: float = 0.0
+    level_seconds: list[float] = field(default_factory=list)
+
+
+class _CancelFlag:
+    """Presents the engine's cancel event as the is_cancelled of a progress dialog."""
+
+    def __init__(self, event: threading.Event):
+        self._event = event
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._event.is_set()
+
+
+class PyramidEngine:
+    """Builds a CT stack's thumbnail pyramid without Qt.
+
+    One engine builds one pyramid at a time; make another for a concurrent
+    build. cancel() may be called from any thread.
+
+    Attributes:
+        workers: Worker count for level-by-level mode
+        use_processes: Run level-by-level tasks on processes instead of threads
+        single_pass: Build with FusedPyramidBuilder instead of level by level
+        max_thumbnail_size: Stop once a level is smaller than this (px)
+        poll_interval: Longest gap between progress events, seconds
+        use_manifest: Record and trust completed outputs in a BuildManifest
+        memory_budget: MemoryBudget the build keeps within
+        level_containers: Pack each finished level into its container
+        result: PyramidResult of the last build, set once iter_build finishes
+    """
+
+    def __init__(
+        self,
+        workers: int = 1,
+        use_processes: bool = False,
+        single_pass: bool = False,
+        max_thumbnail_size: int | None = None,
+        poll_interval: float | None = None,
+        use_manifest: bool = True,
+        memory_budget: MemoryBudget | None = None,
+        level_containers: bool = True,
+    ):
+        """Initialize the engine.
+
+        Args:
+            workers: Worker count for level-by-level mode (see resolve_worker_count)
+            use_processes: Use a process pool for level-by-level mode
+            single_pass: Read each original once and build all levels together
+            max_thumbnail_size: Defaults to MAX_THUMBNAIL_SIZE
+            poll_interval: Defaults to PROGRESS_UPDATE_INTERVAL_MS
+            use_manifest: Keep .thumbnail/manifest.json; False falls back to
+                trusting any output file that exists
+            memory_budget: Bounds tasks in flight, read-ahead and queued
+                writes; defaults to MemoryBudget() (DEFAULT_MEMORY_LIMIT_GB)
+            level_containers: Pack each finished level into a single-file
+                container (core.level_container) after the build. Stale
+                containers are removed whether or not this is set.
+        """
+        from config.constants import MAX_THUMBNAIL_SIZE, PROGRESS_UPDATE_INTERVAL_MS
+
+        self.workers = max(1, workers)
+        self.use_processes = use_processes
+        self.single_pass = single_pass
+        self.max_thumbnail_size = max_thumbnail_size or MAX_THUMBNAIL_SIZE
+        self.poll_interval = (
+            poll_interval if poll_interval is not None else PROGRESS_UPDATE_INTERVAL_MS / 1000
+        )
+        self.use_manifest = use_manifest
+        self.memory_budget = memory_budget or MemoryBudget()
+        self.level_containers = level_containers
+        self.result: PyramidResult | None = None
+
+        self._manifest: BuildManifest | None = None
+        self._cancel_event = threading.Event()
+        self._generated = 0
+        self._loaded = 0
+        self._work_done = 0.0
+        self._work_total = 0.0
+        self._level_seconds: list[float] = []
+        self._bytes_per_pixel = 2
+
+    def cancel(self) -> None:
+        """Ask the running build to stop. Files already written stay."""
+        self._cancel_event.set()
+
+    @property
+    def is_cancelled(self) -> bool:
+        """Whether cancel() has been called for the current build."""
+        return self._cancel_event.is_set()
+
+    def plan(self, settings: dict[str, Any]) -> list[dict[str, Any]]:
+        """Describe the levels a build of `settings` produces, level 1 first.
+
+        Args:
+            settings: image_width, image_height, seq_begin, seq_end
+
+        Returns:
+            One dict per level: level, width, height, seq_begin, seq_end,
+            count (outputs) and weight (progress weight of one output,
+            proportional to its area)
+        """
+        width = int(settings["image_width"])
+        height = int(settings["image_height"])
+        seq_begin = int(settings["seq_begin"])
+        count = int(settings["seq_end"]) - seq_begin + 1
+
+        levels = []
+        for level in range(
+            1, count_pyramid_levels(max(width, height), self.max_thumbnail_size) + 1
+        ):
+            width //= 2
+            height //= 2
+            count = (count + 1) // 2
+            levels.append(
+                {
+                    "level": level,
+                    "width": width,
+                    "height": height,
+                    "seq_begin": seq_begin,
+                    "seq_end": seq_begin + count - 1,
+                    "count": count,
+                    "weight": 0.25**level,
+                }
+            )
+        return levels
+
+    def build(
+        self,
+        directory: str,
+        settings: dict[str, Any],
+        progress_callback: Callable[[PyramidProgress], None] | None = None,
+        cancel_check: Callable[[], bool] | None = None,
+    ) -> PyramidResult:
+        """Build the pyramid, reporting through callbacks.
+
+        Args:
+            directory: Directory holding the original slices
+            settings: image_width, image_height, seq_begin, seq_end, prefix,
+                index_length, file_type
+            progress_callback: Called with every progress event
+            cancel_check: Polled with every progress event; True cancels
+
+        Returns:
+            PyramidResult
+        """
+        for progress in self.iter_build(directory, settings):
+            if progress_callback is not None:
+                progress_callback(progress)
+            if cancel_check is not None and cancel_check():
+                self.cancel()
+        return self.result  # type: ignore[return-value]
+
+    def iter_build(self, directory: str, settings: dict[str, Any]) -> Iterator[PyramidProgress]:
+        """Build the pyramid, yielding progress as it goes.
+
+        Yields at least every poll_interval while work is running, so a caller
+        on a UI thread can keep its event loop turning between events. When
+        the iterator is exhausted self.result holds the outcome.
+
+        Args:
+            directory: Directory holding the original slices
+            settings: As build()
+
+        Yields:
+            PyramidProgress
+
+        Raises:
+            FileNotFoundError: Single-pass mode only -- an original slice is
+                missing. Level-by-level mode logs the failed task and goes on.
+            OutputWriteError: A thumbnail could not be written, in either mode
+        """
+        start_time = time.time()
+        self._cancel_event.clear()
+        self._generated = self._loaded = 0
+        self._work_done = 0.0
+        self._level_seconds = []
+
+        levels = self.plan(settings)
+        self._work_total = sum(entry["count"] * entry["weight"] for entry in levels)
+        self.result = PyramidResult(
+            level_info=[
+                {
+                    "name": "Level 0",
+                    "width": int(settings["image_width"]),
+                    "height": int(settings["image_height"]),
+                    "seq_begin": settings["seq_begin"],
+                    "seq_end": settings["seq_end"],
+                }
+            ]
+        )
+
+        mode = (
+            "single pass" if self.single_pass else "processes" if self.use_processes else "threads"
+        )
+        self._bytes_per_pixel = self._probe_bytes_per_pixel(directory, settings)
+        logger.info(
+            f"Pyramid build: {len(levels)} levels, mode={mode}, workers={self.workers}, "
+            f"{self.memory_budget}, directory={directory}"
+        )
+
+        self._manifest = (
+            open_manifest(
+                directory, settings, levels, self.max_thumbnail_size, self._bytes_per_pixel
+            )
+            if self.use_manifest
+            else None
+        )
+        try:
+            if self.single_pass:
+                yield from self._iter_single_pass(directory, settings, levels)
+            else:
+                yield from self._iter_per_level(directory, settings, levels)
+        finally:
+            if self._manifest is not None:
+                self._manifest.save()
+
+        # A cancel while packing leaves the pyramid itself complete
+        cancelled = self.is_cancelled
+        if self.level_containers and not cancelled:
+            yield from self._iter_pack(directory, levels)
+        if not cancelled:
+            write_pyramid_index(directory, int(settings["seq_begin"]))
+
+        self.result.generated = self._generated
+        self.result.loaded = self._loaded
+        self.result.cancelled = cancelled
+        self.result.elapsed = time.time() - start_time
+        self.result.level_seconds = self._level_seconds
+
+        logger.info(
+            f"Pyramid build {'cancelled' if self.result.cancelled else 'complete'} in "
+            f"{self.result.elapsed:.1f}s: generated {self._generated}, "
+            f"already on disk {self._loaded}"
+        )
+
+    @staticmethod
+    def _probe_bytes_per_pixel(directory: str, settings: dict[str, Any]) -> int:
+        """Bytes per pixel of the stack, from the first slice's header; 2 if unreadable."""
+        first = FusedPyramidBuilder._source_path(directory, settings, int(settings["seq_begin"]))
+        pixels = int(settings["image_width"]) * int(settings["image_height"])
+        slice_bytes = estimate_slice_bytes(first)
+        return max(1, slice_bytes // pixels) if slice_bytes and pixels else 2
+
+    def _make_executor(self) -> Executor:
+        if self.use_processes:
+            # spawn rather than fork: forking a process that has Qt running is not safe
+            return ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return ThreadPoolExecutor(max_workers=self.workers)
+
+    def _iter_per_level(
+        self, directory: str, settings: dict[str, Any], levels: list[dict[str, Any]]
+    ) -> Iterator[PyramidProgress]:
+        """Build one level at a time, each from the files of the one below."""
+        executor = self._make_executor()
+        try:
+            seq_begin = int(settings["seq_begin"])
+            seq_end = int(settings["seq_end"])
+            for entry in levels:
+                level_start = time.time()
+                level = entry["level"]
+                from_dir = (
+                    Path(directory)
+                    if level == 1
+                    else Path(directory) / ".thumbnail" / str(level - 1)
+                )
+                to_dir = Path(directory) / ".thumbnail" / str(level)
+                to_dir.mkdir(parents=True, exist_ok=True)
+
+                todo = self._level_tasks(entry, from_dir, to_dir, seq_begin, seq_end, settings)
+                if todo:
+                    remove_level(to_dir.parent, level)
+                completed = entry["count"] - len(todo)
+                in_flight = self._level_in_flight(entry)
+                pending: set[Future] = set()
+
+                while todo or pending:
+                    # Only as many tasks as the memory budget allows are handed
+                    # to the executor; the rest wait here as plain arguments.
+                    while todo and len(pending) < in_flight:
+                        pending.add(
+                            executor.submit(
+                                reduce_pair, *todo.popleft(), overwrite=self._manifest is not None
+                            )
+                        )
+                    if self.is_cancelled:
+                        for future in pending:
+                            future.cancel()
+                        logger.info(
+                            f"Level {level}: cancelled, {len(pending) + len(todo)} tasks not run"
+                        )
+                        return
+                    done, pending = wait(
+                        pending, timeout=self.poll_interval, return_when=FIRST_COMPLETED
+                    )
+                    for future in done:
+                        self._collect(future, entry)
+                    completed += len(done)
+                    if self._manifest is not None:
+                        self._manifest.save_if_due()
+                    yield self._snapshot(level, completed, entry["count"])
+
+                self._level_seconds.append(time.time() - level_start)
+                logger.info(
+                    f"Level {level}: {entry['count']} outputs in {self._level_seconds[-1]:.2f}s"
+                )
+                self._complete_level(entry)
+                seq_end = entry["seq_end"]
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _level_tasks(
+        self,
+        entry: dict[str, Any],
+        from_dir: Path,
+        to_dir: Path,
+        seq_begin: int,
+        seq_end: int,
+        settings: dict[str, Any],
+    ) -> deque[tuple[int, str, str | None, str]]:
+        """reduce_pair arguments for each output of a level not yet done.
+
+        Outputs the manifest records as done are counted here instead.
+        """
+        level = entry["level"]
+        todo: deque[tuple[int, str, str | None, str]] = deque()
+        for idx in range(entry["count"]):
+            if self._manifest is not None and self._manifest.is_done(level, idx):
+                self._count_output(False, entry["weight"])
+                continue
+            filename1, filename2 = source_filenames(
+                level - 1, seq_begin + idx * 2, seq_begin, seq_end, settings
+            )
+            todo.append(
+                (
+                    idx,
+                    str(from_dir / filename1),
+                    str(from_dir / filename2) if filename2 else None,
+                    str(to_dir / f"{idx:06}.tif"),
+                )
+            )
+        return todo
+
+    def _level_in_flight(self, entry: dict[str, Any]) -> int:
+        """Tasks of a level that may run at once within the memory budget."""
+        task_bytes = reduce_task_bytes(
+            entry["width"] * 2, entry["height"] * 2, self._bytes_per_pixel
+        )
+        in_flight = self.memory_budget.max_in_flight(task_bytes, self.workers)
+        if in_flight < self.workers:
+            logger.info(
+                f"Level {entry['level']}: {in_flight} of {self.workers} workers busy at once, "
+                f"{task_bytes / (1024 * 1024):.0f} MB per task within {self.memory_budget}"
+            )
+        return in_flight
+
+    def _collect(self, future: Future, entry: dict[str, Any]) -> None:
+        """Account for one finished level-by-level task."""
+        try:
+            idx, was_generated = future.result()
+        except OutputWriteError:
+            # Not one bad slice but a full disk or a lost share: every task
+            # after it would fail the same way, so stop the build and say so.
+            raise
+        except (OSError, ValueError, MemoryError, ImageLoadError):
+            # Same policy as FusedPyramidBuilder: log it, count it, carry on --
+            # but leave it out of the manifest, so the next build retries it.
+            logger.error(
+                "Thumbnail task failed",
+                exc_info=True,
+                extra={"extra_fields": {"error_type": "pyramid_task_error"}},
+            )
+            was_generated = True
+        else:
+            if self._manifest is not None:
+                self._manifest.mark_done(entry["level"], idx)
+
+        self._count_output(was_generated, entry["weight"])
+
+    def _count_output(self, was_generated: bool, weight: float) -> None:
+        """Count one output as generated or already on disk."""
+        if was_generated:
+            self._generated += 1
+        else:
+            self._loaded += 1
+        self._work_done += weight
+
+    def _iter_single_pass(
+        self, directory: str, settings: dict[str, Any], levels: list[dict[str, Any]]
+    ) -> Iterator[PyramidProgress]:
+        """Build every level from one read of the originals, on a background thread."""
+        for entry in levels:
+            if not self._level_done(entry):
+                remove_level(Path(directory) / ".thumbnail", entry["level"])
+        builder = FusedPyramidBuilder(
+            _CancelFlag(self._cancel_event),
+            None,
+            [entry["weight"] for entry in levels],
+            manifest=self._manifest,
+            memory_budget=self.memory_budget,
+        )
+        total = sum(entry["count"] for entry in levels)
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(
+                builder.build,
+                directory,
+                settings,
+                int(settings["seq_begin"]),
+                int(settings["seq_end"]),
+                len(levels),
+            )
+            while True:
+                wait([future], timeout=self.poll_interval)
+                self._generated = builder.generated_count
+                self._loaded = builder.loaded_count
+                self._work_done = builder.global_step_counter
+                if future.done():
+                    break
+                if self._manifest is not None:
+                    self._manifest.save_if_due()
+                yield self._snapshot(0, builder.completed_tasks, total)
+
+            # Re-raises whatever stopped the build
+            future.result()
+
+        if not self.is_cancelled:
+            for entry in levels:
+                self._complete_level(entry)
+        yield self._snapshot(0, builder.completed_tasks, total)
+
+    def _level_done(self, entry: dict[str, Any]) -> bool:
+        """Whether the manifest vouches for every output of a level."""
+        if self._manifest is None:
+            return False
+        return all(self._manifest.is_done(entry["level"], idx) for idx in range(entry["count"]))
+
+    def _iter_pack(self, directory: str, levels: list[dict[str, Any]]) -> Iterator[PyramidProgress]:
+        """Pack the levels that have no container yet, yielding while it runs.
+
+        A level that cannot be packed keeps its files and no container, which
+        readers handle as before; it does not fail the build.
+        """
+        thumbnail_base = Path(directory) / ".thumbnail"
+        missing = [
+            entry for entry in levels if not container_path(thumbnail_base, entry["level"]).exists()
+        ]
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="level-packer") as executor:
+            for packed, entry in enumerate(missing):
+                future = executor.submit(
+                    pack_level,
+                    thumbnail_base / str(entry["level"]),
+                    entry["count"],
+                    self._cancel_event.is_set,
+                )
+                while not future.done():
+                    wait([future], timeout=self.poll_interval)
+                    yield self._snapshot(entry["level"], packed, len(missing))
+                if self.is_cancelled:
+                    logger.info("Packing level containers cancelled")
+                    return
+
+    def _complete_level(self, entry: dict[str, Any]) -> None:
+        """Record a finished level in the result."""
+        self.result.levels_built = entry["level"]  # type: ignore[union-attr]
+        self.result.level_info.append(  # type: ignore[union-attr]
+            {
+                "name": f"Level {entry['level']}",
+                "width": entry["width"],
+                "height": entry["height"],
+                "seq_begin": entry["seq_begin"],
+                "seq_end": entry["seq_end"],
+            }
+        )
+
+    def _snapshot(self, level: int, completed: int, total: int) -> PyramidProgress:
+        return PyramidProgress(
+            level=level,
+            completed=completed,
+            total=total,
+            generated=self._generated,
+            loaded=self._loaded,
+            work_done=self._work_done,
+            work_total=self._work_total,
+        )
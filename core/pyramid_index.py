@@ -0,0 +1,192 @@
+"""Index of a built pyramid, written when the build finishes.
+
+Readers used to work a pyramid out from its files: list each level directory,
+open its first slice for the size, and each did so its own way. The index,
+.thumbnail/index.json, records what they need for every level -- size, slice
+count, dtype, sequence range, and value statistics sampled from its slices --
+so reopening a dataset reads one small file.
+
+It is written by PyramidEngine at the end of every build that was not
+cancelled, and by ThumbnailGenerator once the Rust module has built a
+pyramid. Like the level containers, it is removed before any level is
+rewritten, and each level records its directory's mtime, so an index that
+exists describes the files beside it. Readers go through find_levels, which
+falls back on listing the levels (core.directory_index.level_summaries) for
+pyramids built before there was an index.
+
+Typical usage example:
+
+    for level, path, count, width, height in find_levels(directory, 20):
+        ...
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from PIL import Image
+
+from core.directory_index import LevelSummary, level_summaries
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = "index.json"
+INDEX_VERSION = 1
+
+
+def index_path(directory: str | Path) -> Path:
+    """Where the index of the pyramid of `directory` lives."""
+    return Path(directory) / ".thumbnail" / INDEX_FILENAME
+
+
+def _level_statistics(level_dir: Path, count: int) -> tuple[str, dict[str, Any]]:
+    """dtype and value statistics of a level, from slices spread through it.
+
+    Raises:
+        OSError: A sampled slice could not be read
+    """
+    from config.constants import PYRAMID_INDEX_SAMPLE_SLICES
+
+    picks = np.unique(np.linspace(0, count - 1, min(count, PYRAMID_INDEX_SAMPLE_SLICES), dtype=int))
+    lowest = highest = None
+    total = 0.0
+    pixels = 0
+    dtype = ""
+    for idx in picks:
+        with Image.open(level_dir / f"{idx:06}.tif") as img:
+            arr = np.asarray(img)
+        dtype = str(arr.dtype)
+        lo, hi = arr.min().item(), arr.max().item()
+        lowest = lo if lowest is None else min(lowest, lo)
+        highest = hi if highest is None else max(highest, hi)
+        total += float(arr.sum(dtype=np.float64))
+        pixels += arr.size
+    stats = {
+        "min": lowest,
+        "max": highest,
+        "mean": round(total / pixels, 3) if pixels else None,
+        "sampled_slices": len(picks),
+    }
+    return dtype, stats
+
+
+def write_pyramid_index(directory: str | Path, seq_begin: int = 0) -> dict[str, Any] | None:
+    """Record the pyramid now on disk in .thumbnail/index.json.
+
+    Levels are taken from the disk rather than from the build's plan, so the
+    index is the same whichever builder made them; an empty level ends the
+    pyramid. Failing to write it costs readers a listing, so it is logged and
+    otherwise ignored.
+
+    Args:
+        directory: Dataset directory, holding .thumbnail
+        seq_begin: Number of the first original slice, from which each
+            level's sequence range is counted
+
+    Returns:
+        dict: What was written, or None if nothing was
+    """
+    from config.constants import MAX_THUMBNAIL_LEVELS
+
+    path = index_path(directory)
+    levels = []
+    try:
+        for summary in level_summaries(directory, MAX_THUMBNAIL_LEVELS):
+            if not summary.count:
+                break
+            level_dir = Path(summary.path)
+            dtype, stats = _level_statistics(level_dir, summary.count)
+            levels.append(
+                {
+                    "level": summary.level,
+                    "width": summary.width,
+                    "height": summary.height,
+                    "count": summary.count,
+                    "dtype": dtype,
+                    "seq_begin": seq_begin,
+                    "seq_end": seq_begin + summary.count - 1,
+                    "stats": stats,
+                    "mtime_ns": level_dir.stat().st_mtime_ns,
+                }
+            )
+        if not levels:
+            return None
+
+        data = {"version": INDEX_VERSION, "levels": levels}
+        tmp_path = path.with_name(path.name + ".tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1)
+        tmp_path.replace(path)
+    except OSError:
+        logger.warning(f"Could not write pyramid index {path}", exc_info=True)
+        path.with_name(path.name + ".tmp").unlink(missing_ok=True)
+        return None
+
+    logger.info(f"Wrote pyramid index {path}: {len(levels)} levels")
+    return data
+
+
+def read_pyramid_index(directory: str | Path) -> list[dict[str, Any]] | None:
+    """The levels recorded in the index, if it still describes the files.
+
+    Returns:
+        list: One dict per level, level 1 first, as written by
+        write_pyramid_index; None when there is no index, it is unreadable,
+        or a level directory has changed or gone since it was written
+    """
+    path = index_path(directory)
+    try:
+        with path.open(encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError):
+        logger.warning(f"Unreadable pyramid index {path}, listing the levels", exc_info=True)
+        return None
+
+    if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+        return None
+    levels = data.get("levels") or []
+    try:
+        for entry in levels:
+            level_dir = path.parent / str(entry["level"])
+            if level_dir.stat().st_mtime_ns != entry["mtime_ns"]:
+                logger.info(f"Pyramid index is older than {level_dir}, listing the levels")
+                return None
+    except (OSError, KeyError, TypeError):
+        logger.info(f"Pyramid index {path} does not match the levels, listing them")
+        return None
+    return levels or None
+
+
+def remove_pyramid_index(thumbnail_base: str | Path) -> None:
+    """Remove the index, before any level is rewritten."""
+    (Path(thumbnail_base) / INDEX_FILENAME).unlink(missing_ok=True)
+
+
+def find_levels(directory: str | Path, max_levels: int) -> list[LevelSummary]:
+    """The levels of a dataset's pyramid, from its index if it has one.
+
+    Args:
+        directory: Dataset directory, holding .thumbnail
+        max_levels: Levels to look for at most when there is no index
+
+    Returns:
+        list: LevelSummary per level, level 1 first
+    """
+    levels = read_pyramid_index(directory)
+    if levels is None:
+        return level_summaries(directory, max_levels)
+    thumbnail_base = Path(directory) / ".thumbnail"
+    return [
+        LevelSummary(
+            entry["level"],
+            str(thumbnail_base / str(entry["level"])),
+            entry["count"],
+            entry["width"],
+            entry["height"],
+        )
+        for entry in levels
+    ]
@@ -0,0 +1,309 @@
+"""Marching cubes over z-slabs of a volume, in worker processes.
+
+mcubes.marching_cubes runs on one core, which made meshing a large ROI for
+export take as long on a workstation as on a laptop. A cube only reads the
+eight voxels at its corners, so the volume can be cut into slabs along axis 0
+that share one plane of voxels -- slab i covers planes b_i..b_(i+1) -- and each
+slab meshed on its own. Every cube belongs to exactly one slab, so the slabs'
+triangles together are the single-shot mesh's triangles.
+
+What differs is the vertices on the shared planes: a surface crossing the
+plane between two voxels gets a vertex from the slab below and another from
+the slab above. SlabStitcher welds them by the grid edge they lie on, which
+mesh_slab reports for the vertices in a slab's first and last plane. Not by
+position: the two slabs interpolate the same two voxels, but not always from
+the same end, so the coordinates can differ in the last bit; and where a
+voxel equals the isovalue exactly, marching cubes puts a vertex at that voxel
+for each edge through it, several vertices at one position. The stitched
+mesh is watertight across the seams and has the single-shot mesh's vertices
+and triangles, at coordinates equal to within that last bit.
+
+Typical usage example:
+
+    depth, workers = plan_slabs(shape, workers, budget_bytes)
+    mesh = marching_cubes_streamed(planes, isovalue, depth, workers)
+
+    stitcher = SlabStitcher()
+    for z0, z1 in slab_bounds(len(volume), count):
+        stitcher.add(mesh_slab(volume[z0 : z1 + 1], isovalue, z0))
+    vertices, triangles = stitcher.result()
+"""
+
+import logging
+import multiprocessing
+import time
+from collections import deque
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import NamedTuple
+
+import mcubes
+import numpy as np
+
+from config.constants import SLAB_MESH_MIN_DEPTH, SLAB_MESH_MIN_VOXELS
+
+logger = logging.getLogger(__name__)
+
+# Bytes mesh_slab allocates per voxel of a uint8 slab, besides the mesh: the
+# mask of voxels at the isovalue and the int16 copy they are lowered in
+SLAB_WORK_BYTES = 3
+
+
+class SlabMesh(NamedTuple):
+    """Mesh of the slab covering planes z0..z1, in the volume's coordinates.
+
+    bottom and top index the vertices lying on grid edges within plane z0
+    and plane z1; bottom_edges and top_edges identify those edges as
+    (axis, row, column) rows, axis being 1 or 2.
+    """
+
+    vertices: np.ndarray
+    triangles: np.ndarray
+    z0: int
+    z1: int
+    bottom: np.ndarray
+    bottom_edges: np.ndarray
+    top: np.ndarray
+    top_edges: np.ndarray
+
+
+def slab_bounds(depth: int, count: int) -> list[tuple[int, int]]:
+    """First and last plane of each of `count` slabs covering `depth` planes.
+
+    Consecutive slabs share their boundary plane. Fewer slabs are returned
+    when there are not enough planes for `count` of at least one cube each.
+    """
+    count = max(1, min(count, depth - 1))
+    edges = np.unique(np.linspace(0, depth - 1, count + 1).round().astype(int))
+    return [(int(z0), int(z1)) for z0, z1 in zip(edges[:-1], edges[1:], strict=True)]
+
+
+def _edges_of(vertices: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Axis along which each vertex lies between voxels, and the lower voxel.
+
+    A vertex off the voxels has exactly one fractional coordinate. One that
+    is on a voxel -- in practice, t rounded to 0 or 1 -- gets axis -1.
+    """
+    lower = np.floor(vertices)
+    between = vertices != lower
+    axis = np.where(between.any(axis=1), between.argmax(axis=1), -1)
+    return axis, lower.astype(np.intp)
+
+
+def _plane_edges(vertices: np.ndarray, plane: int) -> tuple[np.ndarray, np.ndarray]:
+    """Vertices on grid edges within `plane`, and those edges (see SlabMesh)."""
+    on_plane = np.flatnonzero(vertices[:, 0] == plane)
+    axis, lower = _edges_of(vertices[on_plane])
+    return on_plane, np.column_stack([axis, lower[:, 1], lower[:, 2]]).astype(np.int64)
+
+
+def _snap_to_voxels(vertices: np.ndarray, at_iso: np.ndarray) -> None:
+    """Move vertices on an edge from a voxel in `at_iso` onto that voxel."""
+    axis, lower = _edges_of(vertices)
+    between = axis >= 0
+    upper = lower.copy()
+    upper[np.flatnonzero(between), axis[between]] += 1
+    upper = np.minimum(upper, np.array(at_iso.shape) - 1)
+    from_lower = between & at_iso[tuple(lower.T)]
+    from_upper = between & at_iso[tuple(upper.T)]
+    vertices[from_lower] = lower[from_lower]
+    vertices[from_upper] = upper[from_upper]
+
+
+def mesh_slab(slab: np.ndarray, isovalue: float, z0: int) -> SlabMesh:
+    """Marching cubes of one slab, moved to the volume's planes.
+
+    Module-level so worker processes can run it.
+
+    Voxels equal to the isovalue count as outside the surface, and each edge
+    from one to an inside voxel gets a vertex on that voxel. To tell those
+    vertices apart, the slab is meshed with such voxels lowered below the
+    isovalue instead: every cube keeps its case, so the mesh is the same but
+    for those vertices, which now lie inside their edges. They are then put
+    back on their voxel. The lowered copy is of the smallest signed type
+    holding the slab's values (int16 for uint8), which mcubes reads as is.
+
+    Args:
+        slab: Planes z0..z1 of the volume, both ends included
+        isovalue: Surface level
+        z0: Index of the slab's first plane in the volume
+    """
+    at_iso = slab == isovalue
+    if at_iso.any():
+        lowered = slab.astype(np.result_type(slab.dtype, np.int8))
+        lowered[at_iso] = isovalue - max(float(slab.max()) - isovalue, 1.0)
+        vertices, triangles = mcubes.marching_cubes(lowered, isovalue)
+        on_edges = vertices.copy()
+        _snap_to_voxels(vertices, at_iso)
+    else:
+        vertices, triangles = mcubes.marching_cubes(slab, isovalue)
+        on_edges = vertices
+
+    last = slab.shape[0] - 1
+    bottom, bottom_edges = _plane_edges(on_edges, 0)
+    top, top_edges = _plane_edges(on_edges, last)
+    vertices[:, 0] += z0
+    return SlabMesh(vertices, triangles, z0, z0 + last, bottom, bottom_edges, top, top_edges)
+
+
+def _match_rows(reference: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """Index of the row of `reference` equal to each row of `query`, or -1.
+
+    Rows of `reference` are taken to be unique.
+    """
+    combined = np.concatenate([reference, query])
+    inverse = np.unique(combined, axis=0, return_inverse=True)[1].reshape(-1)
+    index = np.full(int(inverse.max()) + 1, -1)
+    index[inverse[: len(reference)]] = np.arange(len(reference))
+    return index[inverse[len(reference) :]]
+
+
+class SlabStitcher:
+    """Joins slab meshes, added bottom to top, into one mesh.
+
+    Only the previous slab's vertices on its top plane are kept for welding,
+    so slabs can be meshed and added one at a time as they are read.
+    """
+
+    def __init__(self):
+        self._vertices: list[np.ndarray] = []
+        self._triangles: list[np.ndarray] = []
+        self._count = 0
+        self._seam_z: int | None = None
+        self._seam_edges = np.empty((0, 3), dtype=np.int64)
+        self._seam_indices = np.empty(0, dtype=np.int64)
+
+    def add(self, mesh: SlabMesh) -> None:
+        """Append `mesh`, welding it to the previous slab if they share a plane."""
+        remap = np.empty(len(mesh.vertices), dtype=np.int64)
+        welded = np.zeros(len(mesh.vertices), dtype=bool)
+        if mesh.z0 == self._seam_z and len(self._seam_edges) and len(mesh.bottom):
+            match = _match_rows(self._seam_edges, mesh.bottom_edges)
+            hit = match >= 0
+            welded[mesh.bottom[hit]] = True
+            remap[mesh.bottom[hit]] = self._seam_indices[match[hit]]
+
+        kept = ~welded
+        remap[kept] = self._count + np.arange(np.count_nonzero(kept))
+        self._vertices.append(mesh.vertices[kept])
+        self._triangles.append(remap[mesh.triangles])
+
+        self._seam_z = mesh.z1
+        self._seam_edges = mesh.top_edges
+        self._seam_indices = remap[mesh.top]
+        self._count += np.count_nonzero(kept)
+
+    def result(self) -> tuple[np.ndarray, np.ndarray]:
+        """The stitched (N, 3) float64 vertices and (M, 3) uint64 triangles."""
+        if not self._vertices:
+            return np.empty((0, 3)), np.empty((0, 3), dtype=np.uint64)
+        vertices = np.concatenate(self._vertices).astype(np.float64, copy=False)
+        triangles = np.concatenate(self._triangles).astype(np.uint64, copy=False)
+        return vertices, triangles
+
+
+def _slab_executor(workers: int) -> ProcessPoolExecutor:
+    # spawn rather than fork: forking a process that has Qt running is not safe
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def plan_slabs(shape: tuple[int, int, int], workers: int, budget_bytes: int) -> tuple[int, int]:
+    """Slab depth and worker count for marching_cubes_streamed.
+
+    Each slab in flight is held twice -- by this process until its worker
+    is done, and by the worker -- and one more is being filled: 2 * workers
+    + 1 slabs of one byte per voxel. Each worker also allocates
+    SLAB_WORK_BYTES per voxel of its slab to mesh it. A slab of depth cubes
+    has depth + 1 planes. Slabs are no deeper than an even split between the
+    workers, so they all get one, and no shallower than SLAB_MESH_MIN_DEPTH.
+    Volumes below SLAB_MESH_MIN_VOXELS get one worker, which means meshing
+    in this process: starting worker processes would cost more than meshing.
+
+    Args:
+        shape: (planes, height, width) of the volume, one byte per voxel
+        workers: Worker processes available
+        budget_bytes: Memory for slabs
+
+    Returns:
+        tuple: (cubes per slab, the slab_depth of marching_cubes_streamed;
+        workers to use)
+    """
+    depth, height, width = shape
+    if depth * height * width < SLAB_MESH_MIN_VOXELS:
+        workers = 1
+    plane_bytes = max(1, height * width) * (2 * workers + 1 + workers * SLAB_WORK_BYTES)
+    fits = budget_bytes // plane_bytes - 1
+    shared = -(-(depth - 1) // workers)
+    return max(SLAB_MESH_MIN_DEPTH, min(fits, shared)), workers
+
+
+def marching_cubes_streamed(
+    planes: Iterable[np.ndarray],
+    isovalue: float,
+    slab_depth: int,
+    workers: int = 1,
+    cancelled: Callable[[], bool] | None = None,
+) -> tuple[np.ndarray, np.ndarray] | None:
+    """Marching cubes of a volume read one plane at a time.
+
+    Planes are gathered into slabs of `slab_depth` cubes, each meshed as it
+    fills -- by up to `workers` processes at once, or here for one -- and
+    stitched in order. Only the slabs being filled and meshed are held, so
+    the volume never is.
+
+    Args:
+        planes: The volume's planes along axis 0, in order, all of one shape
+        isovalue: Surface level
+        slab_depth: Cubes per slab (see plan_slabs)
+        workers: Worker processes
+        cancelled: Polled between planes; meshing stops once it returns True
+
+    Returns:
+        tuple: The stitched (N, 3) float64 vertices and (M, 3) uint64
+        triangles, as from SlabStitcher.result; None if cancelled
+    """
+    stitcher = SlabStitcher()
+    executor = _slab_executor(workers) if workers > 1 else None
+    pending: deque[Future] = deque()
+
+    def mesh(slab, z0):
+        if executor is None:
+            stitcher.add(mesh_slab(slab, isovalue, z0))
+            return
+        pending.append(executor.submit(mesh_slab, slab, isovalue, z0))
+        while len(pending) > workers:
+            stitcher.add(pending.popleft().result())
+
+    started = time.perf_counter()
+    slab = None
+    filled = z0 = 0
+    try:
+        for plane in planes:
+            if cancelled is not None and cancelled():
+                return None
+            if slab is None:
+                slab = np.empty((slab_depth + 1, *plane.shape), dtype=plane.dtype)
+            slab[filled] = plane
+            filled += 1
+            if filled == len(slab):
+                # A new array for the next slab: a worker may not have read this one yet
+                mesh(slab, z0)
+                last = slab[-1]
+                slab = np.empty_like(slab)
+                slab[0] = last
+                filled = 1
+                z0 += slab_depth
+        if slab is not None and filled > 1:
+            mesh(slab[:filled], z0)
+        while pending:
+            stitcher.add(pending.popleft().result())
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    vertices, triangles = stitcher.result()
+    logger.info(
+        f"Streamed marching cubes: {len(vertices)} vertices, {len(triangles)} triangles "
+        f"in {time.perf_counter() - started:.2f}s"
+    )
+    return vertices, triangles
@@ -0,0 +1,336 @@
+"""Decoded-slice cache and read-ahead for the 2D viewer.
+
+Each stop of the slider used to decode its slice from disk, however recently
+it had been shown, so scrubbing a 2,000-slice original level stuttered on
+every frame. SliceCache keeps decoded slices, keyed by (level, index), in
+least-recently-used order up to a byte limit that all levels share. Going
+back to a slice is then a lookup.
+
+Going forward is what DirectionalPrefetcher is for: after each slice is
+shown, it decodes the next few in the direction the slider is moving, on
+background threads, into the same cache. A new position supersedes the
+requests of the last one, so a fast drag does not leave a queue of slices
+nobody will look at.
+
+Slices are cached as numpy arrays rather than QPixmaps, because a QPixmap
+may only be made on the GUI thread. Only 2D 8- and 16-bit slices are
+cached; anything else (see load_display_slice) is left to QPixmap as before.
+
+Typical usage example:
+
+    cache = SliceCache(slice_cache_bytes(memory_limit_gb))
+    prefetcher = DirectionalPrefetcher(cache)
+    arr = cache.get((level, idx))
+    prefetcher.prefetch(level, idx, direction, last_idx, load)
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import numpy as np
+from PIL import Image
+
+from core.memory_budget import resolve_memory_limit
+
+logger = logging.getLogger(__name__)
+
+SliceKey = tuple[int, int]
+
+
+def slice_cache_bytes(memory_limit_gb: Any = None) -> int:
+    """The viewer's share of processing.memory_limit_gb, in bytes.
+
+    Args:
+        memory_limit_gb: Value of processing.memory_limit_gb; None for the default
+
+    Returns:
+        int: SLICE_CACHE_MEMORY_SHARE of the limit
+    """
+    from config.constants import SLICE_CACHE_MEMORY_SHARE
+
+    return int(resolve_memory_limit(memory_limit_gb) * SLICE_CACHE_MEMORY_SHARE * 1024**3)
+
+
+def load_display_slice(path: str) -> np.ndarray | None:
+    """Decode a slice for the viewer, if it can be shown from an array.
+
+    Like ObjectViewer2D.set_image, a path whose extension is not found is
+    tried again in lower case.
+
+    Returns:
+        2D uint8 or uint16 array; None if the file is missing, unreadable,
+        or in another format (colour, 32-bit, float), which is then shown
+        through QPixmap as before
+    """
+    actual = Path(path)
+    if not actual.exists():
+        actual = actual.with_suffix(actual.suffix.lower())
+    try:
+        with Image.open(actual) as img:
+            arr = np.asarray(img)
+    except (OSError, ValueError):
+        return None
+    if arr.ndim != 2 or arr.dtype not in (np.uint8, np.uint16):
+        return None
+    return arr
+
+
+class SliceCache:
+    """Least-recently-used decoded slices, bounded in bytes.
+
+    Thread-safe: the prefetcher fills it from its threads while the viewer
+    reads it from the GUI thread. Cached arrays are made read-only, since
+    every reader shares them.
+
+    Attributes:
+        limit_bytes: Most bytes of slices held at once
+    """
+
+    def __init__(self, limit_bytes: int):
+        self.limit_bytes = limit_bytes
+        self._slices: OrderedDict[SliceKey, np.ndarray] = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._slices)
+
+    def __contains__(self, key: SliceKey) -> bool:
+        with self._lock:
+            return key in self._slices
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes of slices held."""
+        with self._lock:
+            return self._nbytes
+
+    def get(self, key: SliceKey) -> np.ndarray | None:
+        """The slice cached under `key`, now the most recently used; None if absent."""
+        with self._lock:
+            arr = self._slices.get(key)
+            if arr is not None:
+                self._slices.move_to_end(key)
+            return arr
+
+    def put(self, key: SliceKey, arr: np.ndarray) -> None:
+        """Cache `arr`, evicting the least recently used slices to stay in the limit.
+
+        A slice larger than the whole limit is not cached.
+        """
+        if arr.nbytes > self.limit_bytes:
+            return
+        arr.flags.writeable = False
+        with self._lock:
+            old = self._slices.pop(key, None)
+            if old is not None:
+                self._nbytes -= old.nbytes
+            self._slices[key] = arr
+            self._nbytes += arr.nbytes
+            while self._nbytes > self.limit_bytes:
+                _, evicted = self._slices.popitem(last=False)
+                self._nbytes -= evicted.nbytes
+
+    def clear(self) -> None:
+        """Drop every slice, e.g. when the levels are rebuilt."""
+        with self._lock:
+            self._slices.clear()
+            self._nbytes = 0
+
+
+class DirectionalPrefetcher:
+    """Decodes the slices ahead of the viewer into a SliceCache.
+
+    Each call to prefetch() supersedes the previous one: its requests that
+    have not started are cancelled, and any still running finish without
+    caching their result. Load failures are only logged, since the viewer
+    loads the slice itself when it gets there.
+    """
+
+    def __init__(self, cache: SliceCache, threads: int | None = None):
+        """Start the decoder threads.
+
+        Args:
+            cache: Where decoded slices go
+            threads: Decoder threads; defaults to PREFETCH_THREADS
+        """
+        from config.constants import PREFETCH_THREADS
+
+        self.cache = cache
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, threads or PREFETCH_THREADS), thread_name_prefix="viewer-prefetch"
+        )
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._pending: list[Future] = []
+
+    def prefetch(
+        self,
+        level: int,
+        idx: int,
+        direction: int,
+        last_idx: int,
+        load: Callable[[int], np.ndarray | None],
+        count: int | None = None,
+    ) -> list[int]:
+        """Decode the slices after `idx` in `direction`, replacing earlier requests.
+
+        Args:
+            level: Level the slices belong to, for their cache keys
+            idx: Slice now shown
+            direction: +1 or -1, the way the slider is moving
+            last_idx: Highest slice index of the level
+            load: Decodes slice `i` of the level; None if it cannot be cached
+            count: Slices to read ahead; defaults to VIEWER_PREFETCH_SLICES,
+                and is capped so they take at most half the cache
+
+        Returns:
+            list: Indices requested, nearest first
+        """
+        from config.constants import VIEWER_PREFETCH_SLICES
+
+        if count is None:
+            count = VIEWER_PREFETCH_SLICES
+        shown = self.cache.get((level, idx))
+        if shown is not None and shown.nbytes:
+            count = min(count, self.cache.limit_bytes // 2 // shown.nbytes)
+        step = 1 if direction >= 0 else -1
+        wanted = [
+            i
+            for i in (idx + step * k for k in range(1, count + 1))
+            if 0 <= i <= last_idx and (level, i) not in self.cache
+        ]
+
+        with self._lock:
+            self._cancel_locked()
+            generation = self._generation
+            self._pending = [
+                self._executor.submit(self._load, generation, level, i, load) for i in wanted
+            ]
+        return wanted
+
+    def cancel(self) -> None:
+        """Drop every outstanding request, e.g. before the cache is cleared."""
+        with self._lock:
+            self._cancel_locked()
+
+    def _cancel_locked(self) -> None:
+        self._generation += 1
+        for future in self._pending:
+            future.cancel()
+        self._pending = []
+
+    def _load(
+        self, generation: int, level: int, idx: int, load: Callable[[int], np.ndarray | None]
+    ) -> None:
+        if generation != self._generation or (level, idx) in self.cache:
+            return
+        try:
+            arr = load(idx)
+        except Exception:
+            logger.debug(f"Prefetch of slice {idx} of level {level} failed", exc_info=True)
+            return
+        if arr is None:
+            return
+        with self._lock:
+            # Checked under the lock, so nothing lands after cancel() returns
+            if generation == self._generation:
+                self.cache.put((level, idx), arr)
+
+    def close(self) -> None:
+        """Stop the decoder threads; outstanding requests are dropped."""
+        self.cancel()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+class RefineStep(NamedTuple):
+    """One version of the slice being refined: slice `idx` of `level`."""
+
+    level: int
+    idx: int
+    load: Callable[[int], np.ndarray | None]
+
+
+class SliceRefiner:
+    """Decodes ever finer versions of one slice, coarsest first, in the background.
+
+    The viewer paints a coarse level's slice at once and hands the finer
+    ones to refine(). Each is decoded in turn (or taken from the cache) and
+    passed to `on_loaded` from the decoder thread, which must hand it on to
+    the GUI thread itself. A later refine() or cancel() supersedes the
+    request: its remaining steps are skipped and nothing more is reported.
+    """
+
+    def __init__(
+        self,
+        cache: SliceCache,
+        on_loaded: Callable[[int, int, int, np.ndarray | None], None],
+    ):
+        """Start the decoder thread.
+
+        Args:
+            cache: Consulted before decoding, and filled with what is decoded
+            on_loaded: Called as on_loaded(generation, level, idx, arr) for
+                each step; arr is None if the slice could not be decoded
+        """
+        self.cache = cache
+        self._on_loaded = on_loaded
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slice-refine")
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._pending: Future | None = None
+
+    @property
+    def generation(self) -> int:
+        """Number of the current request; results of earlier ones are stale."""
+        return self._generation
+
+    def refine(self, steps: list[RefineStep]) -> int:
+        """Replace the current request with `steps`, to be run in order.
+
+        Returns:
+            int: The request's generation, as passed to on_loaded
+        """
+        with self._lock:
+            self._cancel_locked()
+            generation = self._generation
+            self._pending = self._executor.submit(self._run, generation, steps)
+        return generation
+
+    def cancel(self) -> None:
+        """Drop the current request, e.g. when the slider moves on."""
+        with self._lock:
+            self._cancel_locked()
+
+    def _cancel_locked(self) -> None:
+        self._generation += 1
+        if self._pending is not None:
+            self._pending.cancel()
+            self._pending = None
+
+    def _run(self, generation: int, steps: list[RefineStep]) -> None:
+        for level, idx, load in steps:
+            if generation != self._generation:
+                return
+            arr = self.cache.get((level, idx))
+            if arr is None:
+                try:
+                    arr = load(idx)
+                except Exception:
+                    logger.warning(f"Could not decode slice {idx} of level {level}", exc_info=True)
+                    arr = None
+                if arr is not None:
+                    self.cache.put((level, idx), arr)
+            if generation == self._generation:
+                self._on_loaded(generation, level, idx, arr)
+
+    def close(self) -> None:
+        """Stop the decoder thread; the current request is dropped."""
+        self.cancel()
+        self._executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,184 @@
+"""Read-ahead decoding of source slices for sequential thumbnail builders.
+
+FusedPyramidBuilder consumes slices strictly in order on one thread: load,
+load, average, write, repeat. The disk sits idle while the CPU works and the
+CPU sits idle while the disk seeks -- on a spinning disk or a network share,
+mostly the latter. SlicePrefetcher decodes the next few
+slices of a known read order on background threads, so by the time the
+consumer asks for a slice it is usually already in memory.
+
+The consumer stays single and deterministic: slices are handed over in the
+order given, one at a time, exactly as if it had loaded them itself. Only the
+decoding moves. How far ahead it reads is bounded by a memory budget, since
+every slice in the window is a decoded full-resolution image.
+
+Typical usage example:
+
+    with SlicePrefetcher(paths, window=window_for_budget(slice_bytes)) as prefetcher:
+        for path in paths:
+            arr = prefetcher.take(path)
+"""
+
+import logging
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from PIL import Image
+
+from utils.image_utils import safe_load_image
+
+logger = logging.getLogger(__name__)
+
+# Bytes per pixel of the PIL modes CT stacks come in; anything else counts as 4.
+_MODE_BYTES = {"1": 1, "L": 1, "P": 1, "I;16": 2, "I;16B": 2, "I;16L": 2, "RGB": 3}
+
+
+def estimate_slice_bytes(path: str) -> int:
+    """Decoded size of the image at `path`, from its header alone.
+
+    Returns:
+        int: Estimated bytes once decoded, or 0 if the header cannot be read
+    """
+    try:
+        with Image.open(path) as img:
+            width, height = img.size
+            mode = img.mode
+    except OSError:
+        return 0
+    return width * height * _MODE_BYTES.get(mode, 4)
+
+
+def window_for_budget(
+    slice_bytes: int, budget_mb: float | None = None, max_slices: int | None = None
+) -> int:
+    """How many slices to decode ahead within a memory budget.
+
+    Args:
+        slice_bytes: Decoded size of one slice (see estimate_slice_bytes)
+        budget_mb: Memory allowed for slices read ahead; defaults to
+            PREFETCH_MEMORY_BUDGET_MB
+        max_slices: Upper bound however small the slices; defaults to
+            PREFETCH_MAX_SLICES
+
+    Returns:
+        int: Window size, at least 1 -- one slice ahead is always allowed,
+        since the consumer is about to hold it anyway
+    """
+    from config.constants import PREFETCH_MAX_SLICES, PREFETCH_MEMORY_BUDGET_MB
+
+    if budget_mb is None:
+        budget_mb = PREFETCH_MEMORY_BUDGET_MB
+    if max_slices is None:
+        max_slices = PREFETCH_MAX_SLICES
+    if slice_bytes <= 0:
+        return 1
+    return max(1, min(max_slices, int(budget_mb * 1024 * 1024) // slice_bytes))
+
+
+class SlicePrefetcher:
+    """Decodes an ordered list of slices ahead of a single consumer.
+
+    At most `window` slices are decoded or waiting at any time. take() hands
+    them over in order; asking for a path further along discards the ones in
+    between, and asking for one that is not next (or not in the list at all)
+    simply loads it on the spot, so a wrong guess costs speed, never
+    correctness.
+
+    Use as a context manager, or call close(), so the decoder threads stop.
+
+    Attributes:
+        window: Slices decoded ahead of the consumer
+    """
+
+    def __init__(
+        self,
+        paths: list[str],
+        window: int,
+        loader: Callable[[str], Any] = safe_load_image,
+        threads: int | None = None,
+    ):
+        """Start decoding the first `window` paths.
+
+        Args:
+            paths: Every slice the consumer will ask for, in the order it will ask
+            window: Slices to decode ahead (see window_for_budget)
+            loader: Decodes one path; exceptions it raises are re-raised by take()
+            threads: Decoder threads; defaults to PREFETCH_THREADS
+        """
+        from config.constants import PREFETCH_THREADS
+
+        self.window = max(1, window)
+        self._loader = loader
+        self._remaining: deque[str] = deque(paths)
+        self._inflight: deque[tuple[str, Future]] = deque()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, min(self.window, threads or PREFETCH_THREADS)),
+            thread_name_prefix="slice-prefetch",
+        )
+        self._fill()
+
+    def __enter__(self) -> "SlicePrefetcher":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _fill(self) -> None:
+        while self._remaining and len(self._inflight) < self.window:
+            path = self._remaining.popleft()
+            self._inflight.append((path, self._executor.submit(self._loader, path)))
+
+    def take(self, path: str) -> Any:
+        """Return the decoded slice at `path`.
+
+        Args:
+            path: The slice wanted; normally the next one in the list
+
+        Returns:
+            Whatever the loader returns for `path`
+
+        Raises:
+            Whatever the loader raised for `path`
+        """
+        if not any(queued == path for queued, _ in self._inflight) and path not in self._remaining:
+            return self._loader(path)
+
+        while True:
+            if not self._inflight:
+                self._fill()
+            queued, future = self._inflight.popleft()
+            if queued == path:
+                self._fill()
+                return future.result()
+            future.cancel()
+
+    def close(self) -> None:
+        """Stop decoding; slices not yet taken are dropped."""
+        for _, future in self._inflight:
+            future.cancel()
+        self._inflight.clear()
+        self._remaining.clear()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+def first_slice_bytes(paths: list[str]) -> int:
+    """Decoded size of the first slice in `paths` that exists; 0 if none does."""
+    for path in paths:
+        if Path(path).exists():
+            return estimate_slice_bytes(path)
+    return 0
+
+
+def prefetch_window(paths: list[str]) -> int:
+    """Window size for `paths`, from the first readable header and the budget.
+
+    Args:
+        paths: Slices about to be read; the first that exists is probed
+
+    Returns:
+        int: Window size (see window_for_budget)
+    """
+    return window_for_budget(first_slice_bytes(paths))
@@ -17,8 +17,15 @@
 from PyQt5.QtCore import QThreadPool
 from PyQt5.QtWidgets import QApplication
 
+from core.directory_index import LevelSummary
+from core.level_container import load_level, open_level, remove_all
+from core.memory_budget import MemoryBudget
+from core.preview_cache import open_preview, save_preview
 from core.protocols import ProgressDialog
-from utils.image_utils import get_image_dimensions, safe_load_image
+from core.pyramid_index import find_levels, write_pyramid_index
+from core.slice_prefetcher import first_slice_bytes
+from core.volume_buffer import load_volume
+from utils.image_utils import get_image_dimensions
 
 logger = logging.getLogger(__name__)
 
@@ -194,6 +201,11 @@ def generate(
         threadpool: Any,  # QThreadPool
         use_rust_preference: bool = True,
         progress_dialog: Any | None = None,  # ProgressDialog
+        single_pass: bool = False,
+        engine: str = "threads",
+        workers: int = 1,
+        memory_limit_gb: Any = None,
+        level_containers: bool = True,
     ) -> dict[str, Any] | None:
         """Generate thumbnails using best available method
 
@@ -203,6 +215,11 @@ def generate(
             threadpool: Qt thread pool for parallel processing
             use_rust_preference: Prefer Rust module if available
             progress_dialog: Progress dialog for UI updates
+            single_pass: Passed to generate_python when the Python path runs
+            engine: Passed to generate_python when the Python path runs
+            workers: Passed to generate_python when the Python path runs
+            memory_limit_gb: Passed to generate_python when the Python path runs
+            level_containers: Passed to generate_python when the Python path runs
 
         Returns:
             Result dictionary containing success status, data, and error info:
@@ -247,6 +264,7 @@ def _cancel_check() -> bool:
 
             # Convert legacy bool to unified dict format
             if rust_success:
+                write_pyramid_index(directory, int(settings.get("seq_begin", 0)))
                 return {
                     "success": True,
                     "cancelled": False,
@@ -259,7 +277,17 @@ def _cancel_check() -> bool:
                 if not cancelled:
                     # Rust failed but wasn't cancelled - fall back to Python
                     logger.warning("Rust thumbnail generation failed, falling back to Python")
-                    return self.generate_python(directory, settings, threadpool, progress_dialog)
+                    return self.generate_python(
+                        directory,
+                        settings,
+                        threadpool,
+                        progress_dialog,
+                        single_pass,
+                        engine,
+                        workers,
+                        memory_limit_gb,
+                        level_containers,
+                    )
                 else:
                     return {
                         "success": False,
@@ -269,7 +297,17 @@ def _cancel_check() -> bool:
                     }
         else:
             logger.info("Using Python-based thumbnail generation")
-            return self.generate_python(directory, settings, threadpool, progress_dialog)
+            return self.generate_python(
+                directory,
+                settings,
+                threadpool,
+                progress_dialog,
+                single_pass,
+                engine,
+                workers,
+                memory_limit_gb,
+                level_containers,
+            )
 
     def generate_rust(
         self,
@@ -322,6 +360,10 @@ def internal_progress_callback(percentage: float) -> bool:
             return True  # Continue processing
 
         try:
+            # The Rust module writes TIFF files only; containers packed by an
+            # earlier Python build would no longer match them
+            remove_all(Path(directory) / ".thumbnail")
+
             # Call Rust thumbnail generation
             # Note: build_thumbnails returns None on success, raises exception on failure
             build_thumbnails(directory, internal_progress_callback)
@@ -412,85 +454,6 @@ def _log_environment(directory: str, threadpool: QThreadPool) -> None:
         except (OSError, AttributeError) as e:
             logger.debug(f"Could not determine drive type: {e}")
 
-    @staticmethod
-    def _resolve_sample_size(settings: dict[str, Any] | None, total_work: float) -> int:
-        """Decide how many images to time before estimating the rest.
-
-        Uses the configured value when there is one, clamped to a sane range;
-        otherwise scales with the total work so a small stack is not spent
-        entirely on measuring.
-        """
-        user_sample_size = None
-        if settings and isinstance(settings, dict):
-            user_sample_size = settings.get("sample_size")
-
-        if user_sample_size is not None:
-            from config.constants import MAX_SAMPLE_SIZE, MIN_SAMPLE_SIZE
-
-            base_sample = max(MIN_SAMPLE_SIZE, min(MAX_SAMPLE_SIZE, int(user_sample_size)))
-            logger.info(f"Using user-configured sample_size: {base_sample}")
-            return base_sample
-
-        from config.constants import (
-            ADAPTIVE_SAMPLE_RATIO,
-            DEFAULT_ADAPTIVE_SAMPLE_MAX,
-            DEFAULT_ADAPTIVE_SAMPLE_MIN,
-        )
-
-        base_sample = max(
-            DEFAULT_ADAPTIVE_SAMPLE_MIN,
-            min(DEFAULT_ADAPTIVE_SAMPLE_MAX, int(total_work * ADAPTIVE_SAMPLE_RATIO)),
-        )
-        logger.info(f"Auto-calculated sample_size: {base_sample} (2% of {total_work} work)")
-        return base_sample
-
-    @staticmethod
-    def _prepare_level_dirs(
-        directory: str, level: int, seq_begin: int, seq_end: int
-    ) -> tuple[str, str, int, int]:
-        """Work out where this level reads from and writes to, and how many images.
-
-        Level 0 reads the original directory and trusts the caller's sequence
-        range. Later levels read the previous level's output and count what is
-        actually on disk, because a level can produce fewer files than predicted
-        when the source count was odd.
-
-        Returns:
-            (from_dir, to_dir, total_count, seq_end) -- seq_end is returned
-            because counting the real files can correct it.
-        """
-        if level == 0:
-            from_dir = directory
-            logger.debug(f"Level {level + 1}: Reading from original directory: {from_dir}")
-            total_count = seq_end - seq_begin + 1
-        else:
-            from_dir = str(Path(directory) / ".thumbnail" / str(level))
-            logger.debug(f"Level {level + 1}: Reading from thumbnail directory: {from_dir}")
-
-            if Path(from_dir).exists():
-                actual_files = [f.name for f in Path(from_dir).iterdir() if f.suffix == ".tif"]
-                total_count = len(actual_files)
-                seq_end = seq_begin + total_count - 1
-                logger.info(
-                    f"Level {level + 1}: Found {total_count} actual files in previous level"
-                )
-            else:
-                total_count = seq_end - seq_begin + 1
-                logger.warning(
-                    f"Level {level + 1}: Previous level directory not found, "
-                    f"using calculated count: {total_count}"
-                )
-
-        to_path = Path(directory) / ".thumbnail" / str(level + 1)
-        to_dir = str(to_path)
-        if not to_path.exists():
-            to_path.mkdir(parents=True)
-            logger.debug(f"Created directory {to_dir}")
-        else:
-            logger.debug(f"Directory already exists: {to_dir}")
-
-        return from_dir, to_dir, total_count, seq_end
-
     @staticmethod
     def _cancelled_result(
         minimum_volume: "np.ndarray | list[np.ndarray]",
@@ -503,7 +466,7 @@ def _cancelled_result(
         they are on disk either way, and the caller can display them.
         """
         return {
-            "minimum_volume": np.array(minimum_volume) if len(minimum_volume) else np.array([]),
+            "minimum_volume": np.asarray(minimum_volume) if len(minimum_volume) else np.array([]),
             "level_info": level_info,
             "success": False,
             "cancelled": True,
@@ -511,14 +474,44 @@ def _cancelled_result(
         }
 
     @staticmethod
-    def _load_smallest_level(directory: str, level: int) -> np.ndarray:
+    def _spill_dir(
+        thumbnail_base: str, volume_bytes: int, budget: MemoryBudget | None
+    ) -> str | None:
+        """Where to map a volume that is too big for the budget to hold.
+
+        Returns:
+            thumbnail_base when `volume_bytes` would not fit the budget's
+            volume share, for load_volume's spill_dir; None to load into memory
+        """
+        if budget is None or budget.fits_volume(volume_bytes):
+            return None
+        logger.warning(
+            f"Volume of {volume_bytes / (1024 * 1024):.0f} MB is over its share of "
+            f"{budget}; mapping it to a temporary file in {thumbnail_base}"
+        )
+        return thumbnail_base
+
+    @classmethod
+    def _load_smallest_level(
+        cls, directory: str, level: int, budget: MemoryBudget | None = None
+    ) -> np.ndarray:
         """Read the smallest pyramid level back off disk as one 3D array.
 
         Loaded from disk rather than kept from the loop so the Python and Rust
         paths return the same thing; the Rust module writes files and nothing
         else. An empty array is returned when the directory is missing or holds
-        nothing readable, which callers already treat as "no volume".
+        nothing readable, which callers already treat as "no volume". A level
+        too big for `budget` is memory-mapped rather than loaded. The level's
+        container is read when it has one.
         """
+        thumbnail_base = str(Path(directory) / ".thumbnail")
+        container = open_level(thumbnail_base, level)
+        if container is not None:
+            logger.info(f"Loading minimum_volume from the level {level} container")
+            return load_level(
+                container, spill_dir=cls._spill_dir(thumbnail_base, container.nbytes, budget)
+            )
+
         smallest_dir = str(Path(directory) / ".thumbnail" / str(level))
 
         if not Path(smallest_dir).exists():
@@ -526,19 +519,16 @@ def _load_smallest_level(directory: str, level: int) -> np.ndarray:
             return np.array([])
 
         logger.info(f"Loading minimum_volume from {smallest_dir}")
-        tif_files = sorted(f.name for f in Path(smallest_dir).iterdir() if f.suffix == ".tif")
+        tif_files = sorted(str(f) for f in Path(smallest_dir).iterdir() if f.suffix == ".tif")
 
-        slices: list[np.ndarray] = []
-        for tif_file in tif_files:
-            img_array = safe_load_image(str(Path(smallest_dir) / tif_file))
-            if img_array is not None:
-                slices.append(img_array)  # type: ignore[arg-type]
-
-        if not slices:
+        volume_bytes = first_slice_bytes(tif_files) * len(tif_files)
+        volume = load_volume(
+            tif_files, spill_dir=cls._spill_dir(thumbnail_base, volume_bytes, budget)
+        )
+        if not volume.size:
             logger.warning("No images loaded for minimum_volume")
             return np.array([])
 
-        volume = np.array(slices)
         logger.info(f"Loaded minimum_volume: shape {volume.shape}")
         return volume
 
@@ -548,6 +538,11 @@ def generate_python(
         settings: dict[str, Any],
         threadpool: QThreadPool,
         progress_dialog: ProgressDialog | None = None,
+        single_pass: bool = False,
+        engine: str = "threads",
+        workers: int = 1,
+        memory_limit_gb: Any = None,
+        level_containers: bool = True,
     ) -> dict[str, Any] | None:
         """Generate thumbnails using Python implementation (fallback)
 
@@ -559,9 +554,22 @@ def generate_python(
             directory: Directory containing CT images
             settings: Settings hash containing image_width, image_height,
                      seq_begin, seq_end, prefix, index_length, file_type
-            threadpool: Qt thread pool for parallel processing
-            progress_dialog: Progress dialog for UI updates.
-                If provided, progress will be updated via shared_progress_manager signals.
+            threadpool: Qt thread pool; only reported in the log now that the
+                work runs on PyramidEngine's own executor
+            progress_dialog: Progress dialog for UI updates and cancellation.
+            single_pass: Build every level from one read of the original slices
+                (FusedPyramidBuilder) instead of re-reading each level from disk
+                to make the next. Same files either way.
+            engine: "threads" (`workers` worker threads) or "processes"
+                (`workers` worker processes); see PyramidEngine. "processes"
+                takes precedence over single_pass, whose one-read pass cannot be
+                spread across processes.
+            workers: Worker thread or process count, processing.threads
+            memory_limit_gb: processing.memory_limit_gb, which the build and
+                the volume returned are kept within (see MemoryBudget)
+            level_containers: Also pack each level into a single-file
+                container once built (thumbnails.level_containers; see
+                core.level_container)
 
         Returns:
             Result dictionary containing:
@@ -576,10 +584,11 @@ def generate_python(
 
         Note:
             This is the fallback implementation used when Rust module is not available.
-            Progress tracking works the same way as the original create_thumbnail_python():
-            - shared_progress_manager tracks overall progress across all levels
-            - ThumbnailManager connects signals to progress_dialog
-            - No callbacks needed - Qt signals handle everything
+            The pyramid itself is built by the Qt-free PyramidEngine; this method
+            only adapts it to the GUI (see _build_levels):
+            - shared_progress_manager tracks overall progress and ETA across all levels
+            - progress_dialog is updated from the engine's progress events
+            - a cancel click on progress_dialog is passed on to the engine
         """
         # Start timing
         thumbnail_start_time = time.time()
@@ -598,6 +607,7 @@ def generate_python(
             height = int(settings["image_height"])
             seq_begin = settings["seq_begin"]
             seq_end = settings["seq_end"]
+            budget = MemoryBudget(memory_limit_gb)
 
             logger.info(f"Thread configuration: maxThreadCount={threadpool.maxThreadCount()}")
             logger.info(f"Image dimensions: width={width}, height={height}, size={size}")
@@ -609,7 +619,6 @@ def generate_python(
             # Import dependencies for thumbnail generation
 
             from core.progress_manager import ProgressManager
-            from core.thumbnail_manager import ThumbnailManager
 
             # Calculate total work for all LoD levels using the standard method
             # This ensures consistency with main_window's progress setup
@@ -617,7 +626,7 @@ def generate_python(
                 seq_begin, seq_end, int(size), MAX_THUMBNAIL_SIZE
             )
             weighted_total_work = self.weighted_total_work
-            # Use the dict-based level_work_distribution directly for ThumbnailManager
+            # Kept on the shared ProgressManager for its ETA calculation
             level_work_distribution = self.level_work_distribution
             total_levels = self.total_levels
 
@@ -626,15 +635,6 @@ def generate_python(
             )
             logger.info(f"Weighted total work: {weighted_total_work:.1f}")
 
-            base_sample = self._resolve_sample_size(settings, total_work)
-
-            sample_size = base_sample
-            total_sample = base_sample * 3
-
-            logger.info(
-                f"Multi-stage sampling: {base_sample} images per stage, {total_sample} total images"
-            )
-
             # Create shared ProgressManager
             shared_progress_manager = ProgressManager()
             shared_progress_manager.level_work_distribution = level_work_distribution  # type: ignore[assignment]
@@ -661,118 +661,21 @@ def generate_python(
                 }
             )
 
-            # Main thumbnail generation loop
-            i = 0
-            global_step_counter: float = 0.0
-
-            while True:
-                # Check for cancellation
-                if progress_dialog and progress_dialog.is_cancelled:
-                    logger.info("Thumbnail generation cancelled by user before level start")
-                    return self._cancelled_result(minimum_volume, level_info, thumbnail_start_time)
-
-                # Start timing for this level
-                level_start_time = time.time()
-                level_start_datetime = datetime.now().astimezone()
-
-                size = size / 2
-                width = int(width / 2)
-                height = int(height / 2)
-
-                current_level_size = size
-
-                if size < 2:
-                    logger.info(f"Stopping at level {i + 1}: size {size} is too small to continue")
-                    break
-
-                from_dir, to_dir, total_count, seq_end = self._prepare_level_dirs(
-                    directory, i, seq_begin, seq_end
-                )
-
-                logger.info(f"--- Level {i + 1} ---")
-                logger.info(
-                    f"Level {i + 1} start time: {level_start_datetime.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]}"
-                )
-                logger.info(
-                    f"Level {i + 1}: Processing {total_count} images (size: {int(size)}x{int(size)})"
-                )
-
-                # Initialize ThumbnailManager for this level
-                # Pass progress_dialog directly - ThumbnailManager will connect signals
-                logger.info(f"Creating ThumbnailManager for level {i + 1}")
-                thumbnail_manager = ThumbnailManager(
-                    None,  # main_window (not needed for core logic)
-                    progress_dialog,  # Pass progress dialog directly
-                    threadpool,
-                    shared_progress_manager,
-                )
-                # Set sample_size for progress sampling
-                thumbnail_manager.sample_size = sample_size
-                logger.info(
-                    f"ThumbnailManager created with sample_size={sample_size}, starting process_level"
-                )
-
-                # Process this level
-                process_start = time.time()
-                level_img_arrays, was_cancelled = thumbnail_manager.process_level(
-                    i,
-                    from_dir,
-                    to_dir,
-                    seq_begin,
-                    seq_end,
-                    settings,
-                    size,
-                    MAX_THUMBNAIL_SIZE,
-                    global_step_counter,
-                )
-                process_time = time.time() - process_start
-                logger.info(f"Level {i + 1}: process_level completed in {process_time:.2f}s")
-
-                # Calculate and log time for this level
-                level_end_datetime = datetime.now().astimezone()
-                level_elapsed = time.time() - level_start_time
-                logger.info(
-                    f"Level {i + 1} end time: {level_end_datetime.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]}"
-                )
-                logger.info(f"Level {i + 1}: Completed in {level_elapsed:.2f} seconds")
-
-                # Update global step counter
-                global_step_counter = thumbnail_manager.global_step_counter
-
-                # Check for cancellation
-                if was_cancelled or (progress_dialog and progress_dialog.is_cancelled):
-                    logger.info("Thumbnail generation cancelled by user")
-                    return self._cancelled_result(minimum_volume, level_info, thumbnail_start_time)
-
-                # Update for next level
-                current_count = seq_end - seq_begin + 1
-                next_count = (current_count // 2) + (current_count % 2)
-                seq_end = seq_begin + next_count - 1
-                logger.info(
-                    f"Level {i + 1}: {current_count} images -> {next_count} thumbnails generated"
-                )
-                logger.info(f"Next level will process range: {seq_begin}-{seq_end}")
-
-                i += 1
-
-                # Add to level_info if doesn't exist
-                level_name = f"Level {i}"
-                level_exists = any(level["name"] == level_name for level in level_info)
-                if not level_exists:
-                    level_info.append(
-                        {
-                            "name": level_name,
-                            "width": width,
-                            "height": height,
-                            "seq_begin": seq_begin,
-                            "seq_end": seq_end,
-                        }
-                    )
+            i, cancelled = self._build_levels(
+                directory,
+                settings,
+                progress_dialog,
+                shared_progress_manager,
+                level_info,
+                single_pass,
+                engine,
+                workers,
+                budget,
+                level_containers,
+            )
 
-                # Check if we've reached size limit
-                if current_level_size < MAX_THUMBNAIL_SIZE:
-                    logger.info(f"Reached target thumbnail size at level {i}")
-                    break
+            if cancelled:
+                return self._cancelled_result(minimum_volume, level_info, thumbnail_start_time)
 
             logger.info(f"Exited thumbnail generation loop at level {i + 1}")
 
@@ -791,7 +694,7 @@ def generate_python(
                 images_per_second = total_work / total_elapsed
                 logger.info(f"Average processing speed: {images_per_second:.1f} images/second")
 
-            minimum_volume = self._load_smallest_level(directory, i)
+            minimum_volume = self._load_smallest_level(directory, i, budget)
 
             # Final progress update
             if progress_dialog:
@@ -863,40 +766,102 @@ def generate_python(
                 "elapsed_time": total_elapsed,
             }
 
+    def _build_levels(
+        self,
+        directory: str,
+        settings: dict[str, Any],
+        progress_dialog: ProgressDialog | None,
+        progress_manager: Any,  # ProgressManager
+        level_info: list[dict[str, Any]],
+        single_pass: bool,
+        engine: str,
+        workers: int,
+        budget: MemoryBudget,
+        level_containers: bool = True,
+    ) -> tuple[int, bool]:
+        """Build the pyramid with PyramidEngine, adapting it to the GUI.
+
+        The engine does the work on its own executor and yields at least every
+        PROGRESS_UPDATE_INTERVAL_MS, blocking in between. This loop, on the UI
+        thread, only forwards each event to progress_manager and the dialog,
+        turns the event loop, and passes a cancel click on. Appends an entry to
+        level_info for each level completed.
+
+        Level by level, the engine runs `workers` threads, or with
+        engine="processes" `workers` worker processes -- as batch mode does
+        (core.batch_builder). The single-pass builder is sequential and uses
+        one thread whatever `workers` is.
+
+        Returns:
+            (levels_built, cancelled) -- levels_built is the number of the
+            smallest level on disk.
+        """
+        from config.constants import MAX_THUMBNAIL_SIZE
+        from core.pyramid_engine import PyramidEngine
+
+        use_processes = engine == "processes"
+        if single_pass and use_processes:
+            logger.info(f"Using {workers} worker processes level by level instead of single pass")
+
+        pyramid = PyramidEngine(
+            workers=workers,
+            use_processes=use_processes,
+            single_pass=single_pass and not use_processes,
+            max_thumbnail_size=MAX_THUMBNAIL_SIZE,
+            memory_budget=budget,
+            level_containers=level_containers,
+        )
+
+        for progress in pyramid.iter_build(directory, settings):
+            progress_manager.update(value=int(progress.fraction * progress_manager.total))
+            if progress_dialog:
+                progress_dialog.pb_progress.setValue(int(progress.percentage))
+                where = f"Level {progress.level}: " if progress.level else ""
+                detail = f"{where}{progress.completed}/{progress.total}"
+                eta = progress_manager.calculate_eta()
+                progress_dialog.lbl_detail.setText(f"{eta} - {detail}" if eta else detail)
+            QApplication.processEvents()
+
+            if progress_dialog and progress_dialog.is_cancelled and not pyramid.is_cancelled:
+                logger.info("Thumbnail generation cancelled by user")
+                pyramid.cancel()
+
+        result = pyramid.result
+        level_info.extend(result.level_info[1:])  # type: ignore[union-attr]
+        return result.levels_built, result.cancelled  # type: ignore[union-attr]
+
     @staticmethod
-    def _find_thumbnail_levels(thumbnail_base: str) -> list[tuple[int, str]]:
-        """List the contiguous level directories under .thumbnail, in order.
+    def _find_thumbnail_levels(directory: str) -> list[LevelSummary]:
+        """The contiguous levels under .thumbnail, in order, with their sizes.
 
         Stops at the first gap rather than scanning the whole range: levels are
-        written consecutively, so a missing one means there are no more.
+        written consecutively, so a missing one means there are no more. Read
+        from the pyramid index when it is current (see find_levels).
         """
         from config.constants import MAX_THUMBNAIL_LEVELS
 
-        level_dirs = []
-        for i in range(1, MAX_THUMBNAIL_LEVELS):
-            level_dir = str(Path(thumbnail_base) / str(i))
-            if not Path(level_dir).exists():
-                break
-            level_dirs.append((i, level_dir))
-        return level_dirs
+        return find_levels(directory, MAX_THUMBNAIL_LEVELS)
 
     @staticmethod
     def _select_thumbnail_level(
-        level_dirs: list[tuple[int, str]], max_thumbnail_size: int
+        levels: list[LevelSummary],
+        max_thumbnail_size: int,
+        budget: MemoryBudget | None = None,
     ) -> tuple[int, str]:
         """Pick the first level whose images fit within max_thumbnail_size.
 
         Levels shrink as the number rises, so the first match is also the
-        highest-resolution one that fits. Falls back to the smallest level
+        highest-resolution one that fits. With a budget, a level must also fit
+        its volume share once loaded as 8-bit. Falls back to the smallest level
         available when even that is too large -- returning nothing would leave
         the caller with no volume at all.
         """
-        for level_num, level_dir in level_dirs:
-            files = [f.name for f in Path(level_dir).iterdir() if f.suffix == ".tif"]
-            if not files:
+        for level_num, level_dir, count, width, height in levels:
+            if not count:
+                continue
+            if budget is not None and not budget.fits_volume(count * width * height):
+                logger.debug(f"Level {level_num} does not fit the volume share of {budget}")
                 continue
-
-            width, height = get_image_dimensions(str(Path(level_dir) / files[0]))
             if max(width, height) < max_thumbnail_size:
                 logger.info(
                     f"Found appropriate level {level_num} with size {width}x{height} "
@@ -908,14 +873,42 @@ def _select_thumbnail_level(
                 f"Level {level_num} size {width}x{height} is >= {max_thumbnail_size}, continuing..."
             )
 
-        level_num, level_dir = level_dirs[-1]
+        level_num, level_dir = levels[-1].level, levels[-1].path
         logger.warning(
             f"No level with size < {max_thumbnail_size} found, using highest level {level_num}"
         )
         return level_num, level_dir
 
+    @classmethod
+    def _load_level_8bit(cls, thumbnail_base: str, level: int, budget: MemoryBudget) -> np.ndarray:
+        """Read a level as an 8-bit volume, from its container if it has one.
+
+        Normalised slice by slice into a preallocated volume, so the level is
+        never held twice.
+        """
+        container = open_level(thumbnail_base, level)
+        if container is not None:
+            logger.info(f"Reading level {level} from its container, shape {container.shape}")
+            count, height, width = container.shape
+            return load_level(
+                container,
+                transform=cls.normalize_to_8bit,
+                spill_dir=cls._spill_dir(thumbnail_base, count * width * height, budget),
+            )
+
+        level_dir = Path(thumbnail_base) / str(level)
+        files = sorted(str(f) for f in level_dir.iterdir() if f.suffix == ".tif")
+        logger.info(f"Found {len(files)} thumbnail files")
+
+        width, height = get_image_dimensions(files[0]) if files else (0, 0)
+        return load_volume(
+            files,
+            transform=cls.normalize_to_8bit,
+            spill_dir=cls._spill_dir(thumbnail_base, len(files) * width * height, budget),
+        )
+
     @staticmethod
-    def _normalize_to_8bit(img_array: np.ndarray) -> np.ndarray:
+    def normalize_to_8bit(img_array: np.ndarray) -> np.ndarray:
         """Scale a slice to uint8, which is what marching cubes expects.
 
         16-bit is divided down by a fixed factor so every slice keeps the same
@@ -940,17 +933,39 @@ def _normalize_to_8bit(img_array: np.ndarray) -> np.ndarray:
         ).astype(np.uint8)
         return stretched
 
+    @staticmethod
+    def _loaded_level_info(volume: np.ndarray, level_num: int) -> dict[str, Any]:
+        """The level_info load_thumbnail_data returns with a volume."""
+        level_info = [
+            {
+                "name": f"Level {level_num}",
+                "width": volume.shape[2],
+                "height": volume.shape[1],
+                "seq_begin": 0,
+                "seq_end": len(volume) - 1,
+            }
+        ]
+        return {"levels": level_info, "current_level": level_num}
+
     def load_thumbnail_data(
-        self, directory: str, max_thumbnail_size: int | None = None
+        self,
+        directory: str,
+        max_thumbnail_size: int | None = None,
+        memory_limit_gb: Any = None,
     ) -> tuple[np.ndarray | None, dict[str, Any]]:
         """Load generated thumbnail data from disk
 
         Finds and loads the appropriate level of thumbnails for 3D visualization.
+        The volume loaded is cached in .thumbnail (core.preview_cache), and a
+        later call for the same size and memory limit maps the cache read-only
+        instead, until the pyramid is rebuilt.
 
         Args:
             directory: Base directory containing .thumbnail subfolder
             max_thumbnail_size: Maximum size for loaded thumbnails. If None,
                 uses DEFAULT_MAX_SIZE from config.
+            memory_limit_gb: processing.memory_limit_gb; the level loaded must
+                fit its volume share, and is memory-mapped if none does
 
         Returns:
             Tuple of (thumbnail_volume, level_info):
@@ -968,51 +983,40 @@ def load_thumbnail_data(
             logger.warning("No thumbnail directory found")
             return None, {}
 
-        level_dirs = self._find_thumbnail_levels(thumbnail_base)
+        budget = MemoryBudget(memory_limit_gb)
+        # Everything the choice of level depends on besides the files
+        preview_key = {
+            "max_thumbnail_size": max_thumbnail_size,
+            "memory_limit_bytes": budget.limit_bytes,
+        }
+        cached = open_preview(thumbnail_base, preview_key)
+        if cached is not None:
+            volume, level_num = cached
+            logger.info(f"Mapped cached level {level_num} preview volume, shape: {volume.shape}")
+            return volume, self._loaded_level_info(volume, level_num)
 
-        if not level_dirs:
+        levels = self._find_thumbnail_levels(directory)
+
+        if not levels:
             logger.warning("No thumbnail levels found")
             return None, {}
 
-        level_num, thumbnail_dir = self._select_thumbnail_level(level_dirs, max_thumbnail_size)
+        level_num, thumbnail_dir = self._select_thumbnail_level(levels, max_thumbnail_size, budget)
 
         logger.info(f"Loading thumbnails from level {level_num}: {thumbnail_dir}")
 
         try:
-            # List all tif files in the directory
-            files = sorted(f.name for f in Path(thumbnail_dir).iterdir() if f.suffix == ".tif")
-
-            logger.info(f"Found {len(files)} thumbnail files")
-
-            minimum_volume = []
-            for file in files:
-                filepath = str(Path(thumbnail_dir) / file)
-                img_array = safe_load_image(filepath)
-                if img_array is None:
-                    continue
+            minimum_volume_array = self._load_level_8bit(thumbnail_base, level_num, budget)
 
-                minimum_volume.append(self._normalize_to_8bit(img_array))  # type: ignore[arg-type]
-
-            if len(minimum_volume) > 0:
-                minimum_volume_array = np.array(minimum_volume)
+            if minimum_volume_array.size:
                 logger.info(
                     f"Loaded {len(minimum_volume_array)} thumbnails, shape: {minimum_volume_array.shape}"
                 )
+                save_preview(thumbnail_base, preview_key, level_num, minimum_volume_array)
 
-                # Create level_info structure
-                level_info = []
-                # Add loaded level info
-                level_info.append(
-                    {
-                        "name": f"Level {level_num}",
-                        "width": minimum_volume_array.shape[2],
-                        "height": minimum_volume_array.shape[1],
-                        "seq_begin": 0,
-                        "seq_end": len(minimum_volume_array) - 1,
-                    }
+                return minimum_volume_array, self._loaded_level_info(
+                    minimum_volume_array, level_num
                 )
-
-                return minimum_volume_array, {"levels": level_info, "current_level": level_num}
             else:
                 logger.warning("No thumbnails loaded")
                 return None, {}
@@ -0,0 +1,174 @@
+"""Preallocated assembly of 2D slices into a 3D volume.
+
+Collecting slices in a list and finishing with np.array(slices) briefly holds
+the volume twice: once as the list, once as the new array. For the level
+handed to the 3D view that doubles peak memory for no reason, since the
+number of slices is known before the first one is read. VolumeBuffer
+allocates the (count, height, width) array once -- in memory, as a .npy
+memory map, or spilled to an unnamed temporary file when it is too big for
+the memory budget -- and each slice is copied straight into its slot.
+
+Typical usage example:
+
+    volume = load_volume(paths, transform=normalize)
+
+    buffer = VolumeBuffer(num_tasks)
+    results[idx] = buffer.put(idx, arr)   # from any thread
+    volume = buffer.volume()
+"""
+
+import logging
+import tempfile
+import threading
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+
+from utils.image_utils import safe_load_image
+
+logger = logging.getLogger(__name__)
+
+
+class VolumeBuffer:
+    """A volume of `count` slices, filled one slice at a time by index.
+
+    The array is allocated by the first put(), from that slice's shape and
+    dtype. A slice of another shape, or of a dtype that does not fit without
+    loss, is refused -- np.array would have failed on it or turned the whole
+    volume into an object array. put() may be called from several threads,
+    each with its own indices.
+
+    Attributes:
+        count: Number of slots
+        memmap_path: .npy file backing the volume, or None
+        spill_dir: Directory of the temporary file backing the volume, or None
+    """
+
+    def __init__(self, count: int, memmap_path: str | None = None, spill_dir: str | None = None):
+        """Set up an empty buffer; nothing is allocated until the first put().
+
+        Args:
+            count: Number of slices the volume will hold
+            memmap_path: Back the volume by this .npy file instead of memory.
+                The file is overwritten and can later be opened with np.load.
+            spill_dir: Back the volume by an unnamed temporary file in this
+                directory instead of memory. The file goes away with the
+                volume, and another volume spilled there never touches it.
+        """
+        self.count = count
+        self.memmap_path = memmap_path
+        self.spill_dir = spill_dir
+        self._array: np.ndarray | None = None
+        self._filled = np.zeros(count, dtype=bool)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return int(self._filled.sum())
+
+    def __contains__(self, idx: int) -> bool:
+        return bool(self._filled[idx])
+
+    @property
+    def array(self) -> np.ndarray | None:
+        """The whole buffer, empty slots included; None until the first put()."""
+        return self._array
+
+    def _allocate(self, arr: np.ndarray) -> np.ndarray:
+        with self._lock:
+            if self._array is None:
+                shape = (self.count, *arr.shape)
+                backing = self.memmap_path or self.spill_dir
+                if self.memmap_path is not None:
+                    self._array = np.lib.format.open_memmap(
+                        self.memmap_path, mode="w+", dtype=arr.dtype, shape=shape
+                    )
+                elif self.spill_dir is not None:
+                    # The map keeps its own handle, so the file object may go
+                    with tempfile.TemporaryFile(dir=self.spill_dir) as f:
+                        self._array = np.memmap(f, dtype=arr.dtype, mode="w+", shape=shape)
+                else:
+                    self._array = np.empty(shape, dtype=arr.dtype)
+                logger.debug(
+                    f"Allocated volume {shape} {arr.dtype}, "
+                    f"{self._array.nbytes / (1024 * 1024):.1f} MB"
+                    + (f" mapped to {backing}" if backing else "")
+                )
+            return self._array
+
+    def put(self, idx: int, arr: np.ndarray) -> np.ndarray | None:
+        """Copy `arr` into slot `idx`.
+
+        Args:
+            idx: Slot, 0 <= idx < count
+            arr: 2D slice
+
+        Returns:
+            The slot, a view into the volume, so a caller that kept the slice
+            can keep the view instead; None if the slice does not fit
+        """
+        volume = self._array if self._array is not None else self._allocate(arr)
+        if arr.shape != volume.shape[1:] or not np.can_cast(arr.dtype, volume.dtype, "safe"):
+            logger.warning(
+                f"Slice {idx} is {arr.shape} {arr.dtype}, volume slices are "
+                f"{volume.shape[1:]} {volume.dtype}; leaving it out"
+            )
+            return None
+        volume[idx] = arr
+        self._filled[idx] = True
+        return volume[idx]  # type: ignore[no-any-return]
+
+    def volume(self) -> np.ndarray:
+        """The filled slices, in slot order.
+
+        Returns:
+            The buffer itself (or a leading part of it) when the filled slots
+            run from 0 without gaps -- the normal case, and no copy. A copy of
+            the filled slots otherwise. An empty array if nothing was put.
+        """
+        if self._array is None:
+            return np.array([])
+        filled = int(self._filled.sum())
+        if self._filled[:filled].all():
+            return self._array if filled == self.count else self._array[:filled]
+        return self._array[self._filled]
+
+
+def load_volume(
+    paths: list[str],
+    transform: Callable[[np.ndarray], np.ndarray] | None = None,
+    memmap_path: str | None = None,
+    spill_dir: str | None = None,
+) -> np.ndarray:
+    """Read slices into one preallocated volume.
+
+    Missing files and slices that do not match the first one are skipped,
+    and the ones after them move up, as with a list built in a loop.
+
+    Args:
+        paths: Slice files, in order
+        transform: Applied to each slice before it is stored, e.g. to 8 bits
+        memmap_path: See VolumeBuffer
+        spill_dir: See VolumeBuffer
+
+    Returns:
+        np.ndarray: (slices, height, width), or an empty array if nothing
+        could be read
+
+    Raises:
+        ImageLoadError: A file is there but cannot be decoded
+    """
+    buffer = VolumeBuffer(len(paths), memmap_path, spill_dir)
+    stored = 0
+    for path in paths:
+        arr = safe_load_image(path)
+        if not isinstance(arr, np.ndarray):
+            continue
+        if transform is not None:
+            arr = transform(arr)
+        if buffer.put(stored, arr) is not None:
+            stored += 1
+
+    if stored < len(paths):
+        logger.info(f"Loaded {stored} of {len(paths)} slices from {Path(paths[0]).parent}")
+    return buffer.volume()
@@ -266,6 +266,56 @@ def get_cropped_volume(
 
         return volume, scaled_roi
 
+    def roi_in_level(
+        self,
+        level_info: list[dict[str, int]],
+        curr_level_idx: int,
+        target_level_idx: int,
+        top_idx: int,
+        bottom_idx: int,
+        crop_box: list[int],
+    ) -> list[int]:
+        """Map the current ROI selection onto another level
+
+        Like get_cropped_volume, but for any level rather than the smallest,
+        and returning the ROI instead of cutting it from a volume in memory.
+        The ROI is widened to whole voxels of the target level, so a finer
+        level covers at least what the current one shows.
+
+        Args:
+            level_info (List[dict]): Information about each LoD level
+            curr_level_idx (int): Level the selection was made on
+            target_level_idx (int): Level to map it onto
+            top_idx (int): Top slice index in current level (inclusive)
+            bottom_idx (int): Bottom slice index in current level
+            crop_box (List[int]): Crop box in current level [x1, y1, x2, y2]
+
+        Returns:
+            List[int]: [z_min, z_max, y_min, y_max, x_min, x_max] in the target
+            level, max exclusive
+        """
+        curr = level_info[curr_level_idx]
+        target = level_info[target_level_idx]
+        curr_count = curr["seq_end"] - curr["seq_begin"] + 1
+        target_count = target["seq_end"] - target["seq_begin"] + 1
+
+        if top_idx < 0 or bottom_idx < 0 or bottom_idx > top_idx:
+            logger.debug("Invalid top/bottom indices, using full range")
+            bottom_idx = 0
+            top_idx = curr_count - 1
+
+        def scale(start, end, curr_size, target_size):
+            # Floor the start and ceil the end, then keep at least one voxel
+            lo = max(0, min(start * target_size // curr_size, target_size - 1))
+            hi = max(lo + 1, min(-(-end * target_size // curr_size), target_size))
+            return [lo, hi]
+
+        return (
+            scale(bottom_idx, top_idx + 1, curr_count, target_count)
+            + scale(crop_box[1], crop_box[3], curr["height"], target["height"])
+            + scale(crop_box[0], crop_box[2], curr["width"], target["width"])
+        )
+
     def scale_coordinates_between_levels(
         self, coords: list[float], from_level: int, to_level: int
     ) -> list[float]:
@@ -72,7 +72,7 @@ def setMaximum(self, maximum):
 class MockProgressDialog:
     """Mock progress dialog for thumbnail generation testing
 
-    Provides the interface expected by ThumbnailManager and ThumbnailGenerator
+    Provides the interface expected by ThumbnailGenerator and FusedPyramidBuilder
     without requiring actual Qt UI components.
 
     Attributes:
@@ -199,3 +199,51 @@ def create_test_images():
         callable: Function that creates test images with custom parameters
     """
     return create_test_image
+
+
+# ==============================================================================
+# Slice stacks for pyramid builds
+# ==============================================================================
+
+
+def stack_settings(count=16, size=64):
+    """Settings hash of a stack written by write_stack."""
+    return {
+        "image_width": str(size),
+        "image_height": str(size),
+        "seq_begin": 0,
+        "seq_end": count - 1,
+        "prefix": "slice_",
+        "index_length": 4,
+        "file_type": "tif",
+    }
+
+
+# The stack stack_dir writes unless a test is marked otherwise
+STACK_SETTINGS = stack_settings()
+
+
+def write_stack(directory, count=16, size=64, dtype=np.uint16, seed=0):
+    """Write `count` square slices of random values as slice_NNNN.tif."""
+    rng = np.random.default_rng(seed)
+    high = 65535 if dtype == np.uint16 else 255
+    for i in range(count):
+        arr = rng.integers(0, high, size=(size, size), dtype=dtype)
+        Image.fromarray(arr).save(os.path.join(directory, f"slice_{i:04d}.tif"))
+
+
+@pytest.fixture
+def stack_dir(request, tmp_path):
+    """Directory holding a stack of slices, 16 of 64x64 uint16 by default
+
+    Mark a test, class or module with ``pytest.mark.stack(...)`` to write
+    another; its arguments are those of write_stack.
+
+    Returns:
+        str: Path to the directory
+    """
+    directory = tmp_path / "stack"
+    directory.mkdir()
+    marker = request.node.get_closest_marker("stack")
+    write_stack(str(directory), **(marker.kwargs if marker else {}))
+    return str(directory)
@@ -31,6 +31,21 @@ def test_complete_ui_workflow(self, main_window, sample_ct_directory):
         # already been read twice.)
         assert main_window.isVisible()
 
+    def test_display_level_matches_view(self, main_window):
+        """The coarsest level still as wide as the 2D view is shown"""
+        main_window.level_info = [
+            {"name": name, "width": width, "height": width, "seq_begin": 0, "seq_end": 0}
+            for name, width in [("Original", 4096), ("Level 1", 2048), ("Level 2", 1024)]
+            + [("Level 3", 512), ("Level 4", 256)]
+        ]
+        main_window.image_label.resize(600, 600)
+
+        assert main_window._display_level(0) == 2
+        assert main_window._display_level(3) == 3
+
+        main_window.settings_manager.set("thumbnails.match_display_resolution", False)
+        assert main_window._display_level(0) == 0
+
     def test_settings_persistence(self, qapp, tmp_path, monkeypatch):
         """A setting written in one session is read back by the next.
 
@@ -0,0 +1,182 @@
+"""
+Tests for the headless batch builder (core/batch_builder.py)
+
+Batch mode must build every dataset it is given, keep going past one that
+fails, and write a summary with per-level timings.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from core.batch_builder import (
+    BatchPyramidBuilder,
+    expand_directories,
+    level_throughput,
+    main,
+)
+
+
+def _write_stack(directory, count=6, size=64):
+    rng = np.random.default_rng(0)
+    for i in range(count):
+        arr = rng.integers(0, 255, size=(size, size), dtype=np.uint8)
+        Image.fromarray(arr).save(os.path.join(directory, f"scan_{i:04d}.tif"))
+
+
+@pytest.fixture
+def scan_root():
+    root = tempfile.mkdtemp()
+    for name in ("scan_a", "scan_b"):
+        os.makedirs(os.path.join(root, name))
+        _write_stack(os.path.join(root, name))
+    os.makedirs(os.path.join(root, "empty"))
+    yield root
+    shutil.rmtree(root)
+
+
+class TestExpandDirectories:
+    def test_glob_matches_directories_only(self, scan_root):
+        Path(scan_root, "notes.txt").write_text("not a scan")
+
+        found = expand_directories([os.path.join(scan_root, "*")])
+
+        assert [os.path.basename(d) for d in found] == ["empty", "scan_a", "scan_b"]
+
+    def test_duplicates_dropped(self, scan_root):
+        scan_a = os.path.join(scan_root, "scan_a")
+
+        found = expand_directories([scan_a, os.path.join(scan_root, "scan_*")])
+
+        assert found == [scan_a, os.path.join(scan_root, "scan_b")]
+
+    def test_missing_directory_skipped(self, scan_root):
+        assert expand_directories([os.path.join(scan_root, "missing")]) == []
+
+
+def test_level_throughput_uses_source_pixels():
+    settings = {"image_width": 100, "image_height": 100, "seq_begin": 0, "seq_end": 9}
+    levels = [
+        {"level": 1, "width": 50, "height": 50, "count": 5},
+        {"level": 2, "width": 25, "height": 25, "count": 3},
+    ]
+
+    entries = level_throughput(settings, levels, [0.5])
+
+    assert entries[0]["outputs_per_second"] == 10.0
+    assert entries[0]["megapixels_per_second"] == pytest.approx(0.2)
+    assert entries[1]["seconds"] is None
+    assert entries[1]["megapixels_per_second"] is None
+
+
+@pytest.mark.unit
+class TestBatchPyramidBuilder:
+    def test_builds_every_dataset_and_reports_failures(self, scan_root):
+        builder = BatchPyramidBuilder(jobs=2, workers=1, engine="threads", max_thumbnail_size=16)
+        directories = [os.path.join(scan_root, name) for name in ("scan_a", "empty", "scan_b")]
+
+        summary = builder.run(directories)
+
+        assert [d["status"] for d in summary["datasets"]] == ["ok", "failed", "ok"]
+        assert summary["succeeded"] == 2
+        assert summary["failed"] == 1
+        assert "NoImagesFoundError" in summary["datasets"][1]["error"]
+        for name in ("scan_a", "scan_b"):
+            assert os.path.isdir(os.path.join(scan_root, name, ".thumbnail", "2"))
+
+        dataset = summary["datasets"][0]
+        assert dataset["slices"] == 6
+        assert dataset["generated"] == 3 + 2 + 1
+        assert [level["outputs"] for level in dataset["levels"]] == [3, 2, 1]
+        assert all(level["seconds"] is not None for level in dataset["levels"])
+
+    def test_cancelled_batch_skips_remaining_datasets(self, scan_root):
+        builder = BatchPyramidBuilder(jobs=1, engine="threads")
+        builder.cancel()
+
+        summary = builder.run([os.path.join(scan_root, "scan_a")])
+
+        assert summary["datasets"][0]["status"] == "cancelled"
+        assert not os.path.exists(os.path.join(scan_root, "scan_a", ".thumbnail"))
+
+    def test_unknown_engine_rejected(self):
+        with pytest.raises(ValueError, match="Unknown engine"):
+            BatchPyramidBuilder(engine="gpu")
+
+
+def test_main_writes_summary(scan_root):
+    summary_path = os.path.join(scan_root, "out", "summary.json")
+
+    status = main(
+        [
+            os.path.join(scan_root, "scan_*"),
+            "--engine",
+            "single-pass",
+            "--max-thumbnail-size",
+            "16",
+            "--summary",
+            summary_path,
+        ]
+    )
+
+    assert status == 0
+    with open(summary_path, encoding="utf-8") as f:
+        summary = json.load(f)
+    assert summary["engine"] == "single-pass"
+    assert [d["status"] for d in summary["datasets"]] == ["ok", "ok"]
+
+
+def test_main_without_matches_fails(scan_root):
+    assert main([os.path.join(scan_root, "nothing_*")]) == 2
+
+
+@pytest.mark.smoke
+def test_batch_flag_never_imports_qt(scan_root):
+    """`CTHarvester.py --batch` must build and exit 0 without importing PyQt5.
+
+    Not merely without a display: a server may have no libGL or xcb either,
+    so the Qt and OpenGL modules must not be imported at all.
+    """
+    summary_path = os.path.join(scan_root, "summary.json")
+    env = {k: v for k, v in os.environ.items() if k not in ("DISPLAY", "QT_QPA_PLATFORM")}
+    code = (
+        "import runpy, sys\n"
+        "sys.argv = sys.argv[1:]\n"
+        "status = 0\n"
+        "try:\n"
+        "    runpy.run_path(sys.argv[0], run_name='__main__')\n"
+        "except SystemExit as exit:\n"
+        "    status = exit.code\n"
+        "sys.exit(3 if any(m.startswith('PyQt5') for m in sys.modules) else status)\n"
+    )
+    root = Path(__file__).resolve().parent.parent
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            code,
+            str(root / "CTHarvester.py"),
+            "--batch",
+            os.path.join(scan_root, "scan_a"),
+            "--engine",
+            "threads",
+            "--summary",
+            summary_path,
+        ],
+        cwd=root,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert os.path.exists(summary_path)
@@ -0,0 +1,149 @@
+"""
+Tests for the pyramid build manifest (core/build_manifest.py)
+
+Only outputs the manifest records as finished may be trusted: a truncated file
+is rebuilt, a changed source slice costs one output per level, and an unchanged
+dataset is reopened without scanning its sources.
+"""
+
+import json
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from core.build_manifest import BuildManifest, open_manifest
+from core.pyramid_engine import PyramidEngine
+from tests.conftest import stack_settings
+
+SETTINGS = stack_settings(count=11)
+
+pytestmark = pytest.mark.stack(count=11, dtype=np.uint8)
+
+
+def _write_slice(directory, i, seed=0):
+    rng = np.random.default_rng(seed + i)
+    arr = rng.integers(0, 255, size=(64, 64), dtype=np.uint8)
+    Image.fromarray(arr).save(os.path.join(directory, f"slice_{i:04d}.tif"))
+
+
+def _build(directory, single_pass=False, max_size=16, **kwargs):
+    engine = PyramidEngine(single_pass=single_pass, max_thumbnail_size=max_size, **kwargs)
+    return engine.build(directory, SETTINGS)
+
+
+def _output(directory, level, idx):
+    return os.path.join(directory, ".thumbnail", str(level), f"{idx:06}.tif")
+
+
+@pytest.mark.unit
+class TestBuildManifest:
+    @pytest.mark.parametrize("single_pass", [False, True])
+    def test_build_records_every_output(self, stack_dir, single_pass):
+        _build(stack_dir, single_pass=single_pass)
+
+        manifest = BuildManifest.load(stack_dir)
+
+        assert manifest is not None
+        assert manifest.is_complete()
+        assert manifest.params["seq_end"] == 10
+        assert len(manifest.sources) == 11
+
+    @pytest.mark.parametrize("single_pass", [False, True])
+    def test_unrecorded_truncated_output_is_rebuilt(self, stack_dir, single_pass):
+        _build(stack_dir, single_pass=single_pass)
+        expected = np.array(Image.open(_output(stack_dir, 1, 2)))
+
+        # What a crash mid-write leaves: a short file the manifest never recorded
+        manifest_path = Path(stack_dir) / ".thumbnail" / "manifest.json"
+        data = json.loads(manifest_path.read_text())
+        data["levels"]["1"] = "11011" + data["levels"]["1"][5:]
+        manifest_path.write_text(json.dumps(data))
+        with open(_output(stack_dir, 1, 2), "r+b") as f:
+            f.truncate(100)
+
+        result = _build(stack_dir, single_pass=single_pass)
+
+        assert result.generated == 1
+        np.testing.assert_array_equal(np.array(Image.open(_output(stack_dir, 1, 2))), expected)
+        assert BuildManifest.load(stack_dir).is_complete()
+
+    def test_changed_source_invalidates_one_output_per_level(self, stack_dir):
+        _build(stack_dir)
+        untouched = np.array(Image.open(_output(stack_dir, 1, 0)))
+
+        # Replaced, as a re-reconstruction does; the directory's mtime moves with it
+        os.remove(os.path.join(stack_dir, "slice_0003.tif"))
+        _write_slice(stack_dir, 3, seed=100)
+        os.utime(stack_dir, ns=(1, 1))
+        result = _build(stack_dir)
+
+        # Slice 3 feeds output 1 of level 1 and output 0 of levels 2 and 3
+        assert result.generated == 3
+        assert result.loaded == 6 + 3 + 2 - 3
+        np.testing.assert_array_equal(np.array(Image.open(_output(stack_dir, 1, 0))), untouched)
+
+    def test_unchanged_dataset_skips_source_scan(self, stack_dir):
+        _build(stack_dir)
+
+        with patch("core.build_manifest.scan_sources") as scan:
+            result = _build(stack_dir)
+
+        scan.assert_not_called()
+        assert result.generated == 0
+        assert result.loaded == 6 + 3 + 2
+
+    def test_parameter_change_discards_old_levels(self, stack_dir):
+        _build(stack_dir, max_size=16)
+        assert os.path.isdir(os.path.join(stack_dir, ".thumbnail", "3"))
+
+        result = _build(stack_dir, max_size=32)
+
+        assert result.levels_built == 2
+        assert result.generated == 6 + 3
+        assert not os.path.exists(os.path.join(stack_dir, ".thumbnail", "3"))
+
+    def test_pyramid_without_manifest_is_adopted(self, stack_dir):
+        _build(stack_dir, use_manifest=False)
+        with open(_output(stack_dir, 2, 1), "r+b") as f:
+            f.truncate(10)
+
+        result = _build(stack_dir)
+
+        assert result.generated == 1
+        assert result.loaded == 6 + 3 + 2 - 1
+
+    @pytest.mark.stack(count=11, dtype=np.uint16)
+    def test_truncated_16bit_output_is_not_adopted(self, stack_dir):
+        _build(stack_dir, use_manifest=False)
+        # Past its 8-bit size, but short of its 16 x 16 pixels at 2 bytes
+        path = _output(stack_dir, 2, 1)
+        with open(path, "r+b") as f:
+            f.truncate(16 * 16 * 2 - 64)
+
+        result = _build(stack_dir)
+
+        assert result.generated == 1
+        assert np.array(Image.open(path)).dtype == np.uint16
+
+    def test_unreadable_manifest_is_ignored(self, stack_dir):
+        _build(stack_dir)
+        (Path(stack_dir) / ".thumbnail" / "manifest.json").write_text("{not json")
+
+        assert BuildManifest.load(stack_dir) is None
+        manifest = open_manifest(
+            stack_dir, SETTINGS, PyramidEngine(max_thumbnail_size=16).plan(SETTINGS), 16
+        )
+        assert manifest.is_complete()
+
+    def test_failed_task_is_not_recorded(self, stack_dir):
+        os.remove(os.path.join(stack_dir, "slice_0004.tif"))
+
+        _build(stack_dir)
+
+        manifest = BuildManifest.load(stack_dir)
+        assert not manifest.is_done(1, 2)
+        assert manifest.is_done(1, 1)
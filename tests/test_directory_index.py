@@ -0,0 +1,174 @@
+"""
+Tests for the cached directory index (core/directory_index.py)
+
+Opening a dataset must list its directory once, reuse that listing until the
+directory changes, and answer exactly as the per-file checks it replaces.
+"""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from core import directory_index
+from core.build_manifest import scan_sources
+from core.directory_index import (
+    INDEX_FILENAME,
+    StackIndex,
+    level_summaries,
+    load_index,
+    scan_directory,
+)
+from core.file_handler import FileHandler
+
+
+def _bump_mtime(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+@pytest.fixture
+def stack_dir():
+    directory = tempfile.mkdtemp()
+    for i in range(1, 11):
+        if i == 5:
+            continue
+        Image.fromarray(np.full((12, 16), i, dtype=np.uint8)).save(
+            os.path.join(directory, f"scan_{i:04d}.tif")
+        )
+    Path(directory, "notes.txt").write_text("log")
+    yield directory
+    shutil.rmtree(directory)
+
+
+@pytest.mark.unit
+class TestStackIndex:
+    def test_scan(self, stack_dir):
+        mtime_ns, file_count, files = scan_directory(stack_dir)
+
+        assert mtime_ns == os.stat(stack_dir).st_mtime_ns
+        assert file_count == 10
+        assert len(files) == 9
+        assert {f.prefix for f in files} == {"scan_"}
+
+    def test_gaps_and_stats(self, stack_dir):
+        mtime_ns, _, files = scan_directory(stack_dir)
+        index = StackIndex.from_scan(stack_dir, mtime_ns, files, "scan_", "tif", 16, 12)
+
+        assert (index.seq_begin, index.seq_end, index.index_length) == (1, 10, 4)
+        assert index.gaps() == [5]
+        stats = index.stats(4, 6)
+        assert stats[1] == [-1, -1]
+        assert stats[0][0] == os.path.getsize(os.path.join(stack_dir, "scan_0004.tif"))
+
+    def test_other_padding_counts_as_missing(self, stack_dir):
+        Image.new("L", (16, 12)).save(os.path.join(stack_dir, "scan_5.tif"))
+        mtime_ns, _, files = scan_directory(stack_dir)
+
+        index = StackIndex.from_scan(stack_dir, mtime_ns, files, "scan_", "tif", 16, 12)
+
+        assert index.name(5) is None
+        assert index.name(4) == "scan_0004.tif"
+
+
+@pytest.mark.unit
+class TestSavedIndex:
+    def test_not_saved_without_thumbnail_dir(self, stack_dir):
+        FileHandler().sort_file_list_from_dir(stack_dir)
+
+        assert not os.path.exists(os.path.join(stack_dir, ".thumbnail"))
+        assert load_index(stack_dir) is None
+
+    def test_reopen_does_not_scan(self, stack_dir):
+        os.mkdir(os.path.join(stack_dir, ".thumbnail"))
+        first = FileHandler().sort_file_list_from_dir(stack_dir)
+
+        with patch.object(directory_index.os, "scandir") as scandir:
+            second = FileHandler().sort_file_list_from_dir(stack_dir)
+
+        scandir.assert_not_called()
+        assert second == first
+
+    def test_changed_directory_rescanned(self, stack_dir):
+        os.mkdir(os.path.join(stack_dir, ".thumbnail"))
+        FileHandler().sort_file_list_from_dir(stack_dir)
+        Image.new("L", (16, 12)).save(os.path.join(stack_dir, "scan_0011.tif"))
+        _bump_mtime(stack_dir)
+
+        settings = FileHandler().sort_file_list_from_dir(stack_dir)
+
+        assert settings["seq_end"] == 11
+
+    def test_file_list_matches_exists_checks(self, stack_dir):
+        handler = FileHandler()
+        settings = handler.sort_file_list_from_dir(stack_dir)
+
+        with patch.object(Path, "exists") as exists:
+            file_list = handler.get_file_list(stack_dir, settings)
+
+        exists.assert_not_called()
+        assert file_list == [
+            str(Path(stack_dir) / f"scan_{i:04d}.tif") for i in range(1, 11) if i != 5
+        ]
+
+    def test_scan_sources_saves_index(self, stack_dir):
+        os.mkdir(os.path.join(stack_dir, ".thumbnail"))
+        settings = {
+            "prefix": "scan_",
+            "index_length": 4,
+            "file_type": "tif",
+            "seq_begin": 1,
+            "seq_end": 10,
+            "image_width": 16,
+            "image_height": 12,
+        }
+
+        sources = scan_sources(stack_dir, settings)
+
+        assert sources[4] == [-1, -1]
+        assert load_index(stack_dir).stats(1, 10) == sources
+
+
+@pytest.mark.unit
+class TestLevelSummaries:
+    @pytest.fixture
+    def levels_dir(self, stack_dir):
+        for level, (count, size) in enumerate([(4, 8), (2, 4)], start=1):
+            level_dir = Path(stack_dir) / ".thumbnail" / str(level)
+            level_dir.mkdir(parents=True)
+            for i in range(count):
+                Image.new("L", (size, size // 2)).save(level_dir / f"{i:06}.tif")
+        return stack_dir
+
+    def test_summaries(self, levels_dir):
+        summaries = level_summaries(levels_dir, 20)
+
+        assert [(s.level, s.count, s.width, s.height) for s in summaries] == [
+            (1, 4, 8, 4),
+            (2, 2, 4, 2),
+        ]
+        assert os.path.exists(os.path.join(levels_dir, ".thumbnail", INDEX_FILENAME))
+
+    def test_unchanged_levels_not_listed(self, levels_dir):
+        first = level_summaries(levels_dir, 20)
+
+        with patch.object(directory_index.os, "scandir") as scandir:
+            second = level_summaries(levels_dir, 20)
+
+        scandir.assert_not_called()
+        assert second == first
+
+    def test_changed_level_listed_again(self, levels_dir):
+        level_summaries(levels_dir, 20)
+        level_dir = Path(levels_dir) / ".thumbnail" / "2"
+        (level_dir / "000001.tif").unlink()
+        _bump_mtime(level_dir)
+
+        summaries = level_summaries(levels_dir, 20)
+
+        assert summaries[1].count == 1
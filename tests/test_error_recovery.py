@@ -9,6 +9,7 @@
 """
 
 import logging
+import os
 from pathlib import Path
 from unittest.mock import MagicMock, Mock, patch
 
@@ -38,10 +39,10 @@ def test_permission_error_opening_directory(self, file_handler, tmp_path, caplog
         test_dir = tmp_path / "restricted"
         test_dir.mkdir()
 
-        # Mock os.listdir to raise PermissionError
+        # Mock os.scandir to raise PermissionError
         # Should raise PermissionError
         with (
-            patch("os.listdir", side_effect=PermissionError("Access denied")),
+            patch("os.scandir", side_effect=PermissionError("Access denied")),
             pytest.raises(PermissionError),
         ):
             file_handler.open_directory(str(test_dir))
@@ -51,10 +52,10 @@ def test_os_error_opening_directory(self, file_handler, tmp_path, caplog):
         test_dir = tmp_path / "broken"
         test_dir.mkdir()
 
-        # Mock os.listdir to raise OSError
+        # Mock os.scandir to raise OSError
         # Should raise OSError
         with (
-            patch("os.listdir", side_effect=OSError("Disk error")),
+            patch("os.scandir", side_effect=OSError("Disk error")),
             pytest.raises(OSError),
         ):
             file_handler.open_directory(str(test_dir))
@@ -64,10 +65,10 @@ def test_permission_error_sorting_files(self, file_handler, tmp_path, caplog):
         test_dir = tmp_path / "restricted"
         test_dir.mkdir()
 
-        # Mock os.listdir to raise PermissionError
+        # Mock os.scandir to raise PermissionError
         # Should raise PermissionError
         with (
-            patch("os.listdir", side_effect=PermissionError("Access denied")),
+            patch("os.scandir", side_effect=PermissionError("Access denied")),
             pytest.raises(PermissionError),
         ):
             file_handler.sort_file_list_from_dir(str(test_dir))
@@ -261,10 +262,10 @@ def test_network_drive_disconnection(self, file_handler, tmp_path, caplog):
         test_dir = tmp_path / "network"
         test_dir.mkdir()
 
-        # Mock os.listdir to raise OSError (connection lost)
+        # Mock os.scandir to raise OSError (connection lost)
         # Should raise OSError
         with (
-            patch("os.listdir", side_effect=OSError(53, "Network path not found")),
+            patch("os.scandir", side_effect=OSError(53, "Network path not found")),
             pytest.raises(OSError),
         ):
             file_handler.open_directory(str(test_dir))
@@ -279,16 +280,17 @@ def test_intermittent_network_access(self, file_handler, tmp_path):
             img = Image.new("L", (100, 100))
             img.save(test_dir / f"img_{i:04d}.tif")
 
-        # Mock os.listdir to succeed first, then fail
+        # Mock os.scandir to succeed first, then fail
         call_count = [0]
+        real_scandir = os.scandir
 
-        def intermittent_listdir(path):
+        def intermittent_scandir(path):
             call_count[0] += 1
             if call_count[0] > 1:
                 raise OSError(53, "Network error")
-            return ["img_0000.tif", "img_0001.tif", "img_0002.tif"]
+            return real_scandir(path)
 
-        with patch("os.listdir", side_effect=intermittent_listdir):
+        with patch("os.scandir", side_effect=intermittent_scandir):
             # First call should succeed
             result1 = file_handler.open_directory(str(test_dir))
             assert result1 is not None
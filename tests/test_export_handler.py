@@ -13,6 +13,7 @@
 import pytest
 from PIL import Image
 
+from core.volume_processor import VolumeProcessor
 from ui.handlers.export_handler import ExportHandler
 
 
@@ -49,10 +50,14 @@ def mock_main_window(self):
 
         # Level info
         window.level_info = [
-            {"seq_begin": 1, "seq_end": 10},
-            {"seq_begin": 1, "seq_end": 5},
+            {"name": "Original", "width": 100, "height": 100, "seq_begin": 1, "seq_end": 10},
+            {"name": "Level 1", "width": 50, "height": 50, "seq_begin": 1, "seq_end": 5},
         ]
         window.comboLevel.currentIndex.return_value = 0
+        window.curr_level_idx = 0
+        window.image_label.get_crop_area.return_value = [0, 0, 100, 100]
+        window.volume_processor = VolumeProcessor()
+        window.settings_manager.get.side_effect = lambda key, default=None: default
 
         # Mock get_cropped_volume
         volume = np.random.randint(0, 255, (10, 100, 100), dtype=np.uint8)
@@ -80,16 +85,44 @@ def temp_image_stack(self):
         # Cleanup
         shutil.rmtree(temp_dir)
 
+    @pytest.fixture
+    def export_level(self, mock_main_window, tmp_path):
+        """Export from level 1, packed in a container; dialogs and cursor patched.
+
+        Yields the progress dialog mock, whose is_cancelled stops meshing.
+        """
+        base = tmp_path / "scan"
+        (base / ".thumbnail").mkdir(parents=True)
+        volume = np.zeros((5, 50, 50), dtype=np.uint8)
+        volume[1:4, 10:40, 10:40] = 200
+        np.save(base / ".thumbnail" / "level_1.npy", volume)
+        mock_main_window.edtDirname.text.return_value = str(base)
+
+        progress = MagicMock(is_cancelled=False)
+        with (
+            patch(
+                "ui.handlers.export_handler.QInputDialog.getItem",
+                side_effect=lambda parent, title, label, items, current, editable: (
+                    items[1],
+                    True,
+                ),
+            ),
+            patch("ui.handlers.export_handler.ProgressDialog", return_value=progress),
+            patch("ui.handlers.export_handler.QApplication"),
+            patch("utils.ui_utils.QApplication"),
+        ):
+            yield progress
+
     def test_initialization(self, handler, mock_main_window):
         """Test handler initializes correctly"""
         assert handler is not None
         assert handler.window == mock_main_window
 
     @patch("ui.handlers.export_handler.QFileDialog.getSaveFileName")
-    @patch("ui.handlers.export_handler.mcubes.marching_cubes")
+    @patch("core.slab_mcubes.mcubes.marching_cubes")
     @patch("ui.handlers.export_handler.SecureFileValidator")
     def test_export_obj_basic(
-        self, mock_validator_cls, mock_mcubes, mock_dialog, handler, tmp_path
+        self, mock_validator_cls, mock_mcubes, mock_dialog, handler, tmp_path, export_level
     ):
         """Test basic OBJ export functionality"""
         # Setup
@@ -129,10 +162,10 @@ def test_export_obj_cancelled(self, mock_dialog, handler):
         mock_dialog.assert_called_once()
 
     @patch("ui.handlers.export_handler.QFileDialog.getSaveFileName")
-    @patch("ui.handlers.export_handler.mcubes.marching_cubes")
+    @patch("core.slab_mcubes.mcubes.marching_cubes")
     @patch("ui.handlers.export_handler.QMessageBox.critical")
     def test_export_obj_mesh_generation_failure(
-        self, mock_msg, mock_mcubes, mock_dialog, handler, tmp_path
+        self, mock_msg, mock_mcubes, mock_dialog, handler, tmp_path, export_level
     ):
         """Test OBJ export when mesh generation fails"""
         # Setup
@@ -153,10 +186,10 @@ def test_export_obj_mesh_generation_failure(
         assert "Failed to generate 3D mesh" in call_args[2]
 
     @patch("ui.handlers.export_handler.QFileDialog.getSaveFileName")
-    @patch("ui.handlers.export_handler.mcubes.marching_cubes")
+    @patch("core.slab_mcubes.mcubes.marching_cubes")
     @patch("ui.handlers.export_handler.SecureFileValidator")
     def test_export_obj_vertex_transformation(
-        self, mock_validator_cls, mock_mcubes, mock_dialog, handler, tmp_path
+        self, mock_validator_cls, mock_mcubes, mock_dialog, handler, tmp_path, export_level
     ):
         """Test that vertices are properly transformed (axis swap)"""
         # Setup
@@ -179,14 +212,14 @@ def test_export_obj_vertex_transformation(
         # Verify transformation (should swap to [z, x, y])
         with open(obj_file) as f:
             content = f.read()
-            assert "v 3.0 1.0 2.0" in content  # First vertex transformed
-            assert "v 6.0 4.0 5.0" in content  # Second vertex transformed
+            assert "v 3 1 2" in content  # First vertex transformed
+            assert "v 6 4 5" in content  # Second vertex transformed
 
     @patch("ui.handlers.export_handler.QFileDialog.getSaveFileName")
-    @patch("ui.handlers.export_handler.mcubes.marching_cubes")
+    @patch("core.slab_mcubes.mcubes.marching_cubes")
     @patch("ui.handlers.export_handler.SecureFileValidator")
     def test_export_obj_face_indexing(
-        self, mock_validator_cls, mock_mcubes, mock_dialog, handler, tmp_path
+        self, mock_validator_cls, mock_mcubes, mock_dialog, handler, tmp_path, export_level
     ):
         """Test that faces use 1-based indexing in OBJ format"""
         # Setup
@@ -210,6 +243,121 @@ def test_export_obj_face_indexing(
             content = f.read()
             assert "f 1 2 3" in content  # Should be 1-based
 
+    @patch("ui.handlers.export_handler.QFileDialog.getSaveFileName")
+    @patch("core.slab_mcubes.mcubes.marching_cubes")
+    def test_export_stl_by_default(self, mock_mcubes, mock_dialog, handler, tmp_path, export_level):
+        """STL is offered first and written in binary"""
+        stl_file = tmp_path / "test.stl"
+        mock_dialog.return_value = (str(stl_file), "STL format (*.stl)")
+        mock_mcubes.return_value = (
+            np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0]], dtype=float),
+            np.array([[0, 1, 2]], dtype=np.uint64),
+        )
+
+        handler.export_3d_model_to_obj()
+
+        filters, selected = mock_dialog.call_args[0][3:5]
+        assert filters.split(";;") == [
+            "STL format (*.stl)",
+            "PLY format (*.ply)",
+            "OBJ format (*.obj)",
+        ]
+        assert selected == "STL format (*.stl)"
+        data = stl_file.read_bytes()
+        assert len(data) == 84 + 50
+        assert np.frombuffer(data, "<u4", count=1, offset=80)[0] == 1
+        assert list(tmp_path.glob("tmp*")) == []
+
+    @patch("ui.handlers.export_handler.QFileDialog.getSaveFileName")
+    @patch("core.slab_mcubes.mcubes.marching_cubes")
+    def test_export_adds_chosen_extension(
+        self, mock_mcubes, mock_dialog, handler, tmp_path, export_level
+    ):
+        """A name typed without an extension gets the chosen filter's"""
+        mock_dialog.return_value = (str(tmp_path / "model"), "PLY format (*.ply)")
+        mock_mcubes.return_value = (
+            np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0]], dtype=float),
+            np.array([[0, 1, 2]], dtype=np.uint64),
+        )
+        settings = {"export.mesh_normals": True}
+        handler.window.settings_manager.get.side_effect = lambda key, default=None: settings.get(
+            key, default
+        )
+
+        handler.export_3d_model_to_obj()
+
+        data = (tmp_path / "model.ply").read_bytes()
+        header, body = data.split(b"end_header\n")
+        assert b"format binary_little_endian 1.0" in header
+        assert b"property float nx" in header
+        assert len(body) == 3 * 24 + 13
+
+    @patch("ui.handlers.export_handler.QFileDialog.getSaveFileName")
+    def test_export_obj_meshes_selected_level(self, mock_dialog, handler, tmp_path, export_level):
+        """The ROI is meshed at the level chosen, read from its container"""
+        obj_file = str(tmp_path / "test.obj")
+        mock_dialog.return_value = (obj_file, "OBJ format (*.obj)")
+        # Left half of the level 0 view: x 0..25 of level 1
+        handler.window.image_label.get_crop_area.return_value = [0, 0, 50, 100]
+
+        handler.export_3d_model_to_obj()
+
+        with open(obj_file) as f:
+            vertices = np.array(
+                [line.split()[1:] for line in f if line.startswith("v ")], dtype=float
+            )
+        # [z, x, y]: x is the first column, cut at the ROI's edge
+        # Threshold 127.5 between 0 and 200 sits 0.6375 voxels out
+        np.testing.assert_allclose(vertices.min(axis=0), [9.6375, 0.6375, 9.6375], rtol=1e-6)
+        np.testing.assert_allclose(vertices.max(axis=0), [24, 3.3625, 39.3625], rtol=1e-6)
+        assert export_level.pb_progress.setValue.call_args[0][0] == 100
+
+    @patch("ui.handlers.export_handler.QFileDialog.getSaveFileName")
+    def test_export_obj_from_original_images(
+        self, mock_dialog, handler, tmp_path, temp_image_stack, export_level
+    ):
+        """Level 0 is read from the original files"""
+        obj_file = str(tmp_path / "test.obj")
+        mock_dialog.return_value = (obj_file, "OBJ format (*.obj)")
+        handler.window.edtDirname.text.return_value = temp_image_stack
+
+        with patch(
+            "ui.handlers.export_handler.QInputDialog.getItem",
+            side_effect=lambda parent, title, label, items, current, editable: (items[0], True),
+        ):
+            handler.export_3d_model_to_obj()
+
+        # Slices are uniform, 25 apart: one plane between 125 and 150
+        with open(obj_file) as f:
+            assert sum(line.startswith("v ") for line in f) == 100 * 100
+
+    @patch("ui.handlers.export_handler.QFileDialog.getSaveFileName")
+    @patch("ui.handlers.export_handler.QMessageBox.critical")
+    def test_export_obj_cancelled_while_meshing(
+        self, mock_msg, mock_dialog, handler, tmp_path, export_level
+    ):
+        """Cancelling the progress dialog writes nothing and reports no error"""
+        obj_file = tmp_path / "test.obj"
+        mock_dialog.return_value = (str(obj_file), "OBJ format (*.obj)")
+        export_level.is_cancelled = True
+
+        handler.export_3d_model_to_obj()
+
+        assert not obj_file.exists()
+        mock_msg.assert_not_called()
+        export_level.close.assert_called_once()
+
+    @patch("ui.handlers.export_handler.QFileDialog.getSaveFileName")
+    def test_export_obj_level_choice_cancelled(self, mock_dialog, handler, tmp_path):
+        """Cancelling the level choice exports nothing"""
+        obj_file = tmp_path / "test.obj"
+        mock_dialog.return_value = (str(obj_file), "OBJ format (*.obj)")
+
+        with patch("ui.handlers.export_handler.QInputDialog.getItem", return_value=("", False)):
+            handler.export_3d_model_to_obj()
+
+        assert not obj_file.exists()
+
     @patch("ui.handlers.export_handler.QFileDialog.getExistingDirectory")
     @patch("ui.handlers.export_handler.QApplication.setOverrideCursor")
     @patch("ui.handlers.export_handler.QApplication.restoreOverrideCursor")
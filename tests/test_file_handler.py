@@ -151,15 +151,6 @@ def test_sort_file_list_no_pattern(self, handler):
         finally:
             shutil.rmtree(temp_dir)
 
-    def test_natural_sort(self, handler):
-        """Test natural sorting of filenames"""
-        pattern = r"^(.*?)(\d+)\.(\w+)$"
-        files = ["slice_1.tif", "slice_10.tif", "slice_2.tif", "slice_20.tif"]
-
-        sorted_files = handler._natural_sort(files, pattern)
-
-        assert sorted_files == ["slice_1.tif", "slice_2.tif", "slice_10.tif", "slice_20.tif"]
-
     def test_get_file_list(self, handler, temp_ct_dir):
         """Test getting full file paths"""
         settings = handler.sort_file_list_from_dir(temp_ct_dir)
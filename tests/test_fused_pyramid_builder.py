@@ -0,0 +1,145 @@
+"""
+Tests for FusedPyramidBuilder (core/fused_pyramid_builder.py)
+
+The builder must write exactly the files the level-by-level path writes while
+reading each source slice only once.
+"""
+
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from core.fused_pyramid_builder import FusedPyramidBuilder, count_pyramid_levels
+from core.progress_manager import ProgressManager
+from core.pyramid_engine import PyramidEngine
+from tests.conftest import MockProgressDialog, write_stack
+
+SETTINGS = {"prefix": "slice_", "index_length": 4, "file_type": "tif"}
+
+
+def _build_level_by_level(directory, count, num_levels, size=64):
+    """Reference: PyramidEngine's level-by-level build, each level read from the last."""
+    engine = PyramidEngine(
+        max_thumbnail_size=size >> (num_levels - 1), use_manifest=False, level_containers=False
+    )
+    settings = {**SETTINGS, "image_width": size, "image_height": size}
+    result = engine.build(directory, {**settings, "seq_begin": 0, "seq_end": count - 1})
+    assert result.levels_built == num_levels
+
+
+def _read_levels(directory, num_levels):
+    levels = {}
+    for level in range(1, num_levels + 1):
+        level_dir = os.path.join(directory, ".thumbnail", str(level))
+        levels[level] = {
+            name: np.array(Image.open(os.path.join(level_dir, name)))
+            for name in sorted(os.listdir(level_dir))
+        }
+    return levels
+
+
+@pytest.fixture
+def stack_dirs():
+    dirs = [tempfile.mkdtemp(), tempfile.mkdtemp()]
+    yield dirs
+    for d in dirs:
+        shutil.rmtree(d)
+
+
+def _builder(dialog=None):
+    manager = ProgressManager()
+    manager.start(1000)
+    return FusedPyramidBuilder(dialog, manager, [1.0, 0.25, 0.0625])
+
+
+class TestCountPyramidLevels:
+    @pytest.mark.parametrize(
+        "size,expected",
+        [(2048, 3), (1024, 2), (600, 1), (512, 1), (100, 1), (3, 0)],
+    )
+    def test_matches_generate_python_loop(self, size, expected):
+        assert count_pyramid_levels(size, 512) == expected
+
+
+@pytest.mark.unit
+class TestFusedPyramidBuilder:
+    @pytest.mark.parametrize("count", [8, 11, 1, 5])
+    def test_output_identical_to_level_by_level(self, qtbot, stack_dirs, count):
+        fused_dir, reference_dir = stack_dirs
+        for d in stack_dirs:
+            write_stack(d, count)
+
+        _builder().build(fused_dir, SETTINGS, 0, count - 1, 3)
+        _build_level_by_level(reference_dir, count, 3)
+
+        fused = _read_levels(fused_dir, 3)
+        reference = _read_levels(reference_dir, 3)
+        for level in (1, 2, 3):
+            assert sorted(fused[level]) == sorted(reference[level])
+            for name, arr in reference[level].items():
+                np.testing.assert_array_equal(fused[level][name], arr)
+
+    def test_each_source_read_once(self, qtbot, stack_dirs):
+        write_stack(stack_dirs[0], 11)
+        builder = _builder()
+
+        builder.build(stack_dirs[0], SETTINGS, 0, 10, 3)
+
+        assert builder.source_reads == 11
+        # 6 + 3 + 2 outputs
+        assert builder.generated_count == 11
+        assert builder.completed_tasks == 11
+
+    def test_complete_pyramid_is_not_reread(self, qtbot, stack_dirs):
+        write_stack(stack_dirs[0], 11)
+        _builder().build(stack_dirs[0], SETTINGS, 0, 10, 3)
+
+        builder = _builder()
+        builder.build(stack_dirs[0], SETTINGS, 0, 10, 3)
+
+        assert builder.source_reads == 0
+        assert builder.generated_count == 0
+        assert builder.loaded_count == 11
+
+    def test_resume_reads_only_incomplete_groups(self, qtbot, stack_dirs):
+        write_stack(stack_dirs[0], 16)
+        _builder().build(stack_dirs[0], SETTINGS, 0, 15, 3)
+        # Drop one level-1 output of the second group of eight
+        os.remove(os.path.join(stack_dirs[0], ".thumbnail", "1", "000005.tif"))
+
+        builder = _builder()
+        builder.build(stack_dirs[0], SETTINGS, 0, 15, 3)
+
+        assert builder.source_reads == 8
+        assert builder.generated_count == 1
+        assert os.path.exists(os.path.join(stack_dirs[0], ".thumbnail", "1", "000005.tif"))
+
+    def test_cancellation_stops_reading(self, qtbot, stack_dirs):
+        write_stack(stack_dirs[0], 8)
+        builder = _builder(MockProgressDialog(cancelled=True))
+
+        builder.build(stack_dirs[0], SETTINGS, 0, 7, 3)
+
+        assert builder.is_cancelled
+        assert builder.source_reads == 0
+
+    def test_missing_source_raises(self, qtbot, stack_dirs):
+        write_stack(stack_dirs[0], 4)
+        os.remove(os.path.join(stack_dirs[0], "slice_0002.tif"))
+
+        with pytest.raises(FileNotFoundError):
+            _builder().build(stack_dirs[0], SETTINGS, 0, 3, 2)
+
+    def test_mixed_depth_follows_first_slice(self, qtbot, stack_dirs):
+        write_stack(stack_dirs[0], 2, dtype=np.uint16)
+        arr = np.full((64, 64), 200, dtype=np.uint8)
+        Image.fromarray(arr).save(os.path.join(stack_dirs[0], "slice_0001.tif"))
+
+        _builder().build(stack_dirs[0], SETTINGS, 0, 1, 1)
+
+        out = np.array(Image.open(os.path.join(stack_dirs[0], ".thumbnail", "1", "000000.tif")))
+        assert out.dtype == np.uint16
@@ -128,10 +128,8 @@ def test_should_use_rust_detection(self, mock_main_window):
 
     @patch("ui.errors.QMessageBox")
     @patch("ui.handlers.thumbnail_creation_handler.ProgressDialog")
-    @patch("core.thumbnail_manager.ThumbnailManager")
     def test_python_thumbnail_creation_workflow(
         self,
-        MockThumbnailManager,
         MockProgressDialog,
         MockQMessageBox,
         mock_main_window,
@@ -160,11 +158,6 @@ def test_python_thumbnail_creation_workflow(
         mock_progress.is_cancelled = False
         MockProgressDialog.return_value = mock_progress
 
-        # Mock ThumbnailManager
-        mock_manager = MagicMock()
-        mock_manager.generate_pyramid.return_value = True
-        MockThumbnailManager.return_value = mock_manager
-
         # Execute
         result = handler.create_thumbnail_python()
 
@@ -172,13 +165,10 @@ def test_python_thumbnail_creation_workflow(
         assert isinstance(result, bool)
         # Verify progress dialog was created
         MockProgressDialog.assert_called_once()
-        # Note: ThumbnailManager may or may not be called depending on level_info state
-        # The important thing is the handler executed without crashing
 
     @patch("ui.handlers.thumbnail_creation_handler.ProgressDialog")
-    @patch("core.thumbnail_manager.ThumbnailManager")
     def test_thumbnail_creation_cancellation(
-        self, MockThumbnailManager, MockProgressDialog, mock_main_window, temp_ct_directory
+        self, MockProgressDialog, mock_main_window, temp_ct_directory
     ):
         """Should handle user cancellation during thumbnail creation."""
         handler = mock_main_window.thumbnail_creation_handler
@@ -203,10 +193,6 @@ def test_thumbnail_creation_cancellation(
         mock_progress.is_cancelled = True
         MockProgressDialog.return_value = mock_progress
 
-        # Mock ThumbnailManager
-        mock_manager = MagicMock()
-        MockThumbnailManager.return_value = mock_manager
-
         # Execute Python thumbnail creation
         result = handler.create_thumbnail_python()
 
@@ -215,10 +201,8 @@ def test_thumbnail_creation_cancellation(
 
     @patch("ui.errors.QMessageBox")
     @patch("ui.handlers.thumbnail_creation_handler.ProgressDialog")
-    @patch("core.thumbnail_manager.ThumbnailManager")
     def test_thumbnail_creation_updates_state(
         self,
-        MockThumbnailManager,
         MockProgressDialog,
         MockQMessageBox,
         mock_main_window,
@@ -246,11 +230,6 @@ def test_thumbnail_creation_updates_state(
         mock_progress.is_cancelled = False
         MockProgressDialog.return_value = mock_progress
 
-        # Mock ThumbnailManager
-        mock_manager = MagicMock()
-        mock_manager.generate_pyramid.return_value = True
-        MockThumbnailManager.return_value = mock_manager
-
         # Execute
         result = handler.create_thumbnail_python()
 
@@ -450,10 +429,8 @@ class TestFullWorkflowIntegration:
     @patch("ui.handlers.directory_open_handler.QFileDialog")
     @patch("ui.errors.QMessageBox")
     @patch("ui.handlers.thumbnail_creation_handler.ProgressDialog")
-    @patch("core.thumbnail_manager.ThumbnailManager")
     def test_complete_directory_to_thumbnail_workflow(
         self,
-        MockThumbnailManager,
         MockProgressDialog,
         MockQMessageBox,
         MockFileDialog,
@@ -482,10 +459,6 @@ def test_complete_directory_to_thumbnail_workflow(
         mock_progress.is_cancelled = False
         MockProgressDialog.return_value = mock_progress
 
-        mock_manager = MagicMock()
-        mock_manager.generate_pyramid.return_value = True
-        MockThumbnailManager.return_value = mock_manager
-
         # Step 1: Open directory
         mock_main_window.directory_open_handler.open_directory()
 
@@ -585,9 +558,8 @@ def test_recovery_from_failed_directory_open(
         assert mock_main_window.settings_hash["prefix"] == "test_"
 
     @patch("ui.handlers.thumbnail_creation_handler.ProgressDialog")
-    @patch("core.thumbnail_manager.ThumbnailManager")
     def test_recovery_from_failed_thumbnail_creation(
-        self, MockThumbnailManager, MockProgressDialog, mock_main_window, temp_ct_directory
+        self, MockProgressDialog, mock_main_window, temp_ct_directory
     ):
         """Should handle thumbnail creation failure gracefully."""
         handler = mock_main_window.thumbnail_creation_handler
@@ -611,16 +583,18 @@ def test_recovery_from_failed_thumbnail_creation(
         mock_progress = MagicMock()
         mock_progress.is_cancelled = False
         MockProgressDialog.return_value = mock_progress
-
-        mock_manager = MagicMock()
-        mock_manager.generate_pyramid.return_value = False  # Failure
-        MockThumbnailManager.return_value = mock_manager
+        mock_main_window.thumbnail_generator.generate_python.return_value = {
+            "success": False,
+            "cancelled": False,
+            "error": "Disk failure",
+        }
 
         # Execute
         result = handler.create_thumbnail_python()
 
         # Should return False but not crash
         assert result is False
+        handler.window.thumbnail_generator.generate_python.assert_called_once()
 
 
 @pytest.mark.integration
@@ -8,6 +8,8 @@
 import shutil
 import sys
 import tempfile
+from pathlib import Path
+from unittest.mock import patch
 
 import numpy as np
 import pytest
@@ -24,11 +26,15 @@
 
 if PIL_AVAILABLE:
     from utils.image_utils import (
+        OutputWriteError,
         average_images,
         detect_bit_depth,
         downsample_image,
         get_image_dimensions,
         load_image_as_array,
+        reduce_slices,
+        reduction_scratch,
+        save_image_atomic,
         save_image_from_array,
     )
 
@@ -242,6 +248,125 @@ def test_float_averaging(self):
         assert result.dtype == np.float32
 
 
+@pytest.mark.skipif(not PIL_AVAILABLE, reason="PIL not available")
+class TestReduceSlices:
+    """Tests for reduce_slices()"""
+
+    @staticmethod
+    def _block_mean(*arrays):
+        """The 2x2x2 block mean in floats, rounded half up"""
+        h2, w2 = arrays[0].shape[0] // 2, arrays[0].shape[1] // 2
+        blocks = [a[: 2 * h2, : 2 * w2].astype(np.float64).reshape(h2, 2, w2, 2) for a in arrays]
+        return np.floor(np.mean(blocks, axis=(0, 2, 4)) + 0.5)
+
+    @pytest.mark.parametrize("dtype", [np.uint8, np.uint16])
+    def test_pair_matches_block_mean(self, dtype):
+        """Should round the mean of all eight voxels once, without overflow"""
+        rng = np.random.default_rng(0)
+        top = np.iinfo(dtype).max
+        arr1 = rng.integers(0, top, (9, 11), dtype=dtype, endpoint=True)
+        arr2 = rng.integers(0, top, (9, 11), dtype=dtype, endpoint=True)
+        arr1[0, 0] = arr1[0, 1] = arr1[1, 0] = arr1[1, 1] = top
+        arr2[0, 0] = arr2[0, 1] = arr2[1, 0] = arr2[1, 1] = top
+
+        result = reduce_slices(arr1, arr2)
+
+        assert result.dtype == dtype
+        assert result.shape == (4, 5)
+        assert result[0, 0] == top
+        np.testing.assert_array_equal(result, self._block_mean(arr1, arr2))
+
+    def test_single_slice(self):
+        """Should halve one slice on its own"""
+        arr = np.arange(16, dtype=np.uint8).reshape(4, 4)
+
+        np.testing.assert_array_equal(reduce_slices(arr), self._block_mean(arr))
+
+    def test_caller_buffers_reused(self):
+        """Should write into out and leave the scratch reusable"""
+        out = np.empty((2, 2), dtype=np.uint16)
+        scratch = reduction_scratch((4, 4), np.uint16)
+
+        for value in (100, 200):
+            arr = np.full((4, 4), value, dtype=np.uint16)
+            result = reduce_slices(arr, arr, out=out, scratch=scratch)
+            assert result is out
+            assert np.all(out == value)
+
+    def test_float_and_color(self):
+        """Should average floats exactly and reduce each channel"""
+        floats = reduce_slices(np.full((2, 2), 0.5, np.float32), np.full((2, 2), 1.0, np.float32))
+        color = reduce_slices(np.zeros((4, 6, 3), dtype=np.uint8))
+
+        assert floats.dtype == np.float32
+        assert floats[0, 0] == pytest.approx(0.75)
+        assert color.shape == (2, 3, 3)
+
+    def test_wrong_shapes_rejected(self):
+        """Should refuse a mismatched partner or output"""
+        arr = np.zeros((4, 4), dtype=np.uint8)
+        with pytest.raises(ValueError):
+            reduce_slices(arr, np.zeros((4, 5), dtype=np.uint8))
+        with pytest.raises(ValueError):
+            reduce_slices(arr, out=np.zeros((4, 4), dtype=np.uint8))
+
+
+@pytest.mark.skipif(not PIL_AVAILABLE, reason="PIL not available")
+class TestSaveImageAtomic:
+    """Tests for save_image_atomic()"""
+
+    def setup_method(self):
+        """Create temporary directory"""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def teardown_method(self):
+        """Clean up temporary directory"""
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def test_writes_array_and_image(self):
+        """Should write arrays and PIL images, in the format of the extension"""
+        arr = np.arange(100, dtype=np.uint16).reshape(10, 10)
+        tif_path = os.path.join(self.temp_dir, "out.tif")
+        png_path = os.path.join(self.temp_dir, "out.png")
+
+        save_image_atomic(arr, tif_path)
+        save_image_atomic(Image.fromarray(arr.astype(np.uint8)), png_path)
+
+        with Image.open(tif_path) as img:
+            assert np.array_equal(np.array(img), arr)
+        with Image.open(png_path) as img:
+            assert img.format == "PNG"
+        assert sorted(os.listdir(self.temp_dir)) == ["out.png", "out.tif"]
+
+    def test_failed_write_leaves_previous_file(self):
+        """A write that fails part way must not replace or truncate the old file"""
+        output_path = os.path.join(self.temp_dir, "out.tif")
+        save_image_atomic(np.ones((10, 10), dtype=np.uint8), output_path)
+        before = Path(output_path).read_bytes()
+
+        with (
+            patch.object(Image.Image, "save", side_effect=OSError(28, "No space left on device")),
+            pytest.raises(OutputWriteError) as excinfo,
+        ):
+            save_image_atomic(np.zeros((10, 10), dtype=np.uint8), output_path)
+
+        assert excinfo.value.errno == 28
+        assert excinfo.value.filename == output_path
+        assert Path(output_path).read_bytes() == before
+        assert os.listdir(self.temp_dir) == ["out.tif"]
+
+    def test_error_survives_pickling(self):
+        """Process-pool workers send it back to the engine pickled"""
+        import pickle
+
+        data = pickle.dumps(OutputWriteError(28, "No space left", "out.tif"))
+        error = pickle.loads(data)  # noqa: S301
+
+        assert isinstance(error, OutputWriteError)
+        assert (error.errno, error.filename) == (28, "out.tif")
+
+
 @pytest.mark.skipif(not PIL_AVAILABLE, reason="PIL not available")
 class TestSaveImageFromArray:
     """Tests for save_image_from_array()"""
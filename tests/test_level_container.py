@@ -0,0 +1,149 @@
+"""
+Tests for single-file pyramid level containers (core/level_container.py)
+
+A container must hold exactly what the level's TIFF files hold, never outlive
+a rebuild of the level, and be optional: readers without one use the files.
+"""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from core.level_container import (
+    container_path,
+    load_level,
+    open_level,
+    pack_level,
+    remove_all,
+    remove_level,
+)
+from core.pyramid_engine import PyramidEngine
+from core.thumbnail_generator import ThumbnailGenerator
+from tests.conftest import STACK_SETTINGS
+
+
+@pytest.fixture
+def level_dir():
+    base = tempfile.mkdtemp()
+    directory = Path(base) / "1"
+    directory.mkdir()
+    for i in range(5):
+        arr = np.full((6, 8), i * 1000, dtype=np.uint16)
+        Image.fromarray(arr).save(directory / f"{i:06}.tif")
+    yield directory
+    shutil.rmtree(base)
+
+
+def read_level(directory):
+    return np.stack([np.array(Image.open(path)) for path in sorted(Path(directory).glob("*.tif"))])
+
+
+@pytest.mark.unit
+class TestPackLevel:
+    def test_round_trip(self, level_dir):
+        path = pack_level(level_dir, 5)
+
+        assert path == container_path(level_dir.parent, 1)
+        volume = open_level(level_dir.parent, 1)
+        assert volume.shape == (5, 6, 8)
+        assert volume.dtype == np.uint16
+        np.testing.assert_array_equal(volume, read_level(level_dir))
+
+    def test_missing_slice_packs_nothing(self, level_dir):
+        (level_dir / "000003.tif").unlink()
+
+        assert pack_level(level_dir, 5) is None
+        assert sorted(os.listdir(level_dir.parent)) == ["1"]
+
+    def test_cancelled_packs_nothing(self, level_dir):
+        assert pack_level(level_dir, 5, cancel_check=lambda: True) is None
+        assert sorted(os.listdir(level_dir.parent)) == ["1"]
+
+    def test_load_level_applies_transform(self, level_dir):
+        pack_level(level_dir, 5)
+
+        volume = load_level(open_level(level_dir.parent, 1), transform=lambda a: a // 1000)
+
+        assert not isinstance(volume, np.memmap)
+        assert volume[:, 0, 0].tolist() == [0, 1, 2, 3, 4]
+
+
+@pytest.mark.unit
+class TestOpenLevel:
+    def test_no_container(self, level_dir):
+        assert open_level(level_dir.parent, 1) is None
+
+    def test_unreadable_container_ignored(self, level_dir):
+        container_path(level_dir.parent, 1).write_bytes(b"not an array")
+
+        assert open_level(level_dir.parent, 1) is None
+
+    def test_remove(self, level_dir):
+        pack_level(level_dir, 5)
+
+        remove_level(level_dir.parent, 1)
+        remove_level(level_dir.parent, 1)
+
+        assert open_level(level_dir.parent, 1) is None
+
+    def test_remove_all(self, level_dir):
+        pack_level(level_dir, 5)
+
+        remove_all(level_dir.parent)
+
+        assert sorted(os.listdir(level_dir.parent)) == ["1"]
+
+
+@pytest.mark.unit
+class TestEngineContainers:
+    @pytest.mark.parametrize("single_pass", [False, True])
+    def test_every_level_packed(self, stack_dir, single_pass):
+        result = PyramidEngine(max_thumbnail_size=16, single_pass=single_pass).build(
+            stack_dir, STACK_SETTINGS
+        )
+
+        thumbnail_base = Path(stack_dir) / ".thumbnail"
+        for level in range(1, result.levels_built + 1):
+            np.testing.assert_array_equal(
+                open_level(thumbnail_base, level), read_level(thumbnail_base / str(level))
+            )
+
+    def test_disabled(self, stack_dir):
+        PyramidEngine(max_thumbnail_size=16, level_containers=False).build(
+            stack_dir, STACK_SETTINGS
+        )
+
+        assert not list((Path(stack_dir) / ".thumbnail").glob("level_*.npy"))
+
+    def test_stale_container_replaced_on_rebuild(self, stack_dir):
+        thumbnail_base = Path(stack_dir) / ".thumbnail"
+        PyramidEngine(max_thumbnail_size=16).build(stack_dir, STACK_SETTINGS)
+        for i in (2, 3):
+            Image.fromarray(np.zeros((64, 64), dtype=np.uint16)).save(
+                os.path.join(stack_dir, f"slice_{i:04d}.tif")
+            )
+        stat = os.stat(stack_dir)
+        os.utime(stack_dir, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        PyramidEngine(max_thumbnail_size=16).build(stack_dir, STACK_SETTINGS)
+
+        assert not open_level(thumbnail_base, 1)[1].any()
+        np.testing.assert_array_equal(
+            open_level(thumbnail_base, 1), read_level(thumbnail_base / "1")
+        )
+
+    def test_load_thumbnail_data_reads_container(self, stack_dir):
+        PyramidEngine(max_thumbnail_size=64).build(stack_dir, STACK_SETTINGS)
+        from_files, _ = ThumbnailGenerator().load_thumbnail_data(stack_dir, 512)
+        shutil.rmtree(Path(stack_dir) / ".thumbnail" / "1")
+        (Path(stack_dir) / ".thumbnail" / "1").mkdir()
+
+        volume, info = ThumbnailGenerator().load_thumbnail_data(stack_dir, 512)
+
+        assert info["current_level"] == 1
+        np.testing.assert_array_equal(volume, from_files)
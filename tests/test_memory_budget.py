@@ -0,0 +1,164 @@
+"""
+Tests for the pyramid build memory budget (core/memory_budget.py)
+
+processing.memory_limit_gb must bound what a build holds at once: tasks in
+flight, slices read ahead, queued writes and the level kept for the 3D view.
+A budget too small for even one image must slow the build down, not stop it.
+"""
+
+import os
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from config.constants import (
+    DEFAULT_MEMORY_LIMIT_GB,
+    MEMORY_SHARE_PREFETCH,
+    MEMORY_SHARE_VOLUME,
+    WRITE_QUEUE_MAX_PENDING,
+)
+from core import pyramid_engine
+from core.memory_budget import (
+    MemoryBudget,
+    pipeline_depths,
+    reduce_task_bytes,
+    resolve_memory_limit,
+)
+from core.pyramid_engine import PyramidEngine
+from core.thumbnail_generator import ThumbnailGenerator
+from tests.conftest import STACK_SETTINGS
+
+MIB = 1024 * 1024
+GIB = 1024 * MIB
+
+
+@pytest.mark.unit
+class TestMemoryBudget:
+    @pytest.mark.parametrize("value", [None, 0, -2, "lots"])
+    def test_unset_or_invalid_limit_uses_default(self, value):
+        assert resolve_memory_limit(value) == DEFAULT_MEMORY_LIMIT_GB
+
+    def test_limit_from_setting(self):
+        assert MemoryBudget("2").limit_bytes == 2 * GIB
+        assert MemoryBudget(0.5).limit_bytes == GIB // 2
+
+    def test_shares_stay_within_limit(self):
+        budget = MemoryBudget(1)
+
+        assert sum(budget.share(part) for part in MemoryBudget.SHARES) <= budget.limit_bytes
+
+    def test_in_flight_capped_by_task_size(self):
+        budget = MemoryBudget(1)
+        task_bytes = reduce_task_bytes(4096, 4096, 2)
+
+        assert budget.max_in_flight(task_bytes, wanted=16) == budget.share("tasks") // task_bytes
+        assert budget.max_in_flight(reduce_task_bytes(64, 64, 1), wanted=4) == 4
+
+    def test_never_below_one(self):
+        budget = MemoryBudget(0.001)
+
+        assert budget.max_in_flight(GIB, wanted=8) == 1
+        assert budget.prefetch_window(GIB) == 1
+        assert budget.write_queue_length(GIB) == 1
+
+    def test_write_queue_capped_at_default(self):
+        assert MemoryBudget(64).write_queue_length(1024) == WRITE_QUEUE_MAX_PENDING
+
+    def test_split_among_jobs(self):
+        assert MemoryBudget(4).split(4).limit_bytes == GIB
+
+    def test_volume_share(self):
+        budget = MemoryBudget(1)
+
+        assert budget.fits_volume(budget.share("volume"))
+        assert not budget.fits_volume(budget.share("volume") + 1)
+
+
+@pytest.mark.unit
+class TestPipelineDepths:
+    def test_small_budget_shortens_both(self, stack_dir):
+        reads = sorted(str(p) for p in Path(stack_dir).glob("*.tif"))
+        slice_bytes = 64 * 64 * 2
+        budget = MemoryBudget(4 * slice_bytes / MEMORY_SHARE_PREFETCH / GIB)
+
+        assert pipeline_depths(reads, budget) == (4, min(WRITE_QUEUE_MAX_PENDING, 16))
+
+    def test_defaults_without_budget(self, stack_dir):
+        reads = sorted(str(p) for p in Path(stack_dir).glob("*.tif"))
+
+        _, max_pending = pipeline_depths(reads, None)
+
+        assert max_pending == WRITE_QUEUE_MAX_PENDING
+
+
+@pytest.mark.unit
+class TestEngineWithinBudget:
+    def test_tasks_in_flight_capped(self, stack_dir):
+        running = 0
+        peak = 0
+        lock = threading.Lock()
+        reduce_pair = pyramid_engine.reduce_pair
+
+        def counting_reduce_pair(*args, **kwargs):
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            try:
+                return reduce_pair(*args, **kwargs)
+            finally:
+                with lock:
+                    running -= 1
+
+        engine = PyramidEngine(
+            workers=4, max_thumbnail_size=16, memory_budget=MemoryBudget(0.000001)
+        )
+        with patch("core.pyramid_engine.reduce_pair", side_effect=counting_reduce_pair):
+            result = engine.build(stack_dir, STACK_SETTINGS)
+
+        assert peak == 1
+        assert not result.cancelled
+        assert len(list((Path(stack_dir) / ".thumbnail" / "1").glob("*.tif"))) == 8
+
+    def test_generous_budget_uses_every_worker(self, stack_dir):
+        engine = PyramidEngine(workers=4, memory_budget=MemoryBudget(4))
+
+        assert engine._level_in_flight({"level": 1, "width": 32, "height": 32}) == 4
+
+
+@pytest.mark.unit
+class TestVolumeWithinBudget:
+    def test_level_too_big_for_budget_skipped(self, stack_dir):
+        PyramidEngine(max_thumbnail_size=8).build(stack_dir, STACK_SETTINGS)
+        # Level 1 is 8 slices of 32x32 at 8 bits; the volume share has room
+        # for level 2's 4 slices of 16x16 only
+        limit_gb = (4 * 16 * 16) / MEMORY_SHARE_VOLUME / GIB
+
+        _, info = ThumbnailGenerator().load_thumbnail_data(
+            stack_dir, max_thumbnail_size=512, memory_limit_gb=limit_gb
+        )
+
+        assert info["current_level"] == 2
+
+    def test_nothing_fits_spilled_to_disk(self, stack_dir):
+        PyramidEngine(max_thumbnail_size=64).build(stack_dir, STACK_SETTINGS)
+
+        volume, info = ThumbnailGenerator().load_thumbnail_data(
+            stack_dir, max_thumbnail_size=512, memory_limit_gb=0.000001
+        )
+
+        assert info["current_level"] == 1
+        assert isinstance(volume, np.memmap)
+        assert volume.shape == (8, 32, 32)
+        assert sorted(os.listdir(Path(stack_dir) / ".thumbnail")) == [
+            "1",
+            "directory_index.json",
+            "index.json",
+            "level_1.npy",
+            "manifest.json",
+            "preview.json",
+            "preview.npy",
+        ]
@@ -0,0 +1,82 @@
+"""
+Tests for reducing preview meshes to a triangle budget (core/mesh_decimation.py)
+"""
+
+import numpy as np
+import pytest
+
+from config.constants import PREVIEW_TRIANGLE_BUDGET
+from core.mesh_decimation import decimate_mesh
+from core.mesh_service import build_mesh
+
+
+def _sphere_mesh(size=40, radius=15):
+    grid = np.indices((size, size, size)) - size // 2
+    volume = np.where((grid**2).sum(axis=0) < radius**2, 200, 0).astype(np.uint8)
+    return build_mesh(volume, 100, 1.0, False)
+
+
+@pytest.mark.unit
+class TestDecimateMesh:
+    def test_within_budget(self):
+        mesh = _sphere_mesh()
+        budget = len(mesh["triangles"]) // 10
+
+        decimated = decimate_mesh(mesh, budget)
+
+        assert 0 < len(decimated["triangles"]) <= budget
+        assert len(decimated["vertices"]) == len(decimated["vertex_normals"])
+        assert decimated["triangles"].max() < len(decimated["vertices"])
+
+    def test_keeps_the_silhouette(self):
+        mesh = _sphere_mesh()
+        centre = mesh["vertices"].mean(axis=0)
+        radius = np.linalg.norm(mesh["vertices"] - centre, axis=1).mean()
+
+        decimated = decimate_mesh(mesh, len(mesh["triangles"]) // 20)
+
+        distances = np.linalg.norm(decimated["vertices"] - centre, axis=1)
+        assert np.abs(distances - radius).max() < 0.1 * radius
+
+    def test_normals_unit_length_and_outward(self):
+        mesh = _sphere_mesh()
+
+        decimated = decimate_mesh(mesh, len(mesh["triangles"]) // 10)
+
+        assert np.allclose(np.linalg.norm(decimated["vertex_normals"], axis=1), 1.0, atol=1e-5)
+        outward = decimated["vertices"] - decimated["vertices"].mean(axis=0)
+        agree = np.einsum("ij,ij->i", outward, decimated["vertex_normals"])
+        original = np.einsum(
+            "ij,ij->i", mesh["vertices"] - mesh["vertices"].mean(axis=0), mesh["vertex_normals"]
+        )
+        assert np.sign(np.median(agree)) == np.sign(np.median(original))
+
+    def test_within_budget_unchanged(self):
+        mesh = _sphere_mesh(size=20, radius=5)
+
+        assert decimate_mesh(mesh, len(mesh["triangles"])) is mesh
+        assert decimate_mesh(mesh, 0) is mesh
+
+    def test_build_mesh_applies_budget(self):
+        mesh = _sphere_mesh()
+        budget = len(mesh["triangles"]) // 4
+
+        grid = np.indices((40, 40, 40)) - 20
+        volume = np.where((grid**2).sum(axis=0) < 15**2, 200, 0).astype(np.uint8)
+        decimated = build_mesh(volume, 100, 1.0, False, triangle_budget=budget)
+
+        assert len(decimated["triangles"]) <= budget
+
+    def test_default_budget_thins_noisy_preview(self):
+        # A bright sphere in a noisy scan, zoomed as the widget's preview is
+        # to 50 voxels on its longest side
+        grid = np.indices((100, 100, 100)) - 50
+        sphere = np.where((grid**2).sum(axis=0) < 40**2, 160, 60)
+        noise = np.random.default_rng(0).normal(0, 60, sphere.shape)
+        volume = np.clip(sphere + noise, 0, 255).astype(np.uint8)
+
+        full = build_mesh(volume, 110, 0.5, False)
+        preview = build_mesh(volume, 110, 0.5, False, triangle_budget=PREVIEW_TRIANGLE_BUDGET)
+
+        assert len(full["triangles"]) > PREVIEW_TRIANGLE_BUDGET
+        assert len(preview["triangles"]) <= PREVIEW_TRIANGLE_BUDGET
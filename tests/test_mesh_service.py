@@ -0,0 +1,186 @@
+"""
+Tests for the 3D preview's background mesh builds and mesh cache (core/mesh_service.py)
+"""
+
+import threading
+
+import numpy as np
+import pytest
+
+from core import mesh_service
+from core.mesh_service import MeshCache, MeshService, build_mesh, mesh_nbytes
+
+
+def _sphere(size=20, radius=5):
+    grid = np.indices((size, size, size)) - size // 2
+    return np.where((grid**2).sum(axis=0) < radius**2, 200, 0).astype(np.uint8)
+
+
+def _mesh(nbytes=100):
+    return {"vertices": np.zeros(nbytes, dtype=np.uint8), "triangles": np.empty((0, 3))}
+
+
+@pytest.mark.unit
+class TestBuildMesh:
+    def test_builds_closed_surface(self):
+        mesh = build_mesh(_sphere(), 100, 1.0, False)
+
+        assert len(mesh["vertices"]) > 0 and len(mesh["triangles"]) > 0
+        lengths = np.linalg.norm(mesh["vertex_normals"], axis=1)
+        assert np.allclose(lengths, 1.0, atol=1e-5)
+
+    def test_cancelled_returns_none(self):
+        assert build_mesh(_sphere(), 100, 1.0, False, cancelled=lambda: True) is None
+
+    def test_volume_not_modified(self):
+        volume = _sphere()
+        before = volume.copy()
+
+        build_mesh(volume, 100, 0.5, True)
+
+        assert np.array_equal(volume, before)
+
+    def test_progress_reported_in_order(self):
+        progress = []
+
+        build_mesh(_sphere(), 100, 1.0, False, progress.append)
+
+        assert progress == sorted(progress) and progress[-1] == 95
+
+    def test_inverse_takes_surface_of_inverted_volume(self):
+        mesh = build_mesh(_sphere(), 100, 1.0, True)
+
+        assert len(mesh["triangles"]) == len(build_mesh(_sphere(), 100, 1.0, False)["triangles"])
+
+    def test_scale_factor_scales_vertices(self):
+        full = build_mesh(_sphere(), 100, 1.0, False)["vertices"]
+        half = build_mesh(_sphere(), 100, 0.5, False)["vertices"]
+
+        assert np.ptp(half, axis=0) == pytest.approx(np.ptp(full, axis=0) / 2, abs=1.5)
+
+    @pytest.mark.parametrize("shape, value", [((10, 10, 10), 128), ((2, 2, 2), 1)])
+    def test_uniform_volume_has_no_surface(self, shape, value):
+        mesh = build_mesh(np.full(shape, value, dtype=np.uint8), 50, 1.0, False)
+
+        assert len(mesh["vertices"]) == 0 and len(mesh["triangles"]) == 0
+
+
+@pytest.mark.unit
+class TestMeshCache:
+    def test_evicts_least_recently_used(self):
+        cache = MeshCache(limit_bytes=300)
+        for isovalue in range(3):
+            cache.put(("roi", isovalue), _mesh())
+        cache.get(("roi", 0))
+
+        cache.put(("roi", 9), _mesh())
+
+        assert ("roi", 1) not in cache
+        assert ("roi", 0) in cache and ("roi", 9) in cache
+
+    def test_oversized_mesh_not_cached(self):
+        cache = MeshCache(limit_bytes=50)
+        cache.put("big", _mesh())
+
+        assert len(cache) == 0
+        assert mesh_nbytes(_mesh()) == 100
+
+
+@pytest.mark.unit
+class TestMeshService:
+    @pytest.fixture
+    def results(self):
+        """Callback recording what it is called with, and an event set on each call."""
+        calls = []
+        done = threading.Event()
+
+        def record(*args):
+            calls.append(args)
+            done.set()
+
+        record.calls = calls
+        record.done = done
+        return record
+
+    def test_builds_then_serves_from_cache(self, results):
+        service = MeshService(MeshCache(10**8), results)
+
+        assert service.request("key", _sphere(), 100, 1.0, False) is None
+        assert results.done.wait(10)
+        generation, key, mesh = results.calls[0]
+
+        assert (generation, key) == (service.generation, "key")
+        assert service.request("key", _sphere(), 100, 1.0, False) is mesh
+        service.close()
+
+    def test_progress_forwarded(self, results):
+        progress = []
+        service = MeshService(MeshCache(10**8), results, on_progress=progress.append)
+
+        service.request(None, _sphere(), 100, 1.0, False)
+        assert results.done.wait(10)
+        service.close()
+
+        assert progress and progress[-1] == 95
+
+    def test_only_newest_request_reported(self, monkeypatch, results):
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow_build(volume, isovalue, scale_factor, is_inverse, progress, cancelled, **kwargs):
+            calls.append(isovalue)
+            started.set()
+            release.wait(5)
+            return None if cancelled() else _mesh()
+
+        monkeypatch.setattr(mesh_service, "build_mesh", slow_build)
+        service = MeshService(MeshCache(10**8), results)
+
+        service.request("a", None, 10, 1.0, False)
+        started.wait(5)
+        service.request("b", None, 20, 1.0, False)
+        service.request("c", None, 30, 1.0, False)
+        release.set()
+        assert results.done.wait(10)
+        service.close()
+
+        assert calls == [10, 30]
+        assert [key for _, key, _ in results.calls] == ["c"]
+        assert "a" not in service.cache and "c" in service.cache
+
+    def test_close_drops_waiting_requests_and_is_not_busy(self, monkeypatch, results):
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow_build(volume, isovalue, scale_factor, is_inverse, progress, cancelled, **kwargs):
+            calls.append(isovalue)
+            started.set()
+            release.wait(5)
+            return None
+
+        monkeypatch.setattr(mesh_service, "build_mesh", slow_build)
+        service = MeshService(MeshCache(10**8), results)
+
+        service.request("a", None, 10, 1.0, False)
+        started.wait(5)
+        service.request("b", None, 20, 1.0, False)
+        threading.Timer(0.2, release.set).start()
+        service.close()
+
+        assert calls == [10]
+        assert not service.busy
+
+    def test_error_reported(self, monkeypatch, results):
+        def failing_build(*args, **kwargs):
+            raise ValueError("no surface")
+
+        monkeypatch.setattr(mesh_service, "build_mesh", failing_build)
+        service = MeshService(MeshCache(10**8), lambda *mesh: None, on_error=results)
+
+        service.request(None, None, 10, 1.0, False)
+        assert results.done.wait(10)
+        service.close()
+
+        assert results.calls == [(1, "no surface")]
@@ -0,0 +1,62 @@
+"""
+Tests for placing meshes in the 3D view's axes (core/mesh_transform.py)
+"""
+
+import numpy as np
+import pytest
+
+from core.mesh_transform import TransformedMeshCache, transform_mesh
+
+
+def _mesh():
+    vertices = np.array([[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]])
+    normals = np.array([[0.0, 0.0, 1.0], [1.0, 0.0, 0.0]])
+    return {"vertices": vertices, "vertex_normals": normals, "triangles": np.zeros((1, 3))}
+
+
+@pytest.mark.unit
+class TestTransformMesh:
+    def test_axis_swap(self):
+        vertices, normals = transform_mesh(_mesh()["vertices"])
+
+        assert vertices.dtype == np.float32
+        assert vertices.tolist() == [[3, 1, 2], [6, 4, 5]]
+        assert normals is None
+
+    def test_scale_then_shift_in_source_axes(self):
+        mesh = _mesh()
+
+        vertices, normals = transform_mesh(
+            mesh["vertices"], mesh["vertex_normals"], scale=0.5, displacement=[0.5, 1.0, 1.5]
+        )
+
+        assert np.allclose(vertices, [[0.0, 0.0, 0.0], [1.5, 1.5, 1.5]])
+        assert normals.tolist() == [[1, 0, 0], [0, 1, 0]]
+
+    def test_source_untouched(self):
+        mesh = _mesh()
+
+        transform_mesh(mesh["vertices"], mesh["vertex_normals"], scale=2.0, displacement=[1, 1, 1])
+
+        assert mesh["vertices"].tolist() == [[1, 2, 3], [4, 5, 6]]
+
+
+@pytest.mark.unit
+class TestTransformedMeshCache:
+    def test_same_input_reuses_result(self):
+        cache = TransformedMeshCache()
+        mesh = _mesh()
+
+        first = cache.get(mesh, scale=0.1, displacement=np.array([1.0, 2.0, 3.0]))
+        second = cache.get(mesh, scale=0.1, displacement=np.array([1.0, 2.0, 3.0]))
+
+        assert first[0] is second[0]
+        assert not first[0].flags.writeable
+
+    def test_new_transform_or_mesh_recomputes(self):
+        cache = TransformedMeshCache()
+        mesh = _mesh()
+        first = cache.get(mesh, scale=0.1)
+
+        assert cache.get(mesh, scale=0.2)[0] is not first[0]
+        assert cache.get(_mesh(), scale=0.2)[0] is not first[0]
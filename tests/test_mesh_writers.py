@@ -0,0 +1,160 @@
+"""
+Tests for the exported mesh file writers (core/mesh_writers.py)
+"""
+
+import io
+
+import numpy as np
+import pytest
+
+import core.mesh_writers as mesh_writers
+from core.mesh_writers import (
+    PLY_FACE,
+    STL_FACET,
+    vertex_normals,
+    write_mesh,
+    write_obj,
+    write_ply,
+    write_stl,
+)
+
+
+@pytest.fixture
+def tetrahedron():
+    """Closed tetrahedron, faces wound to point outwards."""
+    vertices = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, 1]], dtype=np.float32)
+    triangles = np.array([[0, 2, 1], [0, 1, 3], [0, 3, 2], [1, 2, 3]], dtype=np.uint64)
+    return vertices, triangles
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    """Blocks of 3 rows, so a few triangles span several."""
+    monkeypatch.setattr(mesh_writers, "MESH_WRITE_CHUNK", 3)
+
+
+def _written(writer, *args):
+    fh = io.BytesIO()
+    writer(fh, *args)
+    return fh.getvalue()
+
+
+def _ply_body(data):
+    header, body = data.split(b"end_header\n", 1)
+    return header.decode("ascii").splitlines(), body
+
+
+@pytest.mark.unit
+class TestVertexNormals:
+    def test_tetrahedron_corners_point_outwards(self, tetrahedron):
+        vertices, triangles = tetrahedron
+
+        normals = vertex_normals(vertices, triangles)
+
+        assert normals.dtype == np.float32
+        np.testing.assert_allclose(np.linalg.norm(normals, axis=1), 1, rtol=1e-6)
+        # Away from the centroid
+        assert (np.einsum("ij,ij->i", normals, vertices - vertices.mean(axis=0)) > 0).all()
+        np.testing.assert_allclose(normals[0], -np.ones(3) / np.sqrt(3), rtol=1e-6)
+
+    def test_unused_vertex_has_zero_normal(self, tetrahedron):
+        vertices, triangles = tetrahedron
+        vertices = np.vstack([vertices, [5, 5, 5]])
+
+        assert (vertex_normals(vertices, triangles)[4] == 0).all()
+
+
+@pytest.mark.unit
+class TestWriteStl:
+    def test_binary_layout(self, tetrahedron, small_chunks):
+        vertices, triangles = tetrahedron
+
+        data = _written(write_stl, vertices, triangles)
+
+        assert len(data) == 84 + 50 * len(triangles)
+        assert not data.startswith(b"solid")
+        assert np.frombuffer(data, "<u4", count=1, offset=80)[0] == len(triangles)
+        facets = np.frombuffer(data, STL_FACET, offset=84)
+        np.testing.assert_array_equal(facets["corners"], vertices[triangles])
+        np.testing.assert_allclose(facets["normal"][0], [0, 0, -1])
+        np.testing.assert_allclose(facets["normal"][3], np.ones(3) / np.sqrt(3), rtol=1e-6)
+        assert (facets["attributes"] == 0).all()
+
+    def test_empty_mesh(self):
+        data = _written(write_stl, np.zeros((0, 3)), np.zeros((0, 3), dtype=np.uint64))
+
+        assert len(data) == 84
+
+
+@pytest.mark.unit
+class TestWritePly:
+    def test_binary_layout(self, tetrahedron, small_chunks):
+        vertices, triangles = tetrahedron
+
+        header, body = _ply_body(_written(write_ply, vertices, triangles))
+
+        assert header[:2] == ["ply", "format binary_little_endian 1.0"]
+        assert "element vertex 4" in header and "element face 4" in header
+        assert "property list uchar int vertex_indices" in header
+        assert not any(line.startswith("property float n") for line in header)
+        positions = np.frombuffer(body, "<f4", count=12).reshape(4, 3)
+        np.testing.assert_array_equal(positions, vertices)
+        faces = np.frombuffer(body, PLY_FACE, offset=positions.nbytes)
+        assert (faces["count"] == 3).all()
+        np.testing.assert_array_equal(faces["corners"], triangles)
+
+    def test_vertex_normals(self, tetrahedron, small_chunks):
+        vertices, triangles = tetrahedron
+        normals = vertex_normals(vertices, triangles)
+
+        header, body = _ply_body(_written(write_ply, vertices, triangles, normals))
+
+        assert [line.split()[-1] for line in header if line.startswith("property float")] == [
+            "x",
+            "y",
+            "z",
+            "nx",
+            "ny",
+            "nz",
+        ]
+        records = np.frombuffer(body, "<f4", count=24).reshape(4, 6)
+        np.testing.assert_array_equal(records[:, :3], vertices)
+        np.testing.assert_array_equal(records[:, 3:], normals)
+        assert len(body) == 4 * 24 + 4 * PLY_FACE.itemsize
+
+
+@pytest.mark.unit
+class TestWriteObj:
+    def test_round_trips_float32(self, small_chunks):
+        rng = np.random.default_rng(0)
+        vertices = (rng.random((10, 3)) * 1000).astype(np.float32)
+        triangles = rng.integers(0, 10, (7, 3)).astype(np.uint64)
+
+        lines = _written(write_obj, vertices, triangles).decode("ascii").splitlines()
+
+        read = np.array([line.split()[1:] for line in lines if line.startswith("v ")], float)
+        np.testing.assert_array_equal(read.astype(np.float32), vertices)
+        faces = np.array([line.split()[1:] for line in lines if line.startswith("f ")], int)
+        np.testing.assert_array_equal(faces, triangles + 1)
+
+    def test_vertex_normals(self, tetrahedron):
+        vertices, triangles = tetrahedron
+        normals = vertex_normals(vertices, triangles)
+
+        lines = _written(write_obj, vertices, triangles, normals).decode("ascii").splitlines()
+
+        assert sum(line.startswith("vn ") for line in lines) == 4
+        assert "f 1//1 3//3 2//2" in lines
+
+
+@pytest.mark.unit
+class TestWriteMesh:
+    @pytest.mark.parametrize("extension", [".stl", ".PLY", ".obj"])
+    def test_dispatch_by_extension(self, tetrahedron, extension):
+        writer = mesh_writers.MESH_WRITERS[extension.lower()]
+
+        assert _written(write_mesh, extension, *tetrahedron) == _written(writer, *tetrahedron)
+
+    def test_unknown_extension(self, tetrahedron):
+        with pytest.raises(ValueError, match="Unsupported mesh format"):
+            write_mesh(io.BytesIO(), ".3ds", *tetrahedron)
@@ -0,0 +1,129 @@
+"""
+Tests for the write-behind output queue (core/output_writer.py)
+
+Outputs must land complete or not at all, a slow disk must hold the builder
+back rather than let arrays pile up, and a failed write must stop the build
+and reach the caller instead of vanishing into the log.
+"""
+
+import errno
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from core.output_writer import OutputWriter
+from core.pyramid_engine import PyramidEngine
+from core.thumbnail_generator import ThumbnailGenerator
+from tests.conftest import stack_settings
+from utils.image_utils import OutputWriteError
+
+SETTINGS = stack_settings(count=11)
+
+pytestmark = pytest.mark.stack(count=11, dtype=np.uint8)
+
+
+def _disk_full(_arr, path):
+    raise OutputWriteError(errno.ENOSPC, "No space left on device", path)
+
+
+@pytest.fixture
+def out_dir():
+    directory = tempfile.mkdtemp()
+    yield directory
+    shutil.rmtree(directory)
+
+
+@pytest.mark.unit
+class TestOutputWriter:
+    def test_outputs_written_and_callbacks_run(self, out_dir):
+        done = []
+        arrays = [np.full((8, 8), i, dtype=np.uint8) for i in range(5)]
+
+        with OutputWriter(max_pending=2) as writer:
+            for i, arr in enumerate(arrays):
+                writer.submit(os.path.join(out_dir, f"{i}.tif"), arr, lambda i=i: done.append(i))
+            writer.flush()
+
+        assert done == [0, 1, 2, 3, 4]
+        assert writer.written == 5
+        for i, arr in enumerate(arrays):
+            np.testing.assert_array_equal(
+                np.array(Image.open(os.path.join(out_dir, f"{i}.tif"))), arr
+            )
+        assert sorted(os.listdir(out_dir)) == [f"{i}.tif" for i in range(5)]
+
+    def test_full_queue_blocks_submit(self, out_dir):
+        release = threading.Event()
+
+        def slow_save(_arr, _path):
+            release.wait(5)
+
+        with patch("core.output_writer.save_image_atomic", side_effect=slow_save):
+            writer = OutputWriter(max_pending=2)
+            arr = np.zeros((4, 4), dtype=np.uint8)
+            # One being written, two waiting: the fourth has to wait for room
+            for i in range(3):
+                writer.submit(f"{i}.tif", arr)
+            blocked = threading.Thread(target=writer.submit, args=("3.tif", arr))
+            blocked.start()
+            time.sleep(0.1)
+            assert blocked.is_alive()
+
+            release.set()
+            blocked.join(5)
+            assert not blocked.is_alive()
+            writer.close()
+
+        assert writer.written == 4
+
+    def test_failed_write_raised_to_builder(self, out_dir):
+        arr = np.zeros((4, 4), dtype=np.uint8)
+
+        with patch("core.output_writer.save_image_atomic", side_effect=_disk_full):
+            writer = OutputWriter()
+            writer.submit("0.tif", arr)
+            with pytest.raises(OutputWriteError, match="No space left"):
+                writer.flush()
+            with pytest.raises(OutputWriteError):
+                writer.submit("1.tif", arr)
+            writer.close()
+
+        assert writer.written == 0
+
+
+@pytest.mark.unit
+class TestWriteFailuresSurface:
+    @pytest.mark.parametrize("single_pass", [False, True])
+    def test_engine_stops_on_failed_write(self, stack_dir, single_pass):
+        engine = PyramidEngine(single_pass=single_pass, max_thumbnail_size=16)
+
+        with (
+            patch("core.pyramid_engine.save_image_atomic", side_effect=_disk_full),
+            patch("core.output_writer.save_image_atomic", side_effect=_disk_full),
+            pytest.raises(OutputWriteError) as excinfo,
+        ):
+            engine.build(stack_dir, SETTINGS)
+
+        assert excinfo.value.errno == errno.ENOSPC
+        level_1 = Path(stack_dir) / ".thumbnail" / "1"
+        assert not list(level_1.glob("*.tif"))
+
+    def test_generator_reports_file_system_error(self, stack_dir, qtbot):
+        from PyQt5.QtCore import QThreadPool
+
+        with patch("core.pyramid_engine.save_image_atomic", side_effect=_disk_full):
+            result = ThumbnailGenerator().generate_python(
+                stack_dir, SETTINGS, threadpool=QThreadPool()
+            )
+
+        assert result["success"] is False
+        assert result["error"] == "file_system_error"
+        assert "No space left" in result["error_details"]
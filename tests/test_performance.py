@@ -8,16 +8,19 @@
 import os
 import tempfile
 import time
+import timeit
 
 import numpy as np
 import pytest
-from PIL import Image
+from PIL import Image, ImageChops
 
 from core.thumbnail_generator import ThumbnailGenerator
 from utils.image_utils import (
     average_images,
     downsample_image,
     load_image_as_array,
+    reduce_slices,
+    reduction_scratch,
     save_image_from_array,
 )
 
@@ -83,6 +86,80 @@ def test_average_images_16bit_performance(self, test_image_16bit):
         assert elapsed < 0.05, f"Averaging too slow: {elapsed:.3f}s"
 
 
+def _legacy_numpy_pair(img1, img2):
+    """What SequentialProcessor and PyramidEngine did: average, then float block mean"""
+    return downsample_image(average_images(img1, img2), factor=2, method="average")
+
+
+def _legacy_worker_pair_16bit(img1, img2):
+    """What ThumbnailWorker did with a 16-bit pair: four widening copies"""
+    arr1 = np.array(img1, dtype=np.uint16)
+    arr2 = np.array(img2, dtype=np.uint16)
+    avg = ((arr1.astype(np.uint32) + arr2.astype(np.uint32)) // 2).astype(np.uint16)
+    h, w = avg.shape
+    wide = avg.astype(np.uint32)
+    return (
+        (
+            wide[0 : h - h % 2 : 2, 0 : w - w % 2 : 2]
+            + wide[0 : h - h % 2 : 2, 1 : w - w % 2 : 2]
+            + wide[1 : h - h % 2 : 2, 0 : w - w % 2 : 2]
+            + wide[1 : h - h % 2 : 2, 1 : w - w % 2 : 2]
+        )
+        // 4
+    ).astype(np.uint16)
+
+
+def _legacy_worker_pair_8bit(img1, img2):
+    """What ThumbnailWorker did with an 8-bit pair: PIL add, then PIL resize"""
+    return ImageChops.add(img1, img2, scale=2.0).resize((img1.width // 2, img1.height // 2))
+
+
+def _best_time(func, *args):
+    """Fastest of several runs, which is the least disturbed by other load"""
+    return min(timeit.repeat(lambda: func(*args), number=3, repeat=7)) / 3
+
+
+@pytest.mark.benchmark
+class TestReductionKernelPerformance:
+    """reduce_slices against the three reductions it replaced"""
+
+    @pytest.fixture
+    def pair_16bit(self):
+        rng = np.random.default_rng(0)
+        return tuple(rng.integers(0, 65536, (1024, 1024), dtype=np.uint16) for _ in range(2))
+
+    def test_beats_numpy_pair(self, pair_16bit):
+        """Faster than average_images + downsample_image, at either depth"""
+        pair_8bit = tuple((arr >> 8).astype(np.uint8) for arr in pair_16bit)
+        for img1, img2 in (pair_16bit, pair_8bit):
+            kernel = _best_time(reduce_slices, img1, img2)
+            legacy = _best_time(_legacy_numpy_pair, img1, img2)
+            assert kernel < legacy, f"{img1.dtype}: {kernel * 1e3:.2f}ms vs {legacy * 1e3:.2f}ms"
+
+    def test_beats_worker_16bit(self, pair_16bit):
+        """Faster than the worker's 16-bit pair path, with caller buffers"""
+        img1, img2 = pair_16bit
+        out = np.empty((512, 512), dtype=np.uint16)
+        scratch = reduction_scratch(img1.shape, img1.dtype)
+
+        kernel = _best_time(lambda: reduce_slices(img1, img2, out=out, scratch=scratch))
+        legacy = _best_time(_legacy_worker_pair_16bit, img1, img2)
+
+        assert kernel < legacy, f"{kernel * 1e3:.2f}ms vs {legacy * 1e3:.2f}ms"
+
+    def test_beats_worker_8bit(self, pair_16bit):
+        """Faster than ImageChops.add + resize, including the PIL round trip"""
+        img1, img2 = (Image.fromarray((arr >> 8).astype(np.uint8)) for arr in pair_16bit)
+
+        def kernel_from_pil():
+            return Image.fromarray(reduce_slices(np.asarray(img1), np.asarray(img2)))
+
+        kernel = _best_time(kernel_from_pil)
+        legacy = _best_time(_legacy_worker_pair_8bit, img1, img2)
+
+        assert kernel < legacy, f"{kernel * 1e3:.2f}ms vs {legacy * 1e3:.2f}ms"
+
+
 @pytest.mark.benchmark
 @pytest.mark.slow
 class TestThumbnailGenerationPerformance:
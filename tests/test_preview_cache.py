@@ -0,0 +1,108 @@
+"""
+Tests for the cached 3D view volume (core/preview_cache.py)
+
+A dataset opened again must get the volume it got last time, mapped from the
+cache, and never a cache made for other settings or an older pyramid.
+"""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from core.preview_cache import PREVIEW_META_FILE, open_preview, remove_preview, save_preview
+from core.pyramid_engine import PyramidEngine
+from core.thumbnail_generator import ThumbnailGenerator
+from tests.conftest import STACK_SETTINGS
+
+KEY = {"max_thumbnail_size": 512, "memory_limit_bytes": 1024}
+
+
+@pytest.fixture
+def thumbnail_base():
+    base = Path(tempfile.mkdtemp())
+    (base / "2").mkdir()
+    yield base
+    shutil.rmtree(base)
+
+
+@pytest.mark.unit
+class TestPreviewCache:
+    def test_round_trip(self, thumbnail_base):
+        volume = np.arange(60, dtype=np.uint8).reshape(3, 4, 5)
+
+        assert save_preview(thumbnail_base, KEY, 2, volume)
+        cached, level = open_preview(thumbnail_base, dict(KEY))
+
+        assert level == 2
+        assert isinstance(cached, np.memmap)
+        assert not cached.flags.writeable
+        np.testing.assert_array_equal(cached, volume)
+
+    def test_other_key_not_used(self, thumbnail_base):
+        save_preview(thumbnail_base, KEY, 2, np.zeros((3, 4, 5), dtype=np.uint8))
+
+        assert open_preview(thumbnail_base, {**KEY, "max_thumbnail_size": 256}) is None
+
+    def test_level_gone(self, thumbnail_base):
+        save_preview(thumbnail_base, KEY, 2, np.zeros((3, 4, 5), dtype=np.uint8))
+        (thumbnail_base / "2").rmdir()
+
+        assert open_preview(thumbnail_base, KEY) is None
+
+    def test_removed(self, thumbnail_base):
+        save_preview(thumbnail_base, KEY, 2, np.zeros((3, 4, 5), dtype=np.uint8))
+
+        remove_preview(thumbnail_base)
+
+        assert open_preview(thumbnail_base, KEY) is None
+        assert sorted(os.listdir(thumbnail_base)) == ["2"]
+
+    def test_corrupt_metadata_ignored(self, thumbnail_base):
+        save_preview(thumbnail_base, KEY, 2, np.zeros((3, 4, 5), dtype=np.uint8))
+        (thumbnail_base / PREVIEW_META_FILE).write_text("{not json")
+
+        assert open_preview(thumbnail_base, KEY) is None
+
+
+@pytest.mark.unit
+class TestLoadThumbnailDataCache:
+    def test_second_load_mapped(self, stack_dir):
+        PyramidEngine(max_thumbnail_size=16).build(stack_dir, STACK_SETTINGS)
+        first, first_info = ThumbnailGenerator().load_thumbnail_data(stack_dir, 20)
+
+        second, second_info = ThumbnailGenerator().load_thumbnail_data(stack_dir, 20)
+
+        assert not isinstance(first, np.memmap)
+        assert isinstance(second, np.memmap)
+        assert second_info == first_info
+        np.testing.assert_array_equal(second, first)
+
+    def test_other_size_not_cached(self, stack_dir):
+        PyramidEngine(max_thumbnail_size=16).build(stack_dir, STACK_SETTINGS)
+        ThumbnailGenerator().load_thumbnail_data(stack_dir, 20)
+
+        volume, info = ThumbnailGenerator().load_thumbnail_data(stack_dir, 512)
+
+        assert info["current_level"] == 1
+        assert volume.shape == (8, 32, 32)
+
+    def test_rebuild_invalidates(self, stack_dir):
+        PyramidEngine(max_thumbnail_size=16).build(stack_dir, STACK_SETTINGS)
+        ThumbnailGenerator().load_thumbnail_data(stack_dir, 512)
+        for i in (0, 1):
+            Image.fromarray(np.zeros((64, 64), dtype=np.uint16)).save(
+                os.path.join(stack_dir, f"slice_{i:04d}.tif")
+            )
+        stat = os.stat(stack_dir)
+        os.utime(stack_dir, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        PyramidEngine(max_thumbnail_size=16).build(stack_dir, STACK_SETTINGS)
+        volume, _ = ThumbnailGenerator().load_thumbnail_data(stack_dir, 512)
+
+        assert not isinstance(volume, np.memmap)
+        assert not volume[0].any()
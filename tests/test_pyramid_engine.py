@@ -0,0 +1,173 @@
+"""
+Tests for PyramidEngine (core/pyramid_engine.py)
+
+The engine must build the same pyramid in every mode, report progress without
+Qt, and stop when cancelled.
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from core.pyramid_engine import PyramidEngine, PyramidProgress, reduce_pair, resolve_worker_count
+from tests.conftest import stack_settings
+
+SETTINGS = stack_settings(count=11)
+
+pytestmark = pytest.mark.stack(count=11)
+
+
+def _read_pyramid(directory):
+    base = Path(directory) / ".thumbnail"
+    return {
+        str(path.relative_to(base)): np.array(Image.open(path))
+        for path in sorted(base.rglob("*.tif"))
+    }
+
+
+class TestResolveWorkerCount:
+    @pytest.mark.parametrize("value", ["auto", 0, None])
+    def test_auto_leaves_one_core(self, value):
+        with patch("core.pyramid_engine.os.cpu_count", return_value=16):
+            assert resolve_worker_count(value) == 15
+
+    def test_explicit_count_is_clamped_to_cpus(self):
+        with patch("core.pyramid_engine.os.cpu_count", return_value=4):
+            assert resolve_worker_count(2) == 2
+            assert resolve_worker_count(16) == 4
+
+    def test_single_cpu_still_gets_a_worker(self):
+        with patch("core.pyramid_engine.os.cpu_count", return_value=1):
+            assert resolve_worker_count("auto") == 1
+
+    def test_invalid_value_falls_back_to_auto(self):
+        with patch("core.pyramid_engine.os.cpu_count", return_value=8):
+            assert resolve_worker_count("many") == 7
+
+
+class TestPyramidEnginePlan:
+    def test_plan_halves_until_under_limit(self):
+        levels = PyramidEngine(max_thumbnail_size=16).plan(SETTINGS)
+
+        assert [entry["width"] for entry in levels] == [32, 16, 8]
+        assert [entry["count"] for entry in levels] == [6, 3, 2]
+        assert [entry["seq_end"] for entry in levels] == [5, 2, 1]
+
+    def test_small_images_still_get_one_level(self):
+        settings = dict(SETTINGS, image_width="100", image_height="100")
+
+        levels = PyramidEngine(max_thumbnail_size=512).plan(settings)
+
+        assert len(levels) == 1
+        assert levels[0]["width"] == 50
+
+
+@pytest.mark.unit
+class TestPyramidEngineBuild:
+    def test_modes_write_identical_pyramids(self, stack_dir):
+        results = {}
+        for name, engine in [
+            ("threads", PyramidEngine(max_thumbnail_size=16)),
+            ("single_pass", PyramidEngine(single_pass=True, max_thumbnail_size=16)),
+            ("processes", PyramidEngine(workers=2, use_processes=True, max_thumbnail_size=16)),
+        ]:
+            result = engine.build(stack_dir, SETTINGS)
+            assert not result.cancelled
+            assert result.levels_built == 3
+            results[name] = _read_pyramid(stack_dir)
+            shutil.rmtree(Path(stack_dir) / ".thumbnail")
+
+        assert len(results["threads"]) == 6 + 3 + 2
+        for name in ("single_pass", "processes"):
+            assert sorted(results[name]) == sorted(results["threads"])
+            for key, arr in results["threads"].items():
+                np.testing.assert_array_equal(results[name][key], arr)
+
+    @pytest.mark.parametrize("single_pass", [False, True])
+    def test_progress_events_reach_completion(self, stack_dir, single_pass):
+        engine = PyramidEngine(single_pass=single_pass, max_thumbnail_size=16)
+
+        events = list(engine.iter_build(stack_dir, SETTINGS))
+
+        assert events
+        assert all(isinstance(event, PyramidProgress) for event in events)
+        assert events[-1].fraction == pytest.approx(1.0)
+        assert events[-1].generated == 11
+        assert [info["name"] for info in engine.result.level_info] == [
+            "Level 0",
+            "Level 1",
+            "Level 2",
+            "Level 3",
+        ]
+
+    def test_level_timings_reported(self, stack_dir):
+        result = PyramidEngine(max_thumbnail_size=16).build(stack_dir, SETTINGS)
+
+        assert len(result.level_seconds) == 3
+        assert all(seconds >= 0 for seconds in result.level_seconds)
+
+    def test_rebuild_loads_existing_outputs(self, stack_dir):
+        PyramidEngine(max_thumbnail_size=16).build(stack_dir, SETTINGS)
+
+        result = PyramidEngine(max_thumbnail_size=16).build(stack_dir, SETTINGS)
+
+        assert result.generated == 0
+        assert result.loaded == 11
+
+    @pytest.mark.parametrize("single_pass", [False, True])
+    def test_cancel_check_stops_build(self, stack_dir, single_pass):
+        engine = PyramidEngine(single_pass=single_pass, max_thumbnail_size=16)
+
+        result = engine.build(stack_dir, SETTINGS, cancel_check=lambda: True)
+
+        assert result.cancelled
+        assert result.level_info[0]["name"] == "Level 0"
+
+    def test_callback_receives_events(self, stack_dir):
+        seen = []
+
+        PyramidEngine(max_thumbnail_size=16).build(stack_dir, SETTINGS, seen.append)
+
+        assert seen and seen[-1].percentage == pytest.approx(100.0)
+
+
+class TestReducePair:
+    """One level-by-level task."""
+
+    def test_result_written(self, stack_dir, tmp_path):
+        output = tmp_path / "000001.tif"
+
+        result = reduce_pair(
+            1,
+            os.path.join(stack_dir, "slice_0002.tif"),
+            os.path.join(stack_dir, "slice_0003.tif"),
+            str(output),
+        )
+
+        assert result == (1, True)
+        assert np.array(Image.open(output)).shape == (32, 32)
+
+    def test_existing_output_kept(self, tmp_path):
+        output = tmp_path / "000000.tif"
+        Image.fromarray(np.full((32, 32), 1234, dtype=np.uint16)).save(output)
+        before = output.read_bytes()
+
+        result = reduce_pair(0, str(tmp_path / "missing.tif"), None, str(output))
+
+        assert result == (0, False)
+        assert output.read_bytes() == before
+
+
+def test_engine_does_not_import_qt():
+    """The engine has to run in batch jobs with no display server."""
+    code = "import sys, core.pyramid_engine; sys.exit(any('PyQt5' in m for m in sys.modules))"
+    root = Path(__file__).resolve().parent.parent
+    completed = subprocess.run([sys.executable, "-c", code], cwd=root, check=False)
+    assert completed.returncode == 0
@@ -0,0 +1,115 @@
+"""
+Tests for the pyramid index (core/pyramid_index.py)
+
+The index written after a build must describe every level, be trusted only
+while the levels are unchanged, and be removed before a level is rewritten.
+"""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from core import directory_index
+from core.level_container import remove_level
+from core.pyramid_engine import PyramidEngine
+from core.pyramid_index import (
+    find_levels,
+    index_path,
+    read_pyramid_index,
+    write_pyramid_index,
+)
+
+
+@pytest.fixture
+def pyramid_dir():
+    directory = tempfile.mkdtemp()
+    for level, (count, size, value) in enumerate([(4, 8, 10), (2, 4, 20)], start=1):
+        level_dir = Path(directory) / ".thumbnail" / str(level)
+        level_dir.mkdir(parents=True)
+        for i in range(count):
+            Image.fromarray(np.full((size // 2, size), value + i, dtype=np.uint8)).save(
+                level_dir / f"{i:06}.tif"
+            )
+    yield directory
+    shutil.rmtree(directory)
+
+
+@pytest.mark.unit
+class TestPyramidIndex:
+    def test_write_describes_levels(self, pyramid_dir):
+        data = write_pyramid_index(pyramid_dir, seq_begin=5)
+
+        first, second = data["levels"]
+        assert (first["width"], first["height"], first["count"]) == (8, 4, 4)
+        assert (first["seq_begin"], first["seq_end"]) == (5, 8)
+        assert first["dtype"] == "uint8"
+        assert first["stats"] == {"min": 10, "max": 13, "mean": 11.5, "sampled_slices": 4}
+        assert (second["count"], second["stats"]["max"]) == (2, 21)
+        assert read_pyramid_index(pyramid_dir) == data["levels"]
+
+    def test_find_levels_does_not_list(self, pyramid_dir):
+        write_pyramid_index(pyramid_dir)
+
+        with patch.object(directory_index.os, "scandir") as scandir:
+            levels = find_levels(pyramid_dir, 20)
+
+        scandir.assert_not_called()
+        assert [(s.level, s.count, s.width, s.height) for s in levels] == [
+            (1, 4, 8, 4),
+            (2, 2, 4, 2),
+        ]
+
+    def test_changed_level_ignored(self, pyramid_dir):
+        write_pyramid_index(pyramid_dir)
+        level_dir = Path(pyramid_dir) / ".thumbnail" / "2"
+        (level_dir / "000001.tif").unlink()
+        stat = os.stat(level_dir)
+        os.utime(level_dir, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        assert read_pyramid_index(pyramid_dir) is None
+        assert find_levels(pyramid_dir, 20)[1].count == 1
+
+    def test_removed_before_level_rewritten(self, pyramid_dir):
+        write_pyramid_index(pyramid_dir)
+
+        remove_level(Path(pyramid_dir) / ".thumbnail", 1)
+
+        assert not index_path(pyramid_dir).exists()
+
+    def test_unwritable_index_is_not_fatal(self, pyramid_dir):
+        with patch("core.pyramid_index.json.dump", side_effect=OSError("disk full")):
+            assert write_pyramid_index(pyramid_dir) is None
+
+        assert not index_path(pyramid_dir).exists()
+        assert len(find_levels(pyramid_dir, 20)) == 2
+
+    def test_engine_writes_index(self):
+        directory = tempfile.mkdtemp()
+        try:
+            for i in range(8):
+                Image.fromarray(np.full((32, 32), i * 10, dtype=np.uint8)).save(
+                    os.path.join(directory, f"s_{i:04d}.tif")
+                )
+            settings = {
+                "prefix": "s_",
+                "index_length": 4,
+                "file_type": "tif",
+                "seq_begin": 0,
+                "seq_end": 7,
+                "image_width": 32,
+                "image_height": 32,
+            }
+
+            PyramidEngine(max_thumbnail_size=8).build(directory, settings)
+
+            levels = read_pyramid_index(directory)
+            assert [entry["width"] for entry in levels] == [16, 8, 4]
+            assert [entry["count"] for entry in levels] == [4, 2, 1]
+        finally:
+            shutil.rmtree(directory)
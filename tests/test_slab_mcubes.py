@@ -0,0 +1,198 @@
+"""
+Tests for marching cubes over z-slabs (core/slab_mcubes.py)
+"""
+
+import tracemalloc
+from collections import Counter
+
+import mcubes
+import numpy as np
+import pytest
+from scipy import ndimage
+
+import core.slab_mcubes as slab_mcubes
+from config.constants import SLAB_MESH_MIN_DEPTH
+from core.slab_mcubes import (
+    SlabStitcher,
+    marching_cubes_streamed,
+    mesh_slab,
+    plan_slabs,
+    slab_bounds,
+)
+
+
+def _smooth_volume(shape=(40, 30, 25), seed=1):
+    rng = np.random.default_rng(seed)
+    return ndimage.gaussian_filter(rng.random(shape), 2)
+
+
+def _stitched(volume, isovalue, count):
+    stitcher = SlabStitcher()
+    for z0, z1 in slab_bounds(volume.shape[0], count):
+        stitcher.add(mesh_slab(volume[z0 : z1 + 1], isovalue, z0))
+    return stitcher.result()
+
+
+def _edge_uses(triangles):
+    """How many edges are used by 1, 2, 3, ... triangles."""
+    triangles = triangles.astype(np.int64)
+    edges = np.sort(
+        np.concatenate([triangles[:, [0, 1]], triangles[:, [1, 2]], triangles[:, [2, 0]]]),
+        axis=1,
+    )
+    return np.bincount(np.unique(edges, axis=0, return_counts=True)[1]).tolist()
+
+
+def _faces(vertices, triangles):
+    """Triangles as sets of corner positions, which survive renumbering."""
+    vertices = np.round(vertices, 9)
+    return Counter(tuple(sorted(map(tuple, vertices[t]))) for t in triangles)
+
+
+@pytest.mark.unit
+class TestSlabBounds:
+    def test_slabs_share_boundary_planes(self):
+        bounds = slab_bounds(40, 4)
+
+        assert bounds[0][0] == 0 and bounds[-1][1] == 39
+        assert all(a[1] == b[0] for a, b in zip(bounds, bounds[1:], strict=False))
+
+    def test_no_more_slabs_than_cubes(self):
+        assert slab_bounds(3, 8) == [(0, 1), (1, 2)]
+
+
+@pytest.mark.unit
+class TestSlabStitcher:
+    @pytest.mark.parametrize("count", [2, 4, 7])
+    def test_same_mesh_as_single_shot(self, count):
+        volume = _smooth_volume()
+        vertices, triangles = mcubes.marching_cubes(volume, 0.5)
+
+        stitched_vertices, stitched_triangles = _stitched(volume, 0.5, count)
+
+        assert len(stitched_vertices) == len(vertices)
+        assert _faces(stitched_vertices, stitched_triangles) == _faces(vertices, triangles)
+        assert _edge_uses(stitched_triangles) == _edge_uses(triangles)
+
+    def test_voxels_at_isovalue_on_seams(self):
+        # Integer data and threshold: many seam voxels equal the isovalue,
+        # each with a vertex per edge through it at the same position
+        rng = np.random.default_rng(2)
+        volume = (rng.integers(0, 3, (50, 20, 20)) * 100).astype(np.uint8)
+        vertices, triangles = mcubes.marching_cubes(volume, 100)
+
+        stitched_vertices, stitched_triangles = _stitched(volume, 100, 4)
+
+        assert len(stitched_vertices) == len(vertices)
+        assert _faces(stitched_vertices, stitched_triangles) == _faces(vertices, triangles)
+        assert _edge_uses(stitched_triangles) == _edge_uses(triangles)
+
+    def test_closed_surface_is_watertight(self):
+        volume = np.zeros((30, 20, 20))
+        volume[5:25, 4:16, 4:16] = 1.0
+        volume = ndimage.gaussian_filter(volume, 1.5)
+
+        _, triangles = _stitched(volume, 0.5, 5)
+
+        # Every edge shared by exactly two triangles
+        assert _edge_uses(triangles) == [0, 0, len(triangles) * 3 // 2]
+
+    def test_empty_slabs(self):
+        volume = np.zeros((30, 10, 10))
+        volume[2:6, 3:7, 3:7] = 1.0
+
+        vertices, triangles = _stitched(volume, 0.5, 5)
+
+        assert len(triangles) == len(mcubes.marching_cubes(volume, 0.5)[1])
+        assert triangles.max() < len(vertices)
+
+
+@pytest.mark.unit
+class TestPlanSlabs:
+    def test_slabs_fit_the_budget(self):
+        shape = (4096, 2048, 2048)
+        plane = 2048 * 2048
+
+        depth, workers = plan_slabs(shape, 4, 231 * plane)
+
+        assert workers == 4
+        # 11 planes a slab, each 1 byte in 9 slabs (4 meshing, 4 held, 1
+        # filling) and 3 more in the 4 workers' working copies
+        assert depth == 10
+
+    def test_slabs_split_between_workers(self):
+        depth, workers = plan_slabs((401, 4096, 4096), 4, 1 << 40)
+
+        assert (depth, workers) == (100, 4)
+
+    def test_small_volume_uses_one_worker(self):
+        depth, workers = plan_slabs((40, 30, 25), 8, 1 << 30)
+
+        assert workers == 1
+        assert depth == 39
+
+    def test_budget_covers_meshing_allocations(self):
+        shape = (64, 128, 128)
+        budget = 10**6
+        depth, workers = plan_slabs(shape, 1, budget)
+        # A small surface, and a voxel at the isovalue so a lowered copy is made
+        slab = np.zeros((depth + 1, *shape[1:]), dtype=np.uint8)
+        slab[2:4, 60:62, 60:62] = 200
+        slab[6, 10, 10] = 100
+
+        tracemalloc.start()
+        try:
+            mesh_slab(slab, 100, 0)
+            allocated = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        assert allocated > 2 * slab.nbytes
+        assert (2 * workers + 1) * slab.nbytes + workers * allocated <= budget
+
+    def test_depth_never_below_minimum(self):
+        depth, _ = plan_slabs((4096, 2048, 2048), 4, 1)
+
+        assert depth == SLAB_MESH_MIN_DEPTH
+
+
+@pytest.mark.unit
+class TestMarchingCubesStreamed:
+    @pytest.mark.parametrize("slab_depth", [1, 5, 13, 100])
+    def test_same_mesh_as_single_shot(self, slab_depth):
+        volume = _smooth_volume()
+        vertices, triangles = mcubes.marching_cubes(volume, 0.5)
+
+        streamed_vertices, streamed_triangles = marching_cubes_streamed(
+            iter(volume), 0.5, slab_depth
+        )
+
+        assert len(streamed_vertices) == len(vertices)
+        assert _faces(streamed_vertices, streamed_triangles) == _faces(vertices, triangles)
+        assert _edge_uses(streamed_triangles) == _edge_uses(triangles)
+
+    def test_worker_processes(self):
+        volume = _smooth_volume()
+
+        vertices, triangles = marching_cubes_streamed(iter(volume), 0.5, 10, workers=2)
+
+        expected = mcubes.marching_cubes(volume, 0.5)
+        assert len(vertices) == len(expected[0])
+        assert _faces(vertices, triangles) == _faces(*expected)
+
+    def test_planes_read_lazily(self):
+        volume = _smooth_volume()
+        read = []
+
+        def planes():
+            for plane in volume:
+                read.append(len(read))
+                yield plane
+
+        assert marching_cubes_streamed(planes(), 0.5, 5, cancelled=lambda: len(read) >= 12) is None
+        assert len(read) == 12
+
+    def test_single_plane_has_no_surface(self):
+        vertices, triangles = marching_cubes_streamed(iter(np.ones((1, 5, 5))), 0.5, 8)
+
+        assert len(vertices) == 0 and len(triangles) == 0
@@ -0,0 +1,233 @@
+"""
+Tests for the 2D viewer's slice cache and read-ahead (core/slice_cache.py)
+"""
+
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from core.slice_cache import (
+    DirectionalPrefetcher,
+    RefineStep,
+    SliceCache,
+    SliceRefiner,
+    load_display_slice,
+    slice_cache_bytes,
+)
+
+
+def _slice(value, size=10):
+    return np.full((size, size), value, dtype=np.uint8)
+
+
+@pytest.mark.unit
+class TestSliceCache:
+    def test_evicts_least_recently_used(self):
+        cache = SliceCache(limit_bytes=300)
+        for idx in range(3):
+            cache.put((1, idx), _slice(idx))
+        cache.get((1, 0))
+
+        cache.put((2, 0), _slice(9))
+
+        assert (1, 1) not in cache
+        assert (1, 0) in cache and (2, 0) in cache
+        assert cache.nbytes == 300
+
+    def test_levels_share_the_limit(self):
+        cache = SliceCache(limit_bytes=400)
+        cache.put((0, 0), _slice(1, size=20))
+
+        cache.put((3, 0), _slice(2))
+
+        assert (0, 0) not in cache
+        assert len(cache) == 1
+
+    def test_oversized_slice_not_cached(self):
+        cache = SliceCache(limit_bytes=50)
+
+        cache.put((1, 0), _slice(1))
+
+        assert len(cache) == 0
+
+    def test_cached_slices_are_read_only(self):
+        cache = SliceCache(limit_bytes=1000)
+        cache.put((1, 0), _slice(1))
+
+        with pytest.raises(ValueError):
+            cache.get((1, 0))[0, 0] = 5
+
+    def test_budget_follows_memory_limit(self):
+        assert slice_cache_bytes(8) == 2 * slice_cache_bytes(4)
+
+
+@pytest.mark.unit
+class TestDirectionalPrefetcher:
+    @pytest.fixture
+    def cache(self):
+        return SliceCache(limit_bytes=10_000)
+
+    def _wait(self, prefetcher):
+        prefetcher._executor.shutdown(wait=True)
+
+    def test_reads_ahead_in_direction(self, cache):
+        prefetcher = DirectionalPrefetcher(cache, threads=2)
+
+        wanted = prefetcher.prefetch(1, 5, -1, 20, _slice, count=3)
+        self._wait(prefetcher)
+
+        assert wanted == [4, 3, 2]
+        assert [(1, i) in cache for i in range(7)] == [False, False, True, True, True, False, False]
+        assert cache.get((1, 3))[0, 0] == 3
+
+    def test_stops_at_level_bounds_and_skips_cached(self, cache):
+        cache.put((1, 9), _slice(9))
+        prefetcher = DirectionalPrefetcher(cache)
+
+        wanted = prefetcher.prefetch(1, 8, 1, 10, _slice, count=5)
+        prefetcher.close()
+
+        assert wanted == [10]
+
+    def test_read_ahead_capped_at_half_the_cache(self):
+        cache = SliceCache(limit_bytes=400)
+        cache.put((1, 0), _slice(0))
+        prefetcher = DirectionalPrefetcher(cache)
+
+        wanted = prefetcher.prefetch(1, 0, 1, 100, _slice, count=8)
+        prefetcher.close()
+
+        assert wanted == [1, 2]
+
+    def test_superseded_requests_not_cached(self, cache):
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_load(idx):
+            started.set()
+            release.wait(5)
+            return _slice(idx)
+
+        prefetcher = DirectionalPrefetcher(cache, threads=1)
+        prefetcher.prefetch(1, 0, 1, 10, slow_load, count=3)
+        started.wait(5)
+        prefetcher.cancel()
+        release.set()
+        prefetcher.close()
+
+        assert len(cache) == 0
+
+    def test_failed_load_is_dropped(self, cache):
+        def failing_load(idx):
+            raise OSError("unreadable")
+
+        prefetcher = DirectionalPrefetcher(cache)
+        prefetcher.prefetch(1, 0, 1, 10, failing_load, count=2)
+        prefetcher.close()
+
+        assert len(cache) == 0
+
+
+@pytest.mark.unit
+class TestSliceRefiner:
+    @pytest.fixture
+    def cache(self):
+        return SliceCache(limit_bytes=10_000)
+
+    @staticmethod
+    def _recorder(loaded, last_level):
+        """on_loaded appending to `loaded`, and an event set once `last_level` is in."""
+        done = threading.Event()
+
+        def on_loaded(*result):
+            loaded.append(result)
+            if result[1] == last_level:
+                done.set()
+
+        return on_loaded, done
+
+    def test_steps_reported_in_order_and_cached(self, cache):
+        loaded = []
+        cache.put((2, 1), _slice(7))
+        on_loaded, done = self._recorder(loaded, 0)
+        refiner = SliceRefiner(cache, on_loaded)
+
+        generation = refiner.refine(
+            [RefineStep(2, 1, _slice), RefineStep(1, 3, _slice), RefineStep(0, 6, _slice)]
+        )
+        assert done.wait(5)
+        refiner.close()
+
+        assert [(g, level, idx) for g, level, idx, _ in loaded] == [
+            (generation, 2, 1),
+            (generation, 1, 3),
+            (generation, 0, 6),
+        ]
+        assert loaded[0][3][0, 0] == 7
+        assert (1, 3) in cache and (0, 6) in cache
+
+    def test_superseded_request_stops(self, cache):
+        started = threading.Event()
+        release = threading.Event()
+        loaded = []
+
+        def slow_load(idx):
+            started.set()
+            release.wait(5)
+            return _slice(idx)
+
+        refiner = SliceRefiner(cache, lambda *result: loaded.append(result))
+        refiner.refine([RefineStep(1, 0, slow_load), RefineStep(0, 0, slow_load)])
+        started.wait(5)
+        refiner.cancel()
+        release.set()
+        refiner.close()
+
+        assert loaded == []
+        assert (0, 0) not in cache
+
+    def test_failed_step_reported_as_none(self, cache):
+        loaded = []
+
+        def failing_load(idx):
+            raise OSError("unreadable")
+
+        on_loaded, done = self._recorder(loaded, 0)
+        refiner = SliceRefiner(cache, on_loaded)
+        refiner.refine([RefineStep(1, 0, failing_load), RefineStep(0, 0, _slice)])
+        assert done.wait(5)
+        refiner.close()
+
+        assert [(level, arr is None) for _, level, _, arr in loaded] == [(1, True), (0, False)]
+
+
+@pytest.mark.unit
+class TestLoadDisplaySlice:
+    @pytest.fixture
+    def temp_dir(self):
+        directory = tempfile.mkdtemp()
+        yield Path(directory)
+        shutil.rmtree(directory)
+
+    def test_grayscale_16bit(self, temp_dir):
+        Image.fromarray(np.full((4, 6), 1000, dtype=np.uint16)).save(temp_dir / "a.tif")
+
+        arr = load_display_slice(str(temp_dir / "a.tif"))
+
+        assert arr.dtype == np.uint16 and arr.shape == (4, 6)
+
+    def test_lowercase_extension_fallback(self, temp_dir):
+        Image.fromarray(_slice(3)).save(temp_dir / "a.tif")
+
+        assert load_display_slice(str(temp_dir / "a.TIF"))[0, 0] == 3
+
+    def test_colour_and_missing_left_to_qpixmap(self, temp_dir):
+        Image.new("RGB", (4, 4)).save(temp_dir / "c.png")
+
+        assert load_display_slice(str(temp_dir / "c.png")) is None
+        assert load_display_slice(str(temp_dir / "missing.tif")) is None
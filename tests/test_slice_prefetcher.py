@@ -0,0 +1,125 @@
+"""
+Tests for SlicePrefetcher (core/slice_prefetcher.py)
+
+The prefetcher must hand slices over in order, exactly as a direct load would,
+while never holding more than its window.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from core.slice_prefetcher import (
+    SlicePrefetcher,
+    estimate_slice_bytes,
+    prefetch_window,
+    window_for_budget,
+)
+
+
+class _CountingLoader:
+    """Loader that records how many loads overlap and which paths were loaded."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.loaded = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, path):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            self.loaded.append(path)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        if path == "bad":
+            raise OSError("unreadable")
+        return f"data:{path}"
+
+
+@pytest.mark.unit
+class TestSlicePrefetcher:
+    def test_slices_handed_over_in_order(self):
+        paths = [f"s{i}" for i in range(10)]
+        loader = _CountingLoader()
+
+        with SlicePrefetcher(paths, window=3, loader=loader) as prefetcher:
+            taken = [prefetcher.take(path) for path in paths]
+
+        assert taken == [f"data:{path}" for path in paths]
+        assert sorted(loader.loaded) == sorted(paths)
+
+    def test_window_bounds_reads_ahead(self):
+        paths = [f"s{i}" for i in range(6)]
+        loader = _CountingLoader()
+
+        with SlicePrefetcher(paths, window=2, loader=loader) as prefetcher:
+            time.sleep(0.05)
+            assert len(loader.loaded) == 2
+            prefetcher.take("s0")
+            time.sleep(0.05)
+            assert len(loader.loaded) == 3
+
+    def test_decoder_threads_capped(self):
+        paths = [f"s{i}" for i in range(8)]
+        loader = _CountingLoader(delay=0.02)
+
+        with SlicePrefetcher(paths, window=8, loader=loader, threads=2) as prefetcher:
+            for path in paths:
+                prefetcher.take(path)
+
+        assert loader.peak <= 2
+
+    def test_skipping_ahead_drops_intervening_slices(self):
+        paths = [f"s{i}" for i in range(5)]
+
+        with SlicePrefetcher(paths, window=2, loader=_CountingLoader()) as prefetcher:
+            assert prefetcher.take("s3") == "data:s3"
+            assert prefetcher.take("s4") == "data:s4"
+
+    def test_unlisted_path_loaded_directly(self):
+        loader = _CountingLoader()
+
+        with SlicePrefetcher(["s0"], window=1, loader=loader) as prefetcher:
+            assert prefetcher.take("other") == "data:other"
+            assert prefetcher.take("s0") == "data:s0"
+
+    def test_loader_errors_reach_the_consumer(self):
+        with (
+            SlicePrefetcher(["bad"], window=1, loader=_CountingLoader()) as prefetcher,
+            pytest.raises(OSError, match="unreadable"),
+        ):
+            prefetcher.take("bad")
+
+
+class TestWindowSizing:
+    def test_budget_divides_by_slice_size(self):
+        assert window_for_budget(64 * 1024 * 1024, budget_mb=256, max_slices=8) == 4
+
+    def test_window_capped_for_small_slices(self):
+        assert window_for_budget(1024, budget_mb=256, max_slices=8) == 8
+
+    def test_huge_slices_still_read_one_ahead(self):
+        assert window_for_budget(2 * 1024**3, budget_mb=256, max_slices=8) == 1
+        assert window_for_budget(0) == 1
+
+    def test_estimate_from_header(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "slice.tif")
+            Image.fromarray(np.zeros((30, 40), dtype=np.uint16)).save(path)
+
+            assert estimate_slice_bytes(path) == 30 * 40 * 2
+            assert estimate_slice_bytes(os.path.join(directory, "missing.tif")) == 0
+            assert prefetch_window([os.path.join(directory, "missing.tif"), path]) >= 1
+        finally:
+            shutil.rmtree(directory)
@@ -7,6 +7,7 @@
 import os
 import shutil
 import tempfile
+from unittest.mock import patch
 
 import numpy as np
 import pytest
@@ -286,6 +287,100 @@ def setValue(self, value):
         assert isinstance(result_python, dict)
         assert "success" in result_python
 
+    def test_generate_python_single_pass(self, generator, temp_image_dir, qtbot):
+        """Single-pass mode reports the same levels and volume as the per-level path"""
+        from PyQt5.QtCore import QThreadPool
+
+        from tests.conftest import MockProgressDialog
+
+        settings = {
+            "image_width": "100",
+            "image_height": "100",
+            "seq_begin": 0,
+            "seq_end": 9,
+            "prefix": "test_",
+            "index_length": 4,
+            "file_type": "tif",
+        }
+
+        result = generator.generate_python(
+            directory=temp_image_dir,
+            settings=settings,
+            threadpool=QThreadPool(),
+            progress_dialog=MockProgressDialog(cancelled=False),
+            single_pass=True,
+        )
+
+        assert result["success"] is True
+        assert [level["name"] for level in result["level_info"]] == ["Level 0", "Level 1"]
+        assert result["level_info"][1]["width"] == 50
+        assert result["level_info"][1]["seq_end"] == 4
+        assert result["minimum_volume"].shape == (5, 50, 50)
+
+    def test_generate_python_process_engine(self, generator, temp_image_dir, qtbot):
+        """The process engine builds the same pyramid, and takes precedence over single_pass"""
+        from PyQt5.QtCore import QThreadPool
+
+        from tests.conftest import MockProgressDialog
+
+        settings = {
+            "image_width": "100",
+            "image_height": "100",
+            "seq_begin": 0,
+            "seq_end": 9,
+            "prefix": "test_",
+            "index_length": 4,
+            "file_type": "tif",
+        }
+
+        with patch("core.pyramid_engine.FusedPyramidBuilder") as single_pass:
+            result = generator.generate_python(
+                directory=temp_image_dir,
+                settings=settings,
+                threadpool=QThreadPool(),
+                progress_dialog=MockProgressDialog(cancelled=False),
+                single_pass=True,
+                engine="processes",
+                workers=2,
+            )
+
+        single_pass.assert_not_called()
+        assert result["success"] is True
+        assert [level["name"] for level in result["level_info"]] == ["Level 0", "Level 1"]
+        assert result["minimum_volume"].shape == (5, 50, 50)
+
+    def test_generate_python_thread_engine_uses_workers(self, generator, temp_image_dir, qtbot):
+        """Level by level, the thread engine gets processing.threads threads, as in batch mode"""
+        from PyQt5.QtCore import QThreadPool
+
+        from core.pyramid_engine import PyramidEngine
+        from tests.conftest import MockProgressDialog
+
+        settings = {
+            "image_width": "100",
+            "image_height": "100",
+            "seq_begin": 0,
+            "seq_end": 9,
+            "prefix": "test_",
+            "index_length": 4,
+            "file_type": "tif",
+        }
+
+        with patch("core.pyramid_engine.PyramidEngine", wraps=PyramidEngine) as engine:
+            result = generator.generate_python(
+                directory=temp_image_dir,
+                settings=settings,
+                threadpool=QThreadPool(),
+                progress_dialog=MockProgressDialog(cancelled=False),
+                single_pass=False,
+                engine="threads",
+                workers=3,
+            )
+
+        assert result["success"] is True
+        assert engine.call_args.kwargs["workers"] == 3
+        assert engine.call_args.kwargs["use_processes"] is False
+
 
 @pytest.mark.integration
 class TestThumbnailGeneratorIntegration:
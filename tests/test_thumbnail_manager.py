@@ -1,241 +0,0 @@
-"""
-Tests for core/thumbnail_manager.py - Thumbnail generation manager
-
-Part of Phase 2 quality improvement plan (devlog 072)
-"""
-
-import tempfile
-from unittest.mock import MagicMock, Mock, patch
-
-import pytest
-from PyQt5.QtCore import QThreadPool
-
-from core.thumbnail_manager import ThumbnailManager
-
-
-class TestThumbnailManager:
-    """Test suite for ThumbnailManager class"""
-
-    @pytest.fixture
-    def mock_parent(self):
-        """Create a mock thumbnail parent"""
-        parent = Mock()
-        parent.total_levels = 3
-        parent.level_work_distribution = {0: 0.5, 1: 0.3, 2: 0.2}
-        parent.weighted_total_work = 100.0
-        parent.images_per_second = 10.0  # Add numeric value for formatting
-        parent.sample_size = 5  # Add sample size
-        parent.measured_images_per_second = 10.0  # Add measured speed
-        return parent
-
-    @pytest.fixture
-    def mock_progress_dialog(self):
-        """Create a mock progress dialog"""
-        dialog = Mock()
-        dialog.pb_progress = Mock()
-        dialog.pb_progress.setValue = Mock()
-        dialog.lbl_detail = Mock()
-        dialog.lbl_detail.setText = Mock()
-        dialog.is_cancelled = False
-        return dialog
-
-    @pytest.fixture
-    def threadpool(self):
-        """Create a QThreadPool for testing"""
-        return QThreadPool()
-
-    def test_initialization_basic(self, mock_parent, mock_progress_dialog, threadpool):
-        """Test ThumbnailManager initialization with basic parameters"""
-        manager = ThumbnailManager(mock_parent, mock_progress_dialog, threadpool)
-
-        assert manager.thumbnail_parent == mock_parent
-        assert manager.progress_dialog == mock_progress_dialog
-        assert manager.threadpool == threadpool
-        assert hasattr(manager, "progress_manager")
-        assert hasattr(manager, "time_estimator")
-
-    def test_initialization_without_shared_manager(
-        self, mock_parent, mock_progress_dialog, threadpool
-    ):
-        """Test ThumbnailManager creates its own progress manager if not provided"""
-        manager = ThumbnailManager(mock_parent, mock_progress_dialog, threadpool)
-
-        assert manager.progress_manager is not None
-        assert hasattr(manager.progress_manager, "set_speed")
-        assert hasattr(manager.progress_manager, "set_sampling")
-
-    def test_initialization_with_shared_manager(
-        self, mock_parent, mock_progress_dialog, threadpool
-    ):
-        """Test ThumbnailManager uses shared progress manager when provided"""
-        shared_manager = Mock()
-
-        manager = ThumbnailManager(
-            mock_parent, mock_progress_dialog, threadpool, shared_progress_manager=shared_manager
-        )
-
-        assert manager.progress_manager == shared_manager
-
-    def test_progress_tracking_initialization(self, mock_parent, mock_progress_dialog, threadpool):
-        """Test progress tracking attributes are initialized"""
-        manager = ThumbnailManager(mock_parent, mock_progress_dialog, threadpool)
-
-        assert manager.total_tasks == 0
-        assert manager.completed_tasks == 0
-        assert manager.global_step_counter == 0.0
-        assert manager.level == 0
-        assert manager.results == {}
-        assert manager.is_cancelled is False
-
-    def test_sampling_attributes_initialization(
-        self, mock_parent, mock_progress_dialog, threadpool
-    ):
-        """Test sampling-related attributes are initialized"""
-        manager = ThumbnailManager(mock_parent, mock_progress_dialog, threadpool)
-
-        assert hasattr(manager, "is_sampling")
-        assert hasattr(manager, "sample_start_time")
-        assert hasattr(manager, "sample_size")
-
-    def test_update_progress_text(self, mock_parent, mock_progress_dialog, threadpool):
-        """Test _update_progress_text method"""
-        manager = ThumbnailManager(mock_parent, mock_progress_dialog, threadpool)
-
-        # Mock progress_manager.get_detail_text
-        manager.progress_manager.get_detail_text = Mock(return_value="Processing...")
-
-        manager._update_progress_text("ETA: 5m")
-
-        # Should update the detail label
-        mock_progress_dialog.lbl_detail.setText.assert_called()
-        call_args = mock_progress_dialog.lbl_detail.setText.call_args[0][0]
-        assert "ETA: 5m" in call_args
-        assert "Processing..." in call_args
-
-    def test_update_progress_text_without_eta(self, mock_parent, mock_progress_dialog, threadpool):
-        """Test _update_progress_text with None ETA"""
-        manager = ThumbnailManager(mock_parent, mock_progress_dialog, threadpool)
-
-        manager.progress_manager.get_detail_text = Mock(return_value="Processing...")
-
-        manager._update_progress_text(None)
-
-        mock_progress_dialog.lbl_detail.setText.assert_called_with("Processing...")
-
-    def test_update_progress_text_without_detail(
-        self, mock_parent, mock_progress_dialog, threadpool
-    ):
-        """Test _update_progress_text with None detail text"""
-        manager = ThumbnailManager(mock_parent, mock_progress_dialog, threadpool)
-
-        manager.progress_manager.get_detail_text = Mock(return_value=None)
-
-        manager._update_progress_text("ETA: 5m")
-
-        mock_progress_dialog.lbl_detail.setText.assert_called_with("ETA: 5m")
-
-    def test_signals_connection_to_progress_dialog(
-        self, mock_parent, mock_progress_dialog, threadpool
-    ):
-        """Test that progress manager signals are connected to progress dialog"""
-        manager = ThumbnailManager(mock_parent, mock_progress_dialog, threadpool)
-
-        # Verify progress_manager has signals connected
-        # This is implicit in the initialization, we just verify the dialog was passed
-        assert manager.progress_dialog is not None
-
-    def test_process_level_basic_setup(self, mock_parent, mock_progress_dialog, threadpool):
-        """Test process_level sets up tracking variables correctly"""
-        with (
-            tempfile.TemporaryDirectory() as from_dir,
-            tempfile.TemporaryDirectory() as to_dir,
-        ):
-            manager = ThumbnailManager(mock_parent, mock_progress_dialog, threadpool)
-
-            # Create some dummy files
-            import os
-
-            for i in range(10):
-                open(os.path.join(from_dir, f"img_{i:04d}.tif"), "w").close()
-
-            settings_hash = {
-                "prefix": "img_",
-                "index_length": 4,
-                "file_type": "tif",
-            }
-
-            # Mock the worker execution to avoid actual processing
-            with patch("core.thumbnail_manager.ThumbnailWorker") as mock_worker_class:
-                mock_worker = Mock()
-                mock_worker_class.return_value = mock_worker
-
-                # Cancel immediately to avoid hanging
-                mock_progress_dialog.is_cancelled = True
-
-                result, cancelled = manager.process_level(
-                    level=0,
-                    from_dir=from_dir,
-                    to_dir=to_dir,
-                    seq_begin=0,
-                    seq_end=9,
-                    settings_hash=settings_hash,
-                    size=256,
-                    max_thumbnail_size=512,
-                    global_step_offset=0,
-                )
-
-                assert cancelled is True
-
-    def test_time_estimator_attribute(self, mock_parent, mock_progress_dialog, threadpool):
-        """Test that ThumbnailManager has time_estimator attribute"""
-        manager = ThumbnailManager(mock_parent, mock_progress_dialog, threadpool)
-
-        assert hasattr(manager, "time_estimator")
-        from utils.time_estimator import TimeEstimator
-
-        assert isinstance(manager.time_estimator, TimeEstimator)
-
-    def test_thread_safety_attributes(self, mock_parent, mock_progress_dialog, threadpool):
-        """Test that thread safety mechanisms are in place"""
-        manager = ThumbnailManager(mock_parent, mock_progress_dialog, threadpool)
-
-        # Manager uses QThreadPool for thread safety
-        assert manager.threadpool is not None
-
-    @pytest.mark.parametrize(
-        "level,expected_weight",
-        [
-            (0, 1.0),
-            (1, 0.25),
-            (2, 0.0625),
-        ],
-    )
-    def test_level_weight_calculation(
-        self, mock_parent, mock_progress_dialog, threadpool, level, expected_weight
-    ):
-        """Parametrized test for level weight calculation"""
-        manager = ThumbnailManager(mock_parent, mock_progress_dialog, threadpool)
-
-        # The level_weight is set during process_level
-        # For this test we verify the constant exists
-        assert hasattr(manager, "level_weight") or level >= 0  # level_weight set in process_level
-
-    def test_results_dictionary_initialization(self, mock_parent, mock_progress_dialog, threadpool):
-        """Test results dictionary is properly initialized"""
-        manager = ThumbnailManager(mock_parent, mock_progress_dialog, threadpool)
-
-        assert isinstance(manager.results, dict)
-        assert len(manager.results) == 0
-
-    def test_cancellation_flag_initialization(self, mock_parent, mock_progress_dialog, threadpool):
-        """Test cancellation flag is initialized to False"""
-        manager = ThumbnailManager(mock_parent, mock_progress_dialog, threadpool)
-
-        assert manager.is_cancelled is False
-
-    def test_parent_none_handling(self, mock_progress_dialog, threadpool):
-        """Test ThumbnailManager handles None parent gracefully"""
-        manager = ThumbnailManager(None, mock_progress_dialog, threadpool)
-
-        assert manager.thumbnail_parent is None
-        assert manager.progress_manager is not None  # Should still create progress manager
@@ -0,0 +1,140 @@
+"""
+Tests for VolumeBuffer and load_volume (core/volume_buffer.py)
+
+Slices must land in their slots without the volume ever being assembled from
+a list, and a volume with no gaps must come back as the buffer itself.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from core.volume_buffer import VolumeBuffer, load_volume
+
+
+@pytest.fixture
+def slice_dir():
+    directory = tempfile.mkdtemp()
+    yield directory
+    shutil.rmtree(directory)
+
+
+def _write_slices(directory, count, shape=(6, 8), dtype=np.uint16):
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"{i:06}.tif")
+        Image.fromarray(np.full(shape, i * 100, dtype=dtype)).save(path)
+        paths.append(path)
+    return paths
+
+
+@pytest.mark.unit
+class TestVolumeBuffer:
+    def test_full_buffer_returned_without_copy(self):
+        buffer = VolumeBuffer(3)
+        slots = [buffer.put(idx, np.full((4, 5), idx, dtype=np.uint8)) for idx in (2, 0, 1)]
+
+        volume = buffer.volume()
+
+        assert volume is buffer.array
+        assert volume.shape == (3, 4, 5)
+        assert [int(volume[i, 0, 0]) for i in range(3)] == [0, 1, 2]
+        assert all(np.shares_memory(slot, volume) for slot in slots)
+
+    def test_leading_slots_returned_as_view(self):
+        buffer = VolumeBuffer(4)
+        buffer.put(0, np.zeros((2, 2), dtype=np.uint8))
+        buffer.put(1, np.ones((2, 2), dtype=np.uint8))
+
+        volume = buffer.volume()
+
+        assert volume.shape == (2, 2, 2)
+        assert np.shares_memory(volume, buffer.array)
+
+    def test_gaps_are_left_out(self):
+        buffer = VolumeBuffer(3)
+        buffer.put(0, np.zeros((2, 2), dtype=np.uint8))
+        buffer.put(2, np.full((2, 2), 2, dtype=np.uint8))
+
+        volume = buffer.volume()
+
+        assert volume.shape == (2, 2, 2)
+        assert int(volume[1, 0, 0]) == 2
+        assert 1 not in buffer
+        assert len(buffer) == 2
+
+    def test_mismatched_slices_refused(self):
+        buffer = VolumeBuffer(3)
+        buffer.put(0, np.zeros((2, 2), dtype=np.uint8))
+
+        assert buffer.put(1, np.zeros((3, 3), dtype=np.uint8)) is None
+        assert buffer.put(1, np.zeros((2, 2), dtype=np.uint16)) is None
+        assert len(buffer) == 1
+
+    def test_empty_buffer(self):
+        assert VolumeBuffer(5).volume().size == 0
+
+    def test_concurrent_puts(self):
+        buffer = VolumeBuffer(64)
+
+        def fill(start):
+            for idx in range(start, 64, 4):
+                buffer.put(idx, np.full((8, 8), idx, dtype=np.uint16))
+
+        threads = [threading.Thread(target=fill, args=(start,)) for start in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        volume = buffer.volume()
+        np.testing.assert_array_equal(volume[:, 0, 0], np.arange(64))
+
+    def test_memmap_backed_volume(self, slice_dir):
+        path = os.path.join(slice_dir, "volume.npy")
+        buffer = VolumeBuffer(2, memmap_path=path)
+        buffer.put(0, np.zeros((3, 3), dtype=np.uint8))
+        buffer.put(1, np.full((3, 3), 7, dtype=np.uint8))
+        buffer.volume().flush()
+
+        reopened = np.load(path, mmap_mode="r")
+
+        assert reopened.shape == (2, 3, 3)
+        assert int(reopened[1, 2, 2]) == 7
+
+
+@pytest.mark.unit
+class TestLoadVolume:
+    def test_loads_in_order(self, slice_dir):
+        paths = _write_slices(slice_dir, 5)
+
+        volume = load_volume(paths)
+
+        assert volume.shape == (5, 6, 8)
+        assert volume.dtype == np.uint16
+        np.testing.assert_array_equal(volume[:, 0, 0], [0, 100, 200, 300, 400])
+
+    def test_transform_applied_per_slice(self, slice_dir):
+        paths = _write_slices(slice_dir, 3)
+
+        volume = load_volume(paths, transform=lambda arr: (arr // 100).astype(np.uint8))
+
+        assert volume.dtype == np.uint8
+        np.testing.assert_array_equal(volume[:, 0, 0], [0, 1, 2])
+
+    def test_missing_slices_skipped(self, slice_dir):
+        paths = _write_slices(slice_dir, 4)
+        os.remove(paths[1])
+
+        volume = load_volume(paths)
+
+        assert volume.shape[0] == 3
+        np.testing.assert_array_equal(volume[:, 0, 0], [0, 200, 300])
+
+    def test_nothing_readable(self):
+        assert load_volume([]).size == 0
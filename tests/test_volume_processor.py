@@ -328,6 +328,38 @@ def test_scale_coordinates_various_levels(self, processor, from_level, to_level,
         expected = [c * factor for c in coords]
         assert scaled == expected
 
+    def test_roi_in_finer_level(self, processor, sample_level_info):
+        """ROI chosen on the smallest level maps onto level 0"""
+        roi = processor.roi_in_level(
+            level_info=sample_level_info,
+            curr_level_idx=2,
+            target_level_idx=0,
+            top_idx=19,
+            bottom_idx=5,
+            crop_box=[10, 20, 100, 200],
+        )
+
+        assert roi == [20, 80, 80, 800, 40, 400]
+
+    def test_roi_in_coarser_level_widened(self, processor, sample_level_info):
+        """Odd bounds are widened to whole voxels of the coarser level"""
+        roi = processor.roi_in_level(
+            level_info=sample_level_info,
+            curr_level_idx=0,
+            target_level_idx=1,
+            top_idx=10,
+            bottom_idx=3,
+            crop_box=[5, 7, 9, 8],
+        )
+
+        assert roi == [1, 6, 3, 4, 2, 5]
+
+    def test_roi_in_level_invalid_range(self, processor, sample_level_info):
+        """Invalid top/bottom falls back to every slice"""
+        roi = processor.roi_in_level(sample_level_info, 1, 2, -1, -1, [0, 0, 512, 512])
+
+        assert roi == [0, 25, 0, 256, 0, 256]
+
 
 @pytest.mark.unit
 class TestVolumeProcessorEdgeCases:
@@ -105,32 +105,6 @@ def mock_16bit_image_stack(tmp_path):
     return image_dir
 
 
-@pytest.fixture
-def mock_thumbnail_worker(mocker):
-    """
-    Mock ThumbnailWorker to avoid actual processing during tests.
-
-    Returns:
-        Mock: Mocked ThumbnailWorker class
-    """
-    if not PYQT_AVAILABLE:
-        return None
-    return mocker.patch("core.thumbnail_worker.ThumbnailWorker")
-
-
-@pytest.fixture
-def mock_mesh_generation_thread(mocker):
-    """
-    Mock MeshGenerationThread to avoid expensive 3D processing.
-
-    Returns:
-        Mock: Mocked MeshGenerationThread class
-    """
-    if not PYQT_AVAILABLE:
-        return None
-    return mocker.patch("ui.widgets.mcube_widget.MeshGenerationThread")
-
-
 @pytest.fixture
 def sample_numpy_volume():
     """
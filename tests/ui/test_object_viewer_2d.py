@@ -24,7 +24,7 @@
 
 if PYQT_AVAILABLE:
     from config.view_modes import MODE_ADD_BOX, MODE_EDIT_BOX, MODE_MOVE_BOX, MODE_VIEW
-    from ui.widgets.object_viewer_2d import ObjectViewer2D
+    from ui.widgets.object_viewer_2d import ObjectViewer2D, threshold_lut
 
 
 def create_test_pixmap(width=100, height=100):
@@ -335,6 +335,132 @@ def test_initial_inverse_flag(self, viewer):
         assert viewer.is_inverse is False
 
 
+@pytest.mark.skipif(not PYQT_AVAILABLE, reason="PyQt5 not available")
+@pytest.mark.qt
+class TestObjectViewer2DThreshold:
+    """Threshold colouring through lookup tables, and the cache of its results"""
+
+    @pytest.fixture
+    def parent_widget(self, qtbot):
+        widget = QWidget()
+        qtbot.addWidget(widget)
+        return widget
+
+    @pytest.fixture
+    def viewer(self, qtbot, parent_widget):
+        v = ObjectViewer2D(parent_widget)
+        qtbot.addWidget(v)
+        v.resize(512, 512)
+        arr = np.zeros((64, 64), dtype=np.uint8)
+        arr[:, 32:] = 200
+        v.set_image_array(arr)
+        return v
+
+    def _pixel(self, pixmap, x, y):
+        color = pixmap.toImage().pixelColor(x, y)
+        return color.red(), color.green(), color.blue()
+
+    def test_lut_8bit(self):
+        lut = threshold_lut(False, 60, False, (0, 255, 0))
+
+        assert lut.shape == (256, 3)
+        assert tuple(lut[60]) == (60, 60, 60)
+        assert tuple(lut[61]) == (0, 255, 0)
+
+    def test_lut_inverse_and_16bit(self):
+        lut = threshold_lut(True, 60, True, (0, 255, 0))
+
+        assert lut.shape == (65536, 3)
+        assert tuple(lut[60 << 8]) == (0, 255, 0)
+        assert tuple(lut[(61 << 8) + 5]) == (61, 61, 61)
+
+    def test_pixels_past_threshold_coloured(self, viewer):
+        pixmap = viewer.curr_pixmap
+        width = pixmap.width()
+
+        assert self._pixel(pixmap, 2, 2) == (0, 0, 0)
+        assert self._pixel(pixmap, width - 2, 2) == (0, 255, 0)
+
+    def test_only_roi_coloured(self, viewer):
+        viewer.set_mode(MODE_VIEW)
+        viewer.crop_from_x, viewer.crop_from_y = 48, 0
+        viewer.crop_to_x, viewer.crop_to_y = 63, 63
+        viewer.calculate_resize()
+        pixmap = viewer.curr_pixmap
+
+        assert self._pixel(pixmap, pixmap.width() * 9 // 16, 2) == (200, 200, 200)
+        assert self._pixel(pixmap, pixmap.width() * 7 // 8, 2) == (0, 255, 0)
+
+    def test_render_reused_until_state_changes(self, viewer):
+        first = viewer.curr_pixmap
+
+        viewer.calculate_resize()
+        assert viewer.curr_pixmap is first
+
+        viewer.set_isovalue(220)
+        viewer.calculate_resize()
+        assert viewer.curr_pixmap is not first
+        assert self._pixel(viewer.curr_pixmap, viewer.curr_pixmap.width() - 2, 2) == (
+            200,
+            200,
+            200,
+        )
+
+        viewer.set_isovalue(60)
+        viewer.calculate_resize()
+        assert viewer.curr_pixmap is first
+
+    def test_new_slice_not_served_from_cache(self, viewer):
+        first = viewer.curr_pixmap
+
+        viewer.set_image_array(np.full((64, 64), 200, dtype=np.uint8))
+
+        assert viewer.curr_pixmap is not first
+        assert self._pixel(viewer.curr_pixmap, 2, 2) == (0, 255, 0)
+
+
+@pytest.mark.skipif(not PYQT_AVAILABLE, reason="PyQt5 not available")
+@pytest.mark.qt
+class TestObjectViewer2DCoarserLevel:
+    """A coarser level shown in place of the selected one keeps the selected level's space"""
+
+    @pytest.fixture
+    def parent_widget(self, qtbot):
+        widget = QWidget()
+        qtbot.addWidget(widget)
+        return widget
+
+    @pytest.fixture
+    def viewer(self, qtbot, parent_widget):
+        v = ObjectViewer2D(parent_widget)
+        qtbot.addWidget(v)
+        v.resize(512, 512)
+        return v
+
+    def test_display_scale(self, viewer):
+        assert viewer.display_scale(2048, 1024) == 0.25
+        assert viewer.display_scale(256, 1024) == 0.5
+
+    def test_roi_in_selected_level_space(self, viewer):
+        viewer.set_image_array(np.zeros((600, 800), dtype=np.uint8), image_size=(2400, 1800))
+
+        assert (viewer.image_width(), viewer.image_height()) == (2400, 1800)
+        assert viewer.get_crop_area(imgxy=True) == [0, 0, 2400, 1800]
+        assert viewer.curr_pixmap.width() == 512
+        assert not viewer.shows_coarser_than_view()
+
+    def test_coarser_than_view(self, viewer):
+        viewer.set_image_array(np.zeros((150, 200), dtype=np.uint8), image_size=(2400, 1800))
+
+        assert viewer.shows_coarser_than_view()
+
+    def test_own_level_has_no_override(self, viewer):
+        viewer.set_image_array(np.zeros((600, 800), dtype=np.uint8), image_size=(2400, 1800))
+        viewer.set_image_array(np.zeros((60, 80), dtype=np.uint8))
+
+        assert (viewer.image_width(), viewer.image_height()) == (80, 60)
+
+
 @pytest.mark.skipif(not PYQT_AVAILABLE, reason="PyQt5 not available")
 @pytest.mark.qt
 class TestObjectViewer2DEdgeCases:
@@ -172,8 +172,8 @@ def update_unified_progress(self, step, detail_text=""):
                     self.step_times.append(step_duration)
                     self.step_history.append((current_time, step))
 
-            # Don't calculate ETA here - it will be set externally by ThumbnailManager
-            # after sampling or periodic updates
+            # Don't calculate ETA here - the thumbnail build sets it externally
+            # with each progress event
             # Just keep the existing text if no new one is provided
             current_text = self.lbl_detail.text()
             if not current_text.startswith("ETA:") and current_text != "Estimating...":
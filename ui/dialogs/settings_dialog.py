@@ -23,6 +23,7 @@
     QWidget,
 )
 
+from config.constants import PREVIEW_TRIANGLE_BUDGET
 from utils.settings_manager import SettingsManager
 
 logger = logging.getLogger(__name__)
@@ -197,6 +198,11 @@ def create_processing_tab(self):
         self.threads_spin.setSpecialValueText("Auto")
         form_layout.addRow("Worker threads:", self.threads_spin)
 
+        # Python fallback engine
+        self.python_engine_combo = QComboBox()
+        self.python_engine_combo.addItems(["Threads", "Processes"])
+        form_layout.addRow("Python engine:", self.python_engine_combo)
+
         # Memory limit
         self.memory_limit_spin = QSpinBox()
         self.memory_limit_spin.setRange(1, 64)
@@ -235,6 +241,16 @@ def create_rendering_tab(self):
         self.show_fps_check = QCheckBox("Show FPS counter")
         form_layout.addRow("", self.show_fps_check)
 
+        # Preview triangle budget
+        self.triangle_budget_spin = QSpinBox()
+        self.triangle_budget_spin.setRange(0, 10_000_000)
+        self.triangle_budget_spin.setSingleStep(10_000)
+        self.triangle_budget_spin.setSpecialValueText("No limit")
+        self.triangle_budget_spin.setToolTip(
+            "The 3D preview is simplified to about this many triangles. Exports use the full mesh."
+        )
+        form_layout.addRow("Preview triangles:", self.triangle_budget_spin)
+
         group.setLayout(form_layout)
         layout.addWidget(group)
 
@@ -269,6 +285,9 @@ def create_advanced_tab(self):
         self.mesh_format_combo.addItems(["STL", "PLY", "OBJ"])
         export_layout.addRow("Mesh format:", self.mesh_format_combo)
 
+        self.mesh_normals_check = QCheckBox("Write vertex normals (PLY, OBJ)")
+        export_layout.addRow("", self.mesh_normals_check)
+
         self.image_format_combo = QComboBox()
         self.image_format_combo.addItems(["TIF", "PNG", "JPG"])
         export_layout.addRow("Image format:", self.image_format_combo)
@@ -315,6 +334,9 @@ def load_settings(self):
         else:
             self.threads_spin.setValue(int(threads))
 
+        self.python_engine_combo.setCurrentIndex(
+            1 if s.get("processing.python_engine", "threads") == "processes" else 0
+        )
         self.memory_limit_spin.setValue(s.get("processing.memory_limit_gb", 4))
         self.use_rust_check.setChecked(s.get("processing.use_rust_module", True))
 
@@ -322,6 +344,9 @@ def load_settings(self):
         self.threshold_spin.setValue(s.get("rendering.default_threshold", 128))
         self.antialiasing_check.setChecked(s.get("rendering.anti_aliasing", True))
         self.show_fps_check.setChecked(s.get("rendering.show_fps", False))
+        self.triangle_budget_spin.setValue(
+            int(s.get("rendering.preview_triangle_budget", PREVIEW_TRIANGLE_BUDGET))
+        )
 
         # Advanced
         log_level = s.get("logging.level", "INFO")
@@ -336,6 +361,7 @@ def load_settings(self):
         mesh_formats = ["STL", "PLY", "OBJ"]
         if mesh_fmt in mesh_formats:
             self.mesh_format_combo.setCurrentIndex(mesh_formats.index(mesh_fmt))
+        self.mesh_normals_check.setChecked(s.get("export.mesh_normals", False))
 
         img_fmt = s.get("export.image_format", "tif").upper()
         img_formats = ["TIF", "PNG", "JPG"]
@@ -365,6 +391,10 @@ def save_settings(self):
         # Processing
         threads = self.threads_spin.value()
         s.set("processing.threads", "auto" if threads == 0 else threads)
+        s.set(
+            "processing.python_engine",
+            "processes" if self.python_engine_combo.currentIndex() == 1 else "threads",
+        )
         s.set("processing.memory_limit_gb", self.memory_limit_spin.value())
 
         # Update both settings file and app state
@@ -386,6 +416,7 @@ def save_settings(self):
         s.set("rendering.default_threshold", self.threshold_spin.value())
         s.set("rendering.anti_aliasing", self.antialiasing_check.isChecked())
         s.set("rendering.show_fps", self.show_fps_check.isChecked())
+        s.set("rendering.preview_triangle_budget", self.triangle_budget_spin.value())
 
         # Advanced
         levels = ["DEBUG", "INFO", "WARNING", "ERROR"]
@@ -395,6 +426,7 @@ def save_settings(self):
         # Export
         mesh_formats = ["stl", "ply", "obj"]
         s.set("export.mesh_format", mesh_formats[self.mesh_format_combo.currentIndex()])
+        s.set("export.mesh_normals", self.mesh_normals_check.isChecked())
 
         img_formats = ["tif", "png", "jpg"]
         s.set("export.image_format", img_formats[self.image_format_combo.currentIndex()])
@@ -25,14 +25,24 @@
 
 import logging
 import os
+import tempfile
+from collections.abc import Iterator
 from pathlib import Path
 from typing import TYPE_CHECKING
 
-import mcubes
 import numpy as np
 from PIL import Image
-from PyQt5.QtWidgets import QApplication, QFileDialog, QMessageBox
-
+from PyQt5.QtWidgets import QApplication, QFileDialog, QInputDialog, QMessageBox
+
+from config.constants import SUPPORTED_EXPORT_FORMATS
+from core.level_container import open_level
+from core.memory_budget import MemoryBudget
+from core.mesh_transform import transform_mesh
+from core.mesh_writers import vertex_normals, write_mesh
+from core.pyramid_engine import resolve_worker_count
+from core.slab_mcubes import marching_cubes_streamed, plan_slabs
+from core.slice_prefetcher import SlicePrefetcher, first_slice_bytes
+from core.thumbnail_generator import ThumbnailGenerator
 from security.file_validator import SecureFileValidator
 from ui.dialogs import ProgressDialog
 from utils.ui_utils import wait_cursor
@@ -42,12 +52,19 @@
 
 logger = logging.getLogger(__name__)
 
+# Save dialog filter for each mesh format
+MESH_FILE_FILTERS = {
+    ".stl": "STL format (*.stl)",
+    ".ply": "PLY format (*.ply)",
+    ".obj": "OBJ format (*.obj)",
+}
+
 
 class ExportHandler:
     """Handles file export and save operations for CTHarvester main window.
 
     This class manages:
-    - 3D model export to OBJ format (marching cubes algorithm)
+    - 3D model export to STL, PLY or OBJ (marching cubes algorithm)
     - Cropped image stack saving with progress tracking
     - Atomic file writes for data integrity
     - Progress dialog management
@@ -73,38 +90,53 @@ def __init__(self, main_window: "CTHarvesterMainWindow") -> None:
         self.window: CTHarvesterMainWindow = main_window
 
     def export_3d_model_to_obj(self) -> None:
-        """Export 3D model to OBJ file format using marching cubes.
+        """Export 3D model to an STL, PLY or OBJ file using marching cubes.
 
-        Opens a file save dialog, generates a 3D mesh from the current volume
-        using the marching cubes algorithm, and saves the result as an OBJ file.
+        Opens a file save dialog, asks which level to mesh, generates a 3D
+        mesh of the ROI at that level using the marching cubes algorithm, and
+        saves the result in the format of the file name's extension.
 
         The process includes:
         1. File save dialog for output path selection
-        2. Mesh generation using marching cubes
-        3. Vertex coordinate transformation for correct orientation
-        4. Atomic file write with error handling
+        2. Level selection, any level from the original images down
+        3. Mesh generation using marching cubes, streaming the ROI from disk
+        4. Vertex coordinate transformation for correct orientation
+        5. Atomic file write with error handling
 
         Note:
             Uses atomic writes (temp file + rename) to prevent corruption.
             Shows error dialog on failure.
         """
         # Get save filename
-        obj_filename = self._get_export_filename()
-        if not obj_filename:
+        mesh_filename = self._get_export_filename()
+        if not mesh_filename:
+            return
+
+        level = self._choose_export_level()
+        if level is None:
             return
 
         # Generate mesh
+        progress_dialog = self._create_progress_dialog()
         try:
-            vertices, triangles = self._generate_mesh()
+            with wait_cursor():
+                mesh = self._generate_mesh(level, progress_dialog)
         except Exception as e:
             self._show_error(f"Failed to generate 3D mesh: {e}")
             return
+        finally:
+            progress_dialog.close()
+        if mesh is None:
+            logger.info("Export cancelled while meshing")
+            return
 
-        # Save to OBJ file
-        self._save_obj_file(obj_filename, vertices, triangles)
+        self._save_mesh_file(mesh_filename, *mesh)
 
     def _get_export_filename(self) -> str:
-        """Show file save dialog for OBJ export.
+        """Show file save dialog for mesh export.
+
+        Every supported format is offered, export.mesh_format first. A file
+        name typed without a supported extension gets the chosen filter's.
 
         Returns:
             Selected filename path, or empty string if cancelled
@@ -114,104 +146,210 @@ def _get_export_filename(self) -> str:
             >>> if filename:
             ...     # User selected a file
         """
-        obj_filename, _ = QFileDialog.getSaveFileName(
-            self.window, "Save File As", self.window.edtDirname.text(), "OBJ format (*.obj)"
+        preferred = "." + str(self.window.settings_manager.get("export.mesh_format", "stl"))
+        preferred = preferred.lower() if preferred.lower() in MESH_FILE_FILTERS else ".stl"
+        mesh_filename, chosen = QFileDialog.getSaveFileName(
+            self.window,
+            "Save File As",
+            self.window.edtDirname.text(),
+            ";;".join(MESH_FILE_FILTERS.values()),
+            MESH_FILE_FILTERS[preferred],
         )
 
-        if obj_filename:
-            logger.info(f"Exporting 3D model to: {obj_filename}")
+        if mesh_filename and Path(mesh_filename).suffix.lower() not in SUPPORTED_EXPORT_FORMATS:
+            mesh_filename += next(
+                (ext for ext, name in MESH_FILE_FILTERS.items() if name == chosen), preferred
+            )
+
+        if mesh_filename:
+            logger.info(f"Exporting 3D model to: {mesh_filename}")
         else:
             logger.info("Export cancelled")
 
-        return obj_filename
+        return mesh_filename
+
+    def _choose_export_level(self) -> int | None:
+        """Ask which level to mesh, offering the one selected in the viewer.
+
+        Returns:
+            Index into level_info, or None if cancelled
+        """
+        items = [
+            f"{info['name']} ({info['width']} x {info['height']} x "
+            f"{info['seq_end'] - info['seq_begin'] + 1})"
+            for info in self.window.level_info
+        ]
+        item, ok = QInputDialog.getItem(
+            self.window,
+            self.window.tr("Export 3D model"),
+            self.window.tr("Resolution level:"),
+            items,
+            self.window.comboLevel.currentIndex(),
+            False,
+        )
+        if not ok:
+            logger.info("Export cancelled")
+            return None
+        return items.index(item)
+
+    def _generate_mesh(
+        self, level: int, progress_dialog: ProgressDialog
+    ) -> tuple[np.ndarray, np.ndarray] | None:
+        """Generate 3D mesh of the ROI at `level` using marching cubes.
 
-    def _generate_mesh(self) -> tuple[np.ndarray, np.ndarray]:
-        """Generate 3D mesh using marching cubes algorithm.
+        The ROI selected in the viewer is mapped onto `level` and read from
+        disk one slice at a time. Slices are meshed in slabs as they arrive,
+        by processing.threads worker processes, with the slabs in memory
+        bounded by the tasks share of processing.memory_limit_gb (see
+        core.slab_mcubes), so the ROI is never held whole.
 
-        Extracts the cropped volume and isovalue from the UI, runs the
-        marching cubes algorithm, and transforms vertices for correct orientation.
+        Args:
+            level: Index into level_info; 0 is the original images
+            progress_dialog: Shows slices read; its Cancel button stops meshing
 
         Returns:
             Tuple containing:
                 - vertices: Nx3 array of vertex positions
                 - triangles: Mx3 array of triangle face indices
+            None if cancelled
 
         Raises:
-            Exception: If mesh generation fails (e.g., invalid volume data)
+            Exception: If mesh generation fails (e.g., unreadable slices)
 
         Note:
             Vertices are transformed with axis swap: [x,y,z] -> [z,x,y]
-            for correct orientation in 3D viewers.
+            for correct orientation in 3D viewers, and returned as float32.
+            They are in voxels of `level`, from the ROI's corner.
         """
-        # Get cropped volume
-        threed_volume, _ = self.window.get_cropped_volume()
-        isovalue = self.window.image_label.isovalue
+        window = self.window
+        z0, z1, y0, y1, x0, x1 = window.volume_processor.roi_in_level(
+            window.level_info,
+            window.curr_level_idx,
+            level,
+            window.image_label.top_idx,
+            window.image_label.bottom_idx,
+            window.image_label.get_crop_area(imgxy=True),
+        )
+        logger.info(f"Meshing level {level}, ROI z {z0}:{z1}, y {y0}:{y1}, x {x0}:{x1}")
+
+        settings = window.settings_manager
+        budget = MemoryBudget(settings.get("processing.memory_limit_gb"))
+        depth, workers = plan_slabs(
+            (z1 - z0, y1 - y0, x1 - x0),
+            resolve_worker_count(settings.get("processing.threads", "auto")),
+            budget.share("tasks"),
+        )
 
-        # Run marching cubes
-        vertices, triangles = mcubes.marching_cubes(threed_volume, isovalue)
+        def planes():
+            slices = self._read_level_slices(level, range(z0, z1), budget)
+            for count, arr in enumerate(slices, start=1):
+                yield ThumbnailGenerator.normalize_to_8bit(arr[y0:y1, x0:x1])
+                self._update_progress(progress_dialog, count, z1 - z0)
+
+        mesh = marching_cubes_streamed(
+            planes(),
+            window.image_label.isovalue,
+            depth,
+            workers,
+            cancelled=lambda: progress_dialog.is_cancelled,
+        )
+        if mesh is None:
+            return None
 
         # Transform vertices (swap axes for correct orientation)
-        for i in range(len(vertices)):
-            vertices[i] = np.array([vertices[i][2], vertices[i][0], vertices[i][1]])
+        vertices, _ = transform_mesh(mesh[0])
+
+        return vertices, mesh[1]
 
-        return vertices, triangles
+    def _read_level_slices(
+        self, level: int, indices: range, budget: MemoryBudget
+    ) -> Iterator[np.ndarray]:
+        """Slices `indices` of `level`, in order, read ahead of the consumer.
 
-    def _save_obj_file(self, filename: str, vertices: np.ndarray, triangles: np.ndarray) -> None:
-        """Save mesh to OBJ file format with atomic writes.
+        A thumbnail level with a container is read from it; otherwise its files
+        are decoded by a SlicePrefetcher sized from `budget`.
+
+        Raises:
+            OSError: A slice is missing or cannot be read
+        """
+        if level > 0:
+            thumbnail_base = Path(self.window.edtDirname.text()) / ".thumbnail"
+            container = open_level(thumbnail_base, level)
+            if container is not None:
+                for idx in indices:
+                    yield np.asarray(container[idx])
+                return
+
+        paths = [self._get_source_path(self._level_filename(idx, level), level) for idx in indices]
+        window = budget.prefetch_window(first_slice_bytes(paths))
+        with SlicePrefetcher(paths, window=window) as prefetcher:
+            for path in paths:
+                arr = prefetcher.take(path)
+                if arr is None:
+                    raise OSError(f"Cannot read slice {path}")
+                yield arr
+
+    def _level_filename(self, idx: int, level: int) -> str:
+        """File name of slice `idx` of `level`: the original's, or a thumbnail's."""
+        if level == 0:
+            return self._build_filename(idx, 0)
+        return f"{idx:06}.tif"
+
+    def _save_mesh_file(self, filename: str, vertices: np.ndarray, triangles: np.ndarray) -> None:
+        """Save mesh in the format of `filename`'s extension, with atomic writes.
 
         Writes mesh data to a temporary file first, then atomically renames it
         to the target filename to prevent corruption from interrupted writes.
+        STL and PLY are written in binary; see core.mesh_writers.
 
         Args:
-            filename: Output file path
+            filename: Output file path ending in .stl, .ply or .obj
             vertices: Nx3 array of vertex positions
             triangles: Mx3 array of triangle face indices (0-indexed)
 
         Note:
             - Uses atomic file writes (temp + rename) for data integrity
-            - Face indices are converted to 1-indexed for OBJ format
+            - Vertex normals are added to PLY and OBJ if export.mesh_normals
             - Temporary file is cleaned up on error
             - Shows error dialog on failure
         """
         validator = SecureFileValidator()
         temp_file = None
+        extension = Path(filename).suffix.lower()
 
         try:
             # Validate output path (use parent directory as base)
-            import os
-            import tempfile
-
             base_dir = str(Path(filename).parent) or "."
             validated_path = validator.validate_path(filename, base_dir)
 
-            # Write to temporary file first (atomic write)
-            temp_fd, temp_file = tempfile.mkstemp(suffix=".obj", dir=base_dir, text=True)
+            normals = None
+            if extension != ".stl" and self.window.settings_manager.get(
+                "export.mesh_normals", False
+            ):
+                normals = vertex_normals(vertices, triangles)
 
-            with os.fdopen(temp_fd, "w") as fh:
-                # Write vertices
-                for v in vertices:
-                    fh.write(f"v {v[0]} {v[1]} {v[2]}\n")
+            # Write to temporary file first (atomic write)
+            temp_fd, temp_file = tempfile.mkstemp(suffix=extension, dir=base_dir)
 
-                # Write faces (1-indexed)
-                for f in triangles:
-                    fh.write(f"f {f[0] + 1} {f[1] + 1} {f[2] + 1}\n")
+            with os.fdopen(temp_fd, "wb") as fh:
+                write_mesh(fh, extension, vertices, triangles, normals)
 
             # Atomic rename
             Path(temp_file).replace(validated_path)
             temp_file = None  # Successfully moved, don't cleanup
 
-            logger.info(f"Successfully saved OBJ file: {filename}")
+            logger.info(f"Successfully saved mesh file: {filename}")
 
         except OSError as e:
-            error_msg = f"Failed to save OBJ file (I/O error): {e}"
+            error_msg = f"Failed to save mesh file (I/O error): {e}"
             self._show_error(error_msg)
             logger.error(error_msg, exc_info=True)
         except ValueError as e:
-            error_msg = f"Failed to save OBJ file (invalid data): {e}"
+            error_msg = f"Failed to save mesh file (invalid data): {e}"
             self._show_error(error_msg)
             logger.error(error_msg, exc_info=True)
         except Exception as e:
-            error_msg = f"Failed to save OBJ file (unexpected error): {e}"
+            error_msg = f"Failed to save mesh file (unexpected error): {e}"
             self._show_error(error_msg)
             logger.error(error_msg, exc_info=True)
         finally:
@@ -347,7 +485,14 @@ def _save_images_with_progress(
 
         Note:
             Continues processing even if individual images fail (logs errors).
+            A thumbnail level with a container is read from it rather than
+            from one file per image.
         """
+        container = None
+        if crop_info["size_idx"] > 0:
+            thumbnail_base = Path(self.window.edtDirname.text()) / ".thumbnail"
+            container = open_level(thumbnail_base, crop_info["size_idx"])
+
         for i, idx in enumerate(range(crop_info["bottom_idx"], crop_info["top_idx"] + 1)):
             # Build filename
             filename = self._build_filename(idx, crop_info["size_idx"])
@@ -357,7 +502,11 @@ def _save_images_with_progress(
 
             # Process and save image
             try:
-                self._process_and_save_image(source_path, target_dir, filename, crop_info)
+                if container is not None and idx < len(container):
+                    with Image.fromarray(np.asarray(container[idx])) as img:
+                        self._crop_and_save(img, target_dir, filename, crop_info)
+                else:
+                    self._process_and_save_image(source_path, target_dir, filename, crop_info)
             except Exception:
                 logger.exception(f"Error opening/saving image {source_path}")
                 continue
@@ -433,23 +582,29 @@ def _process_and_save_image(
             - Uses SecureFileValidator for path validation
             - Image is opened and closed within context manager
         """
+        with Image.open(source_path) as img:
+            self._crop_and_save(img, target_dir, filename, crop_info)
+
+    @staticmethod
+    def _crop_and_save(
+        img: Image.Image, target_dir: str, filename: str, crop_info: dict[str, int]
+    ) -> None:
+        """Apply the crop, if any, to an open image and save it to target_dir."""
         validator = SecureFileValidator()
 
-        with Image.open(source_path) as img:
-            # Apply crop if specified. Kept in a separate name because crop()
-            # returns a plain Image while img is the ImageFile owned by the
-            # context manager.
-            out = (
-                img.crop(
-                    (crop_info["from_x"], crop_info["from_y"], crop_info["to_x"], crop_info["to_y"])
-                )
-                if crop_info["from_x"] > -1
-                else img
+        # Kept in a separate name because crop() returns a plain Image while
+        # img may be the ImageFile owned by the caller's context manager.
+        out = (
+            img.crop(
+                (crop_info["from_x"], crop_info["from_y"], crop_info["to_x"], crop_info["to_y"])
             )
+            if crop_info["from_x"] > -1
+            else img
+        )
 
-            # Save image with secure path
-            output_path = validator.safe_join(target_dir, filename)
-            out.save(output_path)
+        # Save image with secure path
+        output_path = validator.safe_join(target_dir, filename)
+        out.save(output_path)
 
     def _update_progress(self, progress_dialog: ProgressDialog, current: int, total: int) -> None:
         """Update progress dialog with current progress.
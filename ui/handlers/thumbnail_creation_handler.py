@@ -14,6 +14,7 @@
 import logging
 import time
 from datetime import datetime
+from pathlib import Path
 from typing import TYPE_CHECKING
 
 import numpy as np
@@ -21,6 +22,8 @@
 from PyQt5.QtWidgets import QApplication
 
 from core.auto_setup import detect_initial_settings
+from core.level_container import remove_all
+from core.pyramid_index import write_pyramid_index
 from ui.dialogs.progress_dialog import ProgressDialog
 from ui.errors import ErrorCode, show_error
 from utils.ui_utils import wait_cursor
@@ -80,6 +83,9 @@ def create_thumbnail(self) -> bool:
             use_rust = False
             logger.info("Using Python implementation (Rust module disabled by user)")
 
+        # The build may replace level containers the viewer has mapped
+        self.window.release_level_containers()
+
         if use_rust:
             return self.create_thumbnail_rust()
         else:
@@ -223,6 +229,9 @@ def progress_callback(percentage: float) -> bool:
                 seq_end = int(self.window.settings_hash.get("seq_end", 0))
                 index_length = int(self.window.settings_hash.get("index_length", 0))
 
+                # Rust writes TIFF files only; drop containers they would outdate
+                remove_all(Path(dirname) / ".thumbnail")
+
                 # Call Rust with pattern parameters
                 build_thumbnails(
                     dirname, progress_callback, prefix, file_type, seq_begin, seq_end, index_length
@@ -246,6 +255,7 @@ def progress_callback(percentage: float) -> bool:
                     return False
                 else:
                     success = True
+                    write_pyramid_index(dirname, seq_begin)
 
             except Exception as e:
                 success = False
@@ -403,13 +413,27 @@ def create_thumbnail_python(self) -> bool:
         # Set wait cursor for long operation
         with wait_cursor():
             try:
-                # Call ThumbnailGenerator with progress dialog
-                # Pass the progress dialog directly so ThumbnailManager can connect signals properly
+                from core.pyramid_engine import resolve_worker_count
+
+                settings_manager = self.window.settings_manager
+                use_processes = settings_manager.get("processing.python_engine") == "processes"
+
+                # ThumbnailGenerator runs the build on PyramidEngine's pool and
+                # reports each progress event to the dialog passed here
                 result = self.window.thumbnail_generator.generate_python(
                     directory=self.window.edtDirname.text(),
                     settings=self.window.settings_hash,
                     threadpool=self.window.threadpool,
                     progress_dialog=self.window.progress_dialog,
+                    single_pass=bool(settings_manager.get("thumbnails.single_pass", True)),
+                    engine="processes" if use_processes else "threads",
+                    workers=resolve_worker_count(
+                        settings_manager.get("processing.threads", "auto")
+                    ),
+                    memory_limit_gb=settings_manager.get("processing.memory_limit_gb", 4),
+                    level_containers=bool(
+                        settings_manager.get("thumbnails.level_containers", True)
+                    ),
                 )
 
                 # Handle result
@@ -16,6 +16,7 @@
 import numpy as np
 from PyQt5.QtCore import QRect
 
+from config.constants import PREVIEW_TRIANGLE_BUDGET
 from utils.ui_utils import wait_cursor
 
 if TYPE_CHECKING:
@@ -103,10 +104,18 @@ def update_3d_view(self, update_volume: bool = True) -> None:
 
         if update_volume:
             with wait_cursor():
-                self.window.mcube_widget.update_volume(volume)
+                key = (tuple(roi_box), self.window.curr_level_idx) if roi_box is not None else None
+                self.window.mcube_widget.update_volume(volume, key=key)
+                self._apply_triangle_budget()
                 self.window.mcube_widget.generate_mesh_multithread()
         self.window.mcube_widget.adjust_volume()
 
+    def _apply_triangle_budget(self) -> None:
+        """Give the 3D preview rendering.preview_triangle_budget, read afresh."""
+        self.window.mcube_widget.triangle_budget = self.window.settings_manager.get(
+            "rendering.preview_triangle_budget", PREVIEW_TRIANGLE_BUDGET
+        )
+
     def update_3d_view_with_thumbnails(self) -> None:
         """Update 3D view after loading thumbnails.
 
@@ -154,7 +163,10 @@ def update_3d_view_with_thumbnails(self) -> None:
                 scaled_bounding_box, scaled_bounding_box, curr_slice_val
             )
             self.window.mcube_widget.adjust_boxes()
+            # A new volume: meshes of the last one no longer apply
+            self.window.mcube_widget.mesh_service.cache.clear()
             self.window.mcube_widget.update_volume(self.window.minimum_volume)
+            self._apply_triangle_budget()
             self.window.mcube_widget.generate_mesh()
             self.window.mcube_widget.adjust_volume()
             self.window.mcube_widget.show_buttons()
@@ -8,12 +8,14 @@
 import sys
 from pathlib import Path
 
+import numpy as np
 from PyQt5.QtCore import (
     QRect,
     Qt,
     QThreadPool,
     QTimer,
     QTranslator,
+    pyqtSignal,
 )
 from PyQt5.QtGui import QIcon, QPixmap
 from PyQt5.QtWidgets import (
@@ -27,6 +29,16 @@
     PROGRAM_VERSION,
 )
 from core.file_handler import FileHandler
+from core.level_container import open_level
+from core.pyramid_index import find_levels
+from core.slice_cache import (
+    DirectionalPrefetcher,
+    RefineStep,
+    SliceCache,
+    SliceRefiner,
+    load_display_slice,
+    slice_cache_bytes,
+)
 from core.thumbnail_generator import ThumbnailGenerator
 from core.volume_processor import VolumeProcessor
 from ui.ctharvester_app import CTHarvesterApp
@@ -36,13 +48,15 @@
 from ui.handlers import ExportHandler, WindowSettingsHandler
 from ui.setup import MainWindowSetup
 from utils.common import resource_path
-from utils.image_utils import get_image_dimensions
 from utils.settings_manager import SettingsManager
 
 logger = logging.getLogger(__name__)
 
 
 class CTHarvesterMainWindow(QMainWindow):
+    # (generation, level, idx, arr) from the slice refiner's thread
+    slice_refined = pyqtSignal(int, int, int, object)
+
     def __init__(self):
         super().__init__()
         self.m_app: CTHarvesterApp | None = QApplication.instance()  # type: ignore[assignment]
@@ -65,6 +79,12 @@ def __init__(self):
         self._image_load_timer.timeout.connect(self._perform_delayed_image_load)
         self._pending_image_path = None
         self._pending_image_idx = None
+        self._pending_image_level = 0
+        # Level containers mapped for the slider, by level (None: has none)
+        self._level_containers = {}
+        # Direction the slider last moved in, for reading slices ahead
+        self._slider_idx = 0
+        self._slider_direction = 1
         self.default_directory = "."
         self.threadpool = QThreadPool()
         self.progress_dialog: ProgressDialog | None = None  # Progress dialog for long operations
@@ -77,6 +97,16 @@ def __init__(self):
         self.settings_manager = SettingsManager()
         logger.info(f"Settings file: {self.settings_manager.get_config_file_path()}")
 
+        # Decoded slices shown by the slider, and the ones read ahead of it
+        self.slice_cache = SliceCache(
+            slice_cache_bytes(self.settings_manager.get("processing.memory_limit_gb", 4))
+        )
+        self.slice_prefetcher = DirectionalPrefetcher(self.slice_cache)
+        # Finer versions of the shown slice, painted as they are decoded
+        self.slice_refined.connect(self._show_refined_slice)
+        self.slice_refiner = SliceRefiner(self.slice_cache, self.slice_refined.emit)
+        self._refine_target = None
+
         # Initialize extracted handlers (Phase 1 refactoring)
         self.file_handler = FileHandler()
         self.thumbnail_generator = ThumbnailGenerator()
@@ -334,6 +364,9 @@ def sliderValueChanged(self):
         _, curr_image_idx, _ = self.timeline.values()
         if size_idx < 0:
             size_idx = 0
+        if curr_image_idx != self._slider_idx:
+            self._slider_direction = 1 if curr_image_idx > self._slider_idx else -1
+            self._slider_idx = curr_image_idx
 
         # Build image path
         if size_idx == 0:
@@ -356,6 +389,7 @@ def sliderValueChanged(self):
         # Store pending load and debounce
         self._pending_image_path = image_path
         self._pending_image_idx = curr_image_idx
+        self._pending_image_level = size_idx
 
         # Restart timer (cancels previous pending load)
         self._image_load_timer.stop()
@@ -366,16 +400,186 @@ def _perform_delayed_image_load(self):
         if self._pending_image_path is None:
             return
 
-        # Load image
-        self.image_label.set_image(self._pending_image_path)
-        if self._pending_image_idx is not None:
-            self.image_label.set_curr_idx(self._pending_image_idx)
+        # The slice shown may come from a coarser level than the one selected
+        selected, idx = self._pending_image_level, self._pending_image_idx
+        level = self._display_level(selected)
+        info = self.level_info[level] if level < len(self.level_info) else None
+        last_idx = info["seq_end"] - info["seq_begin"] if info is not None else None
+        level_idx = idx >> (level - selected)
+        if last_idx is not None:
+            level_idx = min(level_idx, last_idx)
+
+        # Cached: show it. Else show the smallest level's slice at once and
+        # decode the finer ones, down to `level`, in the background.
+        self.slice_refiner.cancel()
+        self._refine_target = None
+        arr = self.slice_cache.get((level, level_idx))
+        coarsest = len(self.level_info) - 1
+        if (
+            arr is None
+            and level < coarsest
+            and self.settings_manager.get("thumbnails.progressive_display", True)
+        ):
+            self._show_slice(coarsest, self._level_slice(coarsest, selected, idx), selected, idx)
+            steps = [
+                RefineStep(
+                    finer, self._level_slice(finer, selected, idx), self._slice_loader(finer)
+                )
+                for finer in range(coarsest - 1, level - 1, -1)
+            ]
+            self._refine_target = (selected, idx, level, self._pending_image_path)
+            self.slice_refiner.refine(steps)
+        else:
+            self._show_slice(level, level_idx, selected, idx, arr, self._pending_image_path)
+            # Read on in the direction the slider is moving
+            if last_idx is not None:
+                self.slice_prefetcher.prefetch(
+                    level, level_idx, self._slider_direction, last_idx, self._slice_loader(level)
+                )
+        self.image_label.set_curr_idx(idx)
         self.update_curr_slice()
 
         # Clear pending state
         self._pending_image_path = None
         self._pending_image_idx = None
 
+    def _level_slice(self, level, selected, idx):
+        """Slice of `level` standing for slice `idx` of `selected`, a finer level."""
+        info = self.level_info[level]
+        return min(idx >> (level - selected), info["seq_end"] - info["seq_begin"])
+
+    def _show_slice(self, level, level_idx, selected, idx, arr=None, file_path=None):
+        """Show slice `level_idx` of `level` in place of slice `idx` of `selected`.
+
+        Args:
+            arr: The slice if already decoded; else it is read from the cache or
+                decoded here
+            file_path: The selected slice's file, shown in the overlay and
+                loaded through set_image when there is no array to show. None
+                for a coarse preview, which is skipped if it cannot be decoded.
+        """
+        if arr is None:
+            arr = self.slice_cache.get((level, level_idx))
+        if arr is None:
+            arr = self._slice_loader(level)(level_idx)
+            if arr is not None:
+                self.slice_cache.put((level, level_idx), arr)
+        if arr is not None:
+            selected_info = self.level_info[selected]
+            image_size = (
+                (selected_info["width"], selected_info["height"]) if level != selected else None
+            )
+            self.image_label.set_image_array(arr, file_path or "", image_size)
+        elif file_path is not None:
+            self.image_label.set_image(file_path)
+
+    def _show_refined_slice(self, generation, level, level_idx, arr):
+        """Paint a finer version of the shown slice, decoded by the slice refiner.
+
+        Results of a request the slider has since moved past are dropped. The
+        last step is the level _display_level chose; once it is shown, slices
+        are read ahead of the slider from it, as after a cached slice.
+        """
+        if generation != self.slice_refiner.generation or self._refine_target is None:
+            return
+        selected, idx, target, file_path = self._refine_target
+        final = level == target
+        if arr is not None:
+            self._show_slice(level, level_idx, selected, idx, arr, file_path if final else None)
+        elif final:
+            self.image_label.set_image(file_path)
+        else:
+            return
+        self.image_label.set_curr_idx(idx)
+        self.update_curr_slice()
+        if final:
+            self._refine_target = None
+            info = self.level_info[level]
+            self.slice_prefetcher.prefetch(
+                level,
+                level_idx,
+                self._slider_direction,
+                info["seq_end"] - info["seq_begin"],
+                self._slice_loader(level),
+            )
+
+    def _display_level(self, level):
+        """The level to show for `level`: the coarsest that still has the view's resolution.
+
+        Levels halve in every dimension, so a level at least as wide as the
+        view shows as much detail there as the selected one, for a fraction of
+        the decoding. Slice i of the selected level is then slice
+        i >> (difference in levels) of the one shown, which averages the
+        slices around it. thumbnails.match_display_resolution turns this off.
+
+        Returns:
+            int: Index into level_info, `level` or higher
+        """
+        if not self.settings_manager.get("thumbnails.match_display_resolution", True):
+            return level
+        info = self.level_info[level]
+        needed = info["width"] * self.image_label.display_scale(info["width"], info["height"])
+        shown = level
+        for coarser in range(level + 1, len(self.level_info)):
+            if self.level_info[coarser]["width"] < needed:
+                break
+            shown = coarser
+        return shown
+
+    def _slice_loader(self, level):
+        """A function decoding slice i of `level` for the viewer, from any thread.
+
+        The container, or the file names, are looked up here on the GUI thread,
+        so the prefetcher's threads touch neither the window nor its settings.
+
+        Returns:
+            Callable taking a slice index and returning a 2D array, or None for
+            a slice to be shown through set_image (see load_display_slice)
+        """
+        container = self.level_container(level) if level else None
+        if container is not None:
+            return lambda i: np.array(container[i]) if i < len(container) else None
+
+        if level == 0:
+            dirname = Path(self.edtDirname.text())
+            prefix = self.settings_hash["prefix"]
+            seq_begin = self.level_info[0]["seq_begin"]
+            index_length = self.settings_hash["index_length"]
+            file_type = self.settings_hash["file_type"]
+            return lambda i: load_display_slice(
+                str(dirname / f"{prefix}{str(seq_begin + i).zfill(index_length)}.{file_type}")
+            )
+        level_dir = Path(self.edtDirname.text()) / ".thumbnail" / str(level)
+        return lambda i: load_display_slice(str(level_dir / f"{i:06}.tif"))
+
+    def level_container(self, level):
+        """Map a thumbnail level's container, once per level.
+
+        Returns:
+            The (slices, height, width) memory map, or None when the level has
+            no container and is read from its TIFF files
+        """
+        if level not in self._level_containers:
+            thumbnail_base = Path(self.edtDirname.text()) / ".thumbnail"
+            self._level_containers[level] = open_level(thumbnail_base, level)
+        return self._level_containers[level]
+
+    def release_level_containers(self):
+        """Unmap every level container and drop the cached slices.
+
+        Called before a build or another directory. A mapped file cannot be
+        replaced on Windows, and a build replaces them; cached slices would
+        show the levels as they were.
+        """
+        self._level_containers = {}
+        self.slice_refiner.cancel()
+        self._refine_target = None
+        self.slice_prefetcher.cancel()
+        self.slice_cache.clear()
+        self.slice_cache.limit_bytes = slice_cache_bytes(
+            self.settings_manager.get("processing.memory_limit_gb", 4)
+        )
+
     def reset_crop(self):
         """
         Reset crop area and timeline range to defaults.
@@ -531,7 +735,9 @@ def load_thumbnail_data_from_disk(self):
         dirname = self.edtDirname.text()
 
         # Load thumbnail data using ThumbnailGenerator
-        minimum_volume, thumbnail_info = self.thumbnail_generator.load_thumbnail_data(dirname)
+        minimum_volume, thumbnail_info = self.thumbnail_generator.load_thumbnail_data(
+            dirname, memory_limit_gb=self.settings_manager.get("processing.memory_limit_gb", 4)
+        )
 
         if minimum_volume is None:
             logger.warning("No thumbnail data loaded")
@@ -650,6 +856,7 @@ def _reset_ui_state(self):
             self.minimum_volume = None
         if hasattr(self, "level_volumes"):
             self.level_volumes = {}
+        self.release_level_containers()
 
     @guard_slot("opening directory")
     def open_dir(self):
@@ -717,48 +924,35 @@ def _show_preview_error_placeholder(self, error_message):
 
     def _load_existing_thumbnail_levels(self, ddir):
         """Check for existing thumbnail directories and populate level_info"""
+        from config.constants import MAX_THUMBNAIL_LEVELS
+
         thumbnail_base = str(Path(ddir) / ".thumbnail")
         if not Path(thumbnail_base).exists():
             return
 
         logger.info(f"Found existing thumbnail directory: {thumbnail_base}")
-        level_idx = 1
-        while True:
-            level_dir = str(Path(thumbnail_base) / str(level_idx))
-            if not Path(level_dir).exists():
-                break
+        try:
+            # Slice count and size of each level, from the pyramid index if current
+            levels = find_levels(ddir, MAX_THUMBNAIL_LEVELS)
+        except Exception:
+            logger.exception(f"Error reading thumbnail levels in {thumbnail_base}")
+            return
 
-            # Get first image from this level to determine dimensions
-            try:
-                files = sorted(
-                    [
-                        f
-                        for f in (e.name for e in Path(level_dir).iterdir())
-                        if f.endswith("." + self.settings_hash["file_type"])
-                    ]
-                )
-                if files:
-                    first_img_path = str(Path(level_dir) / files[0])
-                    width, height = get_image_dimensions(first_img_path)
-
-                    # Calculate sequence range for this level
-                    seq_begin = self.settings_hash["seq_begin"]
-                    seq_end = seq_begin + len(files) - 1
-
-                    self.level_info.append(
-                        {
-                            "name": f"Level {level_idx}",
-                            "width": width,
-                            "height": height,
-                            "seq_begin": seq_begin,
-                            "seq_end": seq_end,
-                        }
-                    )
-            except Exception:
-                logger.exception(f"Error reading thumbnail level {level_idx}")
-                break
+        for summary in levels:
+            if not summary.count:
+                continue
 
-            level_idx += 1
+            # Calculate sequence range for this level
+            seq_begin = self.settings_hash["seq_begin"]
+            self.level_info.append(
+                {
+                    "name": f"Level {summary.level}",
+                    "width": summary.width,
+                    "height": summary.height,
+                    "seq_begin": seq_begin,
+                    "seq_end": seq_begin + summary.count - 1,
+                }
+            )
 
     def read_settings(self):
         """
@@ -783,6 +977,9 @@ def closeEvent(self, event):
         """
         logger.info("Application closing")
         self.save_settings()
+        self.slice_refiner.close()
+        self.slice_prefetcher.close()
+        self.mcube_widget.mesh_service.close()
 
         # Wait for thread pool to finish (max 5 seconds)
         if self.threadpool.activeThreadCount() > 0:
@@ -5,61 +5,69 @@
 Updated during Phase 1.2 UI/UX improvements with non-blocking mesh generation.
 """
 
+import ctypes
 import logging
 from copy import deepcopy
 from pathlib import Path
-from queue import Queue
 
-import mcubes
 import numpy as np
 from OpenGL.GL import (
+    GL_ARRAY_BUFFER,
     GL_BLEND,
     GL_COLOR_BUFFER_BIT,
     GL_COLOR_MATERIAL,
-    GL_COMPILE,
     GL_DEPTH_BUFFER_BIT,
     GL_DEPTH_TEST,
+    GL_ELEMENT_ARRAY_BUFFER,
+    GL_FLOAT,
     GL_LIGHT0,
     GL_LIGHTING,
     GL_LINES,
     GL_MODELVIEW,
+    GL_NORMAL_ARRAY,
     GL_ONE_MINUS_SRC_ALPHA,
     GL_POINT_SMOOTH,
     GL_PROJECTION,
     GL_QUADS,
     GL_SMOOTH,
     GL_SRC_ALPHA,
+    GL_STATIC_DRAW,
     GL_TRIANGLES,
+    GL_UNSIGNED_INT,
+    GL_VERTEX_ARRAY,
     glBegin,
+    glBindBuffer,
     glBlendFunc,
-    glCallList,
+    glBufferData,
     glClear,
     glClearColor,
     glColor3f,
     glColor4f,
     glDisable,
+    glDisableClientState,
+    glDrawElements,
     glEnable,
+    glEnableClientState,
     glEnd,
-    glEndList,
-    glGenLists,
+    glGenBuffers,
     glLineWidth,
     glLoadIdentity,
     glMatrixMode,
-    glNewList,
-    glNormal3fv,
+    glNormalPointer,
     glRotatef,
     glShadeModel,
     glTranslatef,
     glVertex3fv,
+    glVertexPointer,
     glViewport,
 )
 from OpenGL.GLU import gluLookAt, gluPerspective
-from PyQt5.QtCore import Qt, QThread, QThreadPool, QTimer, pyqtSignal
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
 from PyQt5.QtGui import QCursor, QPixmap
 from PyQt5.QtOpenGL import QGLWidget
 from PyQt5.QtWidgets import QCheckBox, QLabel
-from scipy import ndimage
 
+from config.constants import MESH_CACHE_MB, PREVIEW_TRIANGLE_BUDGET
 from config.view_modes import (
     MOVE_3DVIEW_MODE,
     OBJECT_MODE,
@@ -69,117 +77,41 @@
     VIEW_MODE,
     ZOOM_MODE,
 )
+from core.mesh_service import MeshCache, MeshService
+from core.mesh_transform import TransformedMeshCache
 from utils.common import resource_path
 from utils.image_utils import safe_load_image
-from utils.worker import Worker
 
 logger = logging.getLogger(__name__)
 
+# Bytes per vertex in the buffer pack_mesh_buffers builds: position, then normal
+_VERTEX_STRIDE = 6 * 4
 
-class MeshGenerationThread(QThread):
-    """
-    Non-blocking mesh generation thread
 
-    Performs marching cubes algorithm in background thread to prevent UI blocking.
-    Emits signals for progress, completion, and errors.
-    """
+def pack_mesh_buffers(vertices, vertex_normals, triangles):
+    """Lay a mesh out for one indexed draw call.
 
-    finished = pyqtSignal(dict)  # emits generated_data dict
-    error = pyqtSignal(str)
-    progress = pyqtSignal(int)
+    Args:
+        vertices: (N, 3) vertex positions
+        vertex_normals: (N, 3) normals, one per vertex
+        triangles: (M, 3) vertex indices
 
-    def __init__(self, volume, isovalue, scale_factor, is_inverse):
-        super().__init__()
-        self.volume = volume
-        self.isovalue = isovalue
-        self.scale_factor = scale_factor
-        self.is_inverse = is_inverse
-
-    def run(self):
-        try:
-            logger.info(
-                f"MeshGenerationThread started: isovalue={self.isovalue}, scale_factor={self.scale_factor}"
-            )
-
-            # Scale volume
-            self.progress.emit(10)
-            volume = ndimage.zoom(self.volume, self.scale_factor, order=1)
-
-            # Invert if needed
-            from config.constants import IMAGE_8BIT_MAX
-
-            self.progress.emit(20)
-            if self.is_inverse:
-                volume = IMAGE_8BIT_MAX - volume
-                isovalue = IMAGE_8BIT_MAX - self.isovalue
-            else:
-                isovalue = self.isovalue
-
-            # Marching cubes algorithm
-            self.progress.emit(30)
-            logger.debug("Running marching cubes...")
-            vertices, triangles = mcubes.marching_cubes(volume, isovalue)
-
-            # Calculate face normals (vectorized)
-            self.progress.emit(60)
-            logger.debug("Calculating face normals (vectorized)...")
-
-            # Get vertices for each triangle (broadcasting)
-            v0 = vertices[triangles[:, 0]]  # Shape: (num_triangles, 3)
-            v1 = vertices[triangles[:, 1]]
-            v2 = vertices[triangles[:, 2]]
-
-            # Calculate edges
-            edge1 = v1 - v0  # Shape: (num_triangles, 3)
-            edge2 = v2 - v0
-
-            # Calculate cross products (face normals)
-            face_normals = np.cross(edge1, edge2)  # Shape: (num_triangles, 3)
-
-            # Normalize face normals (vectorized)
-            norms = np.linalg.norm(face_normals, axis=1, keepdims=True)  # Shape: (num_triangles, 1)
-            # Avoid division by zero
-            norms = np.where(norms == 0, 1, norms)
-            face_normals = face_normals / norms
-
-            # Calculate vertex normals (vectorized accumulation)
-            self.progress.emit(80)
-            logger.debug("Calculating vertex normals (vectorized)...")
-            vertex_normals = np.zeros(vertices.shape, dtype=np.float32)
-
-            # Accumulate face normals to vertices using advanced indexing
-            # This replaces the nested loop
-            np.add.at(vertex_normals, triangles[:, 0], face_normals)
-            np.add.at(vertex_normals, triangles[:, 1], face_normals)
-            np.add.at(vertex_normals, triangles[:, 2], face_normals)
-
-            # Normalize vertex normals (vectorized)
-            norms = np.linalg.norm(vertex_normals, axis=1, keepdims=True)
-            # Avoid division by zero
-            norms = np.where(norms == 0, 1, norms)
-            vertex_normals = vertex_normals / norms
-
-            self.progress.emit(95)
-
-            # Create result dict
-            generated_data = {
-                "vertices": vertices,
-                "triangles": triangles,
-                "vertex_normals": vertex_normals,
-            }
-
-            logger.info(
-                f"Mesh generated successfully: {len(vertices)} vertices, {len(triangles)} triangles"
-            )
-            self.progress.emit(100)
-            self.finished.emit(generated_data)
-
-        except Exception as e:
-            logger.error(f"Mesh generation failed: {e}", exc_info=True)
-            self.error.emit(str(e))
+    Returns:
+        tuple: (N, 6) float32 array of position and normal per vertex, and the
+        (M * 3,) uint32 index array
+    """
+    interleaved = np.empty((len(vertices), 6), dtype=np.float32)
+    interleaved[:, :3] = vertices
+    interleaved[:, 3:] = vertex_normals
+    indices = np.ascontiguousarray(triangles, dtype=np.uint32).reshape(-1)
+    return interleaved, indices
 
 
 class MCubeWidget(QGLWidget):
+    # (generation, mesh) and (generation, message) from the mesh service's thread
+    mesh_ready = pyqtSignal(int, object)
+    mesh_failed = pyqtSignal(int, str)
+
     def __init__(self, parent):
         super().__init__(parent=parent)
         self.setMinimumSize(100, 100)
@@ -215,7 +147,13 @@ def __init__(self, parent):
         self.timer2.start()
 
         self.triangles = []
-        self.gl_list_generated = False
+        # The generated mesh as placed in the view (see adjust_volume)
+        self.transformed_mesh = TransformedMeshCache()
+        # Vertex and index buffers holding the mesh, and whether they hold the
+        # current one (see upload_mesh_buffers)
+        self.mesh_buffers = None
+        self.mesh_index_count = 0
+        self.mesh_buffers_current = False
         # Not `self.parent`: that name is QWidget.parent(), and assigning to it
         # replaces the method for this instance, so any caller doing
         # widget.parent() gets the viewer object back instead of the parent
@@ -269,8 +207,6 @@ def __init__(self, parent):
         self.average_coordinates = np.array([0.0, 0.0, 0.0], dtype=np.float64)
         self.bounding_box = None
         self.roi_box = None
-        self.threadpool = QThreadPool()
-        # print("Multithreading with maximum %d threads" % self.threadpool.maxThreadCount())
         self.vertices: np.ndarray = np.empty((0, 3), dtype=np.float64)
         self.setCursor(QCursor(Qt.CursorShape.ArrowCursor))
         self.generate_mesh_under_way = False
@@ -278,10 +214,19 @@ def __init__(self, parent):
         self.generated_data = None
         self.is_inverse = False
 
-        self.queue: Queue = Queue()
-
-        # Phase 1.2: Non-blocking mesh generation
-        self.mesh_generation_thread = None
+        # Meshes are built off the GUI thread, newest request only, and cached
+        # by (ROI, level, isovalue, inverse); see generate_mesh
+        self.mesh_key = None
+        # Preview meshes are decimated to this many triangles; 0: not at all
+        self.triangle_budget = PREVIEW_TRIANGLE_BUDGET
+        self.mesh_ready.connect(self._on_mesh_ready)
+        self.mesh_failed.connect(self._on_mesh_failed)
+        self.mesh_service = MeshService(
+            MeshCache(MESH_CACHE_MB * 1024**2),
+            on_mesh=lambda generation, key, mesh: self.mesh_ready.emit(generation, mesh),
+            on_error=self.mesh_failed.emit,
+            on_progress=self._on_mesh_progress,
+        )
 
     def recalculate_geometry(self):
         # self.scale = self.parent_widget.
@@ -292,26 +237,6 @@ def recalculate_geometry(self):
         self.resize_self()
         self.reposition_self()
 
-    def start_generate_mesh(self):
-        self.threadpool.start(self.worker)
-
-    def progress_fn(self, n):
-        # print("progress_fn")
-        return
-
-    def execute_this_fn(self, progress_callback):
-        return
-
-        # return "Done."
-
-    def print_output(self, s):
-        return
-
-    def thread_complete(self):
-        # print("THREAD COMPLETE!")
-        self.adjust_volume()
-        return
-
     def expandButton_mousePressEvent(self, event):
         self.scale += 0.1
         self.resize_self()
@@ -520,11 +445,19 @@ def rotate_boxes(self):
         return
 
     def generate_mesh_multithread(self):
-        # put current parameters to the queue
-        self.queue.put((self.volume, self.isovalue))
+        # Requests are coalesced by the mesh service: only the newest is built
+        self.generate_mesh()
+
+    def update_volume(self, volume, key=None):
+        """Set the volume meshes are made from.
 
-    def update_volume(self, volume):
+        Args:
+            volume: The cropped volume
+            key: Identifies it for the mesh cache, e.g. (ROI, level); None
+                for a volume whose meshes are not cached
+        """
         self.set_volume(volume)
+        self.mesh_key = key
 
     def adjust_volume(self):
         if self.generate_mesh_under_way:
@@ -537,13 +470,15 @@ def adjust_volume(self):
             return
 
         self.adjust_volume_under_way = True
-        self.vertices = deepcopy(self.generated_data["vertices"])
-        self.triangles = deepcopy(self.generated_data["triangles"])
-        self.vertex_normals = deepcopy(self.generated_data["vertex_normals"])
-
-        self.scale_volume()
-        self.apply_volume_displacement()
-        self.rotate_volume()
+        # Scaled down, centred on the ROI and in [z, x, y] order; the cache
+        # hands back the same arrays while neither mesh nor ROI has changed
+        vertices, vertex_normals = self.transformed_mesh.get(
+            self.generated_data, scale=0.1, displacement=self.volume_displacement
+        )
+        if vertices is not self.vertices:
+            self.vertices, self.vertex_normals = vertices, vertex_normals
+            self.triangles = self.generated_data["triangles"]
+            self.mesh_buffers_current = False
 
         self.adjust_volume_under_way = False
 
@@ -558,42 +493,56 @@ def show_buttons(self):
 
     def generate_mesh(self):
         """
-        Generate 3D mesh using non-blocking thread (Phase 1.2 improvement)
+        Generate 3D mesh in the background, superseding any mesh still being built
 
-        Uses MeshGenerationThread to perform marching cubes in background,
-        keeping UI responsive during mesh generation.
+        A mesh already built for the same volume key, isovalue, inversion and
+        triangle budget is taken from the cache and shown at once. Otherwise the mesh service
+        builds it on its thread and _on_mesh_ready shows it, unless another
+        request has been made by then. The volume is read, not copied: the
+        window replaces its volume rather than writing into it.
         """
-        # Prevent concurrent mesh generation
-        if self.mesh_generation_thread and self.mesh_generation_thread.isRunning():
-            logger.warning("Mesh generation already in progress, skipping")
-            return
-
-        self.generate_mesh_under_way = True
-
         max_len = max(self.volume.shape)
         scale_factor = 50.0 / max_len
+        key = None
+        if self.mesh_key is not None:
+            key = (
+                self.mesh_key,
+                float(self.isovalue),
+                bool(self.is_inverse),
+                int(self.triangle_budget),
+            )
 
-        # Create and start mesh generation thread
-        self.mesh_generation_thread = MeshGenerationThread(
-            volume=self.volume.copy(),  # Copy to avoid concurrent access issues
-            isovalue=self.isovalue,
-            scale_factor=scale_factor,
-            is_inverse=self.is_inverse,
+        generated_data = self.mesh_service.request(
+            key,
+            self.volume,
+            self.isovalue,
+            scale_factor,
+            self.is_inverse,
+            triangle_budget=int(self.triangle_budget),
         )
+        if generated_data is not None:
+            logger.info("Mesh taken from cache")
+            self._on_mesh_generated(generated_data)
+        else:
+            self.generate_mesh_under_way = True
 
-        # Connect signals
-        self.mesh_generation_thread.finished.connect(self._on_mesh_generated)
-        self.mesh_generation_thread.error.connect(self._on_mesh_error)
-        self.mesh_generation_thread.progress.connect(self._on_mesh_progress)
+    def _on_mesh_ready(self, generation, generated_data):
+        """Show a mesh from the service, if no newer one has been asked for since."""
+        if generation != self.mesh_service.generation:
+            return
+        self._on_mesh_generated(generated_data)
 
-        logger.info("Starting non-blocking mesh generation thread")
-        self.mesh_generation_thread.start()
+    def _on_mesh_failed(self, generation, error_msg):
+        if generation != self.mesh_service.generation:
+            return
+        self._on_mesh_error(error_msg)
 
     def _on_mesh_generated(self, generated_data):
         """Handle mesh generation completion"""
         self.generated_data = generated_data
-        self.gl_list_generated = False
+        self.mesh_buffers_current = False
         self.generate_mesh_under_way = False
+        self.adjust_volume()
         logger.info("Mesh generation complete, triggering GL update")
         self.update()  # Trigger OpenGL repaint
 
@@ -623,34 +572,6 @@ def _on_mesh_progress(self, percentage):
         """Handle mesh generation progress update"""
         logger.debug(f"Mesh generation progress: {percentage}%")
 
-    def apply_volume_displacement(self):
-        if len(self.vertices) > 0:
-            self.vertices = deepcopy(self.vertices - self.volume_displacement)
-
-    def rotate_volume(self):
-        # rotate vertices
-        if len(self.vertices) > 0:
-            # print(self.vertices.shape)
-            for i in range(len(self.vertices)):
-                # print("vertices[i]", i, self.vertices[i])
-                self.vertices[i] = np.array(
-                    [self.vertices[i][2], self.vertices[i][0], self.vertices[i][1]]
-                )
-                self.vertex_normals[i] = np.array(
-                    [
-                        self.vertex_normals[i][2],
-                        self.vertex_normals[i][0],
-                        self.vertex_normals[i][1],
-                    ]
-                )
-
-        # print(self.bounding_box_vertices[0])
-
-    def scale_volume(self):
-        if len(self.vertices) > 0:
-            self.vertices /= 10.0
-        return
-
     def set_isovalue(self, isovalue):
         self.isovalue = isovalue
 
@@ -667,19 +588,6 @@ def read_images_from_folder(self, folder):
         return np.array(images)
 
     def generate_mesh_timeout(self):
-        # print("timout2")
-        if not self.queue.empty() and not self.generate_mesh_under_way:
-            while not self.queue.empty():
-                (volume, isovalue) = self.queue.get()
-            self.volume = volume
-            self.isovalue = isovalue
-            self.worker = Worker(
-                self.generate_mesh
-            )  # Any other args, kwargs are passed to the run function
-            self.worker.signals.result.connect(self.print_output)
-            self.worker.signals.finished.connect(self.thread_complete)
-            self.worker.signals.progress.connect(self.progress_fn)
-            self.threadpool.start(self.worker)
         self.updateGL()
 
     def rotate_timeout(self):
@@ -825,10 +733,10 @@ def paintGL(self):
 
         """ render 3d model """
         glColor3f(0.0, 1.0, 0.0)
-        if not self.gl_list_generated:
-            self.generate_gl_list()
+        if not self.mesh_buffers_current:
+            self.upload_mesh_buffers()
 
-        self.render_gl_list()
+        self.render_mesh_buffers()
 
         """ draw current slice plane """
         glColor4f(0.0, 1.0, 0.0, 0.5)
@@ -839,23 +747,38 @@ def paintGL(self):
 
         return
 
-    def render_gl_list(self):
-        if not self.gl_list_generated:
+    def render_mesh_buffers(self):
+        """Draw the uploaded mesh with one indexed call."""
+        if self.mesh_buffers is None or self.mesh_index_count == 0:
             return
-        glCallList(self.gl_list)
-        return
-
-    def generate_gl_list(self):
-        self.gl_list = glGenLists(1)
-        glNewList(self.gl_list, GL_COMPILE)
-
-        # Render the 3D surface
-        glBegin(GL_TRIANGLES)
-
-        for triangle in self.triangles:
-            for vertex in triangle:
-                glNormal3fv(self.vertex_normals[vertex])
-                glVertex3fv(self.vertices[vertex])
-        glEnd()
-        glEndList()
-        self.gl_list_generated = True
+        vertex_buffer, index_buffer = self.mesh_buffers
+        glBindBuffer(GL_ARRAY_BUFFER, vertex_buffer)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, index_buffer)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_NORMAL_ARRAY)
+        glVertexPointer(3, GL_FLOAT, _VERTEX_STRIDE, ctypes.c_void_p(0))
+        glNormalPointer(GL_FLOAT, _VERTEX_STRIDE, ctypes.c_void_p(3 * 4))
+        glDrawElements(GL_TRIANGLES, self.mesh_index_count, GL_UNSIGNED_INT, ctypes.c_void_p(0))
+        glDisableClientState(GL_NORMAL_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def upload_mesh_buffers(self):
+        """Copy the mesh arrays into the GL buffers, replacing the previous mesh.
+
+        Called from paintGL, where the widget's context is current. The
+        buffers are created once and their storage replaced on each upload.
+        """
+        if self.mesh_buffers is None:
+            self.mesh_buffers = tuple(int(buffer) for buffer in glGenBuffers(2))
+        vertex_buffer, index_buffer = self.mesh_buffers
+        interleaved, indices = pack_mesh_buffers(self.vertices, self.vertex_normals, self.triangles)
+        glBindBuffer(GL_ARRAY_BUFFER, vertex_buffer)
+        glBufferData(GL_ARRAY_BUFFER, interleaved.nbytes, interleaved, GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, index_buffer)
+        glBufferData(GL_ELEMENT_ARRAY_BUFFER, indices.nbytes, indices, GL_STATIC_DRAW)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        self.mesh_index_count = len(indices)
+        self.mesh_buffers_current = True
@@ -6,11 +6,13 @@
 """
 
 import logging
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
 from typing import TYPE_CHECKING
 
 import numpy as np
-from PyQt5.QtCore import QRect, Qt
+from PyQt5.QtCore import QRect, QSize, Qt
 from PyQt5.QtGui import (
     QColor,
     QFont,
@@ -59,6 +61,32 @@
 }
 
 
+@lru_cache(maxsize=8)
+def threshold_lut(sixteen_bit, threshold, inverse, color):
+    """RGB lookup table showing a slice in gray, with pixels past `threshold` in `color`.
+
+    Indexed by pixel value: 256 entries for 8-bit slices, 65,536 for 16-bit
+    ones, whose values are shown by their high byte. Pixels whose shown value
+    is above the threshold (at or below it if `inverse`) take `color`.
+
+    Args:
+        sixteen_bit: Whether the table is for 16-bit slices
+        threshold: 8-bit isovalue, or None for plain gray
+        inverse: Colour the pixels at or below the threshold instead
+        color: (r, g, b) of coloured pixels
+
+    Returns:
+        Read-only (entries, 3) uint8 array
+    """
+    values = np.arange(65536 if sixteen_bit else 256)
+    gray = (values >> 8 if sixteen_bit else values).astype(np.uint8)
+    lut = np.repeat(gray[:, None], 3, axis=1)
+    if threshold is not None:
+        lut[gray <= threshold if inverse else gray > threshold] = color
+    lut.flags.writeable = False
+    return lut
+
+
 class ObjectViewer2D(QLabel):
     def __init__(self, widget):
         super().__init__(widget)
@@ -72,6 +100,12 @@ def __init__(self, widget):
         self.edit_mode = MODE["ADD_BOX"]
         self.orig_pixmap = None
         self.curr_pixmap = None
+        # Grayscale array of orig_pixmap, its resampled copy, and rendered results
+        self._gray = None
+        self._gray_pixmap = None
+        self._image_size_override = None
+        self._scaled = None
+        self._render_cache: OrderedDict[tuple, QPixmap] = OrderedDict()
         self.distance_threshold = self._2imgx(5)
         self.setMouseTracking(True)
         # Set by MainWindowSetup right after construction; None until then, and
@@ -195,6 +229,29 @@ def canvas_box(self):
     def canvas_box(self, value):
         self.roi_manager.canvas_box = value
 
+    def _image_size(self):
+        if self._image_size_override is not None and self._gray_pixmap is self.orig_pixmap:
+            return self._image_size_override
+        return self.orig_pixmap.width(), self.orig_pixmap.height()
+
+    def image_width(self):
+        """Width of the shown slice's level, the space ROI coordinates are in.
+
+        The pixmap's width, unless a coarser level is shown in place of the
+        selected one (see set_image_array).
+        """
+        return self._image_size()[0]
+
+    def image_height(self):
+        """Height of the shown slice's level; see image_width."""
+        return self._image_size()[1]
+
+    def display_scale(self, width, height):
+        """Screen pixels per image pixel for a width x height image shown here."""
+        if width / height > self.width() / self.height():
+            return self.scale * self.width() / width
+        return self.scale * self.height() / height
+
     def get_pixmap_geometry(self):
         if self.curr_pixmap:
             return self.curr_pixmap.rect()
@@ -217,7 +274,7 @@ def set_full_roi(self):
         """Set ROI to cover entire image (delegates to ROIManager)."""
         if self.orig_pixmap is None:
             return
-        self.roi_manager.set_image_size(self.orig_pixmap.width(), self.orig_pixmap.height())
+        self.roi_manager.set_image_size(self.image_width(), self.image_height())
         self.roi_manager.set_full_roi()
         # Update canvas box representation
         if self.image_canvas_ratio != 0:
@@ -239,8 +296,8 @@ def set_roi_from_fractions(self, x1, y1, x2, y2):
         if self.orig_pixmap is None:
             return False
 
-        width = self.orig_pixmap.width()
-        height = self.orig_pixmap.height()
+        width = self.image_width()
+        height = self.image_height()
         self.roi_manager.set_image_size(width, height)
         self.roi_manager.set_roi_bounds(
             round(x1 * width), round(y1 * height), round(x2 * width), round(y2 * height)
@@ -257,10 +314,10 @@ def is_roi_full_or_empty(self):
             return True
         # Ensure ROIManager has image size set
         if (
-            self.roi_manager.image_width != self.orig_pixmap.width()
-            or self.roi_manager.image_height != self.orig_pixmap.height()
+            self.roi_manager.image_width != self.image_width()
+            or self.roi_manager.image_height != self.image_height()
         ):
-            self.roi_manager.set_image_size(self.orig_pixmap.width(), self.orig_pixmap.height())
+            self.roi_manager.set_image_size(self.image_width(), self.image_height())
         return self.roi_manager.is_full_or_empty()
 
     def _update_canvas_box(self):
@@ -441,9 +498,9 @@ def mousePressEvent(self, event):
                 img_y = self._2imgy(me.y())
                 if (
                     img_x < 0
-                    or img_x > self.orig_pixmap.width()
+                    or img_x > self.image_width()
                     or img_y < 0
-                    or img_y > self.orig_pixmap.height()
+                    or img_y > self.image_height()
                 ):
                     return
                 self.temp_x1 = img_x
@@ -487,9 +544,9 @@ def mouseReleaseEvent(self, ev: QMouseEvent | None) -> None:
                 img_y = self._2imgy(self.mouse_curr_y)
                 if (
                     img_x < 0
-                    or img_x > self.orig_pixmap.width()
+                    or img_x > self.image_width()
                     or img_y < 0
-                    or img_y > self.orig_pixmap.height()
+                    or img_y > self.image_height()
                 ):
                     return
                 self.crop_from_x = min(self.temp_x1, self.temp_x2)
@@ -538,6 +595,25 @@ def mouseReleaseEvent(self, ev: QMouseEvent | None) -> None:
         self.repaint()
 
     def get_crop_area(self, imgxy=False):
+        from_x, from_y, to_x, to_y = self._canvas_crop_area()
+        if imgxy:
+            if from_x <= 0 and from_y <= 0 and to_x <= 0 and to_y <= 0 and self.orig_pixmap:
+                return [0, 0, self.image_width(), self.image_height()]
+            else:
+                return [
+                    self._2imgx(from_x),
+                    self._2imgy(from_y),
+                    self._2imgx(to_x),
+                    self._2imgy(to_y),
+                ]
+        else:
+            # default to full canvas if ROI not yet defined
+            if from_x <= 0 and from_y <= 0 and to_x <= 0 and to_y <= 0 and self.curr_pixmap:
+                return [0, 0, self.curr_pixmap.width(), self.curr_pixmap.height()]
+            return [from_x, from_y, to_x, to_y]
+
+    def _canvas_crop_area(self):
+        """ROI in canvas coordinates as drawn now, mid-drag included; -1s if unset."""
         from_x = -1
         to_x = -1
         from_y = -1
@@ -567,21 +643,7 @@ def get_crop_area(self, imgxy=False):
             from_y = self._2cany(min(self.crop_from_y, self.crop_to_y))
             to_y = self._2cany(max(self.crop_from_y, self.crop_to_y))
 
-        if imgxy:
-            if from_x <= 0 and from_y <= 0 and to_x <= 0 and to_y <= 0 and self.orig_pixmap:
-                return [0, 0, self.orig_pixmap.width(), self.orig_pixmap.height()]
-            else:
-                return [
-                    self._2imgx(from_x),
-                    self._2imgy(from_y),
-                    self._2imgx(to_x),
-                    self._2imgy(to_y),
-                ]
-        else:
-            # default to full canvas if ROI not yet defined
-            if from_x <= 0 and from_y <= 0 and to_x <= 0 and to_y <= 0 and self.curr_pixmap:
-                return [0, 0, self.curr_pixmap.width(), self.curr_pixmap.height()]
-            return [from_x, from_y, to_x, to_y]
+        return [from_x, from_y, to_x, to_y]
 
     def paintEvent(self, event):
         painter = QPainter(self)
@@ -645,66 +707,92 @@ def paintEvent(self, event):
         [x1, y1, x2, y2] = self.get_crop_area()
         painter.drawRect(x1, y1, x2 - x1, y2 - y1)
 
-    def apply_threshold_and_colorize(self, qt_pixmap, threshold, color=None):
-        """
-        Apply threshold and colorize image efficiently with minimal copies.
+    def _gray_source(self):
+        """The shown slice as a 2D uint8 or uint16 array.
 
-        Optimized to reduce memory allocations:
-        - Use view operations instead of copies where possible
-        - Create RGB output array once
-        - Direct indexing without intermediate copies
+        set_image_array keeps the array it was given. A pixmap from set_image,
+        or assigned directly, is converted to 8-bit grayscale once, on first use.
+        """
+        if self._gray is None or self._gray_pixmap is not self.orig_pixmap:
+            image = self.orig_pixmap.toImage().convertToFormat(QImage.Format_Grayscale8)
+            width, height = image.width(), image.height()
+            buffer = image.constBits()
+            buffer.setsize(image.byteCount())
+            rows = np.frombuffer(buffer, dtype=np.uint8).reshape(height, image.bytesPerLine())
+            self._gray = rows[:, :width].copy()
+            self._gray_pixmap = self.orig_pixmap
+            self._scaled = None
+            self._render_cache.clear()
+        return self._gray
+
+    def _scaled_gray(self, width, height):
+        """The shown slice resampled to width x height, nearest neighbour as Qt scales.
+
+        The last result is kept, so a threshold change does not resample again.
         """
-        qt_image = qt_pixmap.toImage()
-        width = qt_image.width()
-        height = qt_image.height()
+        gray = self._gray_source()
+        if self._scaled is None or self._scaled[0] != (width, height):
+            rows = np.arange(height) * gray.shape[0] // height
+            cols = np.arange(width) * gray.shape[1] // width
+            self._scaled = ((width, height), gray[rows[:, None], cols])
+        return self._scaled[1]
 
-        # Get buffer as read-only view (no copy)
-        buffer = qt_image.constBits()
-        buffer.setsize(qt_image.byteCount())
+    def render_thresholded(self, width, height):
+        """The slice at width x height, with pixels past the isovalue coloured inside the ROI.
 
-        # Create view of RGBA data (no copy)
-        rgba_view = np.frombuffer(buffer, dtype=np.uint8).reshape((height, width, 4))
+        Each pixel is looked up in a table of 256 entries (65,536 for 16-bit
+        slices) built once per threshold, rather than converted and masked
+        image by image. Results are kept, keyed by what they depend on, so a
+        resize or threshold already seen is not rendered again.
 
-        from config.constants import COLOR_GREEN, IMAGE_8BIT_MAX, IMAGE_8BIT_MIN
+        Args:
+            width: Display width in pixels
+            height: Display height in pixels
 
-        # Create RGB output array (single allocation)
-        # This is the only necessary copy - we need RGB format for QImage
-        rgb_array = np.empty((height, width, 3), dtype=np.uint8)
-        rgb_array[:] = rgba_view[:, :, :3]  # Copy RGB channels, drop alpha
+        Returns:
+            QPixmap
 
-        # Default color if not provided
-        if color is None:
-            color = np.array(COLOR_GREEN, dtype=np.uint8)
+        Raises:
+            ValueError: The isovalue is outside the 8-bit range
+        """
+        from config.constants import (
+            COLOR_GREEN,
+            IMAGE_8BIT_MAX,
+            IMAGE_8BIT_MIN,
+            VIEWER_RENDER_CACHE_ENTRIES,
+        )
 
-        # Validate threshold
         threshold = self.isovalue
         if not IMAGE_8BIT_MIN <= threshold <= IMAGE_8BIT_MAX:
             raise ValueError(f"Threshold should be in the range {IMAGE_8BIT_MIN}-{IMAGE_8BIT_MAX}")
 
-        # Get crop area
-        [x1, y1, x2, y2] = self.get_crop_area()
-        if x1 == x2 == y1 == y2 == 0:
-            # Whole pixmap is selected
-            x1, x2, y1, y2 = 0, width, 0, height
-
-        # Create region view (no copy)
-        region = rgb_array[y1 : y2 + 1, x1 : x2 + 1]
-
-        # Apply threshold mask and colorize in-place
-        mask = region[:, :, 0] <= threshold if self.is_inverse else region[:, :, 0] > threshold
-
-        # Apply color in-place (no intermediate array)
-        region[mask] = color
+        x1, y1, x2, y2 = self._canvas_crop_area()
+        if x1 <= 0 and y1 <= 0 and x2 <= 0 and y2 <= 0:
+            # No ROI yet: the whole slice
+            x1, y1, x2, y2 = 0, 0, width, height
+
+        self._gray_source()  # clears the results if the slice has changed
+        key = (threshold, self.is_inverse, (x1, y1, x2, y2), (width, height))
+        pixmap = self._render_cache.get(key)
+        if pixmap is not None:
+            self._render_cache.move_to_end(key)
+            return pixmap
+
+        scaled = self._scaled_gray(width, height)
+        sixteen_bit = scaled.dtype == np.uint16
+        rgb = threshold_lut(sixteen_bit, None, False, None)[scaled]
+        region = (slice(y1, y2 + 1), slice(x1, x2 + 1))
+        rgb[region] = threshold_lut(sixteen_bit, threshold, self.is_inverse, COLOR_GREEN)[
+            scaled[region]
+        ]
 
-        # Create QImage directly from array data (minimal overhead)
-        bytes_per_line = 3 * width
-        # Keep rgb_array alive by storing reference
-        qt_image = QImage(rgb_array.data, width, height, bytes_per_line, QImage.Format_RGB888)
+        image = QImage(rgb.data, width, height, 3 * width, QImage.Format_RGB888)
+        pixmap = QPixmap.fromImage(image.copy())  # copy: the image must not outlive rgb
 
-        # Convert to QPixmap
-        # Note: QImage holds reference to rgb_array.data, so array must stay alive
-        modified_pixmap = QPixmap.fromImage(qt_image.copy())  # Copy here to own the data
-        return modified_pixmap
+        self._render_cache[key] = pixmap
+        while len(self._render_cache) > VIEWER_RENDER_CACHE_ENTRIES:
+            self._render_cache.popitem(last=False)
+        return pixmap
 
     def set_image(self, file_path):
         # print("set_image", file_path)
@@ -726,7 +814,39 @@ def set_image(self, file_path):
                 self.canvas_box = None
                 return
         self.fullpath = actual_path
-        self.curr_pixmap = self.orig_pixmap = QPixmap(actual_path)
+        self._show_pixmap(QPixmap(actual_path))
+
+    def set_image_array(self, arr, file_path="", image_size=None):
+        """Show a slice already in memory, e.g. one read from a level container.
+
+        The array is kept for thresholding (see render_thresholded), so one
+        mapped from a container is copied first, leaving the file free.
+
+        Args:
+            arr: 2D uint8 or uint16 slice
+            file_path: Name shown in the overlay, that of the slice's file
+            image_size: (width, height) of the level the slice stands for, when
+                a coarser level is shown in its place because the view has
+                fewer pixels than it. ROI coordinates stay in that level's space.
+        """
+        arr = np.array(arr) if isinstance(arr, np.memmap) else np.ascontiguousarray(arr)
+        image_format = (
+            QImage.Format_Grayscale16 if arr.dtype == np.uint16 else QImage.Format_Grayscale8
+        )
+        if image_format == QImage.Format_Grayscale8 and arr.dtype != np.uint8:
+            arr = arr.astype(np.uint8)
+        height, width = arr.shape
+        # copy() detaches the image from arr, which may be a memory map
+        image = QImage(arr.data, width, height, arr.strides[0], image_format).copy()
+        self.fullpath = file_path
+        self._show_pixmap(QPixmap.fromImage(image), arr, image_size)
+
+    def _show_pixmap(self, pixmap, gray=None, image_size=None):
+        self.curr_pixmap = self.orig_pixmap = pixmap
+        self._gray, self._gray_pixmap = gray, pixmap
+        self._image_size_override = tuple(image_size) if image_size is not None else None
+        self._scaled = None
+        self._render_cache.clear()
 
         self.setPixmap(self.curr_pixmap)
         self.calculate_resize()
@@ -752,8 +872,7 @@ def calculate_resize(self):
         # print("objectviewer calculate resize")
         if self.orig_pixmap is not None:
             self.distance_threshold = self._2imgx(DISTANCE_THRESHOLD)
-            self.orig_width = self.orig_pixmap.width()
-            self.orig_height = self.orig_pixmap.height()
+            self.orig_width, self.orig_height = self._image_size()
             image_wh_ratio = self.orig_width / self.orig_height
             label_wh_ratio = self.width() / self.height()
             if image_wh_ratio > label_wh_ratio:
@@ -761,19 +880,24 @@ def calculate_resize(self):
             else:
                 self.image_canvas_ratio = self.orig_height / self.height()
 
-            self.curr_pixmap = self.orig_pixmap.scaled(
-                int(self.orig_width * self.scale / self.image_canvas_ratio),
-                int(self.orig_width * self.scale / self.image_canvas_ratio),
-                Qt.AspectRatioMode.KeepAspectRatio,
+            box = int(self.orig_width * self.scale / self.image_canvas_ratio)
+            size = QSize(self.orig_width, self.orig_height).scaled(
+                box, box, Qt.AspectRatioMode.KeepAspectRatio
             )
-            # Always colorize current slice by threshold. If range not set, treat as full stack
+            # Colour the current slice by threshold whatever the index range
             if self.isovalue > 0:
-                if self.bottom_idx < 0 or self.top_idx < 0 or self.bottom_idx > self.top_idx:
-                    # default to full range
-                    pass
-                self.curr_pixmap = self.apply_threshold_and_colorize(
-                    self.curr_pixmap, self.isovalue
-                )
+                self.curr_pixmap = self.render_thresholded(size.width(), size.height())
+            else:
+                self.curr_pixmap = self.orig_pixmap.scaled(size)
+
+    def shows_coarser_than_view(self):
+        """Whether the slice shown in place of its level has fewer pixels than the view."""
+        return (
+            self._image_size_override is not None
+            and self._gray_pixmap is self.orig_pixmap
+            and self.curr_pixmap is not None
+            and self.orig_pixmap.width() < self.curr_pixmap.width()
+        )
 
     def resizeEvent(self, a0: QResizeEvent | None) -> None:
         self.calculate_resize()
@@ -782,6 +906,9 @@ def resizeEvent(self, a0: QResizeEvent | None) -> None:
         # raise AttributeError before it reached super().
         if self.object_dialog is not None:
             self.object_dialog.mcube_widget.reposition_self()
+            if self.shows_coarser_than_view():
+                # Grown past the level shown: have a finer one loaded
+                self.object_dialog.sliderValueChanged()
 
         if self.canvas_box:
             self.canvas_box = QRect(
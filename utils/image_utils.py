@@ -4,7 +4,7 @@
 
 import logging
 from pathlib import Path
-from typing import TypedDict
+from typing import Any, TypedDict
 
 import numpy as np
 from PIL import Image
@@ -177,6 +177,98 @@ def average_images(img1: np.ndarray, img2: np.ndarray) -> np.ndarray:
     return result
 
 
+def _accumulator_dtype(dtype: np.dtype) -> np.dtype:
+    """Integer type twice as wide as `dtype`, or float64 where there is none."""
+    if np.issubdtype(dtype, np.integer) and dtype.itemsize <= 4:
+        return np.dtype(f"{dtype.kind}{dtype.itemsize * 2}")
+    return np.dtype(np.float64)
+
+
+def reduction_scratch(shape: tuple[int, ...], dtype: Any) -> tuple[np.ndarray, np.ndarray]:
+    """Scratch arrays for reduce_slices, to reuse across slices of one level.
+
+    Args:
+        shape: Shape of the source slices
+        dtype: Dtype of the source slices
+
+    Returns:
+        (rows, blocks) -- row-pair sums and 2x2 block sums, in the accumulator
+        dtype
+    """
+    h2, w2 = shape[0] // 2, shape[1] // 2
+    acc_dtype = _accumulator_dtype(np.dtype(dtype))
+    rows = np.empty((h2, 2 * w2, *shape[2:]), dtype=acc_dtype)
+    blocks = np.empty((h2, w2, *shape[2:]), dtype=acc_dtype)
+    return rows, blocks
+
+
+def reduce_slices(
+    img1: np.ndarray,
+    img2: np.ndarray | None = None,
+    out: np.ndarray | None = None,
+    scratch: tuple[np.ndarray, np.ndarray] | None = None,
+) -> np.ndarray:
+    """Reduce a pair of slices to one half-size slice: the 2x2x2 block mean.
+
+    The pyramid step in one pass. Each output pixel is the mean of the 2x2
+    block under it in both slices, summed in an integer type twice as wide
+    and rounded once at the end, so 8- and 16-bit stacks reduce the same way
+    and nothing is lost to an intermediate rounding. The sum is built from
+    strided views of the sources; no widened copy of a whole slice is made.
+    An odd last row or column is dropped.
+
+    Args:
+        img1: Source slice, (height, width) or (height, width, channels)
+        img2: The slice after it, or None to halve img1 alone (the last slice
+            of an odd-length level). Converted to img1's dtype if it differs.
+        out: Array for the result, (height // 2, width // 2) in img1's dtype;
+            allocated if None
+        scratch: From reduction_scratch(img1.shape, img1.dtype), to reuse
+            across calls; allocated if None or not for this shape and dtype
+
+    Returns:
+        np.ndarray: `out`, holding the reduced slice
+
+    Raises:
+        ValueError: img2 or out has the wrong shape
+    """
+    h2, w2 = img1.shape[0] // 2, img1.shape[1] // 2
+    extra = img1.shape[2:]
+    if img2 is not None and img2.shape != img1.shape:
+        raise ValueError(f"Cannot reduce slices of shapes {img1.shape} and {img2.shape}")
+    if out is None:
+        out = np.empty((h2, w2, *extra), dtype=img1.dtype)
+    elif out.shape != (h2, w2, *extra):
+        raise ValueError(f"Output of shape {out.shape} for a reduced slice of {(h2, w2, *extra)}")
+
+    acc_dtype = _accumulator_dtype(img1.dtype)
+    if scratch is None or scratch[1].shape != out.shape or scratch[1].dtype != acc_dtype:
+        scratch = reduction_scratch(img1.shape, img1.dtype)
+    rows, blocks = scratch
+
+    # Row pairs of each slice go into `rows`, column pairs of that into `blocks`
+    pairs = img1[: 2 * h2, : 2 * w2].reshape(h2, 2, 2 * w2, *extra)
+    np.add(pairs[:, 0], pairs[:, 1], out=rows, dtype=acc_dtype)
+    count = 4
+    if img2 is not None:
+        if img2.dtype != img1.dtype:
+            img2 = img2.astype(img1.dtype)
+        pairs = img2[: 2 * h2, : 2 * w2].reshape(h2, 2, 2 * w2, *extra)
+        rows += pairs[:, 0]
+        rows += pairs[:, 1]
+        count = 8
+    columns = rows.reshape(h2, w2, 2, *extra)
+    np.add(columns[:, :, 0], columns[:, :, 1], out=blocks)
+
+    if acc_dtype.kind == "f":
+        blocks /= count
+    else:
+        blocks += count // 2
+        blocks >>= count.bit_length() - 1
+    np.copyto(out, blocks, casting="unsafe")
+    return out
+
+
 def save_image_from_array(img_array: np.ndarray, output_path: str, compress: bool = True) -> bool:
     """
     Save numpy array as image file
@@ -235,6 +327,55 @@ def save_image_from_array(img_array: np.ndarray, output_path: str, compress: boo
         return True
 
 
+class OutputWriteError(OSError):
+    """Raised when a generated image could not be written.
+
+    A separate type from the OSError a failed read raises, because the two are
+    handled differently: an unreadable source is logged and skipped, while a
+    failed write (a full disk, a lost share) fails every output after it and
+    has to reach the user. Built as OSError(errno, strerror, filename), so it
+    pickles across process boundaries.
+    """
+
+
+def save_image_atomic(img: np.ndarray | Image.Image, output_path: str) -> None:
+    """Write an image so that `output_path` is either complete or absent.
+
+    The image is written to a hidden temporary file in the same directory and
+    renamed over `output_path`, so a crash or a full disk never leaves a
+    truncated file under the real name. The format comes from the extension of
+    `output_path`.
+
+    Args:
+        img: Image array or PIL image
+        output_path: Final path
+
+    Raises:
+        OutputWriteError: The write or the rename failed; nothing is left behind
+    """
+    import uuid
+
+    path = Path(output_path)
+    fmt = Image.registered_extensions().get(path.suffix.lower())
+    # Opened by name rather than with mkstemp so the file gets the usual
+    # permissions; mkstemp's 0600 would survive the rename.
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        with tmp_path.open("xb") as f:
+            if isinstance(img, Image.Image):
+                img.save(f, format=fmt)
+            else:
+                with Image.fromarray(img) as pil_img:
+                    pil_img.save(f, format=fmt)
+        tmp_path.replace(path)
+    except OSError as e:
+        tmp_path.unlink(missing_ok=True)
+        raise OutputWriteError(e.errno, e.strerror or str(e), output_path) from e
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
 def get_image_dimensions(image_path: str) -> tuple[int, int]:
     """
     Get image dimensions without full load
@@ -140,11 +140,33 @@ def _get_default_settings(self) -> dict:
                 "compression": True,
                 # tif, png
                 "format": "tif",
+                # Python fallback only: build every level from one read of the
+                # original slices instead of re-reading each level from disk to
+                # make the next. The Rust module always works this way.
+                "single_pass": True,
+                # Python fallback only: also pack each finished level into one
+                # .thumbnail/level_<n>.npy file, which the viewer and loaders read
+                # instead of a file per slice. The TIFF files are kept either way.
+                "level_containers": True,
+                # Show a coarser level in place of the selected one when it still
+                # has as many pixels as the 2D view. Its slices average 2, 4, ...
+                # slices of the selected level.
+                "match_display_resolution": True,
+                # Show a slice not yet decoded from the smallest level first, then
+                # from each finer level as it is decoded in the background.
+                "progressive_display": True,
             },
             "processing": {
                 # auto, or a specific number (1-16)
                 "threads": "auto",
                 "memory_limit_gb": 4,
+                # Python fallback only. threads: PyramidEngine runs each level's
+                # slice pairs on a pool of `threads` threads (or the single-pass
+                # builder on one), as batch mode's --engine threads does.
+                # processes: a pool of `threads` spawned worker processes, which
+                # uses every core but costs a second or so of process start-up
+                # per build.
+                "python_engine": "threads",
                 # True uses the compiled Rust thumbnail generator, which is what
                 # the application ships with. If the module is missing or fails to
                 # import, ThumbnailCreationHandler falls back to the Python
@@ -157,10 +179,15 @@ def _get_default_settings(self) -> dict:
                 "default_threshold": 128,
                 "anti_aliasing": True,
                 "show_fps": False,
+                # The 3D preview's mesh is decimated to about this many
+                # triangles (0: never). Exported meshes are never decimated.
+                "preview_triangle_budget": 50000,
             },
             "export": {
                 # stl, ply, obj
                 "mesh_format": "stl",
+                # Per-vertex normals in PLY and OBJ exports (STL has facet normals)
+                "mesh_normals": False,
                 # tif, png, jpg
                 "image_format": "tif",
                 # 0-9